@@ -4,7 +4,9 @@ Backup CLI script for unitMail.
 
 This script provides a command-line interface for creating automated backups
 of unitMail data. It is designed to be cron-friendly with proper exit codes
-and supports both full and incremental backups.
+and supports full, incremental and differential backups. Incremental and
+differential backups build on the backups already in the output directory,
+as recorded in its manifest; restore them with scripts/restore.py.
 
 Usage:
     python scripts/backup.py --output /path/to/backup --password <password>
@@ -26,12 +28,11 @@ Examples:
         --password "secure_password" \\
         --user-id "550e8400-e29b-41d4-a716-446655440000"
 
-    # Create an incremental backup
+    # Create an incremental backup on the latest one in /home/user/backups
     python scripts/backup.py \\
         --output /home/user/backups \\
         --password-file /etc/unitmail/backup-password \\
-        --incremental \\
-        --last-backup "2024-01-01T00:00:00"
+        --incremental
 
     # Cron job (daily at 2 AM)
     0 2 * * * /usr/bin/python3 /opt/unitmail/scripts/backup.py \\
@@ -41,7 +42,6 @@ Examples:
 """
 
 import argparse
-import asyncio
 import getpass
 import os
 import sys
@@ -57,11 +57,12 @@ sys.path.insert(0, str(project_root / "src"))
 from client.services.backup_service import (
     BackupContents,
     BackupError,
-    BackupMetadata,
+    BackupManifest,
     BackupProgress,
     BackupService,
+    BackupType,
 )
-from common.database import get_db
+from common.storage import EmailStorage
 
 
 # Exit codes
@@ -121,12 +122,19 @@ def print_info(text: str) -> None:
     print(f"{Colors.BLUE}[INFO]{Colors.RESET} {text}")
 
 
+_last_percent = -1
+
+
 def print_progress(progress: BackupProgress) -> None:
-    """Print progress update."""
+    """Print progress update, at most once per percent."""
+    global _last_percent
+
+    percent = int(progress.percent_complete)
     if progress.is_complete:
         print_success(progress.current_step)
-    else:
-        print(f"  {Colors.DIM}[{progress.percent_complete:.0f}%]{Colors.RESET} {progress.current_step}")
+    elif percent != _last_percent:
+        print(f"  {Colors.DIM}[{percent}%]{Colors.RESET} {progress.current_step}")
+    _last_percent = percent
 
 
 def format_size(size: int) -> str:
@@ -204,7 +212,7 @@ def parse_datetime(value: str) -> Optional[datetime]:
     return None
 
 
-async def run_backup(args: argparse.Namespace) -> int:
+def run_backup(args: argparse.Namespace) -> int:
     """
     Execute the backup operation.
 
@@ -217,10 +225,17 @@ async def run_backup(args: argparse.Namespace) -> int:
     print_header("unitMail Backup")
 
     # Validate user ID
-    try:
-        user_id = UUID(args.user_id)
-    except (ValueError, TypeError):
-        print_error(f"Invalid user ID: {args.user_id}")
+    user_id = None
+    if args.user_id:
+        try:
+            user_id = UUID(args.user_id)
+        except (ValueError, TypeError):
+            print_error(f"Invalid user ID: {args.user_id}")
+            return EXIT_CONFIG_ERROR
+
+    database = os.path.expanduser(args.database)
+    if not os.path.exists(database):
+        print_error(f"Database not found: {database}")
         return EXIT_CONFIG_ERROR
 
     # Get password
@@ -232,14 +247,34 @@ async def run_backup(args: argparse.Namespace) -> int:
         print_error("Password must be at least 8 characters")
         return EXIT_CONFIG_ERROR
 
+    if args.incremental:
+        backup_type = BackupType.INCREMENTAL
+    elif args.differential:
+        backup_type = BackupType.DIFFERENTIAL
+    else:
+        backup_type = BackupType.FULL
+
     # Validate output path
     output_path = Path(args.output)
+    backup_dir = output_path if output_path.is_dir() else output_path.parent
+
+    base_type = BackupType.FULL if args.differential else None
+    if (
+        backup_type != BackupType.FULL
+        and BackupManifest(backup_dir).latest(base_type) is None
+    ):
+        print_warning(
+            f"No backup to build on in {backup_dir}; creating a full backup"
+        )
+        backup_type = BackupType.FULL
 
     if output_path.is_dir():
         # Generate filename if directory provided
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_type = "incr" if args.incremental else "full"
-        filename = f"unitmail_backup_{backup_type}_{timestamp}.unitmail-backup"
+        label = {"incremental": "incr", "differential": "diff"}.get(
+            backup_type.value, "full"
+        )
+        filename = f"unitmail_backup_{label}_{timestamp}.unitmail-backup"
         output_path = output_path / filename
 
     # Ensure parent directory exists
@@ -250,10 +285,10 @@ async def run_backup(args: argparse.Namespace) -> int:
         return EXIT_FS_ERROR
 
     # Parse last backup timestamp for incremental
-    last_backup_timestamp = None
-    if args.incremental and args.last_backup:
-        last_backup_timestamp = parse_datetime(args.last_backup)
-        if last_backup_timestamp is None:
+    since = None
+    if backup_type != BackupType.FULL and args.last_backup:
+        since = parse_datetime(args.last_backup)
+        if since is None:
             print_error(f"Invalid last backup timestamp: {args.last_backup}")
             return EXIT_CONFIG_ERROR
 
@@ -269,8 +304,10 @@ async def run_backup(args: argparse.Namespace) -> int:
 
     # Show configuration
     print_info(f"Output: {output_path}")
-    print_info(f"Backup type: {'Incremental' if args.incremental else 'Full'}")
-    print_info(f"User ID: {user_id}")
+    print_info(f"Backup type: {backup_type.value.capitalize()}")
+    print_info(f"Database: {database}")
+    if user_id:
+        print_info(f"User ID: {user_id}")
 
     if args.verbose:
         print_info("Contents:")
@@ -282,7 +319,7 @@ async def run_backup(args: argparse.Namespace) -> int:
         print(f"  PGP Keys:      {'Yes' if contents.pgp_keys else 'No'}")
 
     # Create backup service
-    backup_service = BackupService()
+    backup_service = BackupService(EmailStorage(database))
 
     if not args.quiet:
         backup_service.set_progress_callback(print_progress)
@@ -294,14 +331,12 @@ async def run_backup(args: argparse.Namespace) -> int:
     try:
         start_time = datetime.now()
 
-        metadata = await backup_service.create_backup(
+        metadata = backup_service.create_backup(
             output_path=output_path,
             password=password,
-            user_id=user_id,
-            user_email=args.user_email or "",
             contents=contents,
-            incremental=args.incremental,
-            last_backup_timestamp=last_backup_timestamp,
+            backup_type=backup_type,
+            since=since,
         )
 
         end_time = datetime.now()
@@ -365,12 +400,14 @@ Examples:
   # Incremental backup with password file
   %(prog)s --output /backups --password-file /etc/unitmail/pass --incremental
 
+  # Restore the backups in /backups as of a point in time
+  scripts/restore.py --backup-dir /backups --point-in-time 2024-01-01T12:00:00
+
   # Skip certain content types
   %(prog)s --output /backups --password "secret" --skip-pgp --skip-dkim
 
 Environment Variables:
-  SUPABASE_URL - Database URL (required)
-  SUPABASE_KEY - Database API key (required)
+  UNITMAIL_BACKUP_PASSWORD - Default source of the encryption password
         """,
     )
 
@@ -383,10 +420,15 @@ Environment Variables:
 
     parser.add_argument(
         "--user-id", "-u",
-        required=True,
         help="UUID of the user to backup",
     )
 
+    parser.add_argument(
+        "--database", "-d",
+        default="~/.unitmail/data/unitmail.db",
+        help="Mailbox database to back up (default: ~/.unitmail/data/unitmail.db)",
+    )
+
     # Password options (one required)
     password_group = parser.add_mutually_exclusive_group()
     password_group.add_argument(
@@ -404,16 +446,23 @@ Environment Variables:
     )
 
     # Backup type
-    parser.add_argument(
+    type_group = parser.add_mutually_exclusive_group()
+    type_group.add_argument(
         "--incremental", "-i",
         action="store_true",
         help="Create incremental backup (only changes since last backup)",
     )
+    type_group.add_argument(
+        "--differential",
+        action="store_true",
+        help="Create differential backup (only changes since last full backup)",
+    )
 
     parser.add_argument(
         "--last-backup",
         metavar="TIMESTAMP",
-        help="Timestamp of last backup for incremental mode (ISO format)",
+        help="Include changes after this time instead of after the last "
+        "backup (ISO format, local time)",
     )
 
     # Content selection
@@ -493,7 +542,7 @@ def main() -> int:
         Colors.disable()
 
     try:
-        return asyncio.run(run_backup(args))
+        return run_backup(args)
 
     except KeyboardInterrupt:
         print("\nBackup cancelled.")
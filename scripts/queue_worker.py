@@ -10,8 +10,10 @@ Usage:
 
 Options:
     --workers N       Number of concurrent workers (default: 4)
+    --processes N     Number of worker processes (default: 1)
+    --cpu-workers N   Processes composing and signing messages (default: 0)
     --batch-size N    Number of items to fetch per batch (default: 10)
-    --poll-interval S Seconds between queue polls (default: 1.0)
+    --poll-interval S Fallback seconds between queue polls (default: 30.0)
     --config FILE     Path to configuration file
     --debug           Enable debug mode
     --help            Show this message and exit
@@ -23,6 +25,9 @@ Examples:
     Start with 8 workers:
         python queue_worker.py --workers 8
 
+    Start 8 processes of 4 workers each:
+        python queue_worker.py --processes 8 --workers 4
+
     Start in debug mode:
         python queue_worker.py --debug --workers 2
 """
@@ -34,16 +39,25 @@ import os
 import signal
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 # Add the src directory to the Python path
 src_dir = Path(__file__).resolve().parent.parent / "src"
 sys.path.insert(0, str(src_dir))
 
+if TYPE_CHECKING:
+    from gateway.smtp.queue import QueueManager
+    from gateway.smtp.supervisor import QueueSupervisor, StatsReporter
+
 
 # Global reference for signal handler
 _queue_manager: Optional["QueueManager"] = None
+_supervisor: Optional["QueueSupervisor"] = None
 _shutdown_requested = False
+_stop_task: Optional[asyncio.Task] = None
+
+# Seconds between stats reports from worker processes to the supervisor
+STATS_REPORT_INTERVAL = 5.0
 
 
 def setup_logging(debug: bool = False) -> logging.Logger:
@@ -98,6 +112,12 @@ Examples:
     Start with 8 workers:
         python queue_worker.py --workers 8
 
+    Spread delivery across 8 processes (e.g. one per core):
+        python queue_worker.py --processes 8
+
+    Compose and DKIM sign in 2 helper processes, off the event loop:
+        python queue_worker.py --cpu-workers 2
+
     Start with custom batch size and poll interval:
         python queue_worker.py --workers 4 --batch-size 20 --poll-interval 0.5
 
@@ -106,8 +126,10 @@ Examples:
 
 Environment Variables:
     QUEUE_WORKERS           Number of concurrent workers
+    QUEUE_PROCESSES         Number of worker processes
+    QUEUE_CPU_WORKERS       Processes composing and signing messages
     QUEUE_BATCH_SIZE        Items to fetch per batch
-    QUEUE_POLL_INTERVAL     Seconds between polls
+    QUEUE_POLL_INTERVAL     Fallback seconds between polls
     UNITMAIL_CONFIG_FILE    Path to configuration file
     SUPABASE_URL            Supabase project URL
     SUPABASE_KEY            Supabase API key
@@ -122,6 +144,28 @@ Environment Variables:
         help="Number of concurrent workers (default: 4 or QUEUE_WORKERS)",
     )
 
+    parser.add_argument(
+        "--processes",
+        "-P",
+        type=int,
+        default=None,
+        help=(
+            "Number of worker processes, each running --workers concurrent "
+            "workers against the shared queue (default: 1 or QUEUE_PROCESSES)"
+        ),
+    )
+
+    parser.add_argument(
+        "--cpu-workers",
+        type=int,
+        default=None,
+        help=(
+            "Processes that compose and DKIM sign outgoing messages, per "
+            "worker process; 0 composes on the event loop "
+            "(default: 0 or QUEUE_CPU_WORKERS)"
+        ),
+    )
+
     parser.add_argument(
         "--batch-size",
         "-b",
@@ -135,7 +179,10 @@ Environment Variables:
         "-p",
         type=float,
         default=None,
-        help="Seconds between queue polls (default: 1.0 or QUEUE_POLL_INTERVAL)",
+        help=(
+            "Fallback seconds between queue polls; new work wakes the "
+            "worker immediately (default: 30.0 or QUEUE_POLL_INTERVAL)"
+        ),
     )
 
     parser.add_argument(
@@ -258,6 +305,8 @@ async def run_queue_worker(
     max_retries: Optional[int],
     shutdown_timeout: Optional[float],
     logger: logging.Logger,
+    stats_reporter: Optional["StatsReporter"] = None,
+    cpu_workers: int = 0,
 ) -> int:
     """
     Run the queue worker main loop.
@@ -270,6 +319,10 @@ async def run_queue_worker(
         max_retries: Maximum retry attempts.
         shutdown_timeout: Graceful shutdown timeout.
         logger: Logger instance.
+        stats_reporter: Reporter to the supervisor when running as one of
+            several worker processes.
+        cpu_workers: Processes composing and signing messages (0 to
+            compose on the event loop).
 
     Returns:
         Exit code (0 for success).
@@ -277,7 +330,10 @@ async def run_queue_worker(
     global _queue_manager, _shutdown_requested
 
     # Import queue modules after path setup
+    from common.config import get_settings
+    from gateway.smtp.executor import CPUExecutor, RenderOptions
     from gateway.smtp.queue import QueueManager, QueueConfig, create_queue_manager
+    from gateway.smtp.sender import create_smtp_sender
     from gateway.smtp.worker import QueueWorker
 
     # Build configuration
@@ -299,16 +355,53 @@ async def run_queue_worker(
     queue_manager = QueueManager(config=config, event_handler=event_handler)
     queue_manager.set_worker_class(QueueWorker)
 
+    # One long-lived SMTP client shared by every worker
+    settings = get_settings()
+    queue_manager.set_sender(
+        create_smtp_sender(
+            hostname=settings.smtp.hostname,
+            dns_resolver=settings.dns.resolver,
+        )
+    )
+
+    # Compose and DKIM sign off the event loop, or on it without CPU workers
+    render_options = RenderOptions(
+        default_domain=settings.smtp.hostname,
+        dkim_domain=settings.dns.dkim_domain,
+        dkim_selector=settings.dns.dkim_selector,
+        dkim_private_key_path=settings.dns.dkim_private_key_path,
+    )
+    queue_manager.set_render_options(render_options)
+    if cpu_workers > 0:
+        queue_manager.set_executor(
+            CPUExecutor(max_workers=cpu_workers, options=render_options)
+        )
+
     # Store global reference for signal handler
     _queue_manager = queue_manager
 
+    # Handle shutdown signals on the event loop: a handler installed with
+    # signal.signal() does not wake it, so the stop would wait for the
+    # next poll. Worker processes ignore SIGINT and keep ignoring it.
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        if signal.getsignal(signum) is not signal.SIG_IGN:
+            loop.add_signal_handler(signum, signal_handler, signum, None)
+
     logger.info(
-        "Starting queue worker with configuration: workers=%d, batch_size=%d, poll_interval=%.1fs",
+        "Starting queue worker with configuration: "
+        "workers=%d, batch_size=%d, poll_interval=%.1fs",
         num_workers,
         batch_size,
         poll_interval,
     )
 
+    reporter_task = None
+    if stats_reporter is not None:
+        reporter_task = asyncio.create_task(
+            stats_reporter.run(queue_manager, STATS_REPORT_INTERVAL)
+        )
+
     try:
         # Run the queue manager
         await queue_manager.start()
@@ -323,6 +416,8 @@ async def run_queue_worker(
         return 1
 
     finally:
+        if reporter_task is not None:
+            reporter_task.cancel()
         if queue_manager.is_running:
             logger.info("Stopping queue manager...")
             await queue_manager.stop()
@@ -336,7 +431,7 @@ def signal_handler(signum: int, frame) -> None:
         signum: Signal number.
         frame: Current stack frame.
     """
-    global _shutdown_requested
+    global _shutdown_requested, _stop_task
 
     signal_name = signal.Signals(signum).name
     logger = logging.getLogger("unitmail.queue_worker")
@@ -348,12 +443,79 @@ def signal_handler(signum: int, frame) -> None:
     logger.info("Received %s, initiating graceful shutdown...", signal_name)
     _shutdown_requested = True
 
-    # Request queue manager to stop
+    # Supervisor: run() stops the worker processes and returns
+    if _supervisor is not None:
+        _supervisor.stop()
+        return
+
+    # Request queue manager to stop; stop() wakes its process loop
     if _queue_manager and _queue_manager.is_running:
-        # Schedule the stop coroutine
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            asyncio.create_task(_queue_manager.stop())
+        _stop_task = asyncio.get_running_loop().create_task(
+            _queue_manager.stop()
+        )
+
+
+def run_worker_process(
+    index: int, reporter: "StatsReporter", options: dict
+) -> None:
+    """
+    Entry point of one worker process in --processes mode.
+
+    Args:
+        index: Slot number assigned by the supervisor.
+        reporter: Sends this process's QueueStats to the supervisor.
+        options: Keyword arguments for run_queue_worker().
+    """
+    options = dict(options)
+    setup_logging(options.pop("debug"))
+    logger = logging.getLogger(f"unitmail.queue_worker.{index}")
+
+    # The supervisor coordinates shutdown; a terminal Ctrl-C reaches the
+    # whole process group, so only act on the supervisor's SIGTERM
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    exit_code = asyncio.run(
+        run_queue_worker(logger=logger, stats_reporter=reporter, **options)
+    )
+    if exit_code:
+        sys.exit(exit_code)
+
+
+def run_supervisor(processes: int, options: dict, logger: logging.Logger) -> int:
+    """
+    Run ``processes`` worker processes under a restarting supervisor.
+
+    Args:
+        processes: Number of worker processes.
+        options: Keyword arguments for run_queue_worker(), plus debug.
+        logger: Logger instance.
+
+    Returns:
+        Exit code (0 for success).
+    """
+    global _supervisor
+
+    from gateway.smtp.supervisor import QueueSupervisor
+
+    shutdown_timeout = options.get("shutdown_timeout") or 30.0
+    _supervisor = QueueSupervisor(
+        run_worker_process,
+        processes=processes,
+        args=(options,),
+        # Leave the children time for their own graceful shutdown
+        shutdown_timeout=shutdown_timeout + 5.0,
+    )
+
+    exit_code = _supervisor.run()
+    stats = _supervisor.stats()
+    logger.info(
+        "Processed %d items across %d processes (%d restarts)",
+        stats.total_processed,
+        processes,
+        _supervisor.restarts,
+    )
+    return exit_code
 
 
 def main() -> int:
@@ -383,8 +545,12 @@ def main() -> int:
 
     # Get configuration values
     num_workers = get_config_value(args.workers, "QUEUE_WORKERS", 4, int)
+    processes = get_config_value(args.processes, "QUEUE_PROCESSES", 1, int)
+    cpu_workers = get_config_value(args.cpu_workers, "QUEUE_CPU_WORKERS", 0, int)
     batch_size = get_config_value(args.batch_size, "QUEUE_BATCH_SIZE", 10, int)
-    poll_interval = get_config_value(args.poll_interval, "QUEUE_POLL_INTERVAL", 1.0, float)
+    poll_interval = get_config_value(
+        args.poll_interval, "QUEUE_POLL_INTERVAL", 30.0, float
+    )
     emit_events = not args.no_events
 
     # Validate configuration
@@ -392,6 +558,14 @@ def main() -> int:
         logger.error("Number of workers must be at least 1")
         return 1
 
+    if processes < 1:
+        logger.error("Number of processes must be at least 1")
+        return 1
+
+    if cpu_workers < 0:
+        logger.error("Number of CPU workers cannot be negative")
+        return 1
+
     if batch_size < 1:
         logger.error("Batch size must be at least 1")
         return 1
@@ -405,13 +579,32 @@ def main() -> int:
     signal.signal(signal.SIGINT, signal_handler)
 
     logger.info(
-        "Configuration: workers=%d, batch_size=%d, poll_interval=%.1fs, events=%s",
+        "Configuration: processes=%d, workers=%d, cpu_workers=%d, "
+        "batch_size=%d, poll_interval=%.1fs, events=%s",
+        processes,
         num_workers,
+        cpu_workers,
         batch_size,
         poll_interval,
         "enabled" if emit_events else "disabled",
     )
 
+    if processes > 1:
+        return run_supervisor(
+            processes,
+            {
+                "num_workers": num_workers,
+                "batch_size": batch_size,
+                "poll_interval": poll_interval,
+                "emit_events": emit_events,
+                "max_retries": args.max_retries,
+                "shutdown_timeout": args.shutdown_timeout,
+                "cpu_workers": cpu_workers,
+                "debug": debug,
+            },
+            logger,
+        )
+
     try:
         # Run the async main loop
         exit_code = asyncio.run(
@@ -423,6 +616,7 @@ def main() -> int:
                 max_retries=args.max_retries,
                 shutdown_timeout=args.shutdown_timeout,
                 logger=logger,
+                cpu_workers=cpu_workers,
             )
         )
 
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Restore CLI script for unitMail.
+
+This script restores the backups written by scripts/backup.py. Given a
+backup directory, it reads the directory's manifest and restores the full
+backup and the incremental or differential backups built on it, in order,
+up to the latest backup or up to a point in time.
+
+Usage:
+    python scripts/restore.py --backup-dir /backups --password-file /path/to/pass.txt
+    python scripts/restore.py --backup-dir /backups --point-in-time 2024-01-01T12:00:00
+    python scripts/restore.py --backup-dir /backups --list
+
+Exit Codes:
+    0 - Success
+    1 - General error
+    2 - Configuration error
+    3 - Authentication error
+    4 - Restore error
+"""
+
+import argparse
+import getpass
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from backup import (
+    Colors,
+    parse_datetime,
+    print_error,
+    print_header,
+    print_info,
+    print_progress,
+    print_success,
+)
+from client.services.backup_service import (
+    BackupContents,
+    BackupManifest,
+    BackupService,
+    RestoreError,
+)
+from common.storage import EmailStorage
+
+
+# Exit codes
+EXIT_SUCCESS = 0
+EXIT_ERROR = 1
+EXIT_CONFIG_ERROR = 2
+EXIT_AUTH_ERROR = 3
+EXIT_RESTORE_ERROR = 4
+
+
+def get_password(args: argparse.Namespace) -> Optional[str]:
+    """
+    Get the backup password from arguments, file or environment.
+
+    Args:
+        args: Parsed command-line arguments.
+
+    Returns:
+        Password string or None if not provided.
+    """
+    if args.password:
+        return args.password
+
+    if args.password_file:
+        try:
+            with open(args.password_file, "r") as f:
+                return f.read().strip()
+        except Exception as e:
+            print_error(f"Failed to read password file: {e}")
+            return None
+
+    password = os.environ.get(args.password_env)
+    if password:
+        return password
+
+    if sys.stdin.isatty():
+        try:
+            return getpass.getpass("Backup password: ")
+        except KeyboardInterrupt:
+            print("\nCancelled")
+            return None
+
+    print_error(
+        "No password provided. Use --password, --password-file, or --password-env"
+    )
+    return None
+
+
+def list_backups(manifest: BackupManifest) -> int:
+    """
+    Print the backups recorded in a manifest.
+
+    Args:
+        manifest: Manifest of the backup directory.
+
+    Returns:
+        Exit code.
+    """
+    if not manifest.entries:
+        print_info(f"No backups recorded in {manifest.directory}")
+        return EXIT_SUCCESS
+
+    for entry in manifest.entries:
+        exists = (manifest.directory / entry["file"]).exists()
+        print(
+            f"  {entry['watermark'] or entry['created_at']}  "
+            f"{entry['backup_type']:<12}  {entry['file']}"
+            f"{'' if exists else '  (missing)'}"
+        )
+    return EXIT_SUCCESS
+
+
+def run_restore(args: argparse.Namespace) -> int:
+    """
+    Execute the restore operation.
+
+    Args:
+        args: Parsed command-line arguments.
+
+    Returns:
+        Exit code.
+    """
+    print_header("unitMail Restore")
+
+    backup_dir = Path(args.backup_dir)
+    if not backup_dir.is_dir():
+        print_error(f"Backup directory not found: {backup_dir}")
+        return EXIT_CONFIG_ERROR
+
+    manifest = BackupManifest(backup_dir)
+    if args.list:
+        return list_backups(manifest)
+
+    point_in_time = None
+    if args.point_in_time:
+        point_in_time = parse_datetime(args.point_in_time)
+        if point_in_time is None:
+            print_error(f"Invalid point in time: {args.point_in_time}")
+            return EXIT_CONFIG_ERROR
+
+    try:
+        chain = manifest.chain(point_in_time)
+    except RestoreError as e:
+        print_error(str(e))
+        return EXIT_CONFIG_ERROR
+
+    print_info(f"Database: {os.path.expanduser(args.database)}")
+    print_info("Backups to restore:")
+    for entry in chain:
+        print(f"  {entry['watermark']}  {entry['backup_type']:<12}  {entry['file']}")
+
+    password = get_password(args)
+    if password is None:
+        return EXIT_CONFIG_ERROR
+
+    contents = BackupContents(
+        configuration=not args.skip_config,
+        dkim_keys=not args.skip_dkim,
+        pgp_keys=not args.skip_pgp,
+    )
+
+    backup_service = BackupService(
+        EmailStorage(os.path.expanduser(args.database))
+    )
+    if not args.quiet:
+        backup_service.set_progress_callback(print_progress)
+
+    print()
+    try:
+        start_time = datetime.now()
+        restored = backup_service.restore_point_in_time(
+            backup_dir, password, point_in_time, contents
+        )
+        duration = (datetime.now() - start_time).total_seconds()
+
+    except RestoreError as e:
+        print_error(f"Restore failed: {e}")
+        if "password" in str(e):
+            return EXIT_AUTH_ERROR
+        return EXIT_RESTORE_ERROR
+
+    except Exception as e:
+        print_error(f"Unexpected error: {e}")
+        if args.verbose:
+            import traceback
+            traceback.print_exc()
+        return EXIT_ERROR
+
+    print()
+    print_header("Restore Complete")
+    print_success(f"Restored {len(restored)} backup(s) as of {chain[-1]['watermark']}")
+    print_info(f"Duration: {duration:.1f} seconds")
+    return EXIT_SUCCESS
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Create the argument parser.
+
+    Returns:
+        Configured ArgumentParser instance.
+    """
+    parser = argparse.ArgumentParser(
+        description="unitMail Restore Tool - Restore backups of your email data",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exit Codes:
+  0 - Success
+  1 - General error
+  2 - Configuration error
+  3 - Authentication error
+  4 - Restore error
+
+Examples:
+  # Restore the latest backups in /backups
+  %(prog)s --backup-dir /backups --password-file /etc/unitmail/pass
+
+  # Restore the mailbox as it was at noon on 1 January
+  %(prog)s --backup-dir /backups --point-in-time 2024-01-01T12:00:00
+
+  # List the backups in /backups
+  %(prog)s --backup-dir /backups --list
+
+Environment Variables:
+  UNITMAIL_BACKUP_PASSWORD - Default source of the decryption password
+        """,
+    )
+
+    parser.add_argument(
+        "--backup-dir", "-b",
+        required=True,
+        help="Directory holding the backups and their manifest",
+    )
+
+    parser.add_argument(
+        "--point-in-time", "-t",
+        metavar="TIMESTAMP",
+        help="Restore the mailbox as of this time (ISO format, local time; "
+        "default: latest backup)",
+    )
+
+    parser.add_argument(
+        "--list", "-l",
+        action="store_true",
+        help="List the backups in the directory and exit",
+    )
+
+    parser.add_argument(
+        "--database", "-d",
+        default="~/.unitmail/data/unitmail.db",
+        help="Mailbox database to restore into (default: ~/.unitmail/data/unitmail.db)",
+    )
+
+    # Password options
+    password_group = parser.add_mutually_exclusive_group()
+    password_group.add_argument(
+        "--password", "-p",
+        help="Decryption password (use --password-file for better security)",
+    )
+    password_group.add_argument(
+        "--password-file",
+        help="Path to file containing decryption password",
+    )
+    password_group.add_argument(
+        "--password-env",
+        default="UNITMAIL_BACKUP_PASSWORD",
+        help="Environment variable containing password "
+        "(default: UNITMAIL_BACKUP_PASSWORD)",
+    )
+
+    # Content selection
+    parser.add_argument(
+        "--skip-config",
+        action="store_true",
+        help="Do not restore configuration",
+    )
+    parser.add_argument(
+        "--skip-dkim",
+        action="store_true",
+        help="Do not restore DKIM keys",
+    )
+    parser.add_argument(
+        "--skip-pgp",
+        action="store_true",
+        help="Do not restore PGP keys",
+    )
+
+    # Output control
+    parser.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="Verbose output",
+    )
+    parser.add_argument(
+        "--quiet", "-q",
+        action="store_true",
+        help="Quiet mode (no progress output)",
+    )
+    parser.add_argument(
+        "--no-color",
+        action="store_true",
+        help="Disable colored output",
+    )
+
+    return parser
+
+
+def main() -> int:
+    """
+    Main entry point for the restore CLI.
+
+    Returns:
+        Exit code (0 for success, non-zero for error).
+    """
+    parser = create_parser()
+    args = parser.parse_args()
+
+    # Disable colors if requested, not a TTY, or quiet
+    if args.no_color or args.quiet or not sys.stdout.isatty():
+        Colors.disable()
+
+    try:
+        return run_restore(args)
+
+    except KeyboardInterrupt:
+        print("\nRestore cancelled.")
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
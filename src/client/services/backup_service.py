@@ -7,29 +7,45 @@ DKIM keys, and PGP keys.
 """
 
 import hashlib
-import io
 import json
 import logging
 import os
 import secrets
 import shutil
+import tempfile
+import threading
+import uuid
 import zipfile
-from dataclasses import dataclass, field, asdict
-from datetime import datetime, timezone
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field, fields, asdict
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 from pathlib import Path
-from typing import Any, Callable, Optional, Union
+from typing import Any, BinaryIO, Callable, Optional, Union
 
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
-from common.storage import EmailStorage, get_storage
+from client.services.backup_stream import (
+    CHUNK_SIZE as COPY_CHUNK_SIZE,
+    MAGIC,
+    ZIP_MAGIC,
+    EncryptedBackupReader,
+    EncryptedBackupWriter,
+)
+from common.storage import EmailStorage, get_storage, run_migrations
 from common.exceptions import CryptoError, UnitMailError
 
 logger = logging.getLogger(__name__)
 
+# Incremental backups reach this far back past their base's watermark,
+# so a change committed while the base was being written isn't missed
+INCREMENTAL_OVERLAP = timedelta(minutes=5)
+
 
 class BackupError(UnitMailError):
     """Exception raised for backup-related errors."""
@@ -43,7 +59,10 @@ class BackupType(str, Enum):
     """Type of backup."""
 
     FULL = "full"
+    # Changes since the latest backup of any type
     INCREMENTAL = "incremental"
+    # Changes since the latest full backup
+    DIFFERENTIAL = "differential"
 
 
 class RestoreMode(str, Enum):
@@ -73,6 +92,9 @@ class BackupMetadata:
     contents: dict[str, int] = field(default_factory=dict)
     checksum: str = ""
     database_path: str = ""
+    backup_id: str = ""
+    parent_id: Optional[str] = None  # Backup this one's changes build on
+    watermark: str = ""  # Database changes up to this time are included
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary."""
@@ -81,7 +103,8 @@ class BackupMetadata:
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "BackupMetadata":
         """Create from dictionary."""
-        return cls(**data)
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
 
 
 @dataclass
@@ -133,6 +156,9 @@ class BackupEncryption:
     Handles encryption and decryption for backup files.
 
     Uses AES-256-GCM for authenticated encryption with PBKDF2 key derivation.
+    Backups are now written in the chunked format of
+    client.services.backup_stream; these methods read and write the
+    single-shot format of earlier versions.
     """
 
     SALT_SIZE = 32
@@ -237,21 +263,192 @@ class BackupEncryption:
         except Exception as e:
             raise CryptoError(f"Decryption failed: {e}")
 
+    @classmethod
+    def decrypt_file(cls, fileobj: BinaryIO, password: str) -> BinaryIO:
+        """
+        Decrypt an encrypted file into a temporary file, in chunks.
+
+        The tag is stored ahead of the ciphertext, so the content can be
+        decrypted as it is read and is only verified at the end.
+
+        Args:
+            fileobj: File holding salt, nonce, tag and ciphertext.
+            password: Decryption password.
+
+        Returns:
+            Temporary file with the decrypted data, positioned at the
+            start. The caller closes it.
+
+        Raises:
+            CryptoError: If decryption fails.
+        """
+        salt = fileobj.read(cls.SALT_SIZE)
+        nonce = fileobj.read(cls.NONCE_SIZE)
+        tag = fileobj.read(cls.TAG_SIZE)
+        if len(tag) < cls.TAG_SIZE:
+            raise CryptoError("Decryption failed: file is truncated")
+
+        cipher = Cipher(
+            algorithms.AES(cls.derive_key(password, salt)),
+            modes.GCM(nonce, tag),
+            backend=default_backend(),
+        )
+        decryptor = cipher.decryptor()
+
+        plaintext = tempfile.TemporaryFile()
+        try:
+            while chunk := fileobj.read(COPY_CHUNK_SIZE):
+                plaintext.write(decryptor.update(chunk))
+            decryptor.finalize()
+        except InvalidTag:
+            plaintext.close()
+            raise CryptoError("Decryption failed: invalid password or data")
+        except BaseException:
+            plaintext.close()
+            raise
+
+        plaintext.seek(0)
+        return plaintext
+
+
+class BackupManifest:
+    """
+    Record of the backups written to a directory.
+
+    Each backup is listed with its id, the backup it builds on and its
+    watermark, so an incremental backup can find its base and a restore
+    can find the chain of backups that rebuilds the mailbox as of a
+    point in time.
+    """
+
+    FILENAME = "unitmail-backups.json"
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        """
+        Load the manifest of a backup directory.
+
+        Args:
+            directory: Directory holding the backups.
+        """
+        self.directory = Path(directory)
+        self.path = self.directory / self.FILENAME
+        self.entries: list[dict[str, Any]] = []
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f).get("backups", [])
+
+    def add(self, metadata: BackupMetadata, backup_path: Path) -> None:
+        """Record a backup written to this directory and save."""
+        self.entries.append(
+            {
+                "backup_id": metadata.backup_id,
+                "parent_id": metadata.parent_id,
+                "file": backup_path.name,
+                "backup_type": metadata.backup_type,
+                "created_at": metadata.created_at,
+                "watermark": metadata.watermark,
+            }
+        )
+        # Replaced in one step so a crash never leaves it half written
+        partial_path = self.path.with_name(f"{self.FILENAME}.partial")
+        partial_path.write_text(
+            json.dumps({"backups": self.entries}, indent=2), encoding="utf-8"
+        )
+        os.replace(partial_path, self.path)
+
+    def _restorable(self) -> list[dict[str, Any]]:
+        """Backups that hold the database and still exist, oldest first."""
+        entries = [
+            entry
+            for entry in self.entries
+            if entry.get("watermark")
+            and (self.directory / entry["file"]).exists()
+        ]
+        return sorted(entries, key=lambda entry: entry["watermark"])
+
+    def latest(
+        self, backup_type: Optional[BackupType] = None
+    ) -> Optional[dict[str, Any]]:
+        """
+        Get the most recent backup that holds the database.
+
+        Args:
+            backup_type: Only consider backups of this type.
+
+        Returns:
+            The manifest entry, or None if there is none.
+        """
+        entries = [
+            entry
+            for entry in self._restorable()
+            if backup_type is None or entry["backup_type"] == backup_type.value
+        ]
+        return entries[-1] if entries else None
+
+    def chain(
+        self, point_in_time: Optional[datetime] = None
+    ) -> list[dict[str, Any]]:
+        """
+        Get the backups to restore, in order, to return to a point in time.
+
+        The last backup taken at or before the point in time is followed
+        back through its parents to a full backup.
+
+        Args:
+            point_in_time: Time to restore to. Defaults to the latest backup.
+
+        Returns:
+            Manifest entries, the full backup first.
+
+        Raises:
+            RestoreError: If no backup precedes the point in time or a
+                backup in the chain is missing.
+        """
+        entries = self._restorable()
+        if point_in_time is not None:
+            # Naive times are taken as local time
+            point_in_time = point_in_time.astimezone(timezone.utc)
+            entries = [
+                entry
+                for entry in entries
+                if datetime.fromisoformat(entry["watermark"]) <= point_in_time
+            ]
+        if not entries:
+            when = f" taken by {point_in_time}" if point_in_time else ""
+            raise RestoreError(f"No backup in {self.directory}{when} to restore")
+
+        by_id = {entry["backup_id"]: entry for entry in self._restorable()}
+        chain = [entries[-1]]
+        while chain[0]["backup_type"] != BackupType.FULL.value:
+            parent = by_id.get(chain[0]["parent_id"])
+            if parent is None:
+                raise RestoreError(
+                    f"Backup {chain[0]['file']} builds on a backup that "
+                    "is missing"
+                )
+            chain.insert(0, parent)
+        return chain
+
 
 class BackupService:
     """
     Service for creating and restoring unitMail backups.
 
-    Supports full backups with AES-256 encryption.
-    Backups include the SQLite database file and configuration.
+    Supports full, incremental and differential backups with AES-256
+    encryption. Full backups include a snapshot of the SQLite database;
+    incremental and differential backups include a change set of the rows
+    changed since the backup they build on. Both include configuration
+    and keys.
     """
 
     BACKUP_EXTENSION = ".unitmail-backup"
     METADATA_FILE = "metadata.json"
     DATABASE_FILE = "unitmail.db"
+    CHANGES_FILE = "changes.db"
     CONFIG_FILE = "config.json"
     DKIM_KEYS_DIR = "dkim_keys/"
     PGP_KEYS_DIR = "pgp_keys/"
+    BLOBS_DIR = "attachments/"
 
     def __init__(
         self,
@@ -268,9 +465,14 @@ class BackupService:
         self._storage = storage or get_storage()
         self._progress_callback = progress_callback
         self._last_backup_path: Optional[Path] = None
+        self._cancelled = threading.Event()
 
         logger.info("BackupService initialized with SQLite storage")
 
+    def cancel(self) -> None:
+        """Stop the backup in progress; its partial file is removed."""
+        self._cancelled.set()
+
     def set_progress_callback(
         self, callback: Optional[ProgressCallback]
     ) -> None:
@@ -304,14 +506,31 @@ class BackupService:
         output_path: Union[str, Path],
         password: Optional[str] = None,
         contents: Optional[BackupContents] = None,
+        backup_type: BackupType = BackupType.FULL,
+        since: Optional[datetime] = None,
     ) -> BackupMetadata:
         """
         Create a backup of user data.
 
+        The backup is streamed to disk as it is built: files are copied
+        into the archive in chunks and, when a password is given, the
+        archive is encrypted in chunks as it is written, so memory use
+        does not depend on the size of the mailbox.
+
+        Incremental and differential backups build on the latest backup
+        (or latest full backup) recorded in the manifest of the output
+        directory and hold only the database rows changed since it, so
+        their size follows the mail that arrived rather than the size of
+        the mailbox. Without a base a full backup is made. Every backup
+        is recorded in the manifest.
+
         Args:
             output_path: Path for the backup file.
             password: Encryption password (optional). If None, backup is unencrypted.
             contents: What to include in backup.
+            backup_type: Full, incremental or differential.
+            since: Include changes after this time instead of those after
+                the base backup.
 
         Returns:
             Backup metadata.
@@ -325,6 +544,26 @@ class BackupService:
         if not output_path.suffix:
             output_path = output_path.with_suffix(self.BACKUP_EXTENSION)
 
+        # Written under a temporary name so a failed backup never
+        # replaces a good one
+        partial_path = output_path.with_name(f"{output_path.name}.partial")
+        self._cancelled.clear()
+
+        manifest = BackupManifest(output_path.parent)
+        base = None
+        if backup_type != BackupType.FULL:
+            base = manifest.latest(
+                BackupType.FULL
+                if backup_type == BackupType.DIFFERENTIAL
+                else None
+            )
+            if base is None:
+                logger.warning(
+                    "No backup to build on in %s; creating a full backup",
+                    output_path.parent,
+                )
+                backup_type = BackupType.FULL
+
         self._report_progress("backup", "Initializing backup", 0, 100)
 
         try:
@@ -334,9 +573,21 @@ class BackupService:
             # Create metadata
             metadata = BackupMetadata(
                 created_at=datetime.now(timezone.utc).isoformat(),
-                backup_type=BackupType.FULL.value,
+                backup_type=backup_type.value,
                 database_path=db_path,
+                backup_id=uuid.uuid4().hex,
             )
+            if base is not None:
+                metadata.parent_id = base["backup_id"]
+                if since is None:
+                    since = (
+                        datetime.fromisoformat(base["watermark"])
+                        - INCREMENTAL_OVERLAP
+                    )
+                # Naive times are taken as local time
+                metadata.last_backup_timestamp = since.astimezone(
+                    timezone.utc
+                ).isoformat()
 
             # Get database stats for metadata
             stats = self._storage.get_database_stats()
@@ -346,135 +597,134 @@ class BackupService:
                 "folders": stats.get("folder_count", 0),
             }
 
-            # Create in-memory zip
-            zip_buffer = io.BytesIO()
-
-            with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-                total_steps = sum(
-                    [
-                        contents.database,
-                        contents.configuration,
-                        contents.dkim_keys,
-                        contents.pgp_keys,
-                    ]
-                )
-                current_step = 0
-
-                # Backup database file
-                if contents.database:
-                    self._report_progress(
-                        "backup",
-                        "Backing up database",
-                        current_step,
-                        total_steps,
-                    )
-                    if os.path.exists(db_path):
-                        # Read the database file
-                        with open(db_path, "rb") as f:
-                            zf.writestr(self.DATABASE_FILE, f.read())
-                        metadata.contents["database_size"] = os.path.getsize(
-                            db_path
-                        )
-                    current_step += 1
+            total_steps = sum(
+                [
+                    contents.database,
+                    contents.configuration,
+                    contents.dkim_keys,
+                    contents.pgp_keys,
+                ]
+            )
+            digest = hashlib.sha256()
+            output_path.parent.mkdir(parents=True, exist_ok=True)
 
-                # Backup configuration
-                if contents.configuration:
-                    self._report_progress(
-                        "backup",
-                        "Backing up configuration",
-                        current_step,
-                        total_steps,
+            with open(partial_path, "wb") as f, ExitStack() as stack:
+                target = f
+                if password:
+                    target = stack.enter_context(
+                        EncryptedBackupWriter(f, password)
                     )
-                    config_path = os.path.expanduser(
-                        "~/.config/unitmail/settings.json"
-                    )
-                    if os.path.exists(config_path):
-                        with open(config_path, "r") as f:
-                            zf.writestr(self.CONFIG_FILE, f.read())
-                        metadata.contents["configuration"] = 1
-                    current_step += 1
+                with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as zf:
+                    current_step = 0
 
-                # Backup DKIM keys
-                if contents.dkim_keys:
-                    self._report_progress(
-                        "backup",
-                        "Backing up DKIM keys",
-                        current_step,
-                        total_steps,
-                    )
-                    dkim_dir = os.path.expanduser("~/.unitmail/keys/dkim")
-                    if os.path.exists(dkim_dir):
-                        for filename in os.listdir(dkim_dir):
-                            filepath = os.path.join(dkim_dir, filename)
-                            if os.path.isfile(filepath):
-                                with open(filepath, "rb") as f:
-                                    zf.writestr(
-                                        f"{self.DKIM_KEYS_DIR}{filename}",
-                                        f.read(),
-                                    )
-                        metadata.contents["dkim_keys"] = 1
-                    current_step += 1
-
-                # Backup PGP keys
-                if contents.pgp_keys:
-                    self._report_progress(
-                        "backup",
-                        "Backing up PGP keys",
-                        current_step,
-                        total_steps,
+                    # Backup database file and attachment content
+                    if contents.database:
+                        self._report_progress(
+                            "backup",
+                            "Backing up database",
+                            current_step,
+                            total_steps,
+                        )
+                        if not os.path.exists(db_path):
+                            logger.warning("No database at %s", db_path)
+                        elif base is None:
+                            # Rows committed from here on are left to the
+                            # next incremental backup
+                            metadata.watermark = datetime.now(
+                                timezone.utc
+                            ).isoformat()
+                            metadata.contents["database_size"] = (
+                                self._add_database(
+                                    zf, digest, current_step, total_steps
+                                )
+                            )
+                            metadata.contents["attachment_blobs"] = (
+                                self._add_directory(
+                                    zf,
+                                    self._storage.blobs.root,
+                                    self.BLOBS_DIR,
+                                    digest,
+                                    recursive=True,
+                                )
+                            )
+                        else:
+                            self._add_changes(zf, digest, metadata)
+                        current_step += 1
+
+                    # Backup configuration
+                    if contents.configuration:
+                        self._report_progress(
+                            "backup",
+                            "Backing up configuration",
+                            current_step,
+                            total_steps,
+                        )
+                        config_path = os.path.expanduser(
+                            "~/.config/unitmail/settings.json"
+                        )
+                        if os.path.exists(config_path):
+                            self._add_file(
+                                zf, config_path, self.CONFIG_FILE, digest
+                            )
+                            metadata.contents["configuration"] = 1
+                        current_step += 1
+
+                    # Backup DKIM keys
+                    if contents.dkim_keys:
+                        self._report_progress(
+                            "backup",
+                            "Backing up DKIM keys",
+                            current_step,
+                            total_steps,
+                        )
+                        dkim_dir = os.path.expanduser("~/.unitmail/keys/dkim")
+                        if os.path.exists(dkim_dir):
+                            self._add_directory(
+                                zf, dkim_dir, self.DKIM_KEYS_DIR, digest
+                            )
+                            metadata.contents["dkim_keys"] = 1
+                        current_step += 1
+
+                    # Backup PGP keys
+                    if contents.pgp_keys:
+                        self._report_progress(
+                            "backup",
+                            "Backing up PGP keys",
+                            current_step,
+                            total_steps,
+                        )
+                        pgp_dir = os.path.expanduser("~/.unitmail/keys/pgp")
+                        if os.path.exists(pgp_dir):
+                            self._add_directory(
+                                zf, pgp_dir, self.PGP_KEYS_DIR, digest
+                            )
+                            metadata.contents["pgp_keys"] = 1
+                        current_step += 1
+
+                    metadata.checksum = digest.hexdigest()
+
+                    # Add metadata to zip
+                    zf.writestr(
+                        self.METADATA_FILE,
+                        json.dumps(metadata.to_dict(), indent=2),
                     )
-                    pgp_dir = os.path.expanduser("~/.unitmail/keys/pgp")
-                    if os.path.exists(pgp_dir):
-                        for filename in os.listdir(pgp_dir):
-                            filepath = os.path.join(pgp_dir, filename)
-                            if os.path.isfile(filepath):
-                                with open(filepath, "rb") as f:
-                                    zf.writestr(
-                                        f"{self.PGP_KEYS_DIR}{filename}",
-                                        f.read(),
-                                    )
-                        metadata.contents["pgp_keys"] = 1
-                    current_step += 1
-
-                # Calculate checksum of zip contents
-                zip_buffer.seek(0)
-                metadata.checksum = hashlib.sha256(
-                    zip_buffer.read()
-                ).hexdigest()
-                zip_buffer.seek(0)
-
-                # Add metadata to zip
-                zf.writestr(
-                    self.METADATA_FILE,
-                    json.dumps(metadata.to_dict(), indent=2),
-                )
+                    members = zf.namelist()
 
-            # Encrypt the zip (if password provided) or write directly
-            zip_buffer.seek(0)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
+                if target is not f:
+                    # Sealed apart from the archive, so a preview needs
+                    # neither the archive nor its directory
+                    target.set_index(self._build_index(metadata, members))
 
-            if password:
-                self._report_progress(
-                    "backup", "Encrypting backup", total_steps - 1, total_steps
-                )
-                encrypted_data = BackupEncryption.encrypt(
-                    zip_buffer.read(), password
-                )
-                # Write encrypted file
-                self._report_progress(
-                    "backup", "Writing backup file", total_steps, total_steps
-                )
-                with open(output_path, "wb") as f:
-                    f.write(encrypted_data)
-            else:
-                # Write unencrypted zip file directly
                 self._report_progress(
                     "backup", "Writing backup file", total_steps, total_steps
                 )
-                with open(output_path, "wb") as f:
-                    f.write(zip_buffer.read())
+                stack.close()
+                f.flush()
+                os.fsync(f.fileno())
 
+            os.replace(partial_path, output_path)
             self._last_backup_path = output_path
+            manifest.add(metadata, output_path)
 
             logger.info(
                 "Backup created: %s, items: %s",
@@ -489,9 +739,220 @@ class BackupService:
             return metadata
 
         except Exception as e:
+            partial_path.unlink(missing_ok=True)
+            if self._cancelled.is_set():
+                logger.info("Backup cancelled: %s", output_path)
+                raise BackupError("Backup cancelled")
             logger.error("Backup failed: %s", str(e))
             raise BackupError(f"Failed to create backup: {e}")
 
+    def _build_index(
+        self, metadata: BackupMetadata, members: list[str]
+    ) -> bytes:
+        """
+        Build the index block of an encrypted backup.
+
+        The index holds the metadata and the archive's members, except
+        attachment blobs, which are counted in the metadata.
+        """
+        index = {
+            "metadata": metadata.to_dict(),
+            "members": [
+                name for name in members if not name.startswith(self.BLOBS_DIR)
+            ],
+        }
+        return json.dumps(index).encode("utf-8")
+
+    def _read_index(
+        self, backup_path: Path, password: Optional[str]
+    ) -> Optional[dict[str, Any]]:
+        """
+        Read the index block of an encrypted backup.
+
+        Only the header, the trailer and the index are read and decrypted.
+
+        Returns:
+            The index, or None if the backup has none.
+
+        Raises:
+            CryptoError: If the password is missing or wrong, or the
+                backup is corrupt.
+        """
+        with open(backup_path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            if not password:
+                raise CryptoError("Backup is encrypted")
+            f.seek(0)
+            index = EncryptedBackupReader(f, password).read_index()
+        return json.loads(index) if index else None
+
+    def _add_database(
+        self,
+        zf: zipfile.ZipFile,
+        digest: Any,
+        step: int,
+        total_steps: int,
+    ) -> int:
+        """
+        Snapshot the live database and copy the snapshot into the archive.
+
+        The snapshot is taken with SQLite's online backup API, so it is
+        consistent and mail delivery carries on while it is written.
+
+        Returns:
+            Size of the snapshot in bytes.
+        """
+
+        def on_pages(copied: int, total: int) -> None:
+            if self._cancelled.is_set():
+                raise BackupError("Backup cancelled")
+            self._report_progress(
+                "backup",
+                f"Backing up database ({copied} of {total} pages)",
+                step * total + copied,
+                total_steps * total,
+            )
+
+        db_dir = os.path.dirname(self._storage._db.db_path)
+        with tempfile.TemporaryDirectory(
+            dir=db_dir, prefix=".snapshot-"
+        ) as tmp:
+            snapshot_path = os.path.join(tmp, self.DATABASE_FILE)
+            self._storage.snapshot(snapshot_path, progress=on_pages)
+            self._add_file(zf, snapshot_path, self.DATABASE_FILE, digest)
+            return os.path.getsize(snapshot_path)
+
+    def _add_changes(
+        self,
+        zf: zipfile.ZipFile,
+        digest: Any,
+        metadata: BackupMetadata,
+    ) -> None:
+        """
+        Export the rows changed since metadata.last_backup_timestamp.
+
+        Only the attachment content of changed messages is copied. The
+        change set's watermark and row counts are recorded in metadata.
+        """
+        db_dir = os.path.dirname(self._storage._db.db_path)
+        with tempfile.TemporaryDirectory(
+            dir=db_dir, prefix=".changes-"
+        ) as tmp:
+            changes_path = os.path.join(tmp, self.CHANGES_FILE)
+            changes = self._storage.export_changes(
+                changes_path, metadata.last_backup_timestamp
+            )
+            self._add_file(zf, changes_path, self.CHANGES_FILE, digest)
+
+        blobs = self._storage.blobs
+        blob_count = 0
+        for checksum in sorted(changes.blob_checksums):
+            if blobs.exists(checksum):
+                relative = blobs.relative_path(checksum)
+                self._add_file(
+                    zf,
+                    blobs.root / relative,
+                    f"{self.BLOBS_DIR}{relative}",
+                    digest,
+                )
+                blob_count += 1
+
+        metadata.watermark = changes.watermark
+        metadata.contents["changed_messages"] = changes.counts["messages"]
+        metadata.contents["changed_contacts"] = changes.counts["contacts"]
+        metadata.contents["changed_folders"] = changes.counts["folders"]
+        metadata.contents["deletions"] = changes.counts["deleted_rows"]
+        metadata.contents["attachment_blobs"] = blob_count
+
+    def _add_file(
+        self,
+        zf: zipfile.ZipFile,
+        path: Union[str, Path],
+        arcname: str,
+        digest: Any,
+    ) -> None:
+        """Copy a file into the archive in chunks."""
+        info = zipfile.ZipInfo.from_file(path, arcname)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        # Files are copied as they are read, so their size isn't final
+        with open(path, "rb") as src, zf.open(
+            info, "w", force_zip64=True
+        ) as dest:
+            while chunk := src.read(COPY_CHUNK_SIZE):
+                if self._cancelled.is_set():
+                    raise BackupError("Backup cancelled")
+                digest.update(chunk)
+                dest.write(chunk)
+
+    def _add_directory(
+        self,
+        zf: zipfile.ZipFile,
+        directory: Union[str, Path],
+        prefix: str,
+        digest: Any,
+        recursive: bool = False,
+    ) -> int:
+        """
+        Copy the files in a directory into the archive.
+
+        Returns:
+            Number of files copied.
+        """
+        directory = Path(directory)
+        if not directory.is_dir():
+            return 0
+
+        pattern = "**/*" if recursive else "*"
+        count = 0
+        for path in sorted(directory.glob(pattern)):
+            relative = path.relative_to(directory).as_posix()
+            if not path.is_file() or relative.startswith("tmp/"):
+                continue
+            self._add_file(zf, path, f"{prefix}{relative}", digest)
+            count += 1
+        return count
+
+    @contextmanager
+    def _open_archive(
+        self, backup_path: Path, password: Optional[str]
+    ) -> Iterator[zipfile.ZipFile]:
+        """
+        Open the zip archive in a backup file.
+
+        Encrypted backups are decrypted on demand, chunk by chunk, as
+        members are read. Backups encrypted in one piece by earlier
+        versions are first decrypted to a temporary file.
+
+        Raises:
+            CryptoError: If the password is missing or wrong, or the
+                backup is corrupt.
+        """
+        with open(backup_path, "rb") as f:
+            magic = f.read(len(MAGIC))
+            f.seek(0)
+            if magic.startswith(ZIP_MAGIC):
+                archive = f
+            elif not password:
+                raise CryptoError("Backup is encrypted")
+            elif magic == MAGIC:
+                archive = EncryptedBackupReader(f, password)
+            else:
+                archive = BackupEncryption.decrypt_file(f, password)
+
+            try:
+                with zipfile.ZipFile(archive, "r") as zf:
+                    yield zf
+            finally:
+                if archive is not f:
+                    archive.close()
+
+    @staticmethod
+    def _extract(zf: zipfile.ZipFile, name: str, path: str) -> None:
+        """Stream an archive member to a file."""
+        with zf.open(name) as src, open(path, "wb") as dest:
+            shutil.copyfileobj(src, dest, COPY_CHUNK_SIZE)
+
     def preview_restore(
         self,
         backup_path: Union[str, Path],
@@ -500,6 +961,10 @@ class BackupService:
         """
         Preview contents of a backup without restoring.
 
+        Encrypted backups are described by their index block, so the
+        preview reads and decrypts a few kilobytes however large the
+        backup is.
+
         Args:
             backup_path: Path to backup file.
             password: Decryption password.
@@ -513,46 +978,48 @@ class BackupService:
         backup_path = Path(backup_path)
 
         try:
-            # Read and decrypt
-            with open(backup_path, "rb") as f:
-                encrypted_data = f.read()
-
-            decrypted_data = BackupEncryption.decrypt(encrypted_data, password)
-
-            # Open zip and read metadata
-            zip_buffer = io.BytesIO(decrypted_data)
-
-            with zipfile.ZipFile(zip_buffer, "r") as zf:
-                # Read metadata
-                metadata_json = zf.read(self.METADATA_FILE).decode("utf-8")
-                metadata = BackupMetadata.from_dict(json.loads(metadata_json))
-
-                preview = RestorePreview(metadata=metadata)
-
-                # Get counts from metadata
-                preview.messages_count = metadata.contents.get("messages", 0)
-                preview.folders_count = metadata.contents.get("folders", 0)
-                preview.database_size_bytes = metadata.contents.get(
-                    "database_size", 0
+            index = self._read_index(backup_path, password)
+            if index is not None:
+                return self._preview(
+                    BackupMetadata.from_dict(index["metadata"]),
+                    index["members"],
                 )
 
-                preview.has_configuration = self.CONFIG_FILE in zf.namelist()
-                preview.has_dkim_keys = any(
-                    name.startswith(self.DKIM_KEYS_DIR)
-                    for name in zf.namelist()
-                )
-                preview.has_pgp_keys = any(
-                    name.startswith(self.PGP_KEYS_DIR)
-                    for name in zf.namelist()
+            # Backups without an index: read metadata.json from the archive
+            with self._open_archive(backup_path, password) as zf:
+                metadata_json = zf.read(self.METADATA_FILE).decode("utf-8")
+                return self._preview(
+                    BackupMetadata.from_dict(json.loads(metadata_json)),
+                    zf.namelist(),
                 )
 
-            return preview
-
         except CryptoError:
             raise RestoreError("Invalid password or corrupted backup")
         except Exception as e:
             raise RestoreError(f"Failed to read backup: {e}")
 
+    def _preview(
+        self, metadata: BackupMetadata, members: list[str]
+    ) -> RestorePreview:
+        """Summarize a backup from its metadata and member names."""
+        preview = RestorePreview(metadata=metadata)
+
+        # Get counts from metadata
+        preview.messages_count = metadata.contents.get("messages", 0)
+        preview.folders_count = metadata.contents.get("folders", 0)
+        preview.database_size_bytes = metadata.contents.get(
+            "database_size", 0
+        )
+
+        preview.has_configuration = self.CONFIG_FILE in members
+        preview.has_dkim_keys = any(
+            name.startswith(self.DKIM_KEYS_DIR) for name in members
+        )
+        preview.has_pgp_keys = any(
+            name.startswith(self.PGP_KEYS_DIR) for name in members
+        )
+        return preview
+
     def restore(
         self,
         backup_path: Union[str, Path],
@@ -563,6 +1030,10 @@ class BackupService:
         """
         Restore data from a backup.
 
+        Only the members selected by contents are read: encrypted backups
+        are decrypted chunk by chunk as those members are extracted, so
+        restoring keys alone does not decrypt the database.
+
         Args:
             backup_path: Path to backup file.
             password: Decryption password.
@@ -581,17 +1052,9 @@ class BackupService:
         self._report_progress("restore", "Reading backup file", 0, 100)
 
         try:
-            # Read and decrypt
-            with open(backup_path, "rb") as f:
-                encrypted_data = f.read()
-
-            self._report_progress("restore", "Decrypting backup", 10, 100)
-            decrypted_data = BackupEncryption.decrypt(encrypted_data, password)
-
-            zip_buffer = io.BytesIO(decrypted_data)
             restored_counts: dict[str, int] = {}
 
-            with zipfile.ZipFile(zip_buffer, "r") as zf:
+            with self._open_archive(backup_path, password) as zf:
                 # Read metadata
                 metadata_json = zf.read(self.METADATA_FILE).decode("utf-8")
                 metadata = BackupMetadata.from_dict(json.loads(metadata_json))
@@ -612,7 +1075,7 @@ class BackupService:
                     self._storage.close()
 
                     # Get database path
-                    db_path = self._storage.db_path
+                    db_path = self._storage._db.db_path
 
                     # Backup existing database
                     if os.path.exists(db_path):
@@ -622,10 +1085,20 @@ class BackupService:
                             f"Backed up existing database to {backup_existing}"
                         )
 
-                    # Extract new database
-                    db_data = zf.read(self.DATABASE_FILE)
-                    with open(db_path, "wb") as f:
-                        f.write(db_data)
+                    # Extract new database next to the old one, then swap
+                    restored_path = f"{db_path}.restore"
+                    try:
+                        self._extract(zf, self.DATABASE_FILE, restored_path)
+                    except BaseException:
+                        Path(restored_path).unlink(missing_ok=True)
+                        raise
+                    os.replace(restored_path, db_path)
+                    # A leftover WAL belongs to the old database
+                    for suffix in ("-wal", "-shm"):
+                        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+                    # The backup may predate the current schema
+                    run_migrations()
+                    self._storage._load_default_user()
 
                     restored_counts["database"] = 1
                     restored_counts["messages"] = metadata.contents.get(
@@ -634,6 +1107,33 @@ class BackupService:
                     restored_counts["folders"] = metadata.contents.get(
                         "folders", 0
                     )
+                    restored_counts["attachment_blobs"] = self._restore_blobs(
+                        zf
+                    )
+
+                # Apply the changes in an incremental or differential backup
+                elif contents.database and self.CHANGES_FILE in zf.namelist():
+                    self._report_progress(
+                        "restore",
+                        "Applying database changes",
+                        current_step,
+                        total_steps,
+                    )
+                    restored_counts["attachment_blobs"] = self._restore_blobs(
+                        zf
+                    )
+                    db_dir = os.path.dirname(self._storage._db.db_path)
+                    with tempfile.TemporaryDirectory(
+                        dir=db_dir, prefix=".changes-"
+                    ) as tmp:
+                        changes_path = os.path.join(tmp, self.CHANGES_FILE)
+                        self._extract(zf, self.CHANGES_FILE, changes_path)
+                        applied = self._storage.apply_changes(changes_path)
+
+                    restored_counts["database"] = 1
+                    restored_counts["messages"] = applied["messages"]
+                    restored_counts["folders"] = applied["folders"]
+                    restored_counts["deleted"] = applied["deleted"]
 
                 current_step += 1
 
@@ -652,10 +1152,7 @@ class BackupService:
                         "~/.config/unitmail/settings.json"
                     )
                     os.makedirs(os.path.dirname(config_path), exist_ok=True)
-
-                    config_data = zf.read(self.CONFIG_FILE)
-                    with open(config_path, "wb") as f:
-                        f.write(config_data)
+                    self._extract(zf, self.CONFIG_FILE, config_path)
 
                     restored_counts["configuration"] = 1
                 current_step += 1
@@ -680,11 +1177,11 @@ class BackupService:
                         for dkim_file in dkim_files:
                             filename = os.path.basename(dkim_file)
                             if filename:
-                                data = zf.read(dkim_file)
-                                with open(
-                                    os.path.join(dkim_dir, filename), "wb"
-                                ) as f:
-                                    f.write(data)
+                                self._extract(
+                                    zf,
+                                    dkim_file,
+                                    os.path.join(dkim_dir, filename),
+                                )
 
                         restored_counts["dkim_keys"] = len(dkim_files)
                 current_step += 1
@@ -709,11 +1206,11 @@ class BackupService:
                         for pgp_file in pgp_files:
                             filename = os.path.basename(pgp_file)
                             if filename:
-                                data = zf.read(pgp_file)
-                                with open(
-                                    os.path.join(pgp_dir, filename), "wb"
-                                ) as f:
-                                    f.write(data)
+                                self._extract(
+                                    zf,
+                                    pgp_file,
+                                    os.path.join(pgp_dir, filename),
+                                )
 
                         restored_counts["pgp_keys"] = len(pgp_files)
                 current_step += 1
@@ -732,6 +1229,81 @@ class BackupService:
             logger.error("Restore failed: %s", str(e))
             raise RestoreError(f"Restore failed: {e}")
 
+    def restore_point_in_time(
+        self,
+        backup_dir: Union[str, Path],
+        password: str,
+        point_in_time: Optional[datetime] = None,
+        contents: Optional[BackupContents] = None,
+    ) -> list[Path]:
+        """
+        Restore the mailbox as it was at a point in time.
+
+        The full backup and the incremental or differential backups built
+        on it that lead to the last backup taken at or before the point in
+        time are restored in order.
+
+        Args:
+            backup_dir: Directory holding the backups and their manifest.
+            password: Decryption password.
+            point_in_time: Time to restore to. Defaults to the latest
+                backup.
+            contents: What to restore.
+
+        Returns:
+            The backups restored, in order.
+
+        Raises:
+            RestoreError: If there is no chain of backups to restore or a
+                restore fails.
+        """
+        manifest = BackupManifest(backup_dir)
+        paths = [
+            manifest.directory / entry["file"]
+            for entry in manifest.chain(point_in_time)
+        ]
+        for path in paths:
+            logger.info("Restoring %s", path)
+            self.restore(path, password, contents=contents)
+        return paths
+
+    def _restore_blobs(self, zf: zipfile.ZipFile) -> int:
+        """
+        Copy attachment content from the archive into the blob store.
+
+        Blobs are rehashed as they are written to a temporary file, so a
+        member whose content does not match its name is dropped before it
+        reaches the store.
+
+        Returns:
+            Number of blobs restored.
+        """
+        blobs = self._storage.blobs
+        count = 0
+        for name in zf.namelist():
+            if not name.startswith(self.BLOBS_DIR):
+                continue
+            checksum = name.rsplit("/", 1)[-1]
+            if blobs.exists(checksum):
+                continue
+            writer = blobs.writer()
+            try:
+                with zf.open(name) as src:
+                    for chunk in iter(lambda: src.read(COPY_CHUNK_SIZE), b""):
+                        writer.write(chunk)
+                if writer.checksum != checksum:
+                    # The content may be another blob already in the store
+                    # (deduplicated), so it must never be committed or deleted
+                    writer.abort()
+                    logger.warning("Skipped corrupt attachment blob %s", name)
+                    continue
+                writer.commit()
+            except BaseException:
+                writer.abort()
+                raise
+            count += 1
+        return count
+
     @staticmethod
     def validate_backup_file(path: Union[str, Path]) -> bool:
         """
@@ -0,0 +1,354 @@
+"""
+Streaming encrypted container for unitMail backups.
+
+A backup is a zip archive. When it is password protected, the archive is
+written through an EncryptedBackupWriter, which encrypts it in fixed-size
+chunks as it is produced, so neither creating nor restoring a backup ever
+holds more than one chunk of it in memory.
+
+File layout::
+
+    header   magic, version, chunk size, KDF iterations, salt, nonce prefix
+    chunk 0  AES-256-GCM(chunk_size bytes) + 16-byte tag
+    chunk 1  ...
+    chunk n  last chunk, may be shorter
+    index    AES-256-GCM(index) + 16-byte tag, if the writer was given one
+    trailer  AES-256-GCM(plaintext size, chunk count, index size) + tag
+
+Each chunk is sealed with its own nonce, built from the random prefix,
+the chunk's index and a final-chunk flag, and the header is authenticated
+with every chunk. Chunks therefore cannot be reordered, dropped or moved
+between backups, and the trailer - sealed with the final flag and a
+counter no chunk uses - proves the backup was not truncated.
+
+The index is a small block the writer is handed before it is closed;
+backups store their metadata and list of members in it, so a backup can
+be described by reading the header, the trailer and the index alone.
+
+Because every chunk but the last has the same size, the reader can seek:
+it decrypts only the chunks that the zip reader asks for.
+"""
+
+import io
+import os
+import secrets
+import struct
+from typing import BinaryIO
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+from common.exceptions import CryptoError
+
+MAGIC = b"UMBACKUP"
+FORMAT_VERSION = 3
+
+# Plaintext bytes per chunk
+CHUNK_SIZE = 1024 * 1024
+
+SALT_SIZE = 32
+KDF_ITERATIONS = 100000
+
+# magic, version, chunk size, PBKDF2 iterations, salt, nonce prefix
+_HEADER = struct.Struct(">8sBII32s7s")
+HEADER_SIZE = _HEADER.size
+
+TAG_SIZE = 16
+
+# plaintext size, chunk count, index size
+_TRAILER = struct.Struct(">QQQ")
+TRAILER_SIZE = _TRAILER.size + TAG_SIZE
+
+# Version 2 had no index: plaintext size, chunk count
+_TRAILER_V2 = struct.Struct(">QQ")
+
+# Nonce counters of the index and trailer, above any chunk index
+_INDEX_COUNTER = 0xFFFFFFFE
+_TRAILER_COUNTER = 0xFFFFFFFF
+
+# Start of a zip archive, i.e. an unencrypted backup
+ZIP_MAGIC = b"PK\x03\x04"
+
+
+def _derive_key(password: str, salt: bytes, iterations: int) -> bytes:
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=iterations,
+    )
+    return kdf.derive(password.encode("utf-8"))
+
+
+def _nonce(prefix: bytes, index: int, final: bool) -> bytes:
+    return prefix + struct.pack(">I?", index, final)
+
+
+class EncryptedBackupWriter(io.RawIOBase):
+    """
+    Write-only file object that encrypts a backup as it is written.
+
+    Example:
+        with open(path, "wb") as f:
+            with EncryptedBackupWriter(f, password) as writer:
+                with zipfile.ZipFile(writer, "w") as zf:
+                    ...
+    """
+
+    def __init__(
+        self,
+        fileobj: BinaryIO,
+        password: str,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> None:
+        """
+        Initialize the writer and write the container header.
+
+        Args:
+            fileobj: Binary file the encrypted backup is written to.
+            password: Encryption password.
+            chunk_size: Plaintext bytes per chunk.
+        """
+        super().__init__()
+        iterations = KDF_ITERATIONS
+        salt = secrets.token_bytes(SALT_SIZE)
+        self._prefix = secrets.token_bytes(7)
+        self._header = _HEADER.pack(
+            MAGIC, FORMAT_VERSION, chunk_size, iterations, salt, self._prefix
+        )
+        self._aead = AESGCM(_derive_key(password, salt, iterations))
+        self._fileobj = fileobj
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+        self._chunks = 0
+        self._size = 0
+        self._index = b""
+        fileobj.write(self._header)
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        """Plaintext bytes written so far."""
+        return self._size
+
+    def write(self, data) -> int:
+        """Buffer data, encrypting every full chunk."""
+        if self.closed:
+            raise ValueError("write to closed backup")
+        self._buffer += data
+        self._size += len(data)
+        while len(self._buffer) >= self._chunk_size:
+            self._seal(bytes(self._buffer[: self._chunk_size]))
+            del self._buffer[: self._chunk_size]
+        return len(data)
+
+    def set_index(self, index: bytes) -> None:
+        """Set the index block sealed when the backup is closed."""
+        self._index = index
+
+    def _seal(self, chunk: bytes) -> None:
+        nonce = _nonce(self._prefix, self._chunks, False)
+        self._fileobj.write(self._aead.encrypt(nonce, chunk, self._header))
+        self._chunks += 1
+
+    def close(self) -> None:
+        """Encrypt the last chunk and seal the index and trailer."""
+        if self.closed:
+            return
+        if self._buffer:
+            self._seal(bytes(self._buffer))
+            self._buffer.clear()
+        if self._index:
+            nonce = _nonce(self._prefix, _INDEX_COUNTER, True)
+            self._fileobj.write(
+                self._aead.encrypt(nonce, self._index, self._header)
+            )
+        trailer = _TRAILER.pack(self._size, self._chunks, len(self._index))
+        nonce = _nonce(self._prefix, _TRAILER_COUNTER, True)
+        self._fileobj.write(self._aead.encrypt(nonce, trailer, self._header))
+        self._fileobj.flush()
+        super().close()
+
+    def abort(self) -> None:
+        """Stop writing without sealing the backup."""
+        self._buffer.clear()
+        super().close()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class EncryptedBackupReader(io.RawIOBase):
+    """
+    Seekable read-only view of the plaintext of an encrypted backup.
+
+    Opening the reader checks the password and the trailer, which reads
+    only the header and the end of the file. Chunks are then decrypted
+    and authenticated as they are read; the index is read by read_index().
+    """
+
+    def __init__(self, fileobj: BinaryIO, password: str) -> None:
+        """
+        Initialize the reader.
+
+        Args:
+            fileobj: Seekable binary file holding the encrypted backup.
+            password: Decryption password.
+
+        Raises:
+            CryptoError: If the password is wrong or the backup is
+                corrupt or truncated.
+        """
+        super().__init__()
+        self._fileobj = fileobj
+        self._header = fileobj.read(HEADER_SIZE)
+        if len(self._header) < HEADER_SIZE:
+            raise CryptoError("Backup is truncated")
+        magic, version, chunk_size, iterations, salt, prefix = _HEADER.unpack(
+            self._header
+        )
+        if magic != MAGIC or version not in (2, 3) or chunk_size <= 0:
+            raise CryptoError("Not a unitMail backup")
+
+        self._prefix = prefix
+        self._chunk_size = chunk_size
+        self._aead = AESGCM(_derive_key(password, salt, iterations))
+
+        file_size = os.fstat(fileobj.fileno()).st_size
+        if version == 2:
+            self._read_trailer_v2(file_size)
+        else:
+            self._read_trailer(file_size)
+
+        self._position = 0
+        self._cached_index = -1
+        self._cached = b""
+
+    def _open(self, sealed: bytes, counter: int, final: bool) -> bytes:
+        try:
+            return self._aead.decrypt(
+                _nonce(self._prefix, counter, final), sealed, self._header
+            )
+        except InvalidTag:
+            raise CryptoError("Invalid password or corrupted backup")
+
+    def _read_trailer(self, file_size: int) -> None:
+        if file_size < HEADER_SIZE + TRAILER_SIZE:
+            raise CryptoError("Backup is truncated")
+        self._fileobj.seek(file_size - TRAILER_SIZE)
+        trailer = self._open(
+            self._fileobj.read(TRAILER_SIZE), _TRAILER_COUNTER, True
+        )
+        self._size, self._chunks, self._index_size = _TRAILER.unpack(trailer)
+
+        # The trailer must account for every byte of the file
+        sealed_index = self._index_size + TAG_SIZE if self._index_size else 0
+        expected = (
+            HEADER_SIZE
+            + self._size
+            + self._chunks * TAG_SIZE
+            + sealed_index
+            + TRAILER_SIZE
+        )
+        if (
+            self._chunks != -(-self._size // self._chunk_size)
+            or file_size != expected
+        ):
+            raise CryptoError("Backup is truncated")
+
+    def _read_trailer_v2(self, file_size: int) -> None:
+        trailer_size = _TRAILER_V2.size + TAG_SIZE
+        if file_size < HEADER_SIZE + trailer_size:
+            raise CryptoError("Backup is truncated")
+        self._fileobj.seek(file_size - trailer_size)
+        sealed = self._fileobj.read(trailer_size)
+
+        # Every chunk carries a tag, so the chunk count follows from the
+        # file size; the trailer is sealed under that count.
+        body = file_size - HEADER_SIZE - trailer_size
+        chunks = -(-body // (self._chunk_size + TAG_SIZE))
+        trailer = self._open(sealed, chunks, True)
+        self._size, self._chunks = _TRAILER_V2.unpack(trailer)
+        self._index_size = 0
+        if self._chunks != chunks or self._size != body - chunks * TAG_SIZE:
+            raise CryptoError("Backup is truncated")
+
+    @property
+    def size(self) -> int:
+        """Plaintext size of the backup."""
+        return self._size
+
+    def read_index(self) -> bytes:
+        """
+        Decrypt the index block, without reading any chunk.
+
+        Returns:
+            The index, or b"" if the backup has none.
+
+        Raises:
+            CryptoError: If the index is corrupted.
+        """
+        if not self._index_size:
+            return b""
+        self._fileobj.seek(
+            HEADER_SIZE + self._size + self._chunks * TAG_SIZE
+        )
+        sealed = self._fileobj.read(self._index_size + TAG_SIZE)
+        return self._open(sealed, _INDEX_COUNTER, True)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+        if position < 0:
+            raise ValueError("negative seek position")
+        self._position = position
+        return position
+
+    def _chunk(self, index: int) -> bytes:
+        if index != self._cached_index:
+            start = index * self._chunk_size
+            length = min(self._chunk_size, self._size - start) + TAG_SIZE
+            self._fileobj.seek(HEADER_SIZE + index * (self._chunk_size + TAG_SIZE))
+            sealed = self._fileobj.read(length)
+            try:
+                self._cached = self._aead.decrypt(
+                    _nonce(self._prefix, index, False), sealed, self._header
+                )
+            except InvalidTag:
+                raise CryptoError(f"Backup chunk {index} is corrupted")
+            self._cached_index = index
+        return self._cached
+
+    def readinto(self, buffer) -> int:
+        """Decrypt plaintext at the current position into ``buffer``."""
+        view = memoryview(buffer).cast("B")
+        filled = 0
+        while filled < len(view) and self._position < self._size:
+            index, offset = divmod(self._position, self._chunk_size)
+            chunk = self._chunk(index)
+            count = min(len(chunk) - offset, len(view) - filled)
+            view[filled : filled + count] = chunk[offset : offset + count]
+            filled += count
+            self._position += count
+        return filled
@@ -4,29 +4,49 @@ Export service for unitMail.
 This module provides functionality for exporting emails in various formats:
 - Plain Text (.txt)
 - Markdown (.md)
-- MBOX (.mbox) - Standard mailbox format for email migration
+- MBOX (.mbox) - Standard mailbox format for email migration (mboxrd)
 - EML (.eml) - Individual email files (RFC 5322)
 - PDF (.pdf) - Via GTK print-to-PDF
+
+Messages are read from storage a batch at a time and written as they are
+read, so exports of any size run in constant memory. Single-file exports
+can be gzip or zstd compressed as they are written.
 """
 
+import gzip
+import io
 import json
 import logging
 import os
+import re
 from dataclasses import dataclass
 from datetime import datetime
-from email import encoders
-from email.mime.base import MIMEBase
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+from email.message import EmailMessage
 from email.utils import formatdate, make_msgid
 from enum import Enum
 from pathlib import Path
-from typing import Callable, Optional
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
 
 from common.storage import get_storage
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore
+
 logger = logging.getLogger(__name__)
 
+# Messages read from storage per query; progress is reported per batch
+EXPORT_BATCH_SIZE = 500
+
+# mboxrd quotes body lines that would read as a message separator
+_MBOX_FROM_LINE = re.compile(rb"^>*From ", re.MULTILINE)
+
+
+def _unfold(value: Optional[str]) -> str:
+    """Undo header folding: collapse line breaks and runs of whitespace."""
+    return " ".join(value.split()) if value else ""
+
 
 class ExportFormat(str, Enum):
     """Supported export formats."""
@@ -38,6 +58,14 @@ class ExportFormat(str, Enum):
     PDF = "pdf"
 
 
+class ExportCompression(str, Enum):
+    """Compression of single-file exports; the value is the file suffix."""
+
+    NONE = ""
+    GZIP = "gz"
+    ZSTD = "zst"
+
+
 class ExportScope(str, Enum):
     """Scope of export operation."""
 
@@ -115,6 +143,8 @@ class ExportService:
         scope: ExportScope,
         folder_name: Optional[str] = None,
         message_id: Optional[str] = None,
+        include_attachments: bool = True,
+        compression: ExportCompression = ExportCompression.NONE,
     ) -> ExportResult:
         """
         Export messages in the specified format.
@@ -125,15 +155,27 @@ class ExportService:
             scope: Export scope (current, folder, all).
             folder_name: Folder name for folder scope.
             message_id: Message ID for current message scope.
+            include_attachments: Include attachments, read from the blob
+                store, in MBOX and EML exports.
+            compression: Compress a text, Markdown or MBOX export.
 
         Returns:
             ExportResult with success status and details.
         """
         try:
+            if compression != ExportCompression.NONE and format not in (
+                ExportFormat.PLAIN_TEXT,
+                ExportFormat.MARKDOWN,
+                ExportFormat.MBOX,
+            ):
+                raise ValueError(f"{format.value} exports can't be compressed")
+
             # Gather messages based on scope
-            messages = self._get_messages_for_scope(scope, folder_name, message_id)
+            total, messages = self._get_messages_for_scope(
+                scope, folder_name, message_id, include_attachments
+            )
 
-            if not messages:
+            if not total:
                 return ExportResult(
                     success=False,
                     output_path=output_path,
@@ -142,15 +184,25 @@ class ExportService:
                     error_message="No messages to export",
                 )
 
+            messages = self._with_progress(messages, total)
+
             # Export based on format
             if format == ExportFormat.PLAIN_TEXT:
-                return self._export_to_text(output_path, messages)
+                result = self._export_to_text(
+                    output_path, messages, total, compression
+                )
             elif format == ExportFormat.MARKDOWN:
-                return self._export_to_markdown(output_path, messages)
+                result = self._export_to_markdown(
+                    output_path, messages, total, compression
+                )
             elif format == ExportFormat.MBOX:
-                return self._export_to_mbox(output_path, messages)
+                result = self._export_to_mbox(
+                    output_path, messages, include_attachments, compression
+                )
             elif format == ExportFormat.EML:
-                return self._export_to_eml(output_path, messages)
+                result = self._export_to_eml(
+                    output_path, messages, include_attachments
+                )
             else:
                 return ExportResult(
                     success=False,
@@ -160,6 +212,13 @@ class ExportService:
                     error_message=f"Unsupported format: {format}",
                 )
 
+            self._report_progress(
+                "Export complete",
+                result.messages_exported,
+                result.messages_exported,
+            )
+            return result
+
         except Exception as e:
             logger.error(f"Export failed: {e}")
             return ExportResult(
@@ -175,33 +234,105 @@ class ExportService:
         scope: ExportScope,
         folder_name: Optional[str],
         message_id: Optional[str],
-    ) -> list[dict]:
-        """Get messages based on export scope."""
+        include_attachments: bool,
+    ) -> tuple[int, Iterable[dict]]:
+        """
+        Get the messages in an export scope.
+
+        Returns:
+            Number of messages and an iterable reading them from storage
+            a batch at a time.
+        """
         if scope == ExportScope.CURRENT_MESSAGE and message_id:
             message = self._storage.get_message(message_id)
-            return [message] if message else []
+            return (1, [message]) if message else (0, [])
 
         elif scope == ExportScope.SELECTED_FOLDER and folder_name:
-            # Get all messages from folder (no limit for export)
-            return self._storage.get_messages_by_folder(
-                folder_name, limit=10000, offset=0
+            folder = self._storage.get_folder_by_name(folder_name)
+            if not folder:
+                return 0, []
+            return (
+                self._storage.count_messages(folder_id=folder["id"]),
+                self._storage.iter_messages(
+                    folder_id=folder["id"],
+                    batch_size=EXPORT_BATCH_SIZE,
+                    include_attachments=include_attachments,
+                ),
             )
 
         elif scope == ExportScope.ALL_MESSAGES:
-            return self._storage.get_all_messages(limit=10000, offset=0)
+            return (
+                self._storage.count_messages(),
+                self._storage.iter_messages(
+                    batch_size=EXPORT_BATCH_SIZE,
+                    include_attachments=include_attachments,
+                ),
+            )
 
-        return []
+        return 0, []
+
+    def _with_progress(
+        self, messages: Iterable[dict], total: int
+    ) -> Iterator[dict]:
+        """Pass messages through, reporting progress once per batch."""
+        count = 0
+        for message in messages:
+            yield message
+            count += 1
+            if count % EXPORT_BATCH_SIZE == 0:
+                self._report_progress(
+                    f"Exported {count} of {total} messages",
+                    count,
+                    max(total, count),
+                )
+
+    def _open_output(
+        self, output_path: Path, compression: ExportCompression
+    ) -> tuple[Path, BinaryIO]:
+        """
+        Open an export file for writing, compressing it if requested.
+
+        Returns:
+            The path written, with the compression suffix added, and the
+            file to write to.
+
+        Raises:
+            RuntimeError: If zstd is requested and zstandard isn't
+                installed.
+        """
+        if compression == ExportCompression.NONE:
+            return output_path, open(output_path, "wb")
+
+        output_path = output_path.with_name(
+            f"{output_path.name}.{compression.value}"
+        )
+        if compression == ExportCompression.GZIP:
+            return output_path, gzip.open(output_path, "wb")
+
+        if zstandard is None:
+            raise RuntimeError(
+                "zstandard package is required for zstd compressed exports"
+            )
+        return output_path, zstandard.ZstdCompressor().stream_writer(
+            open(output_path, "wb")
+        )
 
     def _export_to_text(
-        self, output_path: Path, messages: list[dict]
+        self,
+        output_path: Path,
+        messages: Iterable[dict],
+        total: int,
+        compression: ExportCompression = ExportCompression.NONE,
     ) -> ExportResult:
         """Export messages to plain text format."""
-        output_path = output_path.with_suffix(".txt")
-        total = len(messages)
+        output_path, raw = self._open_output(
+            output_path.with_suffix(".txt"), compression
+        )
+        count = 0
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            for i, msg in enumerate(messages):
-                self._report_progress(f"Exporting message {i + 1}/{total}", i, total)
+        with io.TextIOWrapper(raw, encoding="utf-8") as f:
+            for msg in messages:
+                count += 1
 
                 # Write message header
                 f.write("=" * 70 + "\n")
@@ -221,30 +352,34 @@ class ExportService:
                     body = self._html_to_text(body)
                 f.write(body + "\n\n")
 
-        self._report_progress("Export complete", total, total)
-
         return ExportResult(
             success=True,
             output_path=output_path,
-            messages_exported=total,
+            messages_exported=count,
             format=ExportFormat.PLAIN_TEXT,
         )
 
     def _export_to_markdown(
-        self, output_path: Path, messages: list[dict]
+        self,
+        output_path: Path,
+        messages: Iterable[dict],
+        total: int,
+        compression: ExportCompression = ExportCompression.NONE,
     ) -> ExportResult:
         """Export messages to Markdown format."""
-        output_path = output_path.with_suffix(".md")
-        total = len(messages)
+        output_path, raw = self._open_output(
+            output_path.with_suffix(".md"), compression
+        )
+        count = 0
 
-        with open(output_path, "w", encoding="utf-8") as f:
+        with io.TextIOWrapper(raw, encoding="utf-8") as f:
             f.write("# Exported Emails\n\n")
             f.write(f"*Exported on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n\n")
             f.write(f"**Total messages:** {total}\n\n")
             f.write("---\n\n")
 
-            for i, msg in enumerate(messages):
-                self._report_progress(f"Exporting message {i + 1}/{total}", i, total)
+            for msg in messages:
+                count += 1
 
                 subject = msg.get("subject", "(No Subject)")
                 f.write(f"## {subject}\n\n")
@@ -276,36 +411,48 @@ class ExportService:
                 f.write(body + "\n\n")
                 f.write("---\n\n")
 
-        self._report_progress("Export complete", total, total)
-
         return ExportResult(
             success=True,
             output_path=output_path,
-            messages_exported=total,
+            messages_exported=count,
             format=ExportFormat.MARKDOWN,
         )
 
     def _export_to_mbox(
-        self, output_path: Path, messages: list[dict]
+        self,
+        output_path: Path,
+        messages: Iterable[dict],
+        include_attachments: bool = True,
+        compression: ExportCompression = ExportCompression.NONE,
     ) -> ExportResult:
         """
-        Export messages to MBOX format (RFC 4155).
+        Export messages to MBOX format (mboxrd, RFC 4155).
 
         MBOX is a standard format for storing email messages in a single file,
         widely supported by email clients like Thunderbird, Apple Mail, etc.
+        Each message is written as full MIME, with its HTML part and, if
+        requested, its attachments. Body lines starting with any number of
+        ">" followed by "From " get one more ">", so readers can undo the
+        quoting exactly.
         """
-        output_path = output_path.with_suffix(".mbox")
-        total = len(messages)
+        output_path, f = self._open_output(
+            output_path.with_suffix(".mbox"), compression
+        )
+        count = 0
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            for i, msg in enumerate(messages):
-                self._report_progress(f"Exporting message {i + 1}/{total}", i, total)
+        with f:
+            for msg in messages:
+                data = self._render_email(msg, include_attachments)
+                if data is None:
+                    continue
+                count += 1
 
                 # MBOX format: each message starts with "From " line
-                from_addr = msg.get("from_address", "unknown@unknown.com")
+                from_addr = msg.get("from_address") or "unknown@unknown.com"
                 # Extract just the email address if it contains a name
                 if "<" in from_addr and ">" in from_addr:
                     from_addr = from_addr.split("<")[1].split(">")[0]
+                from_addr = "".join(from_addr.split()) or "unknown@unknown.com"
 
                 received_at = msg.get("received_at", "")
                 try:
@@ -314,57 +461,24 @@ class ExportService:
                 except (ValueError, AttributeError):
                     mbox_date = datetime.now().strftime("%a %b %d %H:%M:%S %Y")
 
-                f.write(f"From {from_addr} {mbox_date}\n")
-
-                # Write headers
-                f.write(f"From: {msg.get('from_address', 'Unknown')}\n")
-                f.write(f"To: {self._format_recipients(msg.get('to_addresses', []))}\n")
-
-                if msg.get("cc_addresses"):
-                    f.write(f"Cc: {self._format_recipients(msg['cc_addresses'])}\n")
-
-                f.write(f"Subject: {msg.get('subject', '')}\n")
-                f.write(f"Date: {self._format_rfc2822_date(msg.get('received_at', ''))}\n")
-
-                if msg.get("message_id"):
-                    f.write(f"Message-ID: {msg['message_id']}\n")
-                else:
-                    f.write(f"Message-ID: {make_msgid()}\n")
-
-                if msg.get("in_reply_to"):
-                    f.write(f"In-Reply-To: {msg['in_reply_to']}\n")
-
-                f.write("MIME-Version: 1.0\n")
-                f.write("Content-Type: text/plain; charset=utf-8\n")
-                f.write("Content-Transfer-Encoding: 8bit\n")
-                f.write("\n")  # End of headers
-
-                # Write body (escape "From " lines at start of lines)
-                body = msg.get("body_text") or ""
-                if not body and msg.get("body_html"):
-                    body = self._html_to_text(msg["body_html"])
-
-                # MBOX requires escaping lines starting with "From "
-                lines = body.split("\n")
-                for line in lines:
-                    if line.startswith("From "):
-                        f.write(">" + line + "\n")
-                    else:
-                        f.write(line + "\n")
-
-                f.write("\n")  # Blank line between messages
-
-        self._report_progress("Export complete", total, total)
+                f.write(f"From {from_addr} {mbox_date}\n".encode("utf-8"))
+                f.write(_MBOX_FROM_LINE.sub(rb">\g<0>", data))
+                if not data.endswith(b"\n"):
+                    f.write(b"\n")
+                f.write(b"\n")  # Blank line between messages
 
         return ExportResult(
             success=True,
             output_path=output_path,
-            messages_exported=total,
+            messages_exported=count,
             format=ExportFormat.MBOX,
         )
 
     def _export_to_eml(
-        self, output_path: Path, messages: list[dict]
+        self,
+        output_path: Path,
+        messages: Iterable[dict],
+        include_attachments: bool = True,
     ) -> ExportResult:
         """
         Export messages to individual EML files (RFC 5322).
@@ -378,62 +492,126 @@ class ExportService:
             output_dir = output_path.parent / output_path.stem
 
         output_dir.mkdir(parents=True, exist_ok=True)
-        total = len(messages)
-
-        for i, msg in enumerate(messages):
-            self._report_progress(f"Exporting message {i + 1}/{total}", i, total)
+        count = 0
 
-            # Create email message
-            email_msg = MIMEMultipart("alternative")
-
-            # Set headers
-            email_msg["From"] = msg.get("from_address", "unknown@unknown.com")
-            email_msg["To"] = self._format_recipients(msg.get("to_addresses", []))
-
-            if msg.get("cc_addresses"):
-                email_msg["Cc"] = self._format_recipients(msg["cc_addresses"])
-
-            email_msg["Subject"] = msg.get("subject", "")
-            email_msg["Date"] = self._format_rfc2822_date(msg.get("received_at", ""))
-
-            if msg.get("message_id"):
-                email_msg["Message-ID"] = msg["message_id"]
-            else:
-                email_msg["Message-ID"] = make_msgid()
-
-            if msg.get("in_reply_to"):
-                email_msg["In-Reply-To"] = msg["in_reply_to"]
-
-            # Add body parts
-            if msg.get("body_text"):
-                text_part = MIMEText(msg["body_text"], "plain", "utf-8")
-                email_msg.attach(text_part)
-
-            if msg.get("body_html"):
-                html_part = MIMEText(msg["body_html"], "html", "utf-8")
-                email_msg.attach(html_part)
+        for msg in messages:
+            data = self._render_email(msg, include_attachments)
+            if data is None:
+                continue
+            count += 1
 
             # Generate safe filename
-            subject = msg.get("subject", "no_subject")[:50]
+            subject = (msg.get("subject") or "no_subject")[:50]
             safe_subject = "".join(
                 c if c.isalnum() or c in " -_" else "_" for c in subject
             )
-            timestamp = msg.get("received_at", "")[:10].replace("-", "")
-            filename = f"{timestamp}_{safe_subject}_{i + 1}.eml"
+            timestamp = (msg.get("received_at") or "")[:10].replace("-", "")
+            filename = f"{timestamp}_{safe_subject}_{count}.eml"
 
             eml_path = output_dir / filename
-            with open(eml_path, "w", encoding="utf-8") as f:
-                f.write(email_msg.as_string())
-
-        self._report_progress("Export complete", total, total)
+            with open(eml_path, "wb") as f:
+                f.write(data)
 
         return ExportResult(
             success=True,
             output_path=output_dir,
-            messages_exported=total,
+            messages_exported=count,
             format=ExportFormat.EML,
         )
 
+    def _render_email(
+        self, msg: dict, include_attachments: bool = True
+    ) -> Optional[bytes]:
+        """
+        Rebuild a stored message as MIME bytes.
+
+        Returns:
+            The message, or None if it can't be rebuilt; the failure is
+            logged and the export carries on without it.
+        """
+        try:
+            return self._build_email(msg, include_attachments).as_bytes()
+        except Exception as e:
+            logger.warning(f"Skipping message {msg.get('id')} in export: {e}")
+            return None
+
+    def _build_email(
+        self, msg: dict, include_attachments: bool = True
+    ) -> EmailMessage:
+        """
+        Rebuild a stored message as a MIME message.
+
+        The text and HTML bodies become a multipart/alternative part;
+        attachments are read from the blob store.
+        """
+        email_msg = EmailMessage()
+
+        # Set headers; received headers are stored folded, and EmailMessage
+        # refuses line breaks in a value
+        email_msg["From"] = (
+            _unfold(msg.get("from_address")) or "unknown@unknown.com"
+        )
+        if msg.get("to_addresses"):
+            email_msg["To"] = _unfold(self._format_recipients(msg["to_addresses"]))
+
+        if msg.get("cc_addresses"):
+            email_msg["Cc"] = _unfold(self._format_recipients(msg["cc_addresses"]))
+
+        email_msg["Subject"] = _unfold(msg.get("subject"))
+        email_msg["Date"] = self._format_rfc2822_date(msg.get("received_at", ""))
+        email_msg["Message-ID"] = _unfold(msg.get("message_id")) or make_msgid()
+
+        if msg.get("in_reply_to"):
+            email_msg["In-Reply-To"] = _unfold(msg["in_reply_to"])
+
+        # Add body parts
+        body_text = msg.get("body_text")
+        body_html = msg.get("body_html")
+        if body_text or not body_html:
+            email_msg.set_content(body_text or "")
+            if body_html:
+                email_msg.add_alternative(body_html, subtype="html")
+        else:
+            email_msg.set_content(body_html, subtype="html")
+
+        if include_attachments:
+            for attachment in msg.get("attachments") or []:
+                data = self._read_attachment(attachment)
+                if data is None:
+                    logger.warning(
+                        "Attachment %s of message %s is missing",
+                        attachment.get("filename"),
+                        msg.get("id"),
+                    )
+                    continue
+                content_type = (
+                    attachment.get("content_type") or "application/octet-stream"
+                )
+                maintype, _, subtype = content_type.partition("/")
+                email_msg.add_attachment(
+                    data,
+                    maintype=maintype,
+                    subtype=subtype or "octet-stream",
+                    filename=_unfold(attachment.get("filename")) or None,
+                    disposition=(
+                        "inline" if attachment.get("is_inline") else "attachment"
+                    ),
+                    cid=attachment.get("content_id"),
+                )
+
+        return email_msg
+
+    def _read_attachment(self, attachment: dict) -> Optional[bytes]:
+        """Read an attachment's content, or None if it is missing."""
+        checksum = attachment.get("checksum")
+        if checksum and self._storage.blobs.exists(checksum):
+            return self._storage.blobs.read(checksum)
+        path = attachment.get("path")
+        if path and os.path.isfile(path):
+            with open(path, "rb") as f:
+                return f.read()
+        return None
+
     def _format_recipients(self, recipients: list | str) -> str:
         """Format recipient list as string."""
         if isinstance(recipients, str):
@@ -468,8 +646,6 @@ class ExportService:
 
     def _html_to_text(self, html: str) -> str:
         """Convert HTML to plain text."""
-        import re
-
         # Remove script and style elements
         text = re.sub(r"<script[^>]*>.*?</script>", "", html, flags=re.DOTALL)
         text = re.sub(r"<style[^>]*>.*?</style>", "", text, flags=re.DOTALL)
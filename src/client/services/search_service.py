@@ -14,7 +14,7 @@ from datetime import datetime, timedelta
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from common.storage import EmailStorage, get_storage
+from common.storage import EmailStorage, MessageSummary, get_storage
 
 logger = logging.getLogger(__name__)
 
@@ -256,6 +256,31 @@ class SearchResult:
             has_attachments=bool(row.get("has_attachments", False)),
         )
 
+    @classmethod
+    def from_summary(cls, summary: MessageSummary) -> "SearchResult":
+        """Create SearchResult from a storage MessageSummary."""
+        received_at = (
+            datetime.fromisoformat(summary.received_at.replace("Z", "+00:00"))
+            if summary.received_at
+            else datetime.now()
+        )
+
+        return cls(
+            id=summary.id,
+            message_id=summary.message_id or "",
+            folder_id=summary.folder_id,
+            from_address=summary.from_address or "",
+            to_addresses=summary.to_addresses,
+            subject=summary.subject,
+            body_preview=summary.preview or None,
+            received_at=received_at,
+            is_read=summary.is_read,
+            is_starred=summary.is_starred,
+            encrypted=summary.is_encrypted,
+            rank=summary.rank,
+            has_attachments=summary.has_attachments,
+        )
+
 
 @dataclass
 class SearchResults:
@@ -578,13 +603,13 @@ class SearchService:
                     pass
 
             # Use storage's FTS5 search method
-            rows = self._storage.search_messages(
+            summaries = self._storage.search_message_summaries(
                 query=criteria.query or "",
                 folder_name=folder_name,
                 limit=criteria.limit,
             )
 
-            results = [SearchResult.from_sqlite_row(dict(row)) for row in rows]
+            results = [SearchResult.from_summary(s) for s in summaries]
 
             # Apply additional filters
             results = self._apply_filters(results, criteria)
@@ -638,16 +663,20 @@ class SearchService:
                     pass
 
             if folder_name:
-                rows = self._storage.get_messages_by_folder(folder_name)
+                summaries = self._storage.get_message_summaries(
+                    folder_name=folder_name
+                )
             else:
                 # Get messages from all folders
-                rows = []
+                summaries = []
                 for folder in self._storage.get_folders():
-                    rows.extend(
-                        self._storage.get_messages_by_folder(folder["name"])
+                    summaries.extend(
+                        self._storage.get_message_summaries(
+                            folder_id=folder["id"]
+                        )
                     )
 
-            results = [SearchResult.from_sqlite_row(dict(row)) for row in rows]
+            results = [SearchResult.from_summary(s) for s in summaries]
 
             # Apply filters
             results = self._apply_filters(results, criteria)
@@ -22,6 +22,7 @@ from client.services.backup_service import (
     BackupMetadata,
     BackupProgress,
     BackupService,
+    BackupType,
     get_backup_service,
 )
 from client.services.settings_service import get_settings_service
@@ -509,6 +510,7 @@ class BackupDialog(Adw.Window):
     ) -> None:
         """Handle cancel confirmation response."""
         if response == "cancel":
+            self._backup_service.cancel()
             self._is_running = False
             self.close()
 
@@ -562,6 +564,9 @@ class BackupDialog(Adw.Window):
                 output_path=backup_path,
                 password=password,
                 contents=contents,
+                backup_type=(
+                    BackupType.INCREMENTAL if incremental else BackupType.FULL
+                ),
             )
 
         def on_complete(metadata):
@@ -2957,15 +2957,15 @@ class MainWindow(ColumnResizeMixin, Adw.ApplicationWindow):
         """Load messages for a specific folder from database."""
         self._message_store.remove_all()
 
-        # Get messages from local storage
+        # Get lightweight list rows from local storage
         storage = get_storage()
-        db_messages = storage.get_messages_by_folder(folder_name)
+        summaries = storage.get_message_summaries(folder_name=folder_name)
 
-        # Convert database messages to MessageItem objects
+        # Convert summaries to MessageItem objects
         messages = []
-        for db_msg in db_messages:
+        for summary in summaries:
             # Parse the received_at datetime
-            received_at = db_msg.get("received_at")
+            received_at = summary.received_at
             if isinstance(received_at, str):
                 try:
                     msg_date = datetime.fromisoformat(
@@ -2977,42 +2977,34 @@ class MainWindow(ColumnResizeMixin, Adw.ApplicationWindow):
                 msg_date = datetime.now()
 
             # Get sender display - use header or from_address
-            from_addr = db_msg.get("from_address", "unknown@example.com")
-            headers = db_msg.get("headers", {})
-            from_display = headers.get("From", from_addr)
+            from_addr = summary.from_address or "unknown@example.com"
+            from_display = summary.from_header or from_addr
 
             # For sent messages, show "me → recipient"
             if folder_name.lower() == "sent":
-                to_addresses = db_msg.get("to_addresses", [])
-                to_display = headers.get(
-                    "To", ", ".join(to_addresses) if to_addresses else ""
+                to_addresses = summary.to_addresses
+                to_display = summary.to_header or (
+                    ", ".join(to_addresses) if to_addresses else ""
                 )
                 from_display = f"me@unitmail.local → {
                     to_display.split('<')[0].strip()}"
 
-            # Get preview from body_text
-            body_text = db_msg.get("body_text", "")
-            preview = (
-                body_text[:100] + "..." if len(body_text) > 100 else body_text
-            )
-            preview = preview.replace("\n", " ").strip()
-
-            # Check for attachments
-            attachments = db_msg.get("attachments", [])
-            has_attachments = len(attachments) > 0
-            attachment_count = len(attachments)
+            # Preview is precomputed at insert time
+            preview = summary.preview
+            if len(preview) > 100:
+                preview = preview[:100] + "..."
 
             message_item = MessageItem(
-                message_id=db_msg.get("id", ""),
+                message_id=summary.id,
                 from_address=from_display,
-                subject=db_msg.get("subject", "(No subject)"),
+                subject=summary.subject,
                 preview=preview,
                 date=msg_date,
-                is_read=db_msg.get("is_read", False),
-                is_starred=db_msg.get("is_starred", False),
-                is_important=db_msg.get("is_important", False),
-                has_attachments=has_attachments,
-                attachment_count=attachment_count,
+                is_read=summary.is_read,
+                is_starred=summary.is_starred,
+                is_important=summary.is_important,
+                has_attachments=summary.has_attachments,
+                attachment_count=summary.attachment_count,
             )
             messages.append(message_item)
 
@@ -4144,11 +4136,11 @@ class MainWindow(ColumnResizeMixin, Adw.ApplicationWindow):
             return
 
         logger.info(f"Bulk delete {len(self._selected_messages)} messages")
-        message_ids = list(self._selected_messages)
+        message_ids = set(self._selected_messages)
 
-        for message_id in message_ids:
-            self._move_message_to_folder(message_id, "Trash")
-            self._selected_messages.discard(message_id)
+        get_storage().trash_many(message_ids)
+        self._remove_message_items(message_ids)
+        self._selected_messages.clear()
 
         # Also remove from _all_messages
         self._all_messages = [
@@ -4169,8 +4161,8 @@ class MainWindow(ColumnResizeMixin, Adw.ApplicationWindow):
             return
 
         logger.info(f"Bulk mark read {len(self._selected_messages)} messages")
-        for message_id in self._selected_messages:
-            self._set_message_read(message_id, True)
+        get_storage().mark_read_many(self._selected_messages, True)
+        self._update_message_items(self._selected_messages, is_read=True)
 
     def _on_bulk_mark_unread(
         self,
@@ -4184,8 +4176,8 @@ class MainWindow(ColumnResizeMixin, Adw.ApplicationWindow):
         logger.info(
             f"Bulk mark unread {len(self._selected_messages)} messages"
         )
-        for message_id in self._selected_messages:
-            self._set_message_read(message_id, False)
+        get_storage().mark_read_many(self._selected_messages, False)
+        self._update_message_items(self._selected_messages, is_read=False)
 
     def _on_bulk_favorite(
         self,
@@ -4197,8 +4189,8 @@ class MainWindow(ColumnResizeMixin, Adw.ApplicationWindow):
             return
 
         logger.info(f"Bulk favorite {len(self._selected_messages)} messages")
-        for message_id in self._selected_messages:
-            self._set_message_starred(message_id, True)
+        get_storage().set_flag_many(self._selected_messages, "is_starred", True)
+        self._update_message_items(self._selected_messages, is_starred=True)
 
     def _on_bulk_unfavorite(
         self,
@@ -4210,8 +4202,38 @@ class MainWindow(ColumnResizeMixin, Adw.ApplicationWindow):
             return
 
         logger.info(f"Bulk unfavorite {len(self._selected_messages)} messages")
-        for message_id in self._selected_messages:
-            self._set_message_starred(message_id, False)
+        get_storage().set_flag_many(
+            self._selected_messages, "is_starred", False
+        )
+        self._update_message_items(self._selected_messages, is_starred=False)
+
+    def _update_message_items(self, message_ids: set[str], **attrs) -> None:
+        """
+        Apply attribute changes to message list items in one refresh.
+
+        Args:
+            message_ids: IDs of the items to change.
+            **attrs: MessageItem attributes to set.
+        """
+        n_items = self._message_store.get_n_items()
+        for i in range(n_items):
+            item = self._message_store.get_item(i)
+            if item.message_id in message_ids:
+                for name, value in attrs.items():
+                    setattr(item, name, value)
+
+        # Force refresh
+        self._message_store.items_changed(0, n_items, n_items)
+
+    def _remove_message_items(self, message_ids: set[str]) -> None:
+        """Remove message list items with a single store splice."""
+        n_items = self._message_store.get_n_items()
+        remaining = [
+            item
+            for item in (self._message_store.get_item(i) for i in range(n_items))
+            if item.message_id not in message_ids
+        ]
+        self._message_store.splice(0, n_items, remaining)
 
     def _on_message_right_click(
         self,
@@ -4931,7 +4953,9 @@ class MainWindow(ColumnResizeMixin, Adw.ApplicationWindow):
                 )
             else:
                 # For Spam, get all spam messages and delete them
-                spam_messages = storage.get_messages_by_folder("Spam")
+                spam_messages = storage.get_messages_by_folder(
+                    "Spam", include_attachments=False
+                )
                 deleted_count = 0
                 for msg in spam_messages:
                     if storage.permanent_delete(msg["id"]):
@@ -2,7 +2,7 @@
 Restore dialog for unitMail.
 
 This module provides a dialog for restoring data from encrypted backups,
-with preview capability, selective restore options, and conflict resolution.
+with preview capability and selective restore options.
 """
 
 import logging
@@ -20,7 +20,6 @@ from gi.repository import Adw, Gdk, Gio, GLib, GObject, Gtk
 from client.services.backup_service import (
     BackupContents,
     BackupService,
-    ConflictResolution,
     RestoreMode,
     RestorePreview,
     BackupProgress,
@@ -39,7 +38,6 @@ class RestoreDialog(Adw.Window):
     - Password entry for decryption
     - Preview of backup contents
     - Selective restore options
-    - Conflict resolution settings
     - Progress display
     """
 
@@ -329,15 +327,15 @@ class RestoreDialog(Adw.Window):
         self._backup_type_row.add_suffix(self._backup_type_label)
         info_group.add(self._backup_type_row)
 
-        self._backup_email_row = Adw.ActionRow(
-            title="Account",
+        self._backup_database_row = Adw.ActionRow(
+            title="Database",
         )
-        self._backup_email_label = Gtk.Label(
+        self._backup_database_label = Gtk.Label(
             css_classes=["dim-label"],
             valign=Gtk.Align.CENTER,
         )
-        self._backup_email_row.add_suffix(self._backup_email_label)
-        info_group.add(self._backup_email_row)
+        self._backup_database_row.add_suffix(self._backup_database_label)
+        info_group.add(self._backup_database_row)
 
         content.append(info_group)
 
@@ -385,23 +383,6 @@ class RestoreDialog(Adw.Window):
 
         content.append(contents_group)
 
-        # Conflict resolution group
-        conflict_group = Adw.PreferencesGroup(
-            title="Conflict Resolution",
-            description="How to handle items that already exist",
-        )
-
-        conflict_items = ["Skip existing", "Overwrite existing", "Keep both"]
-        conflict_model = Gtk.StringList.new(conflict_items)
-        self._conflict_row = Adw.ComboRow(
-            title="When conflicts occur",
-            model=conflict_model,
-            selected=0,
-        )
-        conflict_group.add(self._conflict_row)
-
-        content.append(conflict_group)
-
         scrolled.set_child(content)
         return scrolled
 
@@ -621,20 +602,10 @@ class RestoreDialog(Adw.Window):
         self._action_button.set_sensitive(False)
 
         def do_preview():
-            import asyncio
-
-            async def get_preview():
-                return await self._backup_service.preview_restore(
-                    self._backup_path,
-                    password,
-                )
-
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                return loop.run_until_complete(get_preview())
-            finally:
-                loop.close()
+            return self._backup_service.preview_restore(
+                self._backup_path,
+                password,
+            )
 
         def on_complete(preview):
             GLib.idle_add(self._on_preview_loaded, preview, None)
@@ -689,12 +660,12 @@ class RestoreDialog(Adw.Window):
             self._backup_date_label.set_label(metadata.created_at)
 
         # Backup type
-        self._backup_type_label.set_label(
-            "Incremental" if metadata.backup_type == "incremental" else "Full"
-        )
+        self._backup_type_label.set_label(metadata.backup_type.capitalize())
 
-        # Account email
-        self._backup_email_label.set_label(metadata.user_email or "Unknown")
+        # Database the backup was taken from
+        self._backup_database_label.set_label(
+            Path(metadata.database_path).name or "Unknown"
+        )
 
         # Update switches with counts
         self._restore_messages_switch.set_subtitle(
@@ -741,59 +712,37 @@ class RestoreDialog(Adw.Window):
 
     def _start_restore(self) -> None:
         """Start the restore process."""
-        if self._user_id is None:
-            self._show_error("No user ID provided")
-            return
-
         self._is_running = True
         self._state = self.STATE_RESTORING
         self._update_state()
 
         password = self._restore_password_row.get_text()
 
-        # Get selected contents
+        # Get selected contents; messages, contacts and folders are all
+        # restored with the database
+        messages = self._restore_messages_switch.get_active()
+        contacts = self._restore_contacts_switch.get_active()
+        folders = self._restore_folders_switch.get_active()
         contents = BackupContents(
-            messages=self._restore_messages_switch.get_active(),
-            contacts=self._restore_contacts_switch.get_active(),
-            folders=self._restore_folders_switch.get_active(),
+            database=messages or contacts or folders,
+            messages=messages,
+            contacts=contacts,
+            folders=folders,
             configuration=self._restore_config_switch.get_active(),
             dkim_keys=self._restore_dkim_switch.get_active(),
             pgp_keys=self._restore_pgp_switch.get_active(),
         )
 
-        # Get conflict resolution
-        conflict_map = {
-            0: ConflictResolution.SKIP,
-            1: ConflictResolution.OVERWRITE,
-            2: ConflictResolution.KEEP_BOTH,
-        }
-        conflict_resolution = conflict_map.get(
-            self._conflict_row.get_selected(),
-            ConflictResolution.SKIP,
-        )
-
         # Set progress callback
         self._backup_service.set_progress_callback(self._on_progress)
 
         def do_restore():
-            import asyncio
-
-            async def run_restore():
-                return await self._backup_service.restore(
-                    backup_path=self._backup_path,
-                    password=password,
-                    user_id=self._user_id,
-                    mode=RestoreMode.SELECTIVE,
-                    contents=contents,
-                    conflict_resolution=conflict_resolution,
-                )
-
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                return loop.run_until_complete(run_restore())
-            finally:
-                loop.close()
+            return self._backup_service.restore(
+                backup_path=self._backup_path,
+                password=password,
+                mode=RestoreMode.SELECTIVE,
+                contents=contents,
+            )
 
         def on_complete(result):
             GLib.idle_add(self._on_restore_complete, result, None)
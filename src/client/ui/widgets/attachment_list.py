@@ -162,7 +162,8 @@ class Attachment:
             size=data.get("size", 0),
             content_id=data.get("content_id"),
             data=data.get("data"),
-            file_path=data.get("file_path"),
+            # Stored attachments carry their content's location as "path"
+            file_path=data.get("file_path") or data.get("path"),
         )
 
 
@@ -656,9 +657,7 @@ class AttachmentPreviewDialog(Gtk.Dialog):
             self._attachment.file_path
         ):
             try:
-                image = Gtk.Picture.new_for_filename(
-                    self._attachment.file_path
-                )
+                image = self._picture_from_file(self._attachment.file_path)
                 image.set_can_shrink(True)
                 scrolled.set_child(image)
             except Exception as e:
@@ -672,6 +671,24 @@ class AttachmentPreviewDialog(Gtk.Dialog):
         self.add_button("Close", Gtk.ResponseType.CLOSE)
         self.connect("response", lambda d, r: d.close())
 
+    @staticmethod
+    def _picture_from_file(path: str) -> Gtk.Picture:
+        """
+        Load an image file for display.
+
+        The file is memory-mapped and decoded from the mapping, so the
+        encoded image is never copied into a buffer first.
+        """
+        from gi.repository import Gdk, GLib
+
+        if not hasattr(Gdk.Texture, "new_from_bytes"):
+            # GTK < 4.6
+            return Gtk.Picture.new_for_filename(path)
+
+        mapped = GLib.MappedFile.new(path, False)
+        texture = Gdk.Texture.new_from_bytes(mapped.get_bytes())
+        return Gtk.Picture.new_for_paintable(texture)
+
     def _show_error(self, container: Gtk.Widget, message: str) -> None:
         """Show an error message in the container."""
         label = Gtk.Label(label=message)
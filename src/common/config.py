@@ -93,6 +93,20 @@ class SMTPSettings(BaseSettings):
     tls_key_file: Optional[str] = Field(
         None, description="Path to TLS private key"
     )
+    spool_dir: Optional[str] = Field(
+        None,
+        description="Inbound spool directory (answer DATA once the message "
+        "is on disk and store it in the background)",
+    )
+    spool_workers: int = Field(
+        default=4, ge=1, description="Spooled messages stored concurrently"
+    )
+    blob_prune_interval: Optional[float] = Field(
+        default=6 * 3600,
+        gt=0,
+        description="Seconds between sweeps of unreferenced attachment "
+        "blobs (unset to disable)",
+    )
 
 
 class APISettings(BaseSettings):
@@ -144,10 +158,16 @@ class DNSSettings(BaseSettings):
     )
     timeout: int = Field(default=5, description="DNS query timeout in seconds")
     cache_ttl: int = Field(default=300, description="DNS cache TTL in seconds")
+    dkim_domain: Optional[str] = Field(
+        None, description="Domain outgoing mail is DKIM signed for"
+    )
     dkim_selector: str = Field(default="unitmail", description="DKIM selector")
     dkim_private_key_path: Optional[str] = Field(
         None, description="Path to DKIM private key"
     )
+    dkim_verify: bool = Field(
+        default=True, description="Verify DKIM signatures of inbound mail"
+    )
 
 
 class MeshSettings(BaseSettings):
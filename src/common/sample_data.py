@@ -56,7 +56,9 @@ def generate_sample_messages(force_regenerate: bool = False) -> int:
 
     if force_regenerate:
         # Clear all messages
-        for msg in storage.get_all_messages(limit=10000):
+        for msg in storage.get_all_messages(
+            limit=10000, include_attachments=False
+        ):
             storage.delete_message(msg["id"])
 
     folders = storage.get_folders()
@@ -74,7 +76,7 @@ def generate_sample_messages(force_regenerate: bool = False) -> int:
             "Inbox folder not found - ensure storage is initialized"
         )
 
-    messages_created = 0
+    pending_messages: list[dict] = []
     base_time = datetime.now(timezone.utc)
 
     # Thread 1: Project Planning (5 messages in Inbox)
@@ -172,7 +174,7 @@ Bob""",
     ]
 
     for msg_data in thread1_messages:
-        storage.create_message(
+        pending_messages.append(
             {
                 "folder_id": inbox_id,
                 "from_address": msg_data["from"]["email"],
@@ -191,7 +193,6 @@ Bob""",
                 },
             }
         )
-        messages_created += 1
 
     # Thread 2: Bug Report (4 messages - urgent)
     thread2_id = str(uuid4())
@@ -267,7 +268,7 @@ Frank""",
     ]
 
     for msg_data in thread2_messages:
-        storage.create_message(
+        pending_messages.append(
             {
                 "folder_id": inbox_id,
                 "from_address": msg_data["from"]["email"],
@@ -289,7 +290,6 @@ Frank""",
                 },
             }
         )
-        messages_created += 1
 
     # Individual inbox messages
     individual_messages = [
@@ -640,7 +640,7 @@ Eve - Marketing""",
     ]
 
     for msg_data in individual_messages:
-        storage.create_message(
+        pending_messages.append(
             {
                 "folder_id": inbox_id,
                 "from_address": msg_data["from"]["email"],
@@ -661,7 +661,6 @@ Eve - Marketing""",
                 },
             }
         )
-        messages_created += 1
 
     # Sent messages (5 messages)
     sent_messages = [
@@ -739,7 +738,7 @@ Thanks""",
 
     if sent_id:
         for msg_data in sent_messages:
-            storage.create_message(
+            pending_messages.append(
                 {
                     "folder_id": sent_id,
                     "from_address": ME["email"],
@@ -759,7 +758,6 @@ Thanks""",
                     },
                 }
             )
-            messages_created += 1
 
     # Draft messages (3 messages)
     draft_messages = [
@@ -812,7 +810,7 @@ Points to cover:
 
     if drafts_id:
         for msg_data in draft_messages:
-            storage.create_message(
+            pending_messages.append(
                 {
                     "folder_id": drafts_id,
                     "from_address": ME["email"],
@@ -827,7 +825,6 @@ Points to cover:
                     },
                 }
             )
-            messages_created += 1
 
     # Trash messages (4 messages - deleted emails)
     trash_messages = [
@@ -875,7 +872,7 @@ Apologies for the confusion.""",
 
     if trash_id:
         for msg_data in trash_messages:
-            storage.create_message(
+            pending_messages.append(
                 {
                     "folder_id": trash_id,
                     "from_address": msg_data["from"]["email"],
@@ -891,7 +888,6 @@ Apologies for the confusion.""",
                     },
                 }
             )
-            messages_created += 1
 
     # Spam messages (5 messages - junk mail)
     spam_messages = [
@@ -978,7 +974,7 @@ Unsubscribe: [MORE SUSPICIOUS LINKS]""",
 
     if spam_id:
         for msg_data in spam_messages:
-            storage.create_message(
+            pending_messages.append(
                 {
                     "folder_id": spam_id,
                     "from_address": msg_data["from"]["email"],
@@ -994,7 +990,6 @@ Unsubscribe: [MORE SUSPICIOUS LINKS]""",
                     },
                 }
             )
-            messages_created += 1
 
     # Archive messages (6 messages - old but kept for reference)
     archive_messages = [
@@ -1148,7 +1143,7 @@ Leo - Product""",
 
     if archive_id:
         for msg_data in archive_messages:
-            storage.create_message(
+            pending_messages.append(
                 {
                     "folder_id": archive_id,
                     "from_address": msg_data["from"]["email"],
@@ -1166,12 +1161,8 @@ Leo - Product""",
                     },
                 }
             )
-            messages_created += 1
 
-    # Update folder counts
-    storage._update_folder_counts()
-
-    return messages_created
+    return len(storage.create_messages_bulk(pending_messages))
 
 
 if __name__ == "__main__":
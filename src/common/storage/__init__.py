@@ -9,9 +9,13 @@ Modules:
     connection: Connection pooling and management
     migrations: Schema versioning and migrations
     storage: Main storage class with CRUD operations
+    blobs: Content-addressed attachment blob store
+    changes: Change sets for incremental backups
 """
 
-from .storage import EmailStorage, get_storage
+from .blobs import BlobRef, BlobStore, BlobWriter, blob_directory
+from .changes import ChangeSet
+from .storage import EmailStorage, MessageSummary, get_storage
 from .schema import (
     FolderType,
     MessageStatus,
@@ -22,7 +26,15 @@ from .migrations import run_migrations, get_schema_version
 __all__ = [
     # Main storage
     "EmailStorage",
+    "MessageSummary",
     "get_storage",
+    # Attachment blobs
+    "BlobRef",
+    "BlobStore",
+    "BlobWriter",
+    "blob_directory",
+    # Incremental backups
+    "ChangeSet",
     # Enums
     "FolderType",
     "MessageStatus",
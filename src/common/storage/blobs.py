@@ -0,0 +1,308 @@
+"""
+Content-addressed blob store for attachment content.
+
+Each blob is a file named by the SHA-256 of its content, sharded by the
+first two byte pairs of the digest (``ab/cd/abcd...``) so no directory
+grows too large. Identical attachments in different messages are stored
+once.
+
+Blobs are written through a BlobWriter: chunks are hashed as they are
+written to a temporary file in the store, which is then renamed into
+place, so a blob is never visible half-written and content never has to
+be held in memory as a whole. Reads map the file into memory instead of
+copying it.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+# Chunk size used when streaming blobs out
+READ_CHUNK_SIZE = 256 * 1024
+
+
+def blob_directory(db_path: str) -> Path:
+    """
+    Get the blob store directory for a database.
+
+    Args:
+        db_path: Path to the SQLite database file.
+
+    Returns:
+        ``<db_path>.blobs`` next to the database.
+    """
+    return Path(f"{os.path.abspath(db_path)}.blobs")
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    """A stored blob."""
+
+    checksum: str  # SHA-256 hex digest of the content
+    size: int
+    path: Path
+
+
+class BlobWriter:
+    """
+    Streams one blob into a BlobStore.
+
+    Example:
+        with store.writer() as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+        ref = writer.ref
+    """
+
+    def __init__(self, store: "BlobStore") -> None:
+        """
+        Initialize the writer with a new temporary file in the store.
+
+        Args:
+            store: Store the blob is written to.
+        """
+        self._store = store
+        self._hash = hashlib.sha256()
+        self._size = 0
+        self._tmp_path = store.root / "tmp" / uuid4().hex
+        self._file: Optional[BinaryIO] = open(self._tmp_path, "wb")
+        self.ref: Optional[BlobRef] = None
+
+    @property
+    def size(self) -> int:
+        """Bytes written so far."""
+        return self._size
+
+    @property
+    def checksum(self) -> str:
+        """SHA-256 hex digest of the bytes written so far."""
+        return self._hash.hexdigest()
+
+    def write(self, chunk: bytes) -> None:
+        """Append a chunk to the blob."""
+        self._hash.update(chunk)
+        self._file.write(chunk)
+        self._size += len(chunk)
+
+    def commit(self) -> BlobRef:
+        """
+        Finish the blob and move it into place.
+
+        If the store already holds the same content, the new copy is
+        discarded and the existing blob is used.
+
+        Returns:
+            The stored blob.
+        """
+        self._file.flush()
+        if self._store.fsync:
+            os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+        checksum = self._hash.hexdigest()
+        path = self._store.path(checksum)
+        if path.exists():
+            self._tmp_path.unlink()
+            # Mark it in use again so prune() leaves it alone
+            os.utime(path)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self._tmp_path, path)
+
+        self.ref = BlobRef(checksum, self._size, path)
+        return self.ref
+
+    def abort(self) -> None:
+        """Discard the blob."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "BlobWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None and self.ref is None:
+            self.commit()
+        else:
+            self.abort()
+
+
+class BlobStore:
+    """
+    Content-addressed on-disk store for attachment content.
+
+    Example:
+        store = BlobStore(blob_directory(db_path))
+        ref = store.put(b"...")
+        with store.open(ref.checksum) as view:
+            first_bytes = view[:16]
+    """
+
+    def __init__(self, root: Path | str, fsync: bool = True) -> None:
+        """
+        Initialize the store, creating its directory if needed.
+
+        Args:
+            root: Directory holding the blobs.
+            fsync: Flush blobs to disk before they are moved into place.
+        """
+        self.root = Path(root)
+        self.fsync = fsync
+        (self.root / "tmp").mkdir(parents=True, exist_ok=True)
+
+    def path(self, checksum: str) -> Path:
+        """Get the file path of a blob."""
+        return self.root / self.relative_path(checksum)
+
+    @staticmethod
+    def relative_path(checksum: str) -> str:
+        """Get the path of a blob relative to the store's root."""
+        return f"{checksum[:2]}/{checksum[2:4]}/{checksum}"
+
+    def exists(self, checksum: str) -> bool:
+        """Check whether a blob is stored."""
+        return self.path(checksum).exists()
+
+    def writer(self) -> BlobWriter:
+        """Start writing a new blob."""
+        return BlobWriter(self)
+
+    def put(self, data: bytes) -> BlobRef:
+        """Store a blob held in memory."""
+        return self.put_stream([data])
+
+    def put_stream(self, chunks: Iterable[bytes]) -> BlobRef:
+        """Store a blob from an iterable of chunks."""
+        writer = self.writer()
+        try:
+            for chunk in chunks:
+                writer.write(chunk)
+            return writer.commit()
+        except BaseException:
+            writer.abort()
+            raise
+
+    @contextmanager
+    def open(self, checksum: str) -> Iterator[memoryview]:
+        """
+        Map a blob into memory.
+
+        The view is only valid inside the ``with`` block.
+
+        Args:
+            checksum: SHA-256 of the blob.
+
+        Yields:
+            Read-only view of the blob's content.
+
+        Raises:
+            FileNotFoundError: If the blob is not stored.
+        """
+        with open(self.path(checksum), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # Empty files cannot be mapped
+                yield memoryview(b"")
+                return
+
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
+                mapped.close()
+
+    def iter_chunks(
+        self, checksum: str, chunk_size: int = READ_CHUNK_SIZE
+    ) -> Iterator[memoryview]:
+        """
+        Stream a blob in chunks, without copying it.
+
+        Args:
+            checksum: SHA-256 of the blob.
+            chunk_size: Bytes per chunk.
+
+        Yields:
+            Views into the mapped blob, each valid until the next chunk
+            is requested.
+        """
+        with self.open(checksum) as view:
+            for start in range(0, len(view), chunk_size):
+                chunk = view[start : start + chunk_size]
+                try:
+                    yield chunk
+                finally:
+                    chunk.release()
+
+    def read(self, checksum: str) -> bytes:
+        """Read a whole blob into memory."""
+        with self.open(checksum) as view:
+            return bytes(view)
+
+    def delete(self, checksum: str) -> bool:
+        """
+        Remove a blob.
+
+        Returns:
+            True if the blob existed.
+        """
+        try:
+            self.path(checksum).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def checksums(self) -> Iterator[str]:
+        """Iterate over the checksums of all stored blobs."""
+        for path in self.root.glob("??/??/*"):
+            yield path.name
+
+    def prune(self, referenced: set[str], grace: float = 3600.0) -> int:
+        """
+        Delete blobs that nothing references.
+
+        Blobs written or reused within ``grace`` seconds are kept, so a
+        blob written for a message that is still being stored survives.
+
+        Args:
+            referenced: Checksums that are still in use.
+            grace: Minimum age in seconds of a blob to delete.
+
+        Returns:
+            Number of blobs deleted.
+        """
+        cutoff = time.time() - grace
+        deleted = 0
+        for path in self.root.glob("??/??/*"):
+            if path.name in referenced:
+                continue
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    deleted += 1
+            except FileNotFoundError:
+                continue
+
+        for tmp in (self.root / "tmp").iterdir():
+            try:
+                if tmp.stat().st_mtime < cutoff:
+                    tmp.unlink()
+            except FileNotFoundError:
+                continue
+
+        if deleted:
+            logger.info("Pruned %d unreferenced blobs", deleted)
+        return deleted
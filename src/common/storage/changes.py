@@ -0,0 +1,217 @@
+"""
+Change sets for incremental backups.
+
+A change set is a small SQLite file holding the rows of a mailbox that
+changed after a given time: users, folders, contacts and messages whose
+updated_at is later, the shared content and attachments of those
+messages, and the deleted_rows entries recorded since. Exporting one
+reads the live database inside a single read transaction, so it is
+consistent without blocking writers; applying one upserts the rows and
+replays the deletions.
+
+Timestamps are compared as ISO 8601 strings, the form the application
+writes.
+"""
+
+import logging
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .connection import DatabaseConnection
+from .schema import RECOUNT_FOLDERS_SQL
+
+logger = logging.getLogger(__name__)
+
+# Rows read and written per batch
+BATCH_SIZE = 500
+
+# What a change set holds, in the order it is applied (parents first)
+_CHANGE_QUERIES = {
+    "users": "SELECT * FROM users WHERE updated_at > :since",
+    "folders": "SELECT * FROM folders WHERE updated_at > :since",
+    "contacts": "SELECT * FROM contacts WHERE updated_at > :since",
+    "message_contents": """
+        SELECT * FROM message_contents WHERE hash IN (
+            SELECT content_hash FROM messages WHERE updated_at > :since
+        )
+    """,
+    "messages": "SELECT * FROM messages WHERE updated_at > :since",
+    "attachments": """
+        SELECT * FROM attachments WHERE message_id IN (
+            SELECT id FROM messages WHERE updated_at > :since
+        )
+    """,
+    "deleted_rows": "SELECT * FROM deleted_rows WHERE deleted_at > :since",
+}
+
+# Primary key of each table rows are upserted into
+_KEYS = {
+    "users": "id",
+    "folders": "id",
+    "contacts": "id",
+    "message_contents": "hash",
+    "messages": "id",
+    "attachments": "id",
+}
+
+# Maintained by triggers as messages are applied; recounted afterwards
+_DERIVED_COLUMNS = {"folders": {"message_count", "unread_count"}}
+
+
+@dataclass
+class ChangeSet:
+    """Summary of an exported change set."""
+
+    since: str
+    watermark: str  # Time the rows were read; the next change set's since
+    counts: dict[str, int] = field(default_factory=dict)
+    blob_checksums: set[str] = field(default_factory=set)
+
+
+def export_changes(
+    db: DatabaseConnection, target_path: str, since: str
+) -> ChangeSet:
+    """
+    Write the rows changed after ``since`` to a change set file.
+
+    Args:
+        db: Database to read.
+        target_path: Change set file to create; it is replaced.
+        since: ISO 8601 timestamp; rows changed after it are exported.
+
+    Returns:
+        Summary of the change set.
+
+    Raises:
+        RuntimeError: If this thread's connection is in a transaction.
+    """
+    conn = db.connection
+    if conn.in_transaction:
+        raise RuntimeError("Cannot export changes inside a transaction")
+
+    changes = ChangeSet(
+        since=since, watermark=datetime.now(timezone.utc).isoformat()
+    )
+    Path(target_path).unlink(missing_ok=True)
+    target = sqlite3.connect(target_path)
+    try:
+        # One read transaction, so every table is read at the same point
+        conn.execute("BEGIN")
+        try:
+            for table, query in _CHANGE_QUERIES.items():
+                cursor = conn.execute(query, {"since": since})
+                columns = [column[0] for column in cursor.description]
+                target.execute(
+                    f"CREATE TABLE {table} ({', '.join(columns)})"
+                )
+                insert = (
+                    f"INSERT INTO {table} VALUES "
+                    f"({', '.join('?' * len(columns))})"
+                )
+                count = 0
+                while rows := cursor.fetchmany(BATCH_SIZE):
+                    target.executemany(insert, rows)
+                    count += len(rows)
+                    if table == "attachments":
+                        changes.blob_checksums.update(
+                            row["checksum"] for row in rows if row["checksum"]
+                        )
+                changes.counts[table] = count
+        finally:
+            conn.execute("COMMIT")
+        target.commit()
+    finally:
+        target.close()
+
+    logger.info(f"Exported changes since {since}: {changes.counts}")
+    return changes
+
+
+def apply_changes(db: DatabaseConnection, source_path: str) -> dict[str, int]:
+    """
+    Apply a change set to a database in one transaction.
+
+    Deletions are replayed first, then changed rows are inserted or
+    updated in place, and folder counters are recounted.
+
+    Args:
+        db: Database to update.
+        source_path: Change set file.
+
+    Returns:
+        Number of rows applied per table.
+    """
+    source = sqlite3.connect(source_path)
+    counts: dict[str, int] = {}
+    try:
+        with db.transaction() as conn:
+            # Rows reference each other (folder parents, messages and
+            # their content) in no particular order within a table
+            conn.execute("PRAGMA defer_foreign_keys = ON")
+
+            deleted = source.execute(
+                "SELECT table_name, row_id FROM deleted_rows"
+            )
+            counts["deleted"] = 0
+            while rows := deleted.fetchmany(BATCH_SIZE):
+                for table, row_id in rows:
+                    if table in _KEYS:
+                        cursor = conn.execute(
+                            f"DELETE FROM {table} WHERE {_KEYS[table]} = ?",
+                            (row_id,),
+                        )
+                        counts["deleted"] += cursor.rowcount
+
+            for table, key in _KEYS.items():
+                counts[table] = _upsert(conn, source, table, key)
+
+            conn.execute(
+                RECOUNT_FOLDERS_SQL, (datetime.now(timezone.utc).isoformat(),)
+            )
+    finally:
+        source.close()
+
+    logger.info(f"Applied changes from {source_path}: {counts}")
+    return counts
+
+
+def _upsert(
+    conn: sqlite3.Connection,
+    source: sqlite3.Connection,
+    table: str,
+    key: str,
+) -> int:
+    """Copy one table of a change set into the database."""
+    live_columns = {
+        row[1] for row in conn.execute(f"PRAGMA table_info({table})")
+    }
+    cursor = source.execute(f"SELECT * FROM {table}")
+    # A change set from an older schema may lack newer columns
+    columns = [
+        column[0]
+        for column in cursor.description
+        if column[0] in live_columns
+    ]
+    indexes = [
+        i for i, column in enumerate(cursor.description)
+        if column[0] in live_columns
+    ]
+    updated = [
+        column
+        for column in columns
+        if column != key and column not in _DERIVED_COLUMNS.get(table, ())
+    ]
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' * len(columns))}) "
+        f"ON CONFLICT ({key}) DO UPDATE SET "
+        + ", ".join(f"{column} = excluded.{column}" for column in updated)
+    )
+
+    count = 0
+    while rows := cursor.fetchmany(BATCH_SIZE):
+        conn.executemany(sql, [[row[i] for i in indexes] for row in rows])
+        count += len(rows)
+    return count
@@ -18,9 +18,10 @@ import logging
 import os
 import sqlite3
 import threading
+import time
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Generator, Optional
+from typing import Callable, Generator, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -240,6 +241,51 @@ class DatabaseConnection:
                 conn.rollback()
             raise
 
+    @contextmanager
+    def suspended_triggers(
+        self, *names: str
+    ) -> Generator[sqlite3.Connection, None, None]:
+        """
+        Temporarily drop triggers for the duration of a bulk write.
+
+        Must be used inside ``transaction()``. The triggers are dropped and
+        recreated from their stored definitions within that transaction,
+        so other connections never observe them missing. If the block
+        raises, the enclosing transaction's rollback restores them.
+
+        The caller is responsible for applying whatever the suspended
+        triggers would have done for the rows it wrote.
+
+        Args:
+            *names: Names of the triggers to suspend.
+
+        Yields:
+            SQLite connection with the triggers removed.
+
+        Raises:
+            RuntimeError: If called outside a transaction.
+        """
+        conn = self.connection
+        if not conn.in_transaction:
+            raise RuntimeError("Triggers can only be suspended in a transaction")
+
+        placeholders = ", ".join("?" * len(names))
+        definitions = conn.execute(
+            f"""
+            SELECT name, sql FROM sqlite_master
+            WHERE type = 'trigger' AND name IN ({placeholders})
+            """,
+            names,
+        ).fetchall()
+
+        for name, _ in definitions:
+            conn.execute(f'DROP TRIGGER "{name}"')
+
+        yield conn
+
+        for _, sql in definitions:
+            conn.execute(sql)
+
     def execute(
         self,
         sql: str,
@@ -326,6 +372,65 @@ class DatabaseConnection:
         self.connection.execute("VACUUM")
         logger.info("Database vacuumed")
 
+    def snapshot(
+        self,
+        target_path: str,
+        pages: int = 256,
+        pause: float = 0.001,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """
+        Copy the database to a file with the online backup API.
+
+        The copy is taken inside one read transaction, so it is a
+        consistent snapshot including committed WAL frames, and writers
+        on other connections are never blocked or cause it to restart.
+        Pages are copied a few at a time, pausing between steps so that
+        writers keep their share of the disk and the GIL.
+
+        Args:
+            target_path: File to write the copy to; it is replaced.
+            pages: Pages copied per step.
+            pause: Seconds to wait between steps.
+            progress: Called after each step with pages copied so far
+                and the total number of pages.
+
+        Returns:
+            Number of pages copied.
+
+        Raises:
+            RuntimeError: If this thread's connection is in a transaction.
+        """
+        conn = self.connection
+        if conn.in_transaction:
+            raise RuntimeError("Cannot snapshot inside a transaction")
+
+        copied = 0
+
+        def step(status: int, remaining: int, total: int) -> None:
+            nonlocal copied
+            copied = total - remaining
+            if progress:
+                progress(copied, total)
+            if remaining:
+                time.sleep(pause)
+
+        Path(target_path).unlink(missing_ok=True)
+        target = sqlite3.connect(target_path)
+        try:
+            # Pin the WAL snapshot the copy is taken from
+            conn.execute("BEGIN")
+            conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            try:
+                conn.backup(target, pages=pages, progress=step)
+            finally:
+                conn.execute("COMMIT")
+        finally:
+            target.close()
+
+        logger.info(f"Database snapshot written to {target_path}")
+        return copied
+
     def optimize(self) -> None:
         """
         Run optimization routines.
@@ -18,6 +18,7 @@ import json
 import logging
 import os
 import shutil
+import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Callable, Optional
@@ -25,10 +26,19 @@ from uuid import uuid4
 
 from .connection import get_db
 from .schema import (
+    CHANGE_TRACKING_SQL,
     DEFAULT_FOLDERS,
+    FOLDER_COUNTS_SQL,
     INDEXES_SQL,
+    MESSAGES_V7_SQL,
+    PAGINATION_INDEX_SQL,
+    PREVIEW_SQL,
+    QUEUE_LEASE_SQL,
+    QUEUE_READY_INDEX_SQL,
+    RECOUNT_FOLDERS_SQL,
     SCHEMA_SQL,
     SCHEMA_VERSION,
+    SHARED_CONTENT_SQL,
 )
 
 logger = logging.getLogger(__name__)
@@ -36,6 +46,31 @@ logger = logging.getLogger(__name__)
 # Type alias for migration functions
 MigrationFunc = Callable[[], None]
 
+# Inserts for legacy JSON data. These target the v1 schema, which is what
+# exists when _migrate_json_data runs; later columns are backfilled by
+# their own migrations.
+_LEGACY_MESSAGE_INSERT_SQL = """
+INSERT INTO messages (
+    id, user_id, folder_id, message_id, from_address,
+    to_addresses, cc_addresses, bcc_addresses, subject,
+    body_text, body_html, headers, status, priority,
+    is_read, is_starred, is_important, is_encrypted,
+    has_attachments, thread_id, in_reply_to, reference_ids,
+    original_folder_id, received_at, sent_at, deleted_at,
+    created_at, updated_at
+) VALUES (
+    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+)
+"""
+
+_LEGACY_ATTACHMENT_INSERT_SQL = """
+INSERT INTO attachments (
+    id, message_id, filename, content_type, size,
+    content_id, is_inline, storage_path
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 
 def get_schema_version() -> int:
     """
@@ -98,9 +133,37 @@ def run_migrations(target_version: Optional[int] = None) -> bool:
         if current_version < 1 and target_version >= 1:
             _migrate_v0_to_v1()
 
+        # Migration 1 -> 2: Incremental folder counters
+        if current_version < 2 and target_version >= 2:
+            _migrate_v1_to_v2()
+
+        # Migration 2 -> 3: Message list previews
+        if current_version < 3 and target_version >= 3:
+            _migrate_v2_to_v3()
+
+        # Migration 3 -> 4: Keyset pagination index
+        if current_version < 4 and target_version >= 4:
+            _migrate_v3_to_v4()
+
+        # Migration 4 -> 5: Queue claim leases
+        if current_version < 5 and target_version >= 5:
+            _migrate_v4_to_v5()
+
+        # Migration 5 -> 6: Queue readiness indexes
+        if current_version < 6 and target_version >= 6:
+            _migrate_v5_to_v6()
+
+        # Migration 6 -> 7: Shared message content
+        if current_version < 7 and target_version >= 7:
+            _migrate_v6_to_v7()
+
+        # Migration 7 -> 8: Change tracking for incremental backups
+        if current_version < 8 and target_version >= 8:
+            _migrate_v7_to_v8()
+
         # Add future migrations here:
-        # if current_version < 2 and target_version >= 2:
-        #     _migrate_v1_to_v2()
+        # if current_version < 9 and target_version >= 9:
+        #     _migrate_v8_to_v9()
 
         logger.info(
             f"Migrations completed successfully (now at version {target_version})"
@@ -142,6 +205,191 @@ def _migrate_v0_to_v1() -> None:
     _migrate_json_data()
 
 
+def _migrate_v1_to_v2() -> None:
+    """
+    Incremental folder counters (v1 -> v2).
+
+    Installs triggers that maintain folder message/unread counts as
+    messages are inserted, moved, flagged and deleted, then recounts
+    once so the stored counters start out accurate.
+    """
+    logger.info("Running migration: v1 -> v2 (incremental folder counters)")
+
+    db = get_db()
+
+    with db.transaction() as conn:
+        conn.executescript(FOLDER_COUNTS_SQL)
+        conn.execute(
+            RECOUNT_FOLDERS_SQL,
+            (datetime.now(timezone.utc).isoformat(),),
+        )
+        conn.execute(
+            "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+            (2, "Incremental folder counters"),
+        )
+
+
+def _migrate_v2_to_v3() -> None:
+    """
+    Message list previews (v2 -> v3).
+
+    Adds the messages.preview column used by list views and backfills
+    it from existing message bodies.
+    """
+    logger.info("Running migration: v2 -> v3 (message list previews)")
+
+    db = get_db()
+
+    with db.transaction() as conn:
+        conn.executescript(PREVIEW_SQL)
+        conn.execute(
+            "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+            (3, "Message list previews"),
+        )
+
+
+def _migrate_v3_to_v4() -> None:
+    """
+    Keyset pagination index (v3 -> v4).
+
+    Adds the (folder_id, received_at DESC) index used by cursor-based
+    message listing.
+    """
+    logger.info("Running migration: v3 -> v4 (keyset pagination index)")
+
+    db = get_db()
+
+    with db.transaction() as conn:
+        conn.executescript(PAGINATION_INDEX_SQL)
+        conn.execute(
+            "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+            (4, "Keyset pagination index"),
+        )
+
+
+def _migrate_v4_to_v5() -> None:
+    """
+    Queue claim leases (v4 -> v5).
+
+    Adds the claimed_by and lease_expires_at columns used by atomic
+    batch claiming, so items held by a crashed worker can be reclaimed.
+    """
+    logger.info("Running migration: v4 -> v5 (queue claim leases)")
+
+    db = get_db()
+
+    with db.transaction() as conn:
+        conn.executescript(QUEUE_LEASE_SQL)
+        conn.execute(
+            "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+            (5, "Queue claim leases"),
+        )
+
+
+def _migrate_v5_to_v6() -> None:
+    """
+    Queue readiness indexes (v5 -> v6).
+
+    Replaces the single-column queue indexes with composite ones so that
+    claiming ready work never reads retries deferred into the future.
+    """
+    logger.info("Running migration: v5 -> v6 (queue readiness indexes)")
+
+    db = get_db()
+
+    with db.transaction() as conn:
+        conn.executescript(QUEUE_READY_INDEX_SQL)
+        conn.execute(
+            "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+            (6, "Queue readiness indexes"),
+        )
+
+
+def _migrate_v6_to_v7() -> None:
+    """
+    Shared message content (v6 -> v7).
+
+    Adds the message_contents table and rebuilds messages with a
+    content_hash column and per-user Message-ID uniqueness. Rows keep
+    their rowids, so the full-text index needs no rebuild.
+
+    Statements are run one at a time rather than with executescript(),
+    which would commit the rebuild half way. Foreign keys are switched off
+    for the duration (they cannot be changed inside a transaction):
+    dropping the old table would otherwise cascade into attachments and
+    the queue.
+    """
+    logger.info("Running migration: v6 -> v7 (shared message content)")
+
+    db = get_db()
+    conn = db.connection
+
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        with db.transaction():
+            _execute_statements(conn, MESSAGES_V7_SQL)
+
+            columns = ", ".join(
+                row[1] for row in conn.execute("PRAGMA table_info(messages)")
+            )
+            conn.execute(
+                f"INSERT INTO messages_v7 (rowid, {columns}) "
+                f"SELECT rowid, {columns} FROM messages"
+            )
+
+            # Indexes and triggers go with the old table; keep their SQL
+            dependents = conn.execute(
+                """
+                SELECT sql FROM sqlite_master
+                WHERE tbl_name = 'messages' AND type IN ('index', 'trigger')
+                AND sql IS NOT NULL
+                """
+            ).fetchall()
+
+            conn.execute("DROP TABLE messages")
+            conn.execute("ALTER TABLE messages_v7 RENAME TO messages")
+            for (sql,) in dependents:
+                conn.execute(sql)
+            _execute_statements(conn, SHARED_CONTENT_SQL)
+
+            conn.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (7, "Shared message content"),
+            )
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
+
+
+def _migrate_v7_to_v8() -> None:
+    """
+    Change tracking (v7 -> v8).
+
+    Adds the deleted_rows log and the triggers that fill it, and indexes
+    messages by updated_at, so that incremental backups read only what
+    changed since the previous backup.
+    """
+    logger.info("Running migration: v7 -> v8 (change tracking)")
+
+    db = get_db()
+
+    with db.transaction() as conn:
+        _execute_statements(conn, CHANGE_TRACKING_SQL)
+        conn.execute(
+            "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+            (8, "Change tracking"),
+        )
+
+
+def _execute_statements(conn, script: str) -> None:
+    """Execute a SQL script statement by statement in the current transaction."""
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            conn.execute(statement)
+            statement = ""
+
+
 def _migrate_json_data() -> None:
     """
     Migrate data from legacy JSON files to SQLite.
@@ -234,104 +482,95 @@ def _migrate_json_data() -> None:
             with open(messages_file, "r") as f:
                 messages = json.load(f)
 
-            migrated_count = 0
-            with db.transaction() as conn:
-                for msg in messages:
-                    # Map old folder_id to new folder_id
-                    old_folder_id = msg.get("folder_id")
-                    new_folder_id = folder_id_map.get(old_folder_id)
-
-                    if not new_folder_id:
-                        # Default to Inbox
-                        for old_id, new_id in folder_id_map.items():
-                            new_folder_id = new_id
-                            break
-
-                    message_id = str(uuid4())
-                    attachments = msg.get("attachments", [])
-
-                    conn.execute(
-                        """
-                        INSERT INTO messages (
-                            id, user_id, folder_id, message_id, from_address,
-                            to_addresses, cc_addresses, bcc_addresses, subject,
-                            body_text, body_html, headers, status, priority,
-                            is_read, is_starred, is_important, is_encrypted,
-                            has_attachments, thread_id, in_reply_to, reference_ids,
-                            original_folder_id, received_at, sent_at, deleted_at,
-                            created_at, updated_at
-                        ) VALUES (
-                            ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
-                            ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
-                        )
-                        """,
-                        (
-                            message_id,
-                            user_id,
-                            new_folder_id,
-                            msg.get("message_id"),
-                            msg.get("from_address", ""),
-                            json.dumps(msg.get("to_addresses", [])),
-                            json.dumps(msg.get("cc_addresses", [])),
-                            json.dumps(msg.get("bcc_addresses", [])),
-                            msg.get("subject", ""),
-                            msg.get("body_text"),
-                            msg.get("body_html"),
-                            json.dumps(msg.get("headers", {})),
-                            msg.get("status", "received"),
-                            msg.get("priority", "normal"),
-                            1 if msg.get("is_read") else 0,
-                            1 if msg.get("is_starred") else 0,
-                            1 if msg.get("is_important") else 0,
-                            1 if msg.get("is_encrypted") else 0,
-                            1 if attachments else 0,
-                            msg.get("thread_id"),
-                            msg.get("in_reply_to"),
-                            json.dumps(msg.get("references", [])),
-                            folder_id_map.get(msg.get("original_folder_id")),
-                            msg.get(
-                                "received_at",
-                                datetime.now(timezone.utc).isoformat(),
-                            ),
-                            msg.get("sent_at"),
-                            msg.get("deleted_at"),
-                            msg.get(
-                                "created_at",
-                                datetime.now(timezone.utc).isoformat(),
-                            ),
-                            msg.get(
-                                "updated_at",
-                                datetime.now(timezone.utc).isoformat(),
-                            ),
+            message_rows: list[tuple] = []
+            attachment_rows: list[tuple] = []
+            for msg in messages:
+                # Map old folder_id to new folder_id
+                old_folder_id = msg.get("folder_id")
+                new_folder_id = folder_id_map.get(old_folder_id)
+
+                if not new_folder_id:
+                    # Default to Inbox
+                    for old_id, new_id in folder_id_map.items():
+                        new_folder_id = new_id
+                        break
+
+                message_id = str(uuid4())
+                attachments = msg.get("attachments", [])
+
+                message_rows.append(
+                    (
+                        message_id,
+                        user_id,
+                        new_folder_id,
+                        msg.get("message_id"),
+                        msg.get("from_address", ""),
+                        json.dumps(msg.get("to_addresses", [])),
+                        json.dumps(msg.get("cc_addresses", [])),
+                        json.dumps(msg.get("bcc_addresses", [])),
+                        msg.get("subject", ""),
+                        msg.get("body_text"),
+                        msg.get("body_html"),
+                        json.dumps(msg.get("headers", {})),
+                        msg.get("status", "received"),
+                        msg.get("priority", "normal"),
+                        1 if msg.get("is_read") else 0,
+                        1 if msg.get("is_starred") else 0,
+                        1 if msg.get("is_important") else 0,
+                        1 if msg.get("is_encrypted") else 0,
+                        1 if attachments else 0,
+                        msg.get("thread_id"),
+                        msg.get("in_reply_to"),
+                        json.dumps(msg.get("references", [])),
+                        folder_id_map.get(msg.get("original_folder_id")),
+                        msg.get(
+                            "received_at",
+                            datetime.now(timezone.utc).isoformat(),
+                        ),
+                        msg.get("sent_at"),
+                        msg.get("deleted_at"),
+                        msg.get(
+                            "created_at",
+                            datetime.now(timezone.utc).isoformat(),
+                        ),
+                        msg.get(
+                            "updated_at",
+                            datetime.now(timezone.utc).isoformat(),
                         ),
                     )
+                )
 
-                    # Migrate attachments
-                    for att in attachments:
-                        conn.execute(
-                            """
-                            INSERT INTO attachments (
-                                id, message_id, filename, content_type, size,
-                                content_id, is_inline, storage_path
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                            """,
-                            (
-                                str(uuid4()),
-                                message_id,
-                                att.get("filename", "attachment"),
-                                att.get(
-                                    "content_type", "application/octet-stream"
-                                ),
-                                att.get("size", 0),
-                                att.get("content_id"),
-                                1 if att.get("is_inline") else 0,
-                                att.get("path"),
+                # Migrate attachments
+                for att in attachments:
+                    attachment_rows.append(
+                        (
+                            str(uuid4()),
+                            message_id,
+                            att.get("filename", "attachment"),
+                            att.get(
+                                "content_type", "application/octet-stream"
                             ),
+                            att.get("size", 0),
+                            att.get("content_id"),
+                            1 if att.get("is_inline") else 0,
+                            att.get("path"),
                         )
+                    )
 
-                    migrated_count += 1
+            # Insert with the FTS trigger suspended and index once at the
+            # end; folder counters are recounted by the v1 -> v2 migration.
+            with db.transaction() as conn:
+                with db.suspended_triggers("messages_ai"):
+                    conn.executemany(_LEGACY_MESSAGE_INSERT_SQL, message_rows)
+                    conn.executemany(
+                        _LEGACY_ATTACHMENT_INSERT_SQL, attachment_rows
+                    )
+                    conn.execute(
+                        "INSERT INTO messages_fts(messages_fts) "
+                        "VALUES('rebuild')"
+                    )
 
-            logger.info(f"Migrated {migrated_count} messages")
+            logger.info(f"Migrated {len(message_rows)} messages")
         except Exception as e:
             logger.error(f"Error migrating messages: {e}")
 
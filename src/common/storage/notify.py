@@ -0,0 +1,176 @@
+"""
+Cross-process wakeup notifications for the outbound queue.
+
+A queue worker that wants to be told about new work opens a QueueDoorbell:
+a non-blocking UNIX datagram socket in a directory derived from the
+database path. Any process that enqueues work calls ring_doorbells(),
+which sends a one-byte datagram to every socket in that directory.
+
+Listeners sleep in the event loop on the socket, so an idle worker costs
+nothing, and a wakeup arrives within a syscall of the enqueue. Doorbells
+are only a latency optimisation: a lost or unsupported ring just means
+the worker picks the item up on its next fallback poll.
+"""
+
+import hashlib
+import logging
+import os
+import socket
+import tempfile
+from pathlib import Path
+from typing import Optional
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+# sun_path is 108 bytes on Linux; leave room for the socket file name
+_MAX_DIRECTORY_LENGTH = 80
+
+DOORBELLS_SUPPORTED = hasattr(socket, "AF_UNIX")
+
+
+def doorbell_directory(db_path: str) -> Path:
+    """
+    Get the directory holding queue doorbell sockets for a database.
+
+    Args:
+        db_path: Path to the SQLite database file.
+
+    Returns:
+        ``<db_path>.wakeup`` next to the database, or a per-database
+        directory under the system temp dir if that path is too long to
+        hold a UNIX socket.
+    """
+    db_path = os.path.abspath(db_path)
+    directory = Path(f"{db_path}.wakeup")
+    if len(str(directory)) <= _MAX_DIRECTORY_LENGTH:
+        return directory
+
+    digest = hashlib.sha256(db_path.encode()).hexdigest()[:16]
+    return Path(tempfile.gettempdir()) / f"unitmail-{digest}.wakeup"
+
+
+def ring_doorbells(db_path: str) -> int:
+    """
+    Wake every queue worker listening on a database.
+
+    Never raises: sockets left behind by dead listeners are removed,
+    and full socket buffers are ignored since a wakeup is already
+    pending there.
+
+    Args:
+        db_path: Path to the SQLite database file.
+
+    Returns:
+        Number of listeners rung.
+    """
+    if not DOORBELLS_SUPPORTED:
+        return 0
+
+    try:
+        entries = list(os.scandir(doorbell_directory(db_path)))
+    except OSError:
+        return 0
+
+    rung = 0
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        sock.setblocking(False)
+        for entry in entries:
+            if not entry.name.endswith(".sock"):
+                continue
+            try:
+                sock.sendto(b"\x01", entry.path)
+                rung += 1
+            except BlockingIOError:
+                rung += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                _unlink_quietly(entry.path)
+            except OSError as e:
+                logger.debug(f"Failed to ring queue doorbell {entry.path}: {e}")
+    return rung
+
+
+class QueueDoorbell:
+    """
+    Listening end of a queue doorbell.
+
+    Register fileno() with an event loop reader (or select) and call
+    drain() when it becomes readable.
+
+    Example:
+        doorbell = QueueDoorbell(db_path)
+        loop.add_reader(doorbell.fileno(), on_ring)
+        ...
+        loop.remove_reader(doorbell.fileno())
+        doorbell.close()
+    """
+
+    def __init__(self, db_path: str) -> None:
+        """
+        Bind a new doorbell socket for the given database.
+
+        Args:
+            db_path: Path to the SQLite database file.
+
+        Raises:
+            OSError: If UNIX sockets are unavailable or binding fails.
+        """
+        if not DOORBELLS_SUPPORTED:
+            raise OSError("UNIX domain sockets are not supported")
+
+        directory = doorbell_directory(db_path)
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+        self._path: Optional[str] = str(
+            directory / f"{os.getpid()}-{uuid4().hex[:8]}.sock"
+        )
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            self._socket.setblocking(False)
+            self._socket.bind(self._path)
+        except OSError:
+            self._socket.close()
+            raise
+
+        logger.debug(f"Queue doorbell listening on {self._path}")
+
+    @property
+    def path(self) -> Optional[str]:
+        """Filesystem path of the bound socket (None once closed)."""
+        return self._path
+
+    def fileno(self) -> int:
+        """Return the socket file descriptor."""
+        return self._socket.fileno()
+
+    def drain(self) -> int:
+        """
+        Consume all pending rings.
+
+        Returns:
+            Number of rings consumed.
+        """
+        count = 0
+        while True:
+            try:
+                self._socket.recv(64)
+                count += 1
+            except (BlockingIOError, InterruptedError):
+                return count
+            except OSError:
+                return count
+
+    def close(self) -> None:
+        """Close the socket and remove its file."""
+        self._socket.close()
+        if self._path:
+            _unlink_quietly(self._path)
+            self._path = None
+
+
+def _unlink_quietly(path: str) -> None:
+    """Remove a socket file, ignoring errors."""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
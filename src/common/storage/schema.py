@@ -52,7 +52,10 @@ class MessagePriority(str, Enum):
 
 
 # Current schema version
-SCHEMA_VERSION = 1
+SCHEMA_VERSION = 8
+
+# Length of the precomputed body preview shown in message lists
+PREVIEW_LENGTH = 200
 
 # SQL statements for creating tables
 SCHEMA_SQL = """
@@ -307,6 +310,332 @@ CREATE INDEX IF NOT EXISTS idx_token_blacklist_expires_at
     ON token_blacklist(expires_at);
 """
 
+# Folder counter maintenance (schema v2)
+# Keeps folders.message_count and folders.unread_count up to date with
+# O(1) deltas instead of recounting every folder after each write.
+FOLDER_COUNTS_SQL = """
+CREATE TRIGGER IF NOT EXISTS messages_folder_counts_ai
+AFTER INSERT ON messages BEGIN
+    UPDATE folders SET
+        message_count = message_count + 1,
+        unread_count = unread_count + (NEW.is_read = 0)
+    WHERE id = NEW.folder_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS messages_folder_counts_ad
+AFTER DELETE ON messages BEGIN
+    UPDATE folders SET
+        message_count = message_count - 1,
+        unread_count = unread_count - (OLD.is_read = 0)
+    WHERE id = OLD.folder_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS messages_folder_counts_au
+AFTER UPDATE OF folder_id, is_read ON messages
+WHEN OLD.folder_id IS NOT NEW.folder_id OR OLD.is_read != NEW.is_read
+BEGIN
+    UPDATE folders SET
+        message_count = message_count - 1,
+        unread_count = unread_count - (OLD.is_read = 0)
+    WHERE id = OLD.folder_id;
+    UPDATE folders SET
+        message_count = message_count + 1,
+        unread_count = unread_count + (NEW.is_read = 0)
+    WHERE id = NEW.folder_id;
+END;
+
+-- Only re-index FTS when an indexed column changes, so flag updates
+-- (read, starred, folder moves) don't rewrite the full-text index.
+DROP TRIGGER IF EXISTS messages_au;
+CREATE TRIGGER messages_au
+AFTER UPDATE OF subject, body_text, from_address, to_addresses ON messages
+BEGIN
+    INSERT INTO messages_fts(
+        messages_fts, rowid, subject, body_text, from_address, to_addresses
+    ) VALUES (
+        'delete', OLD.rowid, OLD.subject, OLD.body_text,
+        OLD.from_address, OLD.to_addresses
+    );
+    INSERT INTO messages_fts(
+        rowid, subject, body_text, from_address, to_addresses
+    ) VALUES (
+        NEW.rowid, NEW.subject, NEW.body_text,
+        NEW.from_address, NEW.to_addresses
+    );
+END;
+"""
+
+# Full recount of folder counters, used to repair drift. Only folders
+# whose stored counters differ from the actual counts are rewritten.
+RECOUNT_FOLDERS_SQL = """
+UPDATE folders SET
+    message_count = counts.total,
+    unread_count = counts.unread,
+    updated_at = ?
+FROM (
+    SELECT
+        f.id AS folder_id,
+        COUNT(m.id) AS total,
+        COALESCE(SUM(m.is_read = 0), 0) AS unread
+    FROM folders f
+    LEFT JOIN messages m ON m.folder_id = f.id
+    GROUP BY f.id
+) AS counts
+WHERE folders.id = counts.folder_id
+AND (
+    folders.message_count != counts.total
+    OR folders.unread_count != counts.unread
+)
+"""
+
+# Bulk ingest (see EmailStorage.create_messages_bulk)
+# The per-row insert triggers are suspended while a batch is written; the
+# statements below apply their effects in one pass to every message whose
+# rowid is above the given watermark.
+BULK_INSERT_SUSPENDED_TRIGGERS = ("messages_ai", "messages_folder_counts_ai")
+
+BULK_FOLDER_COUNTS_SQL = """
+UPDATE folders SET
+    message_count = message_count + delta.total,
+    unread_count = unread_count + delta.unread
+FROM (
+    SELECT folder_id, COUNT(*) AS total, SUM(is_read = 0) AS unread
+    FROM messages
+    WHERE rowid > ?
+    GROUP BY folder_id
+) AS delta
+WHERE folders.id = delta.folder_id
+"""
+
+BULK_FTS_INSERT_SQL = """
+INSERT INTO messages_fts(rowid, subject, body_text, from_address, to_addresses)
+SELECT rowid, subject, body_text, from_address, to_addresses
+FROM messages
+WHERE rowid > ?
+"""
+
+# Message list previews (schema v3)
+# Adds a precomputed plain-text preview so list views never need to read
+# body_text. Existing rows are backfilled from their body.
+PREVIEW_SQL = f"""
+ALTER TABLE messages ADD COLUMN preview TEXT NOT NULL DEFAULT '';
+
+UPDATE messages SET preview = substr(
+    trim(replace(replace(COALESCE(body_text, ''), char(13), ' '), char(10), ' ')),
+    1, {PREVIEW_LENGTH}
+);
+"""
+
+# Keyset pagination index (schema v4)
+# Serves folder listings ordered by (received_at DESC, rowid) straight from
+# the index. It also covers folder_id lookups, so the single-column index
+# becomes redundant.
+PAGINATION_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_messages_folder_received
+    ON messages(folder_id, received_at DESC);
+
+DROP INDEX IF EXISTS idx_messages_folder_id;
+"""
+
+# Queue claim leases (schema v5)
+# Workers claim items by stamping claimed_by and a lease expiry; an item
+# still 'processing' after its lease expires is claimable again. Items
+# left 'processing' by pre-v5 workers get an already-expired lease so
+# they are recovered.
+QUEUE_LEASE_SQL = """
+ALTER TABLE queue ADD COLUMN claimed_by TEXT;
+ALTER TABLE queue ADD COLUMN lease_expires_at TEXT;
+
+UPDATE queue SET lease_expires_at = strftime('%Y-%m-%dT%H:%M:%S+00:00', 'now')
+WHERE status = 'processing';
+
+CREATE INDEX IF NOT EXISTS idx_queue_lease
+    ON queue(lease_expires_at) WHERE status = 'processing';
+"""
+
+# Queue readiness indexes (schema v6)
+# The claim query reads ready work branch by branch: pending items in
+# priority order straight from (status, priority, created_at), and due
+# retries as a range scan of (status, next_attempt_at). Retries deferred
+# into the future are never read. These supersede the single-column
+# status, priority and next_attempt_at indexes.
+QUEUE_READY_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_queue_status_priority
+    ON queue(status, priority DESC, created_at);
+CREATE INDEX IF NOT EXISTS idx_queue_due
+    ON queue(status, next_attempt_at) WHERE next_attempt_at IS NOT NULL;
+
+DROP INDEX IF EXISTS idx_queue_status;
+DROP INDEX IF EXISTS idx_queue_priority;
+DROP INDEX IF EXISTS idx_queue_next_attempt;
+"""
+
+# Shared message content (schema v7)
+# A message delivered to several local users is stored once: its bodies and
+# headers go to message_contents, keyed by the SHA-256 of that content, and
+# each user's messages row references them through content_hash, leaving
+# its own body_text, body_html and headers NULL. Message-IDs are unique per
+# user instead of globally, which takes a rebuild of the messages table
+# (the column-level UNIQUE constraint cannot be dropped in place): rows are
+# copied into MESSAGES_V7_SQL with their rowids, so the full-text index
+# stays valid, and the table's indexes and triggers are recreated.
+MESSAGES_V7_SQL = """
+CREATE TABLE message_contents (
+    hash TEXT PRIMARY KEY,  -- SHA-256 of the content
+    body_text TEXT,
+    body_html TEXT,
+    headers TEXT NOT NULL DEFAULT '{}',  -- JSON object of all headers
+    created_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TABLE messages_v7 (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    folder_id TEXT NOT NULL,
+    message_id TEXT,  -- RFC 5322 Message-ID header, unique per user
+    from_address TEXT NOT NULL,
+    to_addresses TEXT NOT NULL,  -- JSON array
+    cc_addresses TEXT DEFAULT '[]',  -- JSON array
+    bcc_addresses TEXT DEFAULT '[]',  -- JSON array
+    reply_to TEXT,
+    subject TEXT DEFAULT '',
+    body_text TEXT,
+    body_html TEXT,
+    headers TEXT DEFAULT '{}',  -- JSON object of all headers
+    content_hash TEXT,  -- Shared content, in place of the three above
+    status TEXT NOT NULL DEFAULT 'received',
+    priority TEXT NOT NULL DEFAULT 'normal',
+    is_read INTEGER NOT NULL DEFAULT 0,
+    is_starred INTEGER NOT NULL DEFAULT 0,
+    is_important INTEGER NOT NULL DEFAULT 0,
+    is_encrypted INTEGER NOT NULL DEFAULT 0,
+    is_signed INTEGER NOT NULL DEFAULT 0,
+    has_attachments INTEGER NOT NULL DEFAULT 0,
+    thread_id TEXT,  -- For conversation threading
+    in_reply_to TEXT,  -- Message-ID of parent message
+    reference_ids TEXT DEFAULT '[]',  -- JSON array of Message-IDs
+    original_folder_id TEXT,  -- For trash restoration
+    received_at TEXT NOT NULL DEFAULT (datetime('now')),
+    sent_at TEXT,
+    deleted_at TEXT,
+    created_at TEXT NOT NULL DEFAULT (datetime('now')),
+    updated_at TEXT NOT NULL DEFAULT (datetime('now')),
+    preview TEXT NOT NULL DEFAULT '',
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (folder_id) REFERENCES folders(id) ON DELETE CASCADE,
+    FOREIGN KEY (content_hash) REFERENCES message_contents(hash)
+);
+"""
+
+# Applied once the rebuilt table has been renamed to messages. The FTS
+# triggers index the shared body of rows that have one, and drop a shared
+# content row once the last message referencing it is deleted or rewritten.
+# Because those bodies are not in messages.body_text, the FTS 'rebuild'
+# command would drop them from the index.
+SHARED_CONTENT_SQL = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_messages_user_message_id
+    ON messages(user_id, message_id);
+CREATE INDEX IF NOT EXISTS idx_messages_content_hash
+    ON messages(content_hash) WHERE content_hash IS NOT NULL;
+
+DROP TRIGGER IF EXISTS messages_ai;
+CREATE TRIGGER messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts(rowid, subject, body_text, from_address, to_addresses)
+    VALUES (
+        NEW.rowid, NEW.subject,
+        COALESCE(NEW.body_text, (
+            SELECT body_text FROM message_contents WHERE hash = NEW.content_hash
+        )),
+        NEW.from_address, NEW.to_addresses
+    );
+END;
+
+DROP TRIGGER IF EXISTS messages_ad;
+CREATE TRIGGER messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts(
+        messages_fts, rowid, subject, body_text, from_address, to_addresses
+    ) VALUES (
+        'delete', OLD.rowid, OLD.subject,
+        COALESCE(OLD.body_text, (
+            SELECT body_text FROM message_contents WHERE hash = OLD.content_hash
+        )),
+        OLD.from_address, OLD.to_addresses
+    );
+    DELETE FROM message_contents
+    WHERE hash = OLD.content_hash
+    AND NOT EXISTS (
+        SELECT 1 FROM messages WHERE content_hash = OLD.content_hash
+    );
+END;
+
+DROP TRIGGER IF EXISTS messages_au;
+CREATE TRIGGER messages_au
+AFTER UPDATE OF subject, body_text, from_address, to_addresses, content_hash
+ON messages
+BEGIN
+    INSERT INTO messages_fts(
+        messages_fts, rowid, subject, body_text, from_address, to_addresses
+    ) VALUES (
+        'delete', OLD.rowid, OLD.subject,
+        COALESCE(OLD.body_text, (
+            SELECT body_text FROM message_contents WHERE hash = OLD.content_hash
+        )),
+        OLD.from_address, OLD.to_addresses
+    );
+    INSERT INTO messages_fts(
+        rowid, subject, body_text, from_address, to_addresses
+    ) VALUES (
+        NEW.rowid, NEW.subject,
+        COALESCE(NEW.body_text, (
+            SELECT body_text FROM message_contents WHERE hash = NEW.content_hash
+        )),
+        NEW.from_address, NEW.to_addresses
+    );
+    DELETE FROM message_contents
+    WHERE hash = OLD.content_hash
+    AND NOT EXISTS (
+        SELECT 1 FROM messages WHERE content_hash = OLD.content_hash
+    );
+END;
+"""
+
+# Change tracking (schema v8)
+# Incremental backups copy rows whose updated_at is past the previous
+# backup's watermark. Deletions leave no row to find that way, so each
+# delete is recorded in deleted_rows, with a timestamp in the same ISO
+# 8601 form the application writes to updated_at.
+CHANGE_TRACKING_SQL = """
+CREATE TABLE IF NOT EXISTS deleted_rows (
+    table_name TEXT NOT NULL,
+    row_id TEXT NOT NULL,
+    deleted_at TEXT NOT NULL
+        DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_deleted_rows_deleted_at
+    ON deleted_rows(deleted_at);
+CREATE INDEX IF NOT EXISTS idx_messages_updated_at
+    ON messages(updated_at);
+
+CREATE TRIGGER IF NOT EXISTS messages_deleted AFTER DELETE ON messages BEGIN
+    INSERT INTO deleted_rows (table_name, row_id) VALUES ('messages', OLD.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS attachments_deleted AFTER DELETE ON attachments
+BEGIN
+    INSERT INTO deleted_rows (table_name, row_id)
+    VALUES ('attachments', OLD.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS folders_deleted AFTER DELETE ON folders BEGIN
+    INSERT INTO deleted_rows (table_name, row_id) VALUES ('folders', OLD.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS contacts_deleted AFTER DELETE ON contacts BEGIN
+    INSERT INTO deleted_rows (table_name, row_id) VALUES ('contacts', OLD.id);
+END;
+"""
+
 # Default system folders
 DEFAULT_FOLDERS = [
     {
@@ -15,28 +15,245 @@ Features:
 - Attachment handling
 """
 
+import base64
+import binascii
+import hashlib
 import json
 import logging
 import os
 import shutil
 from datetime import datetime, timedelta, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Any, Optional
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Optional,
+)
 from uuid import uuid4
 
+from .blobs import BlobStore, blob_directory
+from .changes import ChangeSet, apply_changes, export_changes
 from .connection import get_db, DatabaseConnection
 from .migrations import get_schema_version, run_migrations
+from .notify import QueueDoorbell, ring_doorbells
 from .schema import (
+    BULK_FOLDER_COUNTS_SQL,
+    BULK_FTS_INSERT_SQL,
+    BULK_INSERT_SUSPENDED_TRIGGERS,
     DEFAULT_FOLDERS,
     FolderType,
     MessagePriority,
     MessageStatus,
+    PREVIEW_LENGTH,
+    RECOUNT_FOLDERS_SQL,
     SCHEMA_VERSION,
 )
 
 logger = logging.getLogger(__name__)
 
 
+class MessageSummary(NamedTuple):
+    """
+    Compact, read-only view of a message for list displays.
+
+    Carries only the columns needed to render a message row, plus a
+    precomputed body preview, so listing never touches message bodies
+    or parses the full headers JSON.
+    """
+
+    id: str
+    user_id: str
+    folder_id: str
+    message_id: Optional[str]
+    thread_id: Optional[str]
+    from_address: str
+    from_header: Optional[str]
+    to_addresses: list[str]
+    to_header: Optional[str]
+    subject: str
+    preview: str
+    status: str
+    is_read: bool
+    is_starred: bool
+    is_important: bool
+    is_encrypted: bool
+    has_attachments: bool
+    attachment_count: int
+    received_at: str
+    rowid: int  # Listing position, used to build the next page's cursor
+    rank: Optional[float] = None
+
+
+# Headers of a message row m, whether stored inline or shared
+_MESSAGE_HEADERS = """COALESCE(m.headers, (
+        SELECT c.headers FROM message_contents c WHERE c.hash = m.content_hash
+    ))"""
+
+# Columns read for MessageSummary rows (messages table aliased as m)
+_SUMMARY_COLUMNS = f"""
+    m.id, m.user_id, m.folder_id, m.message_id, m.thread_id,
+    m.from_address,
+    json_extract({_MESSAGE_HEADERS}, '$.From') AS from_header,
+    m.to_addresses,
+    json_extract({_MESSAGE_HEADERS}, '$.To') AS to_header,
+    m.subject, m.preview, m.status,
+    m.is_read, m.is_starred, m.is_important, m.is_encrypted,
+    m.has_attachments,
+    CASE WHEN m.has_attachments THEN (
+        SELECT COUNT(*) FROM attachments a WHERE a.message_id = m.id
+    ) ELSE 0 END AS attachment_count,
+    m.received_at, m.rowid
+"""
+
+_MESSAGE_INSERT_SQL = """
+INSERT INTO messages (
+    id, user_id, folder_id, message_id, from_address,
+    to_addresses, cc_addresses, bcc_addresses, subject,
+    body_text, body_html, headers, status, priority,
+    is_read, is_starred, is_important, is_encrypted,
+    has_attachments, thread_id, in_reply_to, reference_ids,
+    received_at, sent_at, created_at, updated_at, preview
+) VALUES (
+    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+)
+"""
+
+# A user's copy of a message whose content is in message_contents. A user
+# who already has the Message-ID is skipped.
+_SHARED_MESSAGE_INSERT_SQL = """
+INSERT INTO messages (
+    id, user_id, folder_id, message_id, from_address,
+    to_addresses, cc_addresses, bcc_addresses, subject,
+    body_text, body_html, headers, status, priority,
+    is_read, is_starred, is_important, is_encrypted,
+    has_attachments, thread_id, in_reply_to, reference_ids,
+    received_at, sent_at, created_at, updated_at, preview, content_hash
+) VALUES (
+    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+)
+ON CONFLICT (user_id, message_id) DO NOTHING
+"""
+
+_CONTENT_INSERT_SQL = """
+INSERT INTO message_contents (hash, body_text, body_html, headers, created_at)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (hash) DO NOTHING
+"""
+
+_ATTACHMENT_INSERT_SQL = """
+INSERT INTO attachments (
+    id, message_id, filename, content_type, size,
+    content_id, is_inline, storage_path, checksum
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Ready queue items, highest priority first, then longest overdue. Each
+# branch is an index range over work that is already due, limited before
+# the merge, so retries deferred into the future are never read. The
+# time-bounded branches are pinned to their range indexes: left alone,
+# the planner prefers walking (status, priority) to skip a sort, which
+# reads every deferred retry.
+_QUEUE_READY_SQL = """
+SELECT id FROM (
+    SELECT * FROM (
+        SELECT id, priority, created_at AS due_at FROM queue
+        WHERE status = 'pending'
+        ORDER BY priority DESC, created_at
+        LIMIT :limit
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT id, priority, next_attempt_at FROM queue INDEXED BY idx_queue_due
+        WHERE status = 'retrying' AND next_attempt_at <= :now
+        ORDER BY priority DESC, next_attempt_at
+        LIMIT :limit
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT id, priority, lease_expires_at FROM queue INDEXED BY idx_queue_lease
+        WHERE status = 'processing' AND lease_expires_at <= :now
+        ORDER BY priority DESC, lease_expires_at
+        LIMIT :limit
+    )
+)
+ORDER BY priority DESC, due_at
+LIMIT :limit
+"""
+
+
+def make_preview(body_text: Optional[str]) -> str:
+    """
+    Build the list preview for a message body.
+
+    Args:
+        body_text: Plain text message body.
+
+    Returns:
+        Whitespace-collapsed prefix of the body.
+    """
+    if not body_text:
+        return ""
+    # Only look at a bounded prefix so huge bodies stay cheap
+    return " ".join(body_text[: PREVIEW_LENGTH * 4].split())[:PREVIEW_LENGTH]
+
+
+# Message listings are ordered newest first with rowid as the tiebreaker.
+# The composite (folder_id, received_at DESC) index stores rowid ascending,
+# so this order lets SQLite walk the index without a sort step.
+_LIST_ORDER = "ORDER BY received_at DESC, rowid ASC"
+
+# Keyset predicate selecting rows strictly after a (received_at, rowid)
+# position in _LIST_ORDER. The leading "received_at <= ?" gives SQLite an
+# index range to seek to instead of filtering from the start of the index.
+_KEYSET_CLAUSE = "received_at <= ? AND (received_at < ? OR rowid > ?)"
+
+
+def _claim_fence(worker_id: Optional[str]) -> tuple[str, tuple]:
+    """
+    WHERE condition limiting a queue update to the worker holding the claim.
+
+    A worker whose lease expired keeps running; once another worker has
+    reclaimed the item, the first one's result must not overwrite it.
+
+    Returns:
+        Tuple of (SQL to append to the WHERE clause, its parameters); empty
+        without a worker.
+    """
+    if worker_id is None:
+        return "", ()
+    return " AND claimed_by = ?", (worker_id,)
+
+
+def _encode_cursor(received_at: str, rowid: int) -> str:
+    """Encode a listing position as an opaque, URL-safe cursor."""
+    raw = json.dumps([received_at, rowid], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    """
+    Decode a cursor produced by _encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        received_at, rowid = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError("Invalid pagination cursor") from None
+    if not isinstance(received_at, str) or not isinstance(rowid, int):
+        raise ValueError("Invalid pagination cursor")
+    return received_at, rowid
+
+
 class EmailStorage:
     """
     SQLite-based email storage with full-text search.
@@ -56,6 +273,12 @@ class EmailStorage:
 
     _instance: Optional["EmailStorage"] = None
 
+    # Keep IN (...) lists under SQLite's default bound-parameter limit
+    _MAX_SQL_PARAMS = 900
+
+    # Flag columns that set_flag_many() may change
+    _BATCH_FLAGS = ("is_read", "is_starred", "is_important")
+
     def __new__(cls, db_path: Optional[str] = None) -> "EmailStorage":
         """Singleton pattern for storage instance."""
         if cls._instance is None:
@@ -77,7 +300,9 @@ class EmailStorage:
             db_path = os.path.expanduser("~/.unitmail/data/unitmail.db")
 
         self._db = get_db(db_path)
+        self.blobs = BlobStore(blob_directory(db_path))
         self._default_user_id: Optional[str] = None
+        self._queue_listeners: list[Callable[[], None]] = []
 
         # Run migrations if needed
         if get_schema_version() < SCHEMA_VERSION:
@@ -199,6 +424,7 @@ class EmailStorage:
 
     def _row_to_user(self, row) -> dict:
         """Convert a database row to a user dictionary."""
+        row = dict(row)
         return {
             "id": row["id"],
             "email": row["email"],
@@ -322,7 +548,6 @@ class EmailStorage:
         Returns:
             Created message with ID.
         """
-        message_id = str(uuid4())
         now = datetime.now(timezone.utc).isoformat()
 
         # Get folder_id
@@ -332,105 +557,323 @@ class EmailStorage:
             inbox = self.get_folder_by_name("Inbox")
             folder_id = inbox["id"] if inbox else None
 
-        # Prepare JSON fields
-        to_addresses = message.get("to_addresses", [])
-        cc_addresses = message.get("cc_addresses", [])
-        bcc_addresses = message.get("bcc_addresses", [])
-        headers = message.get("headers", {})
-        references = message.get("references", [])
-        attachments = message.get("attachments", [])
-
-        if isinstance(to_addresses, str):
-            to_addresses = [to_addresses]
+        message_row = self._message_row(message, folder_id, now)
+        message_id = message_row[0]
 
         with self._db.transaction() as conn:
-            conn.execute(
-                """
-                INSERT INTO messages (
-                    id, user_id, folder_id, message_id, from_address,
-                    to_addresses, cc_addresses, bcc_addresses, subject,
-                    body_text, body_html, headers, status, priority,
-                    is_read, is_starred, is_important, is_encrypted,
-                    has_attachments, thread_id, in_reply_to, reference_ids,
-                    received_at, sent_at, created_at, updated_at
-                ) VALUES (
-                    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
-                    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
-                )
-                """,
-                (
-                    message_id,
-                    self._default_user_id,
-                    folder_id,
-                    message.get(
-                        "message_id", f"<{message_id}@unitmail.local>"
-                    ),
-                    message.get("from_address", ""),
-                    json.dumps(to_addresses),
-                    json.dumps(cc_addresses),
-                    json.dumps(bcc_addresses),
-                    message.get("subject", ""),
-                    message.get("body_text"),
-                    message.get("body_html"),
-                    json.dumps(headers),
-                    message.get("status", MessageStatus.RECEIVED.value),
-                    message.get("priority", MessagePriority.NORMAL.value),
-                    1 if message.get("is_read") else 0,
-                    1 if message.get("is_starred") else 0,
-                    1 if message.get("is_important") else 0,
-                    1 if message.get("is_encrypted") else 0,
-                    1 if attachments else 0,
-                    message.get("thread_id"),
-                    message.get("in_reply_to"),
-                    json.dumps(references),
-                    message.get("received_at", now),
-                    message.get("sent_at"),
-                    now,
-                    now,
-                ),
-            )
+            conn.execute(_MESSAGE_INSERT_SQL, message_row)
 
             # Store attachments
-            for att in attachments:
+            conn.executemany(
+                _ATTACHMENT_INSERT_SQL,
+                self._attachment_rows(message_id, message),
+            )
+
+        return self.get_message(message_id)
+
+    def create_messages_bulk(
+        self,
+        messages: Iterable[dict],
+        chunk_size: int = 1000,
+        progress_callback: Optional[Callable[[int], None]] = None,
+    ) -> list[str]:
+        """
+        Create many messages in a single transaction.
+
+        Messages are consumed lazily and written with executemany in
+        chunks of ``chunk_size``. The per-row FTS and folder counter
+        triggers are suspended for the batch: folder counters are applied
+        once per chunk and the full-text index is populated once at the
+        end. Nothing is read back, so this is the path to use for imports
+        and seeding.
+
+        The batch is atomic: if any message fails to insert (for example
+        a duplicate Message-ID), nothing is stored.
+
+        Args:
+            messages: Iterable of message data dictionaries, in the same
+                format accepted by create_message().
+            chunk_size: Number of messages written per executemany call.
+            progress_callback: Optional callable invoked after each chunk
+                with the number of messages written so far.
+
+        Returns:
+            IDs of the created messages, in input order.
+
+        Raises:
+            ValueError: If chunk_size is not positive.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        now = datetime.now(timezone.utc).isoformat()
+        inbox_id: Optional[str] = None
+        message_ids: list[str] = []
+        iterator = iter(messages)
+
+        with self._db.transaction() as conn:
+            batch_start = self._max_message_rowid(conn)
+
+            with self._db.suspended_triggers(*BULK_INSERT_SUSPENDED_TRIGGERS):
+                while chunk := list(islice(iterator, chunk_size)):
+                    chunk_start = self._max_message_rowid(conn)
+                    message_rows = []
+                    attachment_rows = []
+
+                    for message in chunk:
+                        folder_id = message.get("folder_id")
+                        if not folder_id:
+                            if inbox_id is None:
+                                inbox = self.get_folder_by_name("Inbox")
+                                inbox_id = inbox["id"] if inbox else None
+                            folder_id = inbox_id
+
+                        row = self._message_row(message, folder_id, now)
+                        message_rows.append(row)
+                        attachment_rows.extend(
+                            self._attachment_rows(row[0], message)
+                        )
+
+                    conn.executemany(_MESSAGE_INSERT_SQL, message_rows)
+                    if attachment_rows:
+                        conn.executemany(
+                            _ATTACHMENT_INSERT_SQL, attachment_rows
+                        )
+                    conn.execute(BULK_FOLDER_COUNTS_SQL, (chunk_start,))
+
+                    message_ids.extend(row[0] for row in message_rows)
+                    if progress_callback:
+                        progress_callback(len(message_ids))
+
+                conn.execute(BULK_FTS_INSERT_SQL, (batch_start,))
+
+        logger.info(f"Bulk-created {len(message_ids)} messages")
+        return message_ids
+
+    def create_shared_message(
+        self, message: dict, targets: Mapping[str, Optional[str]]
+    ) -> list[str]:
+        """
+        Store one message for several users in a single transaction.
+
+        The bodies and headers are written once, to message_contents,
+        keyed by their SHA-256; each user gets a messages row that
+        references them. A user who already has a message with the same
+        Message-ID is skipped, so storing a delivery twice (for example
+        when a spooled message is replayed) is harmless.
+
+        Args:
+            message: Message data dictionary, in the same format accepted
+                by create_message().
+            targets: Destination folder ID per user ID (None for the
+                Inbox).
+
+        Returns:
+            IDs of the created messages. Users that already had the
+            message are not included.
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        content_row = self._content_row(message, now)
+        content_hash = content_row[0]
+        inbox_id: Optional[str] = None
+        message_ids: list[str] = []
+
+        with self._db.transaction() as conn:
+            conn.execute(_CONTENT_INSERT_SQL, content_row)
+
+            for user_id, folder_id in targets.items():
+                if not folder_id:
+                    if inbox_id is None:
+                        inbox = self.get_folder_by_name("Inbox")
+                        inbox_id = inbox["id"] if inbox else None
+                    folder_id = inbox_id
+
+                row = self._message_row(
+                    message, folder_id, now, user_id, content_hash
+                )
+                if conn.execute(_SHARED_MESSAGE_INSERT_SQL, row).rowcount:
+                    message_ids.append(row[0])
+                    conn.executemany(
+                        _ATTACHMENT_INSERT_SQL,
+                        self._attachment_rows(row[0], message),
+                    )
+
+            if not message_ids:
+                # Every user had it already; drop the content if unused
                 conn.execute(
                     """
-                    INSERT INTO attachments (
-                        id, message_id, filename, content_type, size,
-                        content_id, is_inline, storage_path
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    DELETE FROM message_contents WHERE hash = ?
+                    AND NOT EXISTS (
+                        SELECT 1 FROM messages WHERE content_hash = ?
+                    )
                     """,
-                    (
-                        str(uuid4()),
-                        message_id,
-                        att.get("filename", "attachment"),
-                        att.get("content_type", "application/octet-stream"),
-                        att.get("size", 0),
-                        att.get("content_id"),
-                        1 if att.get("is_inline") else 0,
-                        att.get("path"),
-                    ),
+                    (content_hash, content_hash),
                 )
 
-        # Update folder counts
-        self._update_folder_counts()
+        return message_ids
 
-        return self.get_message(message_id)
+    @staticmethod
+    def _content_row(message: dict, now: str) -> tuple:
+        """
+        Build the INSERT parameters for a message's shared content.
+
+        Returns:
+            Parameter tuple for _CONTENT_INSERT_SQL; the first element is
+            the content hash.
+        """
+        body_text = message.get("body_text")
+        body_html = message.get("body_html")
+        headers = json.dumps(message.get("headers", {}), sort_keys=True)
+        digest = hashlib.sha256(
+            json.dumps([body_text, body_html, headers]).encode("utf-8")
+        ).hexdigest()
+        return (digest, body_text, body_html, headers, now)
+
+    @staticmethod
+    def _max_message_rowid(conn) -> int:
+        """Return the highest messages rowid (0 for an empty table)."""
+        return conn.execute(
+            "SELECT COALESCE(MAX(rowid), 0) FROM messages"
+        ).fetchone()[0]
+
+    def _message_row(
+        self,
+        message: dict,
+        folder_id: Optional[str],
+        now: str,
+        user_id: Optional[str] = None,
+        content_hash: Optional[str] = None,
+    ) -> tuple:
+        """
+        Build the INSERT parameters for a new message.
+
+        Args:
+            message: Message data dictionary.
+            folder_id: Resolved destination folder.
+            now: Timestamp used for created_at/updated_at and as the
+                default received_at.
+            user_id: Owner of the message (defaults to the default user).
+            content_hash: Shared content the message references. Its
+                bodies and headers are then left NULL and the hash is
+                appended, for _SHARED_MESSAGE_INSERT_SQL.
+
+        Returns:
+            Parameter tuple for _MESSAGE_INSERT_SQL; the first element is
+            the new message's ID.
+        """
+        message_id = str(uuid4())
+        shared = content_hash is not None
+
+        # Prepare JSON fields
+        to_addresses = message.get("to_addresses", [])
+        if isinstance(to_addresses, str):
+            to_addresses = [to_addresses]
+
+        row = (
+            message_id,
+            user_id or self._default_user_id,
+            folder_id,
+            message.get("message_id", f"<{message_id}@unitmail.local>"),
+            message.get("from_address", ""),
+            json.dumps(to_addresses),
+            json.dumps(message.get("cc_addresses", [])),
+            json.dumps(message.get("bcc_addresses", [])),
+            message.get("subject", ""),
+            None if shared else message.get("body_text"),
+            None if shared else message.get("body_html"),
+            None if shared else json.dumps(message.get("headers", {})),
+            message.get("status", MessageStatus.RECEIVED.value),
+            message.get("priority", MessagePriority.NORMAL.value),
+            1 if message.get("is_read") else 0,
+            1 if message.get("is_starred") else 0,
+            1 if message.get("is_important") else 0,
+            1 if message.get("is_encrypted") else 0,
+            1 if message.get("attachments") else 0,
+            message.get("thread_id"),
+            message.get("in_reply_to"),
+            json.dumps(message.get("references", [])),
+            message.get("received_at", now),
+            message.get("sent_at"),
+            now,
+            now,
+            make_preview(message.get("body_text")),
+        )
+        return row + (content_hash,) if shared else row
+
+    @staticmethod
+    def _attachment_rows(message_id: str, message: dict) -> list[tuple]:
+        """Build the INSERT parameters for a new message's attachments."""
+        return [
+            (
+                str(uuid4()),
+                message_id,
+                att.get("filename", "attachment"),
+                att.get("content_type", "application/octet-stream"),
+                att.get("size", 0),
+                att.get("content_id"),
+                1 if att.get("is_inline") else 0,
+                att.get("path"),
+                att.get("checksum"),
+            )
+            for att in message.get("attachments", [])
+        ]
 
     def get_message(self, message_id: str) -> Optional[dict]:
         """Get a message by ID."""
         row = self._db.fetchone(
-            "SELECT * FROM messages WHERE id = ?",
+            "SELECT rowid, * FROM messages WHERE id = ?",
             (message_id,),
         )
         if row:
             return self._row_to_message(row)
         return None
 
+    def get_attachment(
+        self, message_id: str, attachment_id: str
+    ) -> Optional[dict]:
+        """
+        Get one attachment of a message.
+
+        Args:
+            message_id: ID of the message.
+            attachment_id: ID of the attachment.
+
+        Returns:
+            Attachment dictionary or None if not found.
+        """
+        row = self._db.fetchone(
+            "SELECT * FROM attachments WHERE id = ? AND message_id = ?",
+            (attachment_id, message_id),
+        )
+        return self._row_to_attachment(row) if row else None
+
+    def prune_attachment_blobs(self, grace: float = 3600.0) -> int:
+        """
+        Delete attachment content that no attachment references anymore.
+
+        Deleting a message leaves its blobs in place, since another
+        delivery may be about to reuse them; this scan reclaims them, along
+        with blobs written for deliveries that were never stored.
+
+        Args:
+            grace: Keep blobs written within this many seconds, which may
+                belong to a message that is still being stored.
+
+        Returns:
+            Number of blobs deleted.
+        """
+        rows = self._db.fetchall(
+            "SELECT DISTINCT checksum FROM attachments WHERE checksum IS NOT NULL"
+        )
+        return self.blobs.prune({row[0] for row in rows}, grace)
+
     def get_messages_by_folder(
         self,
         folder_name: str,
         limit: int = 100,
         offset: int = 0,
+        include_attachments: bool = True,
+        cursor: Optional[str] = None,
     ) -> list[dict]:
         """
         Get messages in a folder.
@@ -438,39 +881,78 @@ class EmailStorage:
         Args:
             folder_name: Folder name (e.g., "Inbox").
             limit: Maximum messages to return.
-            offset: Pagination offset.
+            offset: Pagination offset (ignored when cursor is given).
+            include_attachments: Load attachment rows. When False the
+                ``attachments`` list is left empty and callers should
+                rely on ``has_attachments``.
+            cursor: Keyset cursor from get_next_cursor().
 
         Returns:
             List of messages sorted by received_at descending.
+
+        Raises:
+            ValueError: If the cursor is malformed.
         """
         folder = self.get_folder_by_name(folder_name)
         if not folder:
             return []
 
-        rows = self._db.fetchall(
-            """
-            SELECT * FROM messages
-            WHERE folder_id = ?
-            ORDER BY received_at DESC
-            LIMIT ? OFFSET ?
-            """,
-            (folder["id"], limit, offset),
+        return self.get_messages(
+            folder_id=folder["id"],
+            limit=limit,
+            offset=offset,
+            include_attachments=include_attachments,
+            cursor=cursor,
         )
-        return [self._row_to_message(row) for row in rows]
 
     def get_all_messages(
-        self, limit: int = 100, offset: int = 0
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        include_attachments: bool = True,
+        cursor: Optional[str] = None,
     ) -> list[dict]:
         """Get all messages sorted by date."""
-        rows = self._db.fetchall(
-            """
-            SELECT * FROM messages
-            ORDER BY received_at DESC
-            LIMIT ? OFFSET ?
-            """,
-            (limit, offset),
+        return self.get_messages(
+            limit=limit,
+            offset=offset,
+            include_attachments=include_attachments,
+            cursor=cursor,
         )
-        return [self._row_to_message(row) for row in rows]
+
+    def iter_messages(
+        self,
+        folder_id: Optional[str] = None,
+        batch_size: int = 500,
+        include_attachments: bool = True,
+    ) -> Iterator[dict]:
+        """
+        Iterate over messages a batch at a time.
+
+        Batches are fetched with keyset pagination, so only one batch is
+        held in memory and each costs the same however deep into the
+        mailbox it is. No read transaction is held between batches.
+
+        Args:
+            folder_id: Only messages in this folder.
+            batch_size: Messages fetched per query.
+            include_attachments: Load attachment rows.
+
+        Yields:
+            Message dictionaries, newest first.
+        """
+        cursor = None
+        while True:
+            batch = self.get_messages(
+                folder_id=folder_id,
+                limit=batch_size,
+                include_attachments=include_attachments,
+                cursor=cursor,
+            )
+            yield from batch
+            cursor = self.get_next_cursor(batch, batch_size)
+            if cursor is None:
+                return
 
     def get_messages(
         self,
@@ -481,6 +963,8 @@ class EmailStorage:
         is_starred: Optional[bool] = None,
         limit: int = 50,
         offset: int = 0,
+        include_attachments: bool = True,
+        cursor: Optional[str] = None,
     ) -> list[dict]:
         """
         Get messages with optional filters.
@@ -492,13 +976,134 @@ class EmailStorage:
             is_read: Filter by read status.
             is_starred: Filter by starred status.
             limit: Maximum messages to return.
-            offset: Pagination offset.
+            offset: Pagination offset (ignored when cursor is given).
+            include_attachments: Load attachment rows for each message.
+            cursor: Keyset cursor from get_next_cursor().
 
         Returns:
             List of messages sorted by received_at descending.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        where_clause, params = self._build_message_filters(
+            user_id, folder_id, status, is_read, is_starred, cursor
+        )
+        params.extend([limit, 0 if cursor else offset])
+
+        rows = self._db.fetchall(
+            f"""
+            SELECT rowid, * FROM messages
+            {where_clause}
+            {_LIST_ORDER}
+            LIMIT ? OFFSET ?
+            """,
+            tuple(params),
+        )
+        return self._rows_to_messages(rows, include_attachments)
+
+    def get_message_summaries(
+        self,
+        folder_name: Optional[str] = None,
+        folder_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        status: Optional[str] = None,
+        is_read: Optional[bool] = None,
+        is_starred: Optional[bool] = None,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> list[MessageSummary]:
+        """
+        Get lightweight message summaries for list views.
+
+        Only the columns needed to render a message list are read; bodies
+        and the headers JSON are never loaded.
+
+        Args:
+            folder_name: Filter by folder name (e.g., "Inbox").
+            folder_id: Filter by folder ID.
+            user_id: Filter by user ID.
+            status: Filter by message status.
+            is_read: Filter by read status.
+            is_starred: Filter by starred status.
+            limit: Maximum messages to return.
+            offset: Pagination offset (ignored when cursor is given).
+            cursor: Keyset cursor from get_next_cursor().
+
+        Returns:
+            List of summaries sorted by received_at descending.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        if folder_name and not folder_id:
+            folder = self.get_folder_by_name(folder_name)
+            if not folder:
+                return []
+            folder_id = folder["id"]
+
+        where_clause, params = self._build_message_filters(
+            user_id, folder_id, status, is_read, is_starred, cursor
+        )
+        params.extend([limit, 0 if cursor else offset])
+
+        return self._fetch_summaries(
+            f"""
+            SELECT {_SUMMARY_COLUMNS}, NULL AS rank FROM messages m
+            {where_clause}
+            {_LIST_ORDER}
+            LIMIT ? OFFSET ?
+            """,
+            tuple(params),
+        )
+
+    def get_next_cursor(self, messages: list, limit: int) -> Optional[str]:
+        """
+        Get the keyset cursor for the page following ``messages``.
+
+        Fetching the next page with this cursor costs the same no matter
+        how deep into the listing it is, unlike OFFSET pagination.
+
+        The cursor is built from the last row of the page itself, so it
+        stays valid if that message is deleted before the next fetch.
+
+        Args:
+            messages: Page returned by a listing method (message dicts
+                or MessageSummary rows).
+            limit: Page size the listing was requested with.
+
+        Returns:
+            Opaque cursor string, or None if this was the last page.
+        """
+        if not messages or len(messages) < limit:
+            return None
+
+        last = messages[-1]
+        if isinstance(last, MessageSummary):
+            return _encode_cursor(last.received_at, last.rowid)
+        return _encode_cursor(last["received_at"], last["rowid"])
+
+    def _build_message_filters(
+        self,
+        user_id: Optional[str],
+        folder_id: Optional[str],
+        status: Optional[str],
+        is_read: Optional[bool],
+        is_starred: Optional[bool],
+        cursor: Optional[str] = None,
+    ) -> tuple[str, list[Any]]:
+        """
+        Build the WHERE clause shared by the message listing methods.
+
+        Returns:
+            Tuple of (where clause, parameters).
+
+        Raises:
+            ValueError: If the cursor is malformed.
         """
         conditions = []
-        params = []
+        params: list[Any] = []
 
         if user_id:
             conditions.append("user_id = ?")
@@ -520,22 +1125,61 @@ class EmailStorage:
             conditions.append("is_starred = ?")
             params.append(1 if is_starred else 0)
 
+        if cursor:
+            received_at, rowid = _decode_cursor(cursor)
+            conditions.append(_KEYSET_CLAUSE)
+            params.extend([received_at, received_at, rowid])
+
         where_clause = ""
         if conditions:
             where_clause = "WHERE " + " AND ".join(conditions)
 
-        params.extend([limit, offset])
+        return where_clause, params
 
-        rows = self._db.fetchall(
+    def search_message_summaries(
+        self,
+        query: str,
+        folder_name: Optional[str] = None,
+        limit: int = 50,
+    ) -> list[MessageSummary]:
+        """
+        Full-text search returning lightweight message summaries.
+
+        Args:
+            query: Search query (supports FTS5 syntax).
+            folder_name: Optional folder to limit search.
+            limit: Maximum results.
+
+        Returns:
+            List of matching summaries ranked by relevance.
+        """
+        if not query.strip():
+            return []
+
+        safe_query = query.replace('"', '""')
+        params: list[Any] = [safe_query]
+        folder_clause = ""
+
+        if folder_name:
+            folder = self.get_folder_by_name(folder_name)
+            if not folder:
+                return []
+            folder_clause = "AND m.folder_id = ?"
+            params.append(folder["id"])
+
+        params.append(limit)
+
+        return self._fetch_summaries(
             f"""
-            SELECT * FROM messages
-            {where_clause}
-            ORDER BY received_at DESC
-            LIMIT ? OFFSET ?
+            SELECT {_SUMMARY_COLUMNS}, fts.rank AS rank FROM messages m
+            JOIN messages_fts fts ON m.rowid = fts.rowid
+            WHERE messages_fts MATCH ?
+            {folder_clause}
+            ORDER BY rank
+            LIMIT ?
             """,
             tuple(params),
         )
-        return [self._row_to_message(row) for row in rows]
 
     def count_messages(
         self,
@@ -558,32 +1202,9 @@ class EmailStorage:
         Returns:
             Count of matching messages.
         """
-        conditions = []
-        params = []
-
-        if user_id:
-            conditions.append("user_id = ?")
-            params.append(user_id)
-
-        if folder_id:
-            conditions.append("folder_id = ?")
-            params.append(folder_id)
-
-        if status:
-            conditions.append("status = ?")
-            params.append(status)
-
-        if is_read is not None:
-            conditions.append("is_read = ?")
-            params.append(1 if is_read else 0)
-
-        if is_starred is not None:
-            conditions.append("is_starred = ?")
-            params.append(1 if is_starred else 0)
-
-        where_clause = ""
-        if conditions:
-            where_clause = "WHERE " + " AND ".join(conditions)
+        where_clause, params = self._build_message_filters(
+            user_id, folder_id, status, is_read, is_starred
+        )
 
         row = self._db.fetchone(
             f"SELECT COUNT(*) as count FROM messages {where_clause}",
@@ -641,6 +1262,20 @@ class EmailStorage:
         if not set_clauses:
             return self.get_message(message_id)
 
+        if "body_text" in updates:
+            set_clauses.append("preview = ?")
+            params.append(make_preview(updates["body_text"]))
+
+        if "body_text" in updates or "body_html" in updates:
+            # Editing a shared message gives it its own copy of the content
+            for column in ("body_text", "body_html", "headers"):
+                if column not in updates:
+                    set_clauses.append(
+                        f"{column} = COALESCE({column}, (SELECT {column} "
+                        "FROM message_contents WHERE hash = content_hash))"
+                    )
+            set_clauses.append("content_hash = NULL")
+
         set_clauses.append("updated_at = ?")
         params.append(datetime.now(timezone.utc).isoformat())
         params.append(message_id)
@@ -650,7 +1285,6 @@ class EmailStorage:
             tuple(params),
         )
 
-        self._update_folder_counts()
         return self.get_message(message_id)
 
     def delete_message(self, message_id: str) -> bool:
@@ -667,10 +1301,7 @@ class EmailStorage:
             "DELETE FROM messages WHERE id = ?",
             (message_id,),
         )
-        if cursor.rowcount > 0:
-            self._update_folder_counts()
-            return True
-        return False
+        return cursor.rowcount > 0
 
     def move_to_trash(self, message_id: str) -> Optional[dict]:
         """Move a message to Trash, preserving original folder."""
@@ -728,9 +1359,7 @@ class EmailStorage:
             "DELETE FROM messages WHERE folder_id = ?",
             (trash["id"],),
         )
-        count = cursor.rowcount
-        self._update_folder_counts()
-        return count
+        return cursor.rowcount
 
     def move_to_folder(
         self, message_id: str, folder_name: str
@@ -741,38 +1370,205 @@ class EmailStorage:
             return None
         return self.update_message(message_id, {"folder_id": folder["id"]})
 
-    def toggle_starred(self, message_id: str) -> Optional[dict]:
-        """Toggle starred status."""
-        msg = self.get_message(message_id)
-        if msg:
-            return self.update_message(
-                message_id, {"is_starred": not msg.get("is_starred", False)}
-            )
-        return None
+    def toggle_starred(self, message_id: str) -> Optional[dict]:
+        """Toggle starred status."""
+        msg = self.get_message(message_id)
+        if msg:
+            return self.update_message(
+                message_id, {"is_starred": not msg.get("is_starred", False)}
+            )
+        return None
+
+    def toggle_important(self, message_id: str) -> Optional[dict]:
+        """Toggle important status."""
+        msg = self.get_message(message_id)
+        if msg:
+            return self.update_message(
+                message_id,
+                {"is_important": not msg.get("is_important", False)},
+            )
+        return None
+
+    def set_important(
+        self, message_id: str, important: bool
+    ) -> Optional[dict]:
+        """Set important status."""
+        return self.update_message(message_id, {"is_important": important})
+
+    def mark_as_read(self, message_id: str) -> Optional[dict]:
+        """Mark message as read."""
+        return self.update_message(message_id, {"is_read": True})
+
+    def mark_as_unread(self, message_id: str) -> Optional[dict]:
+        """Mark message as unread."""
+        return self.update_message(message_id, {"is_read": False})
+
+    # =========================================================================
+    # Batch Message Operations
+    # =========================================================================
+
+    def mark_read_many(
+        self,
+        message_ids: Iterable[str],
+        is_read: bool = True,
+        user_id: Optional[str] = None,
+    ) -> int:
+        """
+        Mark many messages as read or unread.
+
+        Args:
+            message_ids: IDs of messages to update.
+            is_read: Read status to set.
+            user_id: If given, only messages owned by this user are changed.
+
+        Returns:
+            Number of messages whose read status changed.
+        """
+        return self.set_flag_many(message_ids, "is_read", is_read, user_id)
+
+    def set_flag_many(
+        self,
+        message_ids: Iterable[str],
+        flag: str,
+        value: bool,
+        user_id: Optional[str] = None,
+    ) -> int:
+        """
+        Set a boolean flag on many messages.
+
+        Args:
+            message_ids: IDs of messages to update.
+            flag: Flag column, one of is_read, is_starred or is_important.
+            value: Value to set.
+            user_id: If given, only messages owned by this user are changed.
+
+        Returns:
+            Number of messages whose flag changed.
+
+        Raises:
+            ValueError: If flag is not a supported flag column.
+        """
+        if flag not in self._BATCH_FLAGS:
+            raise ValueError(f"Unsupported message flag: {flag}")
+
+        value = 1 if value else 0
+        return self._update_many(
+            message_ids,
+            f"{flag} = ?",
+            (value,),
+            f"{flag} != ?",
+            (value,),
+            user_id,
+        )
+
+    def move_many(
+        self,
+        message_ids: Iterable[str],
+        folder_id: str,
+        user_id: Optional[str] = None,
+    ) -> int:
+        """
+        Move many messages to a folder.
+
+        Args:
+            message_ids: IDs of messages to move.
+            folder_id: Destination folder ID.
+            user_id: If given, only messages owned by this user are moved.
+
+        Returns:
+            Number of messages moved.
+        """
+        return self._update_many(
+            message_ids,
+            "folder_id = ?",
+            (folder_id,),
+            "folder_id IS NOT ?",
+            (folder_id,),
+            user_id,
+        )
+
+    def trash_many(
+        self,
+        message_ids: Iterable[str],
+        user_id: Optional[str] = None,
+    ) -> int:
+        """
+        Move many messages to Trash, preserving their original folders.
+
+        Args:
+            message_ids: IDs of messages to trash.
+            user_id: If given, only messages owned by this user are trashed.
+
+        Returns:
+            Number of messages moved to Trash.
+        """
+        trash = self.get_folder_by_name("Trash")
+        if not trash:
+            return 0
+
+        return self._update_many(
+            message_ids,
+            "original_folder_id = folder_id, folder_id = ?, deleted_at = ?",
+            (trash["id"], datetime.now(timezone.utc).isoformat()),
+            "folder_id IS NOT ?",
+            (trash["id"],),
+            user_id,
+        )
+
+    def _update_many(
+        self,
+        message_ids: Iterable[str],
+        set_clause: str,
+        set_params: tuple,
+        condition: str,
+        condition_params: tuple,
+        user_id: Optional[str] = None,
+    ) -> int:
+        """
+        Apply one UPDATE to many messages in a single transaction.
+
+        IDs are bound in chunks of _MAX_SQL_PARAMS, one UPDATE per chunk.
+        Rows already matching the target state are excluded by
+        ``condition`` so they aren't rewritten.
 
-    def toggle_important(self, message_id: str) -> Optional[dict]:
-        """Toggle important status."""
-        msg = self.get_message(message_id)
-        if msg:
-            return self.update_message(
-                message_id,
-                {"is_important": not msg.get("is_important", False)},
-            )
-        return None
+        Args:
+            message_ids: IDs of messages to update.
+            set_clause: SET expressions (updated_at is added).
+            set_params: Parameters for set_clause.
+            condition: Extra WHERE predicate selecting rows to change.
+            condition_params: Parameters for condition.
+            user_id: If given, restrict the update to this user's messages.
 
-    def set_important(
-        self, message_id: str, important: bool
-    ) -> Optional[dict]:
-        """Set important status."""
-        return self.update_message(message_id, {"is_important": important})
+        Returns:
+            Total number of rows updated.
+        """
+        ids = list(dict.fromkeys(message_ids))
+        if not ids:
+            return 0
 
-    def mark_as_read(self, message_id: str) -> Optional[dict]:
-        """Mark message as read."""
-        return self.update_message(message_id, {"is_read": True})
+        condition = f"({condition})"
+        condition_params = tuple(condition_params)
+        if user_id is not None:
+            condition += " AND user_id = ?"
+            condition_params += (user_id,)
 
-    def mark_as_unread(self, message_id: str) -> Optional[dict]:
-        """Mark message as unread."""
-        return self.update_message(message_id, {"is_read": False})
+        params = (*set_params, datetime.now(timezone.utc).isoformat())
+        updated = 0
+
+        with self._db.transaction() as conn:
+            for start in range(0, len(ids), self._MAX_SQL_PARAMS):
+                chunk = ids[start : start + self._MAX_SQL_PARAMS]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor = conn.execute(
+                    f"""
+                    UPDATE messages SET {set_clause}, updated_at = ?
+                    WHERE id IN ({placeholders}) AND {condition}
+                    """,
+                    (*params, *chunk, *condition_params),
+                )
+                updated += cursor.rowcount
+
+        return updated
 
     # =========================================================================
     # Search Operations (FTS5)
@@ -783,6 +1579,7 @@ class EmailStorage:
         query: str,
         folder_name: Optional[str] = None,
         limit: int = 50,
+        include_attachments: bool = True,
     ) -> list[dict]:
         """
         Full-text search across messages.
@@ -791,6 +1588,7 @@ class EmailStorage:
             query: Search query (supports FTS5 syntax).
             folder_name: Optional folder to limit search.
             limit: Maximum results.
+            include_attachments: Load attachment rows for each message.
 
         Returns:
             List of matching messages ranked by relevance.
@@ -808,7 +1606,7 @@ class EmailStorage:
 
             rows = self._db.fetchall(
                 """
-                SELECT m.* FROM messages m
+                SELECT m.rowid, m.* FROM messages m
                 JOIN messages_fts fts ON m.rowid = fts.rowid
                 WHERE messages_fts MATCH ?
                 AND m.folder_id = ?
@@ -820,7 +1618,7 @@ class EmailStorage:
         else:
             rows = self._db.fetchall(
                 """
-                SELECT m.* FROM messages m
+                SELECT m.rowid, m.* FROM messages m
                 JOIN messages_fts fts ON m.rowid = fts.rowid
                 WHERE messages_fts MATCH ?
                 ORDER BY rank
@@ -829,7 +1627,7 @@ class EmailStorage:
                 (safe_query, limit),
             )
 
-        return [self._row_to_message(row) for row in rows]
+        return self._rows_to_messages(rows, include_attachments)
 
     # =========================================================================
     # Folder Operations
@@ -1003,23 +1801,27 @@ class EmailStorage:
 
         return self.get_folder_by_id(folder_id)
 
-    def _update_folder_counts(self) -> None:
-        """Update message and unread counts for all folders."""
+    def recount_folders(self) -> int:
+        """
+        Recount message and unread counts for all folders.
+
+        Folder counters are maintained incrementally by database
+        triggers, so this is only needed to repair drift (e.g. after
+        rows were edited outside the application).
+
+        Returns:
+            Number of folders whose counters were corrected.
+        """
         with self._db.transaction() as conn:
-            conn.execute(
-                """
-                UPDATE folders SET
-                    message_count = (
-                        SELECT COUNT(*) FROM messages WHERE folder_id = folders.id
-                    ),
-                    unread_count = (
-                        SELECT COUNT(*) FROM messages
-                        WHERE folder_id = folders.id AND is_read = 0
-                    ),
-                    updated_at = ?
-                """,
+            cursor = conn.execute(
+                RECOUNT_FOLDERS_SQL,
                 (datetime.now(timezone.utc).isoformat(),),
             )
+            repaired = cursor.rowcount
+
+        if repaired:
+            logger.info(f"Repaired counters for {repaired} folder(s)")
+        return repaired
 
     # =========================================================================
     # Contact Operations
@@ -1230,7 +2032,7 @@ class EmailStorage:
             "notes": row["notes"],
             "is_favorite": bool(row["is_favorite"]),
             "contact_frequency": row["contact_frequency"],
-            "last_contacted": row.get("last_contacted"),
+            "last_contacted": row["last_contacted"],
             "created_at": row["created_at"],
             "updated_at": row["updated_at"],
         }
@@ -1239,17 +2041,19 @@ class EmailStorage:
     # Thread Operations
     # =========================================================================
 
-    def get_thread_messages(self, thread_id: str) -> list[dict]:
+    def get_thread_messages(
+        self, thread_id: str, include_attachments: bool = True
+    ) -> list[dict]:
         """Get all messages in a thread."""
         rows = self._db.fetchall(
             """
-            SELECT * FROM messages
+            SELECT rowid, * FROM messages
             WHERE thread_id = ?
             ORDER BY received_at
             """,
             (thread_id,),
         )
-        return [self._row_to_message(row) for row in rows]
+        return self._rows_to_messages(rows, include_attachments)
 
     # =========================================================================
     # Statistics
@@ -1274,6 +2078,49 @@ class EmailStorage:
         )
         return result[0] if result else 0
 
+    def snapshot(
+        self,
+        target_path: str,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """
+        Write a consistent copy of the database while it stays in use.
+
+        Args:
+            target_path: File to write the copy to.
+            progress: Called with pages copied so far and total pages.
+
+        Returns:
+            Number of pages copied.
+        """
+        return self._db.snapshot(target_path, progress=progress)
+
+    def export_changes(self, target_path: str, since: str) -> ChangeSet:
+        """
+        Write what changed after ``since`` to a change set file.
+
+        Args:
+            target_path: File to write the change set to.
+            since: ISO 8601 timestamp of the previous backup.
+
+        Returns:
+            Summary of the change set, including the attachment blobs
+            its messages reference.
+        """
+        return export_changes(self._db, target_path, since)
+
+    def apply_changes(self, source_path: str) -> dict[str, int]:
+        """
+        Apply a change set written by export_changes().
+
+        Args:
+            source_path: Change set file.
+
+        Returns:
+            Number of rows applied per table.
+        """
+        return apply_changes(self._db, source_path)
+
     def get_database_stats(self) -> dict[str, Any]:
         """Get comprehensive database statistics."""
         db_path = Path(self._db.db_path)
@@ -1410,7 +2257,6 @@ class EmailStorage:
     def clear_all_messages(self) -> None:
         """Clear all messages (for testing)."""
         self._db.execute("DELETE FROM messages")
-        self._update_folder_counts()
 
     # =========================================================================
     # Queue Operations
@@ -1464,6 +2310,7 @@ class EmailStorage:
                 now,
             ),
         )
+        self._notify_queue()
 
         return self.get_queue_item(item_id)
 
@@ -1488,6 +2335,109 @@ class EmailStorage:
         )
         return [self._row_to_queue_item(row) for row in rows]
 
+    def claim_queue_batch(
+        self, worker_id: str, n: int, lease_seconds: float = 300.0
+    ) -> list[dict]:
+        """
+        Atomically claim up to ``n`` ready queue items for a worker.
+
+        Ready items are pending items, retrying items whose next_attempt_at
+        has passed, and processing items whose lease has expired (their
+        worker is presumed dead). They are taken highest priority first,
+        then in order of when they fell due, so a backlog of deferred
+        retries can neither starve ready work nor slow the claim down.
+
+        Selection and the flip to processing with a fresh lease happen
+        under one write lock, so concurrent workers, in this or other
+        processes, never receive the same item.
+
+        Args:
+            worker_id: Identifier of the claiming worker.
+            n: Maximum number of items to claim.
+            lease_seconds: How long the claim is valid before the item
+                becomes claimable again.
+
+        Returns:
+            Claimed queue items in claim order.
+        """
+        if n < 1:
+            return []
+
+        now = datetime.now(timezone.utc)
+        now_iso = now.isoformat()
+        lease_expires_at = (now + timedelta(seconds=lease_seconds)).isoformat()
+
+        with self._db.transaction() as conn:
+            ids = [
+                row["id"]
+                for row in conn.execute(
+                    _QUEUE_READY_SQL, {"now": now_iso, "limit": n}
+                )
+            ]
+            if not ids:
+                return []
+
+            placeholders = ",".join("?" * len(ids))
+            rows = conn.execute(
+                f"""
+                UPDATE queue SET
+                    status = 'processing',
+                    claimed_by = ?,
+                    lease_expires_at = ?,
+                    last_attempt = ?,
+                    updated_at = ?
+                WHERE id IN ({placeholders})
+                RETURNING *
+                """,
+                (worker_id, lease_expires_at, now_iso, now_iso, *ids),
+            ).fetchall()
+
+        # RETURNING order is unspecified
+        position = {item_id: i for i, item_id in enumerate(ids)}
+        items = [self._row_to_queue_item(row) for row in rows]
+        items.sort(key=lambda item: position[item["id"]])
+        return items
+
+    def release_queue_claims(
+        self, worker_id: str, deferrals: list[tuple[str, str]]
+    ) -> int:
+        """
+        Hand claimed items back to the queue without attempting them.
+
+        Each item returns to retrying with the given next_attempt_at and
+        its lease cleared. The attempt count is left alone, since no
+        delivery was tried. Items no longer held by ``worker_id`` (their
+        lease expired and another worker took them) are skipped.
+
+        Args:
+            worker_id: Identifier of the worker that claimed the items.
+            deferrals: (item_id, next_attempt_at ISO timestamp) pairs.
+
+        Returns:
+            Number of items released.
+        """
+        if not deferrals:
+            return 0
+
+        now = datetime.now(timezone.utc).isoformat()
+        with self._db.transaction() as conn:
+            cursor = conn.executemany(
+                """
+                UPDATE queue SET
+                    status = 'retrying',
+                    next_attempt_at = ?,
+                    claimed_by = NULL,
+                    lease_expires_at = NULL,
+                    updated_at = ?
+                WHERE id = ? AND status = 'processing' AND claimed_by = ?
+                """,
+                [
+                    (next_attempt_at, now, item_id, worker_id)
+                    for item_id, next_attempt_at in deferrals
+                ],
+            )
+            return cursor.rowcount
+
     def mark_queue_item_processing(self, item_id: str) -> Optional[dict]:
         """Mark a queue item as processing."""
         now = datetime.now(timezone.utc).isoformat()
@@ -1503,22 +2453,37 @@ class EmailStorage:
         )
         return self.get_queue_item(item_id)
 
-    def mark_queue_item_completed(self, item_id: str) -> Optional[dict]:
-        """Mark a queue item as completed."""
+    def mark_queue_item_completed(
+        self, item_id: str, worker_id: Optional[str] = None
+    ) -> Optional[dict]:
+        """
+        Mark a queue item as completed.
+
+        Args:
+            item_id: Queue item ID.
+            worker_id: Only update the item while this worker holds its
+                claim (see claim_queue_batch()).
+
+        Returns:
+            Updated queue item, or None if it was not updated.
+        """
         now = datetime.now(timezone.utc).isoformat()
-        self._db.execute(
-            """
+        fence, fence_params = _claim_fence(worker_id)
+        cursor = self._db.execute(
+            f"""
             UPDATE queue SET
                 status = 'completed',
                 updated_at = ?
-            WHERE id = ?
+            WHERE id = ?{fence}
             """,
-            (now, item_id),
+            (now, item_id, *fence_params),
         )
+        if cursor.rowcount == 0:
+            return None
         return self.get_queue_item(item_id)
 
     def mark_queue_item_failed(
-        self, item_id: str, error_message: str
+        self, item_id: str, error_message: str, worker_id: Optional[str] = None
     ) -> Optional[dict]:
         """
         Mark a queue item as failed and increment attempt count.
@@ -1526,9 +2491,11 @@ class EmailStorage:
         Args:
             item_id: Queue item ID.
             error_message: Error message.
+            worker_id: Only update the item while this worker holds its
+                claim (see claim_queue_batch()).
 
         Returns:
-            Updated queue item or None.
+            Updated queue item, or None if it was not updated.
         """
         now = datetime.now(timezone.utc).isoformat()
 
@@ -1542,42 +2509,60 @@ class EmailStorage:
             "failed" if new_attempts >= item["max_attempts"] else "pending"
         )
 
-        self._db.execute(
-            """
+        fence, fence_params = _claim_fence(worker_id)
+        cursor = self._db.execute(
+            f"""
             UPDATE queue SET
                 status = ?,
                 attempts = ?,
                 error_message = ?,
                 last_attempt = ?,
                 updated_at = ?
-            WHERE id = ?
+            WHERE id = ?{fence}
             """,
-            (new_status, new_attempts, error_message, now, now, item_id),
+            (
+                new_status,
+                new_attempts,
+                error_message,
+                now,
+                now,
+                item_id,
+                *fence_params,
+            ),
         )
+        if cursor.rowcount == 0:
+            return None
         return self.get_queue_item(item_id)
 
-    def move_to_dead_letter(self, item_id: str, reason: str) -> Optional[dict]:
+    def move_to_dead_letter(
+        self, item_id: str, reason: str, worker_id: Optional[str] = None
+    ) -> Optional[dict]:
         """
         Move a queue item to dead letter status.
 
         Args:
             item_id: Queue item ID.
             reason: Reason for moving to dead letter.
+            worker_id: Only update the item while this worker holds its
+                claim (see claim_queue_batch()).
 
         Returns:
-            Updated queue item or None.
+            Updated queue item, or None if it was not updated.
         """
         now = datetime.now(timezone.utc).isoformat()
-        self._db.execute(
-            """
+        fence, fence_params = _claim_fence(worker_id)
+        cursor = self._db.execute(
+            f"""
             UPDATE queue SET
                 status = 'dead_letter',
                 error_message = ?,
                 updated_at = ?
-            WHERE id = ?
+            WHERE id = ?{fence}
             """,
-            (reason, now, item_id),
+            (reason, now, item_id, *fence_params),
         )
+        if cursor.rowcount == 0:
+            return None
         return self.get_queue_item(item_id)
 
     def delete_queue_item(self, item_id: str) -> bool:
@@ -1656,18 +2641,23 @@ class EmailStorage:
             """,
             (now, item_id),
         )
+        self._notify_queue()
         return self.get_queue_item(item_id)
 
-    def update_queue_item(self, item_id: str, updates: dict) -> Optional[dict]:
+    def update_queue_item(
+        self, item_id: str, updates: dict, worker_id: Optional[str] = None
+    ) -> Optional[dict]:
         """
         Update a queue item.
 
         Args:
             item_id: Queue item ID.
             updates: Fields to update.
+            worker_id: Only update the item while this worker holds its
+                claim (see claim_queue_batch()).
 
         Returns:
-            Updated queue item or None.
+            Updated queue item, or None if it was not updated.
         """
         if not updates:
             return self.get_queue_item(item_id)
@@ -1695,16 +2685,94 @@ class EmailStorage:
         set_clauses.append("updated_at = ?")
         params.append(datetime.now(timezone.utc).isoformat())
         params.append(item_id)
+        fence, fence_params = _claim_fence(worker_id)
+        params.extend(fence_params)
 
-        self._db.execute(
-            f"UPDATE queue SET {', '.join(set_clauses)} WHERE id = ?",
+        cursor = self._db.execute(
+            f"UPDATE queue SET {', '.join(set_clauses)} WHERE id = ?{fence}",
             tuple(params),
         )
+        if cursor.rowcount == 0:
+            return None
 
-        return self.get_queue_item(item_id)
+        item = self.get_queue_item(item_id)
+        # Only wake workers when the item may now be claimable
+        if (
+            item is not None
+            and item["status"] in ("pending", "retrying")
+            and ("status" in updates or "next_attempt_at" in updates)
+        ):
+            self._notify_queue()
+        return item
+
+    def add_queue_listener(self, callback: Callable[[], None]) -> None:
+        """
+        Register a callback invoked whenever queue work may be ready.
+
+        Callbacks run synchronously on the thread that changed the queue
+        (enqueue, retry, reschedule), so they must be cheap and
+        thread-safe. Workers in other processes are woken through
+        queue doorbells instead (see notify.py).
+
+        Args:
+            callback: Zero-argument callable.
+        """
+        self._queue_listeners.append(callback)
+
+    def remove_queue_listener(self, callback: Callable[[], None]) -> None:
+        """Unregister a callback added with add_queue_listener()."""
+        try:
+            self._queue_listeners.remove(callback)
+        except ValueError:
+            pass
+
+    def open_queue_doorbell(self) -> QueueDoorbell:
+        """
+        Open a doorbell socket that is rung whenever queue work is added.
+
+        Returns:
+            A bound QueueDoorbell; the caller must close() it.
+
+        Raises:
+            OSError: If the doorbell cannot be created on this platform.
+        """
+        return QueueDoorbell(self._db.db_path)
+
+    def get_next_queue_due_time(self) -> Optional[str]:
+        """
+        Get the earliest time a not-yet-ready queue item becomes claimable.
+
+        That is the next scheduled retry or the next lease expiry of an
+        item being processed, whichever comes first.
+
+        Returns:
+            ISO timestamp, or None if nothing is scheduled.
+        """
+        row = self._db.fetchone(
+            """
+            SELECT MIN(due) FROM (
+                SELECT MIN(next_attempt_at) AS due FROM queue
+                WHERE status = 'retrying' AND next_attempt_at IS NOT NULL
+                UNION ALL
+                SELECT MIN(lease_expires_at) FROM queue
+                WHERE status = 'processing' AND lease_expires_at IS NOT NULL
+            )
+            """
+        )
+        return row[0] if row else None
+
+    def _notify_queue(self) -> None:
+        """Wake in-process and cross-process queue workers."""
+        for callback in list(self._queue_listeners):
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Queue listener failed: {e}")
+        ring_doorbells(self._db.db_path)
 
     def _row_to_queue_item(self, row) -> dict:
         """Convert a database row to a queue item dictionary."""
+        row = dict(row)
         return {
             "id": row["id"],
             "message_id": row["message_id"],
@@ -1719,6 +2787,8 @@ class EmailStorage:
             "last_attempt_at": row.get("last_attempt"),  # Alias
             "next_attempt_at": row.get("next_attempt_at"),
             "error_message": row.get("error_message"),
+            "claimed_by": row.get("claimed_by"),
+            "lease_expires_at": row.get("lease_expires_at"),
             "metadata": json.loads(row.get("metadata") or "{}"),
             "created_at": row["created_at"],
             "updated_at": row["updated_at"],
@@ -1799,8 +2869,31 @@ class EmailStorage:
     # Helper Methods
     # =========================================================================
 
-    def _row_to_message(self, row) -> dict:
-        """Convert a database row to a message dictionary."""
+    def _row_to_message(
+        self,
+        row,
+        attachments: Optional[list[dict]] = None,
+        contents: Optional[dict[str, Any]] = None,
+    ) -> dict:
+        """
+        Convert a database row to a message dictionary.
+
+        Args:
+            row: Row from the messages table.
+            attachments: Pre-fetched attachments. Loaded from the
+                database when not provided.
+            contents: Pre-fetched shared contents by hash. Loaded from
+                the database when not provided.
+        """
+        if attachments is None:
+            attachments = self._get_message_attachments(row["id"])
+
+        content = row
+        if row["content_hash"] is not None:
+            if contents is None:
+                contents = self._get_message_contents([row["content_hash"]])
+            content = contents.get(row["content_hash"], row)
+
         return {
             "id": row["id"],
             "user_id": row["user_id"],
@@ -1811,9 +2904,10 @@ class EmailStorage:
             "cc_addresses": json.loads(row["cc_addresses"] or "[]"),
             "bcc_addresses": json.loads(row["bcc_addresses"] or "[]"),
             "subject": row["subject"],
-            "body_text": row["body_text"],
-            "body_html": row["body_html"],
-            "headers": json.loads(row["headers"] or "{}"),
+            "body_text": content["body_text"],
+            "body_html": content["body_html"],
+            "preview": row["preview"],
+            "headers": json.loads(content["headers"] or "{}"),
             "status": row["status"],
             "priority": row["priority"],
             "is_read": bool(row["is_read"]),
@@ -1830,9 +2924,87 @@ class EmailStorage:
             "deleted_at": row["deleted_at"],
             "created_at": row["created_at"],
             "updated_at": row["updated_at"],
-            "attachments": self._get_message_attachments(row["id"]),
+            "attachments": attachments,
+            "rowid": row["rowid"],
         }
 
+    def _rows_to_messages(
+        self, rows: list, include_attachments: bool = True
+    ) -> list[dict]:
+        """
+        Convert message rows to dictionaries, loading attachments in bulk.
+
+        Attachments and shared contents for the whole page are fetched
+        with ``IN (...)`` queries instead of one query per message.
+
+        Args:
+            rows: Rows from the messages table.
+            include_attachments: Load attachment rows. When False every
+                message gets an empty ``attachments`` list.
+
+        Returns:
+            List of message dictionaries in row order.
+        """
+        if include_attachments:
+            by_message = self._get_attachments_for_messages(
+                [row["id"] for row in rows if row["has_attachments"]]
+            )
+        else:
+            by_message = {}
+
+        contents = self._get_message_contents(
+            list({row["content_hash"] for row in rows if row["content_hash"]})
+        )
+
+        return [
+            self._row_to_message(row, by_message.get(row["id"], []), contents)
+            for row in rows
+        ]
+
+    def _fetch_summaries(
+        self, sql: str, params: tuple
+    ) -> list[MessageSummary]:
+        """
+        Run a summary projection query and build MessageSummary rows.
+
+        Uses plain tuples instead of sqlite3.Row, since summaries are
+        built positionally and list views can return many thousands.
+        """
+        cursor = self._db.connection.cursor()
+        cursor.row_factory = None
+        try:
+            rows = cursor.execute(sql, params).fetchall()
+        finally:
+            cursor.close()
+
+        loads = json.loads
+        return [
+            MessageSummary(
+                row[0],
+                row[1],
+                row[2],
+                row[3],
+                row[4],
+                row[5],
+                row[6],
+                loads(row[7]) if row[7] else [],
+                row[8],
+                row[9] or "",
+                row[10] or "",
+                row[11],
+                bool(row[12]),
+                bool(row[13]),
+                bool(row[14]),
+                bool(row[15]),
+                bool(row[16]),
+                row[17],
+                row[18],
+                row[19],
+                row[20],
+            )
+            for row in rows
+        ]
+
     def _row_to_folder(self, row) -> dict:
         """Convert a database row to a folder dictionary."""
         return {
@@ -1857,18 +3029,85 @@ class EmailStorage:
             "SELECT * FROM attachments WHERE message_id = ?",
             (message_id,),
         )
-        return [
-            {
-                "id": row["id"],
-                "filename": row["filename"],
-                "content_type": row["content_type"],
-                "size": row["size"],
-                "content_id": row["content_id"],
-                "is_inline": bool(row["is_inline"]),
-                "path": row["storage_path"],
-            }
-            for row in rows
-        ]
+        return [self._row_to_attachment(row) for row in rows]
+
+    def _get_attachments_for_messages(
+        self, message_ids: list[str]
+    ) -> dict[str, list[dict]]:
+        """
+        Get attachments for several messages at once.
+
+        Args:
+            message_ids: Message IDs to load attachments for.
+
+        Returns:
+            Mapping of message ID to its attachment list. Messages
+            without attachments are absent from the mapping.
+        """
+        result: dict[str, list[dict]] = {}
+
+        for start in range(0, len(message_ids), self._MAX_SQL_PARAMS):
+            chunk = message_ids[start : start + self._MAX_SQL_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self._db.fetchall(
+                f"""
+                SELECT * FROM attachments
+                WHERE message_id IN ({placeholders})
+                ORDER BY rowid
+                """,
+                tuple(chunk),
+            )
+            for row in rows:
+                result.setdefault(row["message_id"], []).append(
+                    self._row_to_attachment(row)
+                )
+
+        return result
+
+    def _get_message_contents(self, hashes: list[str]) -> dict[str, Any]:
+        """
+        Get shared message contents by hash.
+
+        Args:
+            hashes: Content hashes to load.
+
+        Returns:
+            Mapping of hash to its message_contents row.
+        """
+        result: dict[str, Any] = {}
+
+        for start in range(0, len(hashes), self._MAX_SQL_PARAMS):
+            chunk = hashes[start : start + self._MAX_SQL_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self._db.fetchall(
+                f"SELECT * FROM message_contents WHERE hash IN ({placeholders})",
+                tuple(chunk),
+            )
+            result.update((row["hash"], row) for row in rows)
+
+        return result
+
+    def _row_to_attachment(self, row) -> dict:
+        """
+        Convert a database row to an attachment dictionary.
+
+        Content in the blob store is stored with a path relative to the
+        store; ``path`` is always absolute.
+        """
+        path = row["storage_path"]
+        if path and row["checksum"] and not os.path.isabs(path):
+            path = str(self.blobs.root / path)
+
+        return {
+            "id": row["id"],
+            "filename": row["filename"],
+            "content_type": row["content_type"],
+            "size": row["size"],
+            "content_id": row["content_id"],
+            "is_inline": bool(row["is_inline"]),
+            "path": path,
+            "checksum": row["checksum"],
+        }
 
     def close(self) -> None:
         """Close database connections."""
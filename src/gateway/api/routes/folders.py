@@ -702,6 +702,7 @@ def create_folders_blueprint() -> Blueprint:
                     messages = storage.get_messages(
                         folder_id=folder_id,
                         limit=1000,
+                        include_attachments=False,
                     )
                     for msg in messages:
                         storage.update_message(
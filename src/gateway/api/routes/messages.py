@@ -7,20 +7,35 @@ Uses SQLite for storage.
 """
 
 import logging
+import os
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import Any, Literal, Optional
 from uuid import uuid4
 
-from flask import Blueprint, Response, g, jsonify, request
+from flask import Blueprint, Response, g, jsonify, request, send_file
 from pydantic import BaseModel, EmailStr, Field, ValidationError
 
-from common.storage import get_storage
+from common.storage import MessageSummary, get_storage
 from ..middleware import rate_limit
 from ..auth import require_auth
 
 # Configure module logger
 logger = logging.getLogger(__name__)
 
+# Attachment types that may be shown inline. Anything else, including
+# SVG and HTML, could run script on the API's origin and is always sent
+# as a download.
+INLINE_CONTENT_TYPES = frozenset(
+    {
+        "image/png",
+        "image/jpeg",
+        "image/gif",
+        "image/webp",
+        "image/bmp",
+        "text/plain",
+    }
+)
+
 
 # =============================================================================
 # Request/Response Models
@@ -75,6 +90,27 @@ class MarkReadRequest(BaseModel):
     is_read: bool = Field(..., description="Read status to set")
 
 
+class BatchActionRequest(BaseModel):
+    """Request model for applying one action to many messages."""
+
+    ids: list[str] = Field(
+        ..., min_length=1, max_length=10000, description="Message IDs"
+    )
+    action: Literal[
+        "mark_read",
+        "mark_unread",
+        "star",
+        "unstar",
+        "mark_important",
+        "unmark_important",
+        "move",
+        "trash",
+    ] = Field(..., description="Action to apply")
+    folder_id: Optional[str] = Field(
+        None, description="Destination folder (required for move)"
+    )
+
+
 # =============================================================================
 # Helper Functions
 # =============================================================================
@@ -108,6 +144,29 @@ def serialize_message(message: dict) -> dict[str, Any]:
     }
 
 
+def serialize_message_summary(summary: MessageSummary) -> dict[str, Any]:
+    """Serialize a message summary for list responses."""
+    return {
+        "id": summary.id,
+        "user_id": summary.user_id,
+        "folder_id": summary.folder_id,
+        "message_id": summary.message_id,
+        "thread_id": summary.thread_id,
+        "from_address": summary.from_address,
+        "to_addresses": summary.to_addresses,
+        "subject": summary.subject,
+        "preview": summary.preview,
+        "status": summary.status,
+        "is_read": summary.is_read,
+        "is_starred": summary.is_starred,
+        "is_important": summary.is_important,
+        "is_encrypted": summary.is_encrypted,
+        "has_attachments": summary.has_attachments,
+        "attachment_count": summary.attachment_count,
+        "received_at": summary.received_at,
+    }
+
+
 # =============================================================================
 # Blueprint and Routes
 # =============================================================================
@@ -132,6 +191,8 @@ def create_messages_blueprint() -> Blueprint:
 
         Query Parameters:
             - folder_id: Filter by folder ID
+            - cursor: Opaque cursor from a previous response's
+              pagination.next_cursor (takes precedence over page)
             - page: Page number (default: 1)
             - per_page: Items per page (default: 50, max: 100)
             - status: Filter by message status
@@ -140,7 +201,8 @@ def create_messages_blueprint() -> Blueprint:
             - search: Search in subject and body
 
         Returns:
-            Paginated list of messages.
+            Paginated list of message summaries (no bodies; fetch
+            /messages/<id> for the full message).
         """
         try:
             # Parse query parameters
@@ -151,6 +213,7 @@ def create_messages_blueprint() -> Blueprint:
             is_read_param = request.args.get("is_read")
             is_starred_param = request.args.get("is_starred")
             search = request.args.get("search", "").strip()
+            cursor = request.args.get("cursor") or None
 
             offset = (page - 1) * per_page
             user_id = getattr(g, "user_id", None)
@@ -167,41 +230,44 @@ def create_messages_blueprint() -> Blueprint:
                 is_starred = is_starred_param.lower() == "true"
 
             # Search or filter
+            next_cursor = None
             if search:
-                messages = storage.search_messages(
+                messages = storage.search_message_summaries(
                     query=search, limit=per_page
                 )
                 # Apply additional filters to search results
                 if user_id:
-                    messages = [
-                        m for m in messages if m.get("user_id") == user_id
-                    ]
+                    messages = [m for m in messages if m.user_id == user_id]
                 if folder_id:
                     messages = [
-                        m for m in messages if m.get("folder_id") == folder_id
+                        m for m in messages if m.folder_id == folder_id
                     ]
                 if is_read is not None:
-                    messages = [
-                        m for m in messages if m.get("is_read") == is_read
-                    ]
+                    messages = [m for m in messages if m.is_read == is_read]
                 if is_starred is not None:
                     messages = [
-                        m
-                        for m in messages
-                        if m.get("is_starred") == is_starred
+                        m for m in messages if m.is_starred == is_starred
                     ]
                 total = len(messages)
             else:
                 # Get messages with filters
-                messages = storage.get_messages(
-                    user_id=user_id,
-                    folder_id=folder_id,
-                    status=status,
-                    is_read=is_read,
-                    is_starred=is_starred,
-                    limit=per_page,
-                    offset=offset,
-                )
+                try:
+                    messages = storage.get_message_summaries(
+                        user_id=user_id,
+                        folder_id=folder_id,
+                        status=status,
+                        is_read=is_read,
+                        is_starred=is_starred,
+                        limit=per_page,
+                        offset=offset,
+                        cursor=cursor,
+                    )
+                except ValueError as e:
+                    return (
+                        jsonify({"error": "Invalid cursor", "message": str(e)}),
+                        400,
+                    )
+                next_cursor = storage.get_next_cursor(messages, per_page)
 
                 # Get total count
                 total = storage.count_messages(
@@ -215,7 +281,9 @@ def create_messages_blueprint() -> Blueprint:
             return (
                 jsonify(
                     {
-                        "messages": [serialize_message(m) for m in messages],
+                        "messages": [
+                            serialize_message_summary(m) for m in messages
+                        ],
                         "pagination": {
                             "page": page,
                             "per_page": per_page,
@@ -225,8 +293,13 @@ def create_messages_blueprint() -> Blueprint:
                                 if total > 0
                                 else 1
                             ),
-                            "has_next": page * per_page < total,
+                            "has_next": (
+                                next_cursor is not None
+                                if cursor
+                                else page * per_page < total
+                            ),
                             "has_prev": page > 1,
+                            "next_cursor": next_cursor,
                         },
                     }
                 ),
@@ -299,6 +372,87 @@ def create_messages_blueprint() -> Blueprint:
                 500,
             )
 
+    @bp.route("/<message_id>/attachments/<attachment_id>", methods=["GET"])
+    @require_auth
+    def get_attachment(
+        message_id: str, attachment_id: str
+    ) -> tuple[Response, int] | Response:
+        """
+        Download an attachment's content.
+
+        The file is handed to the WSGI server's file wrapper, which sends
+        it with sendfile() where supported instead of reading it into
+        memory. Range and conditional (ETag) requests are supported.
+
+        The content type comes from the sender, so only types in
+        INLINE_CONTENT_TYPES are sent inline, and browsers are told not
+        to sniff a different one.
+
+        Path Parameters:
+            - message_id: Message UUID
+            - attachment_id: Attachment UUID
+
+        Returns:
+            The attachment content.
+        """
+        not_found = (
+            jsonify({"error": "Not found", "message": "Attachment not found"}),
+            404,
+        )
+        try:
+            storage = get_storage()
+            message = storage.get_message(message_id)
+
+            # Check ownership
+            user_id = getattr(g, "user_id", None)
+            if not message or (
+                message.get("user_id") and message.get("user_id") != user_id
+            ):
+                return not_found
+
+            attachment = storage.get_attachment(message_id, attachment_id)
+            if not attachment or not attachment["path"]:
+                return not_found
+            if not os.path.isfile(attachment["path"]):
+                logger.warning(
+                    "Attachment content missing",
+                    extra={"attachment_id": attachment_id},
+                )
+                return not_found
+
+            content_type = attachment["content_type"] or ""
+            inline = (
+                attachment["is_inline"]
+                and content_type.split(";")[0].strip().lower()
+                in INLINE_CONTENT_TYPES
+            )
+            response = send_file(
+                attachment["path"],
+                mimetype=attachment["content_type"],
+                as_attachment=not inline,
+                download_name=attachment["filename"],
+                etag=attachment["checksum"] or True,
+                conditional=True,
+            )
+            response.headers["X-Content-Type-Options"] = "nosniff"
+            if attachment["checksum"]:
+                # Content-addressed: the bytes behind this URL never change
+                response.cache_control.private = True
+                response.cache_control.max_age = 31536000
+            return response
+
+        except Exception as e:
+            logger.error(f"Get attachment error: {e}")
+            return (
+                jsonify(
+                    {
+                        "error": "Server error",
+                        "message": "An error occurred while fetching the attachment",
+                    }
+                ),
+                500,
+            )
+
     @bp.route("", methods=["POST"])
     @bp.route("/", methods=["POST"])
     @require_auth
@@ -412,13 +566,10 @@ def create_messages_blueprint() -> Blueprint:
                         else (100 if priority == "urgent" else 0)
                     )
                     storage.create_queue_item(
-                        {
-                            "message_id": message["id"],
-                            "user_id": user_id,
-                            "recipient": recipient,
-                            "status": "pending",
-                            "priority": queue_priority,
-                        }
+                        message["id"],
+                        recipient,
+                        user_id=user_id,
+                        priority=queue_priority,
                     )
 
             logger.info(
@@ -842,6 +993,117 @@ def create_messages_blueprint() -> Blueprint:
                 500,
             )
 
+    @bp.route("/batch", methods=["POST"])
+    @require_auth
+    @rate_limit(max_requests=30, window_seconds=60)
+    def batch_action() -> tuple[Response, int]:
+        """
+        Apply one action to many messages at once.
+
+        Request Body:
+            - ids: Message UUIDs (1 to 10000)
+            - action: mark_read, mark_unread, star, unstar, mark_important,
+              unmark_important, move or trash
+            - folder_id: Destination folder (required for move)
+
+        Only messages owned by the authenticated user are changed; unknown
+        IDs are ignored.
+
+        Returns:
+            Number of messages requested and actually changed.
+        """
+        try:
+            if not request.is_json:
+                return (
+                    jsonify(
+                        {
+                            "error": "Invalid request",
+                            "message": "Request must be JSON",
+                        }
+                    ),
+                    400,
+                )
+
+            try:
+                data = BatchActionRequest(**request.get_json())
+            except ValidationError as e:
+                return (
+                    jsonify(
+                        {
+                            "error": "Validation error",
+                            "message": "Invalid request data",
+                            "details": e.errors(),
+                        }
+                    ),
+                    400,
+                )
+
+            storage = get_storage()
+            user_id = getattr(g, "user_id", None)
+
+            if data.action == "move":
+                folder = (
+                    storage.get_folder_by_id(data.folder_id)
+                    if data.folder_id
+                    else None
+                )
+                if not folder:
+                    return (
+                        jsonify(
+                            {
+                                "error": "Invalid folder",
+                                "message": "Destination folder not found",
+                            }
+                        ),
+                        400,
+                    )
+                updated = storage.move_many(data.ids, folder["id"], user_id)
+            elif data.action == "trash":
+                updated = storage.trash_many(data.ids, user_id)
+            else:
+                flag, value = {
+                    "mark_read": ("is_read", True),
+                    "mark_unread": ("is_read", False),
+                    "star": ("is_starred", True),
+                    "unstar": ("is_starred", False),
+                    "mark_important": ("is_important", True),
+                    "unmark_important": ("is_important", False),
+                }[data.action]
+                updated = storage.set_flag_many(data.ids, flag, value, user_id)
+
+            logger.info(
+                "Batch message action",
+                extra={
+                    "user_id": user_id,
+                    "action": data.action,
+                    "requested": len(data.ids),
+                    "updated": updated,
+                },
+            )
+
+            return (
+                jsonify(
+                    {
+                        "action": data.action,
+                        "requested": len(data.ids),
+                        "updated": updated,
+                    }
+                ),
+                200,
+            )
+
+        except Exception as e:
+            logger.error(f"Batch action error: {e}")
+            return (
+                jsonify(
+                    {
+                        "error": "Server error",
+                        "message": "An error occurred while updating messages",
+                    }
+                ),
+                500,
+            )
+
     return bp
 
 
@@ -8,10 +8,15 @@ This package provides cryptographic functionality for email security:
 """
 
 from .dkim import (
+    BodyHasher,
+    DKIMKeyCache,
     DKIMKeyPair,
+    DKIMResult,
     DKIMSignature,
     DKIMSigner,
     DKIMVerifier,
+    HeaderIndex,
+    format_authentication_results,
     generate_dkim_keys,
 )
 from .pgp import (
@@ -40,10 +45,15 @@ from .tls import (
 
 __all__ = [
     # DKIM
+    "BodyHasher",
+    "DKIMKeyCache",
     "DKIMKeyPair",
+    "DKIMResult",
     "DKIMSignature",
     "DKIMSigner",
     "DKIMVerifier",
+    "HeaderIndex",
+    "format_authentication_results",
     "generate_dkim_keys",
     # TLS
     "CertificateInfo",
@@ -5,15 +5,16 @@ This module provides classes for signing outgoing emails with DKIM signatures
 and verifying incoming DKIM signatures, ensuring email authenticity and integrity.
 """
 
+import asyncio
 import base64
+import functools
 import hashlib
 import logging
 import re
 import time
 from dataclasses import dataclass, field
-from email import message_from_bytes, message_from_string
 from email.message import EmailMessage
-from typing import Optional, Union
+from typing import Any, Callable, Iterable, Optional, Union
 
 import dns.resolver
 from cryptography.hazmat.backends import default_backend
@@ -24,7 +25,8 @@ from cryptography.hazmat.primitives.asymmetric.rsa import (
     RSAPublicKey,
 )
 
-from src.common.exceptions import CryptoError, DNSLookupError, SignatureError
+from common.exceptions import CryptoError, DNSLookupError, SignatureError
+from gateway.smtp.dns_cache import DNSCache, DNSCacheStats
 
 logger = logging.getLogger(__name__)
 
@@ -80,6 +82,304 @@ class DKIMSignature:
         return "; ".join(parts)
 
 
+@dataclass
+class DKIMResult:
+    """Outcome of checking one DKIM signature (RFC 8601 result names)."""
+
+    # pass, fail, none, temperror or permerror
+    result: str
+    reason: str = ""
+    domain: str = ""
+    selector: str = ""
+    signature: str = ""
+
+    @property
+    def passed(self) -> bool:
+        """Whether the signature verified."""
+        return self.result == "pass"
+
+    def to_method(self) -> str:
+        """Format as a method result of an Authentication-Results header."""
+        parts = [f"dkim={self.result}"]
+        if self.result != "pass" and self.reason:
+            reason = self.reason.replace("\\", "").replace('"', "'")
+            parts.append(f'reason="{reason}"')
+        if self.domain:
+            parts.append(f"header.d={self.domain}")
+        if self.selector:
+            parts.append(f"header.s={self.selector}")
+        if self.signature:
+            # RFC 6008: enough of b= to tell signatures apart
+            parts.append(f"header.b={self.signature[:8]}")
+        return " ".join(parts)
+
+
+# Body bytes hashed per update when signing a message held in memory
+BODY_CHUNK_SIZE = 1024 * 1024
+
+# hashlib names for the DKIM signing algorithms (a= tag)
+_BODY_HASHES = {"rsa-sha256": "sha256", "rsa-sha1": "sha1"}
+
+_HEADER_END = re.compile(rb"\r?\n\r?\n")
+_LINE_END = re.compile(rb"\r?\n")
+_WSP = re.compile(rb"[ \t]+")
+_B_TAG = re.compile(rb"(^|;)(\s*b\s*=)[^;]*")
+_DIGITS = re.compile(r"[0-9]+")
+
+
+def _raw_bytes(message: Union[bytes, str, EmailMessage]) -> bytes:
+    """Get the wire bytes of a message."""
+    if isinstance(message, bytes):
+        return message
+    if isinstance(message, (bytearray, memoryview)):
+        return bytes(message)
+    if isinstance(message, str):
+        return message.encode("utf-8")
+    return message.as_bytes()
+
+
+def _tag_number(tag: str, value: str) -> int:
+    """
+    Parse the numeric value of a t=, x= or l= signature tag.
+
+    Raises:
+        SignatureError: If the value is not a string of digits.
+    """
+    if not _DIGITS.fullmatch(value):
+        raise SignatureError(f"Invalid {tag}= value in DKIM signature: {value!r}")
+    return int(value)
+
+
+def _split_canonicalization(canonicalization: str) -> tuple[str, str]:
+    """Split a c= value into (header, body) methods (body defaults to simple)."""
+    header_canon, _, body_canon = canonicalization.lower().partition("/")
+    return header_canon or "simple", body_canon or "simple"
+
+
+def _signature_hash(algorithm: str) -> hashes.HashAlgorithm:
+    """Hash used by the RSA signature for a DKIM algorithm."""
+    if algorithm == "rsa-sha256":
+        return hashes.SHA256()
+    if algorithm == "rsa-sha1":
+        return hashes.SHA1()
+    raise CryptoError(f"Unsupported DKIM algorithm: {algorithm}")
+
+
+def split_message(raw: bytes) -> tuple[bytes, int]:
+    """
+    Find the end of the header block of a raw message.
+
+    The block ends at the first empty line; CRLF and bare LF line endings
+    are both accepted.
+
+    Args:
+        raw: The message as received or sent.
+
+    Returns:
+        Tuple of (header_block, body_offset), where header_block excludes
+        the empty line and body_offset is where the body starts in raw.
+    """
+    match = _HEADER_END.search(raw)
+    if match is None:
+        return raw, len(raw)
+    return raw[: match.start()], match.end()
+
+
+def canonicalize_header(name: bytes, value: bytes, method: str) -> bytes:
+    """
+    Canonicalize one header field (RFC 6376 section 3.4.1 and 3.4.2).
+
+    Args:
+        name: Header name as it appears in the message.
+        value: Raw value after the colon, folded lines joined with CRLF.
+        method: "simple" or "relaxed".
+
+    Returns:
+        The canonical header, without the trailing CRLF.
+    """
+    if method == "relaxed":
+        value = _WSP.sub(b" ", _LINE_END.sub(b"", value)).strip(b" ")
+        return name.rstrip(b" \t").lower() + b":" + value
+    return name + b":" + value
+
+
+class HeaderIndex:
+    """
+    The header fields of a raw message, indexed by lowercase name.
+
+    Values are kept as raw bytes (folding normalized to CRLF), so 8-bit
+    header content is signed exactly as it is sent.
+    """
+
+    def __init__(self, header_block: bytes) -> None:
+        """
+        Parse a header block.
+
+        Args:
+            header_block: Headers as returned by split_message().
+        """
+        self.headers: list[tuple[bytes, bytes]] = []
+        for line in _LINE_END.split(header_block):
+            if line[:1] in (b" ", b"\t") and self.headers:
+                name, value = self.headers[-1]
+                self.headers[-1] = (name, value + b"\r\n" + line)
+            elif b":" in line:
+                name, _, value = line.partition(b":")
+                self.headers.append((name, value))
+
+        self._index: dict[bytes, list[int]] = {}
+        for position, (name, _) in enumerate(self.headers):
+            self._index.setdefault(name.rstrip(b" \t").lower(), []).append(position)
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower().encode("ascii") in self._index
+
+    def all(self, name: str) -> list[tuple[bytes, bytes]]:
+        """Every instance of a header, top to bottom, as (name, value)."""
+        positions = self._index.get(name.lower().encode("ascii"), ())
+        return [self.headers[position] for position in positions]
+
+    def first(self, name: str) -> Optional[tuple[bytes, bytes]]:
+        """Topmost instance of a header, as (name, value)."""
+        positions = self._index.get(name.lower().encode("ascii"))
+        return self.headers[positions[0]] if positions else None
+
+    def select(self, names: list[str]) -> list[tuple[bytes, bytes]]:
+        """
+        Header instances covered by an h= list.
+
+        A name listed more than once selects the next instance up from the
+        bottom of the header block; names with no instance left select
+        nothing (RFC 6376 section 5.4.2).
+
+        Args:
+            names: Signed header names, in h= order.
+
+        Returns:
+            (name, value) pairs in signing order.
+        """
+        used: dict[bytes, int] = {}
+        selected = []
+        for name in names:
+            key = name.strip().lower().encode("ascii")
+            positions = self._index.get(key, ())
+            count = used.get(key, 0)
+            if count < len(positions):
+                selected.append(self.headers[positions[-1 - count]])
+                used[key] = count + 1
+        return selected
+
+
+class BodyHasher:
+    """
+    Incremental DKIM body hash (RFC 6376 section 3.4.3 to 3.4.5).
+
+    The body is canonicalized and hashed as chunks are fed in, holding back
+    only the last partial line and any run of empty lines (which count only
+    if more content follows). Bytes are never decoded, so 8-bit bodies hash
+    exactly as sent.
+
+    Example:
+        hasher = BodyHasher("rsa-sha256", "relaxed")
+        for chunk in chunks:
+            hasher.update(chunk)
+        body_hash = hasher.finalize()
+    """
+
+    def __init__(
+        self,
+        algorithm: str = "rsa-sha256",
+        method: str = "relaxed",
+        length: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize the hasher.
+
+        Args:
+            algorithm: DKIM algorithm (a= tag).
+            method: Body canonicalization, "simple" or "relaxed".
+            length: Hash only this many canonical bytes (l= tag).
+
+        Raises:
+            CryptoError: If the algorithm is not supported.
+        """
+        if algorithm not in _BODY_HASHES:
+            raise CryptoError(f"Unsupported DKIM algorithm: {algorithm}")
+        self._hash = hashlib.new(_BODY_HASHES[algorithm])
+        self._relaxed = method == "relaxed"
+        self._remaining = length
+        self._carry = b""
+        self._blank_lines = 0
+        self.length = 0
+
+    def update(self, data: bytes) -> None:
+        """Feed the next chunk of the raw body."""
+        if self._carry:
+            data = self._carry + data
+        end = data.rfind(b"\n") + 1
+        self._carry = data[end:]
+        if end:
+            self._feed(data[:end] if end < len(data) else data)
+
+    def finalize(self) -> str:
+        """
+        Finish the body.
+
+        Returns:
+            The base64 body hash (bh= value).
+        """
+        if self._carry:
+            # The unterminated last line keeps its trailing whitespace (as
+            # other common DKIM implementations do) and gains a CRLF
+            if self._relaxed:
+                self._append(_WSP.sub(b" ", self._carry) + b"\r\n")
+            else:
+                self._append(self._carry + b"\r\n")
+            self._carry = b""
+        if not self._relaxed and not self.length:
+            # A simple-canonicalized empty body is a single CRLF
+            self._write(b"\r\n")
+        return base64.b64encode(self._hash.digest()).decode("ascii")
+
+    def _feed(self, lines: bytes) -> None:
+        """Canonicalize and hash whole lines."""
+        # bytes.replace() is much faster than a regex here and is skipped
+        # entirely for lines it would not change (e.g. base64 attachments)
+        if lines.count(b"\n") != lines.count(b"\r\n"):
+            lines = _LINE_END.sub(b"\r\n", lines)
+        if self._relaxed:
+            if b"\t" in lines:
+                lines = lines.replace(b"\t", b" ")
+            while b"  " in lines:
+                lines = lines.replace(b"  ", b" ")
+            if b" \r\n" in lines:
+                lines = lines.replace(b" \r\n", b"\r\n")
+        self._append(lines)
+
+    def _append(self, lines: bytes) -> None:
+        """Hash canonical CRLF-terminated lines."""
+        # Hold back trailing empty lines until non-empty content follows
+        end = len(lines)
+        while end >= 2 and lines.endswith(b"\r\n", 0, end) and (
+            end == 2 or lines.endswith(b"\r\n", 0, end - 2)
+        ):
+            end -= 2
+        if end:
+            if self._blank_lines:
+                self._write(b"\r\n" * self._blank_lines)
+                self._blank_lines = 0
+            self._write(memoryview(lines)[:end])
+        self._blank_lines += (len(lines) - end) // 2
+
+    def _write(self, data: Union[bytes, memoryview]) -> None:
+        """Hash canonical bytes, honouring the length limit."""
+        if self._remaining is not None:
+            data = data[: self._remaining]
+            self._remaining -= len(data)
+        self._hash.update(data)
+        self.length += len(data)
+
+
 class DKIMSigner:
     """
     DKIM signer for outgoing email messages.
@@ -129,7 +429,8 @@ class DKIMSigner:
             signature_ttl: Signature validity period in seconds.
 
         Raises:
-            CryptoError: If no valid private key is provided.
+            CryptoError: If no valid private key is provided or the
+                algorithm is not supported.
         """
         self.domain = domain
         self.selector = selector
@@ -142,6 +443,13 @@ class DKIMSigner:
             private_key, private_key_pem, private_key_path
         )
 
+        # Reused for every message
+        self._header_canon, self._body_canon = _split_canonicalization(
+            canonicalization
+        )
+        self._hash_algorithm = _signature_hash(algorithm)
+        self._padding = padding.PKCS1v15()
+
         logger.info(
             "Initialized DKIM signer for domain=%s, selector=%s",
             domain,
@@ -259,64 +567,6 @@ class DKIMSigner:
 
         return record
 
-    def _canonicalize_header(self, name: str, value: str, method: str) -> str:
-        """Canonicalize a header according to DKIM specification."""
-        if method == "relaxed":
-            # Convert header name to lowercase
-            name = name.lower()
-            # Unfold header value (remove CRLF followed by whitespace)
-            value = re.sub(r"\r\n[ \t]+", " ", value)
-            # Convert sequences of whitespace to single space
-            value = re.sub(r"[ \t]+", " ", value)
-            # Strip leading/trailing whitespace
-            value = value.strip()
-            return f"{name}:{value}"
-        else:
-            # Simple canonicalization - preserve as-is
-            return f"{name}:{value}"
-
-    def _canonicalize_body(self, body: bytes, method: str) -> bytes:
-        """Canonicalize the message body according to DKIM specification."""
-        if method == "relaxed":
-            # Convert to string for processing
-            body_str = body.decode("utf-8", errors="replace")
-            lines = body_str.split("\n")
-            result_lines = []
-
-            for line in lines:
-                # Remove trailing whitespace from each line
-                line = line.rstrip(" \t\r")
-                # Reduce sequences of whitespace to single space
-                line = re.sub(r"[ \t]+", " ", line)
-                result_lines.append(line)
-
-            # Join with CRLF
-            result = "\r\n".join(result_lines)
-            # Remove trailing empty lines (but keep one CRLF)
-            result = result.rstrip("\r\n") + "\r\n"
-
-            return result.encode("utf-8")
-        else:
-            # Simple canonicalization - just ensure CRLF line endings
-            # and remove trailing empty lines
-            body = body.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
-            while body.endswith(b"\r\n\r\n"):
-                body = body[:-2]
-            if not body.endswith(b"\r\n"):
-                body += b"\r\n"
-            return body
-
-    def _compute_body_hash(self, body: bytes, method: str) -> str:
-        """Compute the hash of the canonicalized body."""
-        canonical_body = self._canonicalize_body(body, method)
-
-        if self.algorithm == "rsa-sha256":
-            hash_obj = hashlib.sha256(canonical_body)
-        else:
-            hash_obj = hashlib.sha1(canonical_body)
-
-        return base64.b64encode(hash_obj.digest()).decode("ascii")
-
     def sign(
         self,
         message: Union[bytes, str, EmailMessage],
@@ -325,6 +575,10 @@ class DKIMSigner:
         """
         Sign an email message with DKIM.
 
+        Raw bytes are signed as they are: the header block is split off
+        once and the body is hashed in BODY_CHUNK_SIZE chunks without being
+        decoded or copied whole.
+
         Args:
             message: Email message (bytes, string, or EmailMessage).
             signed_headers: List of headers to sign (uses defaults if None).
@@ -336,119 +590,107 @@ class DKIMSigner:
             CryptoError: If signing fails.
         """
         try:
-            # Parse message if needed
-            if isinstance(message, bytes):
-                msg = message_from_bytes(message)
-                raw_message = message
-            elif isinstance(message, str):
-                msg = message_from_string(message)
-                raw_message = message.encode("utf-8")
-            else:
-                msg = message
-                raw_message = message.as_bytes()
-
-            # Split headers and body
-            raw_str = raw_message.decode("utf-8", errors="replace")
-            if "\r\n\r\n" in raw_str:
-                _, body_str = raw_str.split("\r\n\r\n", 1)
-            elif "\n\n" in raw_str:
-                _, body_str = raw_str.split("\n\n", 1)
-            else:
-                body_str = ""
-            body = body_str.encode("utf-8")
-
-            # Determine headers to sign
-            if signed_headers is None:
-                signed_headers = [
-                    h.lower()
-                    for h in self.DEFAULT_SIGNED_HEADERS
-                    if h.lower() in [k.lower() for k in msg.keys()]
-                ]
-            else:
-                signed_headers = [h.lower() for h in signed_headers]
+            raw_message = _raw_bytes(message)
+            header_block, body_offset = split_message(raw_message)
 
-            # Ensure 'from' is always signed
-            if "from" not in signed_headers:
-                signed_headers.insert(0, "from")
+            hasher = BodyHasher(self.algorithm, self._body_canon)
+            for start in range(body_offset, len(raw_message), BODY_CHUNK_SIZE):
+                hasher.update(raw_message[start : start + BODY_CHUNK_SIZE])
 
-            # Parse canonicalization methods
-            if "/" in self.canonicalization:
-                header_canon, body_canon = self.canonicalization.split("/")
-            else:
-                header_canon = body_canon = self.canonicalization
-
-            # Compute body hash
-            body_hash = self._compute_body_hash(body, body_canon)
-
-            # Build signature structure
-            sig = DKIMSignature(
-                algorithm=self.algorithm,
-                domain=self.domain,
-                selector=self.selector,
-                canonicalization=self.canonicalization,
-                signed_headers=signed_headers,
-                body_hash=body_hash,
-                timestamp=int(time.time()),
+            return self._sign_headers(
+                HeaderIndex(header_block), hasher.finalize(), signed_headers
             )
 
-            if self.signature_ttl:
-                sig.expiration = sig.timestamp + self.signature_ttl
-
-            # Build header string to sign (without b= value)
-            sig_header_value = sig.to_header().replace(
-                f"b={sig.signature}", "b="
-            )
-
-            # Canonicalize headers
-            headers_to_sign = []
-            for header_name in signed_headers:
-                for key in msg.keys():
-                    if key.lower() == header_name:
-                        value = msg[key]
-                        headers_to_sign.append(
-                            self._canonicalize_header(key, value, header_canon)
-                        )
-                        break
-
-            # Add DKIM-Signature header (without trailing CRLF)
-            dkim_header = self._canonicalize_header(
-                "dkim-signature", sig_header_value, header_canon
-            )
-            headers_to_sign.append(dkim_header)
-
-            # Create data to sign
-            data_to_sign = "\r\n".join(headers_to_sign).encode("utf-8")
+        except CryptoError:
+            raise
+        except Exception as e:
+            raise CryptoError(f"Failed to sign message with DKIM: {e}")
 
-            # Sign with RSA
-            if self.algorithm == "rsa-sha256":
-                hash_alg = hashes.SHA256()
-            else:
-                hash_alg = hashes.SHA1()
+    def sign_stream(
+        self,
+        header_block: bytes,
+        body_chunks: Iterable[bytes],
+        signed_headers: Optional[list[str]] = None,
+    ) -> str:
+        """
+        Sign a message whose body is read in chunks, e.g. from a file.
 
-            signature = self._private_key.sign(
-                data_to_sign,
-                padding.PKCS1v15(),
-                hash_alg,
-            )
+        Args:
+            header_block: Raw header block, without the empty line.
+            body_chunks: The raw body, in order.
+            signed_headers: List of headers to sign (uses defaults if None).
 
-            sig.signature = base64.b64encode(signature).decode("ascii")
+        Returns:
+            The complete DKIM-Signature header line.
 
-            # Format final header
-            header_line = f"DKIM-Signature: {sig.to_header()}"
+        Raises:
+            CryptoError: If signing fails.
+        """
+        try:
+            hasher = BodyHasher(self.algorithm, self._body_canon)
+            for chunk in body_chunks:
+                hasher.update(chunk)
 
-            logger.debug(
-                "Generated DKIM signature for domain=%s, selector=%s",
-                self.domain,
-                self.selector,
+            return self._sign_headers(
+                HeaderIndex(header_block), hasher.finalize(), signed_headers
             )
 
-            return header_line
-
         except CryptoError:
             raise
         except Exception as e:
             raise CryptoError(f"Failed to sign message with DKIM: {e}")
 
+    def _sign_headers(
+        self,
+        headers: HeaderIndex,
+        body_hash: str,
+        signed_headers: Optional[list[str]],
+    ) -> str:
+        """Build and sign the DKIM-Signature header for a hashed body."""
+        if signed_headers is None:
+            signed_headers = [h for h in self.DEFAULT_SIGNED_HEADERS if h in headers]
+        else:
+            signed_headers = [h.lower() for h in signed_headers]
+
+        # Ensure 'from' is always signed
+        if "from" not in signed_headers:
+            signed_headers.insert(0, "from")
+
+        sig = DKIMSignature(
+            algorithm=self.algorithm,
+            domain=self.domain,
+            selector=self.selector,
+            canonicalization=self.canonicalization,
+            signed_headers=signed_headers,
+            body_hash=body_hash,
+            timestamp=int(time.time()),
+        )
+        if self.signature_ttl:
+            sig.expiration = sig.timestamp + self.signature_ttl
+
+        # Signed headers, then this DKIM-Signature (empty b=, no CRLF)
+        data_to_sign = b"".join(
+            canonicalize_header(name, value, self._header_canon) + b"\r\n"
+            for name, value in headers.select(signed_headers)
+        ) + canonicalize_header(
+            b"DKIM-Signature",
+            b" " + sig.to_header().encode("ascii"),
+            self._header_canon,
+        )
+
+        signature = self._private_key.sign(
+            data_to_sign, self._padding, self._hash_algorithm
+        )
+        sig.signature = base64.b64encode(signature).decode("ascii")
+
+        logger.debug(
+            "Generated DKIM signature for domain=%s, selector=%s",
+            self.domain,
+            self.selector,
+        )
+
+        return f"DKIM-Signature: {sig.to_header()}"
+
     def sign_message(
         self,
         message: Union[bytes, str, EmailMessage],
@@ -464,17 +706,152 @@ class DKIMSigner:
         Returns:
             The signed message with DKIM-Signature header prepended.
         """
-        if isinstance(message, bytes):
-            raw_message = message
-        elif isinstance(message, str):
-            raw_message = message.encode("utf-8")
-        else:
-            raw_message = message.as_bytes()
-
-        signature_header = self.sign(message, signed_headers)
+        raw_message = _raw_bytes(message)
+        signature_header = self.sign(raw_message, signed_headers)
 
         # Prepend signature header to message
-        return f"{signature_header}\r\n".encode("utf-8") + raw_message
+        return f"{signature_header}\r\n".encode("ascii") + raw_message
+
+
+def parse_key_record(txt_data: str, dkim_domain: str) -> RSAPublicKey:
+    """
+    Load the public key from a DKIM DNS record.
+
+    Args:
+        txt_data: The TXT record, its strings concatenated.
+        dkim_domain: Name the record was found at (for error messages).
+
+    Returns:
+        The RSA public key.
+
+    Raises:
+        SignatureError: If the record has no key, a revoked key or a key
+            that cannot be loaded.
+    """
+    key_data = None
+    for part in txt_data.split(";"):
+        tag, _, value = part.partition("=")
+        if tag.strip() == "p":
+            key_data = re.sub(r"\s+", "", value)
+            break
+
+    if key_data is None:
+        raise SignatureError(f"No public key (p=) in DKIM record for {dkim_domain}")
+
+    if key_data == "":
+        raise SignatureError(f"DKIM key revoked for {dkim_domain}")
+
+    # Decode and load the public key
+    try:
+        return serialization.load_der_public_key(
+            base64.b64decode(key_data),
+            backend=default_backend(),
+        )
+    except Exception as e:
+        raise SignatureError(f"Failed to parse DKIM public key: {e}")
+
+
+def _txt_data(answers: Iterable) -> str:
+    """Concatenate the strings of TXT rdata."""
+    return "".join(
+        txt_string.decode("utf-8", errors="replace")
+        for rdata in answers
+        for txt_string in rdata.strings
+    )
+
+
+class DKIMKeyCache:
+    """
+    Cache of parsed DKIM public keys, keyed by (selector, domain).
+
+    Key records are looked up through a DNSCache, which keeps TXT answers
+    for their TTL, remembers missing records for the SOA negative TTL and
+    coalesces concurrent lookups of a name into one query. Parsed keys are
+    memoized by record, so verifying mail from a busy sender costs one
+    lookup and one DER parse per TTL instead of one per message. Transient
+    DNS failures are not cached.
+
+    Example:
+        cache = DKIMKeyCache()
+        public_key = await cache.get("example.com", "mail")
+    """
+
+    def __init__(
+        self,
+        resolver: Optional[Any] = None,
+        nameserver: Optional[str] = None,
+        timeout: float = 5.0,
+        max_ttl: int = 3600,
+        negative_ttl: int = 300,
+        max_entries: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+        dns_cache: Optional[DNSCache] = None,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            resolver: Resolver to query (a dnspython asyncio resolver by
+                default).
+            nameserver: Nameserver address for the default resolver.
+            timeout: Query lifetime in seconds for the default resolver.
+            max_ttl: Upper bound in seconds on how long keys are kept.
+            negative_ttl: Upper bound in seconds on how long a missing key
+                record is remembered.
+            max_entries: Keys kept before the least recently used are
+                evicted.
+            clock: Monotonic time source.
+            dns_cache: DNS cache to look records up in (one built from
+                the other arguments by default).
+        """
+        self.dns_cache = dns_cache or DNSCache(
+            resolver=resolver,
+            nameserver=nameserver,
+            timeout=timeout,
+            max_ttl=max_ttl,
+            negative_ttl=negative_ttl,
+            max_entries=max_entries,
+            clock=clock,
+        )
+        self._parse_key = functools.lru_cache(maxsize=max_entries)(
+            parse_key_record
+        )
+
+    @property
+    def stats(self) -> DNSCacheStats:
+        """Current counters of the key record lookups."""
+        return self.dns_cache.stats
+
+    async def get(self, domain: str, selector: str) -> RSAPublicKey:
+        """
+        Get the public key for a signature's d= and s= tags.
+
+        Args:
+            domain: The signing domain.
+            selector: The DKIM selector.
+
+        Returns:
+            The RSA public key.
+
+        Raises:
+            SignatureError: If there is no usable key for the selector.
+            DNSLookupError: If the lookup failed transiently.
+        """
+        dkim_domain = f"{selector}._domainkey.{domain}".lower().rstrip(".")
+        try:
+            answers = await self.dns_cache.resolve(dkim_domain, "TXT")
+        except dns.resolver.NXDOMAIN:
+            raise SignatureError(f"No DKIM key record at {dkim_domain}") from None
+        except dns.resolver.NoAnswer:
+            raise SignatureError(f"No TXT record at {dkim_domain}") from None
+        except Exception as e:
+            raise DNSLookupError(dkim_domain, "TXT", {"reason": str(e) or repr(e)})
+        return self._parse_key(_txt_data(answers), dkim_domain)
+
+    def clear(self) -> None:
+        """Drop every cached key."""
+        self.dns_cache.clear()
+        self._parse_key.cache_clear()
 
 
 class DKIMVerifier:
@@ -482,13 +859,20 @@ class DKIMVerifier:
     DKIM signature verifier for incoming email messages.
 
     This class verifies DKIM signatures on incoming emails by
-    fetching public keys from DNS and validating signatures.
+    fetching public keys from DNS and validating signatures. verify()
+    looks keys up synchronously; evaluate() resolves them through an
+    asynchronous DKIMKeyCache and reports per-signature results for an
+    Authentication-Results header.
     """
 
+    # Signatures evaluated per message (bounds the work a message can cause)
+    MAX_SIGNATURES = 5
+
     def __init__(
         self,
         dns_resolver: Optional[str] = None,
         dns_timeout: int = 5,
+        key_cache: Optional[DKIMKeyCache] = None,
     ) -> None:
         """
         Initialize the DKIM verifier.
@@ -496,6 +880,8 @@ class DKIMVerifier:
         Args:
             dns_resolver: Custom DNS resolver address.
             dns_timeout: DNS query timeout in seconds.
+            key_cache: Public key cache used by evaluate() (one using
+                dns_resolver and dns_timeout by default).
         """
         self.dns_timeout = dns_timeout
 
@@ -504,6 +890,10 @@ class DKIMVerifier:
             self._resolver.nameservers = [dns_resolver]
         self._resolver.lifetime = dns_timeout
 
+        self.key_cache = key_cache or DKIMKeyCache(
+            nameserver=dns_resolver, timeout=dns_timeout
+        )
+
         logger.info("Initialized DKIM verifier")
 
     @staticmethod
@@ -548,15 +938,15 @@ class DKIMVerifier:
                     h.strip().lower() for h in value.split(":")
                 ]
             elif tag == "bh":
-                sig.body_hash = value.replace(" ", "").replace("\t", "")
+                sig.body_hash = re.sub(r"\s+", "", value)
             elif tag == "b":
-                sig.signature = value.replace(" ", "").replace("\t", "")
+                sig.signature = re.sub(r"\s+", "", value)
             elif tag == "t":
-                sig.timestamp = int(value)
+                sig.timestamp = _tag_number(tag, value)
             elif tag == "x":
-                sig.expiration = int(value)
+                sig.expiration = _tag_number(tag, value)
             elif tag == "l":
-                sig.body_length = int(value)
+                sig.body_length = _tag_number(tag, value)
 
         # Validate required fields
         if not sig.domain:
@@ -608,73 +998,7 @@ class DKIMVerifier:
         except Exception as e:
             raise DNSLookupError(dkim_domain, "TXT", {"reason": str(e)})
 
-        # Concatenate all TXT record parts
-        txt_data = ""
-        for rdata in answers:
-            for txt_string in rdata.strings:
-                txt_data += txt_string.decode("utf-8", errors="replace")
-
-        # Parse the DKIM record
-        key_data = None
-        for part in txt_data.split(";"):
-            part = part.strip()
-            if part.startswith("p="):
-                key_data = part[2:].replace(" ", "")
-                break
-
-        if not key_data:
-            raise SignatureError(
-                f"No public key (p=) in DKIM record for {dkim_domain}"
-            )
-
-        if key_data == "":
-            raise SignatureError(f"DKIM key revoked for {dkim_domain}")
-
-        # Decode and load the public key
-        try:
-            key_bytes = base64.b64decode(key_data)
-            public_key = serialization.load_der_public_key(
-                key_bytes,
-                backend=default_backend(),
-            )
-            return public_key
-        except Exception as e:
-            raise SignatureError(f"Failed to parse DKIM public key: {e}")
-
-    def _canonicalize_header(self, name: str, value: str, method: str) -> str:
-        """Canonicalize a header according to DKIM specification."""
-        if method == "relaxed":
-            name = name.lower()
-            value = re.sub(r"\r\n[ \t]+", " ", value)
-            value = re.sub(r"[ \t]+", " ", value)
-            value = value.strip()
-            return f"{name}:{value}"
-        else:
-            return f"{name}:{value}"
-
-    def _canonicalize_body(self, body: bytes, method: str) -> bytes:
-        """Canonicalize the message body according to DKIM specification."""
-        if method == "relaxed":
-            body_str = body.decode("utf-8", errors="replace")
-            lines = body_str.split("\n")
-            result_lines = []
-
-            for line in lines:
-                line = line.rstrip(" \t\r")
-                line = re.sub(r"[ \t]+", " ", line)
-                result_lines.append(line)
-
-            result = "\r\n".join(result_lines)
-            result = result.rstrip("\r\n") + "\r\n"
-
-            return result.encode("utf-8")
-        else:
-            body = body.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
-            while body.endswith(b"\r\n\r\n"):
-                body = body[:-2]
-            if not body.endswith(b"\r\n"):
-                body += b"\r\n"
-            return body
+        return parse_key_record(_txt_data(answers), dkim_domain)
 
     def verify(self, message: Union[bytes, str]) -> tuple[bool, str]:
         """
@@ -687,22 +1011,20 @@ class DKIMVerifier:
             Tuple of (is_valid, result_description).
         """
         try:
-            # Parse message
-            if isinstance(message, bytes):
-                msg = message_from_bytes(message)
-                raw_message = message
-            else:
-                msg = message_from_string(message)
-                raw_message = message.encode("utf-8")
+            raw_message = _raw_bytes(message)
+            header_block, body_offset = split_message(raw_message)
+            headers = HeaderIndex(header_block)
 
             # Get DKIM-Signature header
-            dkim_header = msg.get("DKIM-Signature")
+            dkim_header = headers.first("DKIM-Signature")
             if not dkim_header:
                 return False, "No DKIM-Signature header found"
 
             # Parse signature
             try:
-                sig = self.parse_signature(dkim_header)
+                sig = self.parse_signature(
+                    dkim_header[1].decode("ascii", errors="replace")
+                )
             except SignatureError as e:
                 return False, f"Invalid signature format: {e}"
 
@@ -717,103 +1039,161 @@ class DKIMVerifier:
             except (DNSLookupError, SignatureError) as e:
                 return False, f"Failed to fetch public key: {e}"
 
-            # Parse canonicalization methods
-            if "/" in sig.canonicalization:
-                header_canon, body_canon = sig.canonicalization.split("/")
-            else:
-                header_canon = body_canon = sig.canonicalization
-
-            # Extract body
-            raw_str = raw_message.decode("utf-8", errors="replace")
-            if "\r\n\r\n" in raw_str:
-                _, body_str = raw_str.split("\r\n\r\n", 1)
-            elif "\n\n" in raw_str:
-                _, body_str = raw_str.split("\n\n", 1)
-            else:
-                body_str = ""
-            body = body_str.encode("utf-8")
-
-            # Apply body length limit if specified
-            if sig.body_length is not None:
-                body = body[: sig.body_length]
-
-            # Verify body hash
-            canonical_body = self._canonicalize_body(body, body_canon)
-            if sig.algorithm == "rsa-sha256":
-                body_hash = base64.b64encode(
-                    hashlib.sha256(canonical_body).digest()
-                ).decode("ascii")
-            else:
-                body_hash = base64.b64encode(
-                    hashlib.sha1(canonical_body).digest()
-                ).decode("ascii")
-
-            if body_hash != sig.body_hash:
-                return False, "Body hash mismatch"
-
-            # Build headers to verify
-            headers_to_sign = []
-            for header_name in sig.signed_headers:
-                for key in msg.keys():
-                    if key.lower() == header_name:
-                        value = msg[key]
-                        headers_to_sign.append(
-                            self._canonicalize_header(key, value, header_canon)
-                        )
-                        break
-
-            # Add DKIM-Signature header without the b= value
-            dkim_value = re.sub(
-                r"b=[^;]*",
-                "b=",
-                dkim_header,
-                flags=re.IGNORECASE,
+            result = self._check_signature(
+                raw_message, body_offset, headers, dkim_header, sig, public_key
             )
-            dkim_header_canon = self._canonicalize_header(
-                "dkim-signature", dkim_value, header_canon
-            )
-            headers_to_sign.append(dkim_header_canon)
+            return result.passed, result.reason
 
-            # Create data to verify
-            data_to_verify = "\r\n".join(headers_to_sign).encode("utf-8")
+        except Exception as e:
+            logger.error("DKIM verification error: %s", str(e))
+            return False, f"Verification error: {e}"
 
-            # Decode signature
-            try:
-                signature_bytes = base64.b64decode(sig.signature)
-            except Exception:
-                return False, "Invalid signature encoding"
+    async def evaluate(self, message: Union[bytes, str]) -> list[DKIMResult]:
+        """
+        Verify every DKIM signature of a message without blocking the loop.
+
+        Public keys come from the key cache; the body hash and RSA check
+        run in a worker thread. Failures are reported as results rather
+        than raised.
 
-            # Verify signature
+        Args:
+            message: The email message to verify.
+
+        Returns:
+            One DKIMResult per signature (up to MAX_SIGNATURES), or a
+            single "none" result when the message is unsigned.
+        """
+        raw_message = _raw_bytes(message)
+        header_block, body_offset = split_message(raw_message)
+        headers = HeaderIndex(header_block)
+
+        dkim_headers = headers.all("DKIM-Signature")[: self.MAX_SIGNATURES]
+        if not dkim_headers:
+            return [DKIMResult("none", "No DKIM-Signature header found")]
+
+        results = []
+        for dkim_header in dkim_headers:
             try:
-                if sig.algorithm == "rsa-sha256":
-                    hash_alg = hashes.SHA256()
-                else:
-                    hash_alg = hashes.SHA1()
-
-                public_key.verify(
-                    signature_bytes,
-                    data_to_verify,
-                    padding.PKCS1v15(),
-                    hash_alg,
+                sig = self.parse_signature(
+                    dkim_header[1].decode("ascii", errors="replace")
                 )
-
-                logger.info(
-                    "DKIM signature verified for domain=%s, selector=%s",
-                    sig.domain,
-                    sig.selector,
+            except SignatureError as e:
+                results.append(
+                    DKIMResult("permerror", f"Invalid signature format: {e}")
                 )
+                continue
 
-                return True, f"Valid signature from {sig.domain}"
+            if sig.expiration and time.time() > sig.expiration:
+                results.append(_result_for("fail", "Signature has expired", sig))
+                continue
 
-            except Exception as e:
-                logger.warning(
-                    "DKIM signature verification failed: %s", str(e)
+            try:
+                public_key = await self.key_cache.get(sig.domain, sig.selector)
+            except SignatureError as e:
+                results.append(_result_for("permerror", str(e), sig))
+                continue
+            except DNSLookupError as e:
+                results.append(_result_for("temperror", str(e), sig))
+                continue
+
+            try:
+                result = await asyncio.to_thread(
+                    self._check_signature,
+                    raw_message,
+                    body_offset,
+                    headers,
+                    dkim_header,
+                    sig,
+                    public_key,
                 )
-                return False, "Signature verification failed"
+            except Exception as e:
+                logger.error("DKIM verification error: %s", str(e))
+                result = _result_for("permerror", f"Verification error: {e}", sig)
+            results.append(result)
+
+        return results
+
+    def _check_signature(
+        self,
+        raw_message: bytes,
+        body_offset: int,
+        headers: HeaderIndex,
+        dkim_header: tuple[bytes, bytes],
+        sig: DKIMSignature,
+        public_key: RSAPublicKey,
+    ) -> DKIMResult:
+        """Check the body hash and the RSA signature of one signature."""
+        header_canon, body_canon = _split_canonicalization(sig.canonicalization)
+
+        # Verify body hash
+        hasher = BodyHasher(sig.algorithm, body_canon, sig.body_length)
+        for start in range(body_offset, len(raw_message), BODY_CHUNK_SIZE):
+            hasher.update(raw_message[start : start + BODY_CHUNK_SIZE])
+        if hasher.finalize() != sig.body_hash:
+            return _result_for("fail", "Body hash mismatch", sig)
+
+        # Signed headers, then the DKIM-Signature without the b= value
+        dkim_name, dkim_value = dkim_header
+        data_to_verify = b"".join(
+            canonicalize_header(name, value, header_canon) + b"\r\n"
+            for name, value in headers.select(sig.signed_headers)
+        ) + canonicalize_header(
+            dkim_name, _B_TAG.sub(rb"\1\2", dkim_value), header_canon
+        )
 
+        # Decode signature
+        try:
+            signature_bytes = base64.b64decode(sig.signature)
+        except Exception:
+            return _result_for("permerror", "Invalid signature encoding", sig)
+
+        # Verify signature
+        try:
+            public_key.verify(
+                signature_bytes,
+                data_to_verify,
+                padding.PKCS1v15(),
+                _signature_hash(sig.algorithm),
+            )
         except Exception as e:
-            logger.error("DKIM verification error: %s", str(e))
-            return False, f"Verification error: {e}"
+            logger.warning("DKIM signature verification failed: %s", str(e))
+            return _result_for("fail", "Signature verification failed", sig)
+
+        logger.info(
+            "DKIM signature verified for domain=%s, selector=%s",
+            sig.domain,
+            sig.selector,
+        )
+        return _result_for("pass", f"Valid signature from {sig.domain}", sig)
+
+
+def _result_for(result: str, reason: str, sig: DKIMSignature) -> DKIMResult:
+    """DKIMResult for a parsed signature."""
+    return DKIMResult(
+        result,
+        reason,
+        domain=sig.domain,
+        selector=sig.selector,
+        signature=sig.signature,
+    )
+
+
+def format_authentication_results(
+    authserv_id: str, results: list[DKIMResult]
+) -> str:
+    """
+    Build an Authentication-Results header value (RFC 8601).
+
+    Args:
+        authserv_id: Name of the host that did the checks.
+        results: DKIM results, e.g. from DKIMVerifier.evaluate().
+
+    Returns:
+        The header value, e.g.
+        ``mx.example.org; dkim=pass header.d=example.com header.s=mail``.
+    """
+    methods = [result.to_method() for result in results] or ["dkim=none"]
+    return "; ".join([authserv_id, *methods])
 
 
 def generate_dkim_keys(
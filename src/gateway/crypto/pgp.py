@@ -18,7 +18,7 @@ try:
 except ImportError:
     gnupg = None  # type: ignore
 
-from src.common.exceptions import (
+from common.exceptions import (
     CryptoError,
     DecryptionError,
     EncryptionError,
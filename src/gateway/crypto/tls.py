@@ -25,7 +25,7 @@ from cryptography.hazmat.primitives.asymmetric.ec import (
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey
 from cryptography.x509.oid import ExtendedKeyUsageOID, NameOID
 
-from src.common.exceptions import ConfigurationError, CryptoError
+from common.exceptions import ConfigurationError, CryptoError
 
 logger = logging.getLogger(__name__)
 
@@ -122,7 +122,8 @@ class TLSConfig:
     ocsp_stapling: bool = True
 
     # Session settings
-    session_cache_mode: int = ssl.SESS_CACHE_SERVER
+    # OpenSSL SSL_SESS_CACHE_SERVER; the ssl module does not export it
+    session_cache_mode: int = getattr(ssl, "SESS_CACHE_SERVER", 2)
     session_timeout: int = 300
 
     # ALPN protocols
@@ -13,9 +13,15 @@ from .composer import (
     EmailRecipient,
     create_email_composer,
 )
+from .dns_cache import DNSCache, DNSCacheStats
+from .executor import CPUExecutor, ExecutorStats, MessageRenderer, RenderOptions
 from .parser import Attachment, EmailParser, ParsedEmail
+from .pool import PoolKey, PoolStats, SMTPConnectionPool, TLSMode
 from .queue import (
     DeliveryStatus as QueueDeliveryStatus,
+    DomainLimits,
+    DomainScheduler,
+    DomainStats,
     QueueConfig,
     QueueEvent,
     QueueManager,
@@ -23,6 +29,7 @@ from .queue import (
     create_queue_manager,
 )
 from .receiver import (
+    RecipientLookups,
     SMTPAuthenticator,
     SMTPHandler,
     SMTPReceiver,
@@ -37,6 +44,8 @@ from .sender import (
     SMTPSender,
     create_smtp_sender,
 )
+from .spool import InboundSpool, SpoolEntry, SpoolProcessor, SpoolStats
+from .supervisor import QueueSupervisor, StatsReporter, aggregate_stats
 from .worker import (
     BaseQueueWorker,
     DeliveryResult as WorkerDeliveryResult,
@@ -55,6 +64,12 @@ __all__ = [
     "SMTPAuthenticator",
     "SMTPHandler",
     "SMTPReceiver",
+    "RecipientLookups",
+    # Inbound spool
+    "InboundSpool",
+    "SpoolEntry",
+    "SpoolProcessor",
+    "SpoolStats",
     # Sender classes
     "SMTPSender",
     "DeliveryStatus",
@@ -62,6 +77,19 @@ __all__ = [
     "BatchDeliveryResult",
     "MXRecord",
     "RelayConfig",
+    # Connection pooling
+    "SMTPConnectionPool",
+    "PoolKey",
+    "PoolStats",
+    "TLSMode",
+    # DNS caching
+    "DNSCache",
+    "DNSCacheStats",
+    # CPU offload
+    "CPUExecutor",
+    "ExecutorStats",
+    "MessageRenderer",
+    "RenderOptions",
     # Composer classes
     "EmailComposer",
     "ComposedEmail",
@@ -73,6 +101,11 @@ __all__ = [
     "QueueStats",
     "QueueEvent",
     "QueueDeliveryStatus",
+    "QueueSupervisor",
+    "StatsReporter",
+    "DomainScheduler",
+    "DomainLimits",
+    "DomainStats",
     # Worker classes
     "QueueWorker",
     "BaseQueueWorker",
@@ -85,4 +118,5 @@ __all__ = [
     "create_smtp_sender",
     "create_email_composer",
     "create_queue_manager",
+    "aggregate_stats",
 ]
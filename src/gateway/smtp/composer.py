@@ -19,8 +19,8 @@ from email.utils import format_datetime, make_msgid
 from pathlib import Path
 from typing import Any, Optional, Union
 
-from ...common.exceptions import InvalidMessageError
-from ...common.models import Message, MessagePriority
+from common.exceptions import InvalidMessageError
+from common.models import Message, MessagePriority
 
 logger = logging.getLogger(__name__)
 
@@ -0,0 +1,248 @@
+"""
+Asynchronous DNS cache for outbound delivery.
+
+MX and address lookups are resolved with dnspython's asyncio resolver and
+cached for the TTL of the answer. Names that do not exist (NXDOMAIN) or
+have no records of the requested type (NoAnswer) are cached negatively
+for the SOA negative TTL (RFC 2308), so a typo'd domain is not re-queried
+for every queued recipient. Concurrent lookups of the same name share a
+single in-flight query. Transient failures (timeouts, SERVFAIL) are never
+cached.
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import dns.asyncresolver
+import dns.rdatatype
+import dns.resolver
+
+logger = logging.getLogger(__name__)
+
+# Answers are kept at most this long regardless of the record TTL
+DEFAULT_MAX_TTL = 3600
+
+# Negative answers are kept at most this long (also used without an SOA)
+DEFAULT_NEGATIVE_TTL = 300
+
+DEFAULT_MAX_ENTRIES = 10000
+
+
+@dataclass
+class DNSCacheStats:
+    """DNS cache counters."""
+
+    hits: int = 0
+    negative_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    entries: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered without a new query."""
+        total = self.hits + self.negative_hits + self.coalesced + self.misses
+        if total == 0:
+            return 0.0
+        return (total - self.misses) / total
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "entries": self.entries,
+            "hit_rate": self.hit_rate,
+        }
+
+
+@dataclass
+class _CacheEntry:
+    """A cached answer: records, or the negative-answer exception."""
+
+    expires_at: float
+    records: tuple = ()
+    error: Optional[dns.resolver.NXDOMAIN | dns.resolver.NoAnswer] = None
+
+
+class DNSCache:
+    """
+    TTL-honouring DNS cache with negative caching and request coalescing.
+
+    The resolver is anything with dnspython's asyncio resolver interface:
+    ``await resolver.resolve(name, rdtype)`` returning an answer that
+    iterates over rdata and exposes ``rrset.ttl``, and raising
+    dns.resolver.NXDOMAIN / NoAnswer for negative answers.
+
+    Example:
+        cache = DNSCache()
+        answers = await cache.resolve("example.com", "MX")
+    """
+
+    def __init__(
+        self,
+        resolver: Optional[Any] = None,
+        nameserver: Optional[str] = None,
+        timeout: float = 30.0,
+        max_ttl: int = DEFAULT_MAX_TTL,
+        negative_ttl: int = DEFAULT_NEGATIVE_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            resolver: Resolver to query (a dnspython asyncio resolver by
+                default).
+            nameserver: Nameserver address for the default resolver.
+            timeout: Query lifetime in seconds for the default resolver.
+            max_ttl: Upper bound in seconds on how long answers are kept.
+            negative_ttl: Upper bound in seconds on how long negative
+                answers are kept.
+            max_entries: Cached names kept before the least recently used
+                are evicted.
+            clock: Monotonic time source.
+        """
+        self._resolver = resolver
+        self.nameserver = nameserver
+        self.timeout = timeout
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._clock = clock
+
+        self._entries: OrderedDict[tuple[str, str], _CacheEntry] = OrderedDict()
+        self._inflight: dict[tuple[str, str], asyncio.Task] = {}
+        self._stats = DNSCacheStats()
+
+    @property
+    def resolver(self) -> Any:
+        """Get or create the asyncio resolver."""
+        if self._resolver is None:
+            self._resolver = dns.asyncresolver.Resolver()
+            if self.nameserver:
+                self._resolver.nameservers = [self.nameserver]
+            self._resolver.lifetime = self.timeout
+        return self._resolver
+
+    @property
+    def stats(self) -> DNSCacheStats:
+        """Current cache counters."""
+        self._stats.entries = len(self._entries)
+        return self._stats
+
+    async def resolve(self, name: str, rdtype: str) -> list:
+        """
+        Resolve a name, answering from the cache where possible.
+
+        Args:
+            name: DNS name to look up.
+            rdtype: Record type, e.g. "MX" or "A".
+
+        Returns:
+            List of rdata objects.
+
+        Raises:
+            dns.resolver.NXDOMAIN: If the name does not exist.
+            dns.resolver.NoAnswer: If the name has no records of the type.
+            dns.exception.DNSException: For other lookup failures.
+        """
+        key = (name.lower().rstrip("."), rdtype.upper())
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > self._clock():
+                self._entries.move_to_end(key)
+                if entry.error is not None:
+                    self._stats.negative_hits += 1
+                    raise entry.error.with_traceback(None)
+                self._stats.hits += 1
+                return list(entry.records)
+            del self._entries[key]
+
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not loop:
+            self._stats.misses += 1
+            task = loop.create_task(self._query(key))
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        else:
+            self._stats.coalesced += 1
+
+        # Shielded so one caller giving up does not cancel the shared query
+        return list(await asyncio.shield(task))
+
+    def clear(self) -> None:
+        """Drop every cached answer."""
+        self._entries.clear()
+
+    async def _query(self, key: tuple[str, str]) -> tuple:
+        """Query the resolver and cache the outcome."""
+        name, rdtype = key
+        logger.debug("DNS cache miss for %s %s", rdtype, name)
+        try:
+            answer = await self.resolver.resolve(name, rdtype)
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer) as e:
+            ttl = _negative_ttl(e, self.negative_ttl)
+            self._store(key, _CacheEntry(self._expiry(ttl), error=e))
+            raise
+
+        records = tuple(answer)
+        self._store(key, _CacheEntry(self._expiry(answer.rrset.ttl), records=records))
+        return records
+
+    def _expiry(self, ttl: int) -> float:
+        """Monotonic expiry time for a TTL, capped at max_ttl."""
+        return self._clock() + min(ttl, self.max_ttl)
+
+    def _store(self, key: tuple[str, str], entry: _CacheEntry) -> None:
+        """Cache an entry, evicting the least recently used if full."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats.evictions += 1
+
+    def _forget(self, key: tuple[str, str], task: asyncio.Task) -> None:
+        """Drop a finished query from the in-flight table."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved when every caller has gone away
+        if not task.cancelled():
+            task.exception()
+
+
+def _negative_ttl(
+    error: dns.resolver.NXDOMAIN | dns.resolver.NoAnswer, cap: int
+) -> int:
+    """
+    Negative-caching TTL from the SOA in the authority section (RFC 2308).
+
+    Args:
+        error: The NXDOMAIN or NoAnswer raised by the resolver.
+        cap: Maximum TTL, also used when the response carries no SOA.
+
+    Returns:
+        TTL in seconds.
+    """
+    if isinstance(error, dns.resolver.NXDOMAIN):
+        responses = list(error.kwargs.get("responses", {}).values())
+    else:
+        responses = [error.kwargs.get("response")]
+
+    for response in responses:
+        for rrset in getattr(response, "authority", None) or ():
+            if rrset.rdtype == dns.rdatatype.SOA:
+                return min(rrset.ttl, rrset[0].minimum, cap)
+    return cap
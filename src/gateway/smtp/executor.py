@@ -0,0 +1,296 @@
+"""
+Process pool for CPU-bound outbound message work.
+
+Building the MIME tree (EmailComposer) and DKIM signing (an RSA private-key
+operation over the canonicalized headers) are pure CPU work. Run on the
+event loop they stall every other delivery in the process for the
+duration. CPUExecutor runs them in a bounded pool of worker processes.
+
+Only bytes cross the process boundary: a message goes in as JSON and comes
+back as the finished RFC 5322 message. Each pool process builds its
+composer and DKIM signer once, when it starts, so no model objects, keys
+or composer state are pickled per call.
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from pydantic import ValidationError
+
+from common.exceptions import InvalidMessageError
+from common.models import Message
+
+from .composer import EmailComposer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RenderOptions:
+    """How outgoing messages are composed and signed."""
+
+    default_domain: str = "localhost"
+    organization: Optional[str] = None
+    x_mailer: Optional[str] = None
+    # DKIM signing is enabled when a domain and a key are configured
+    dkim_domain: Optional[str] = None
+    dkim_selector: str = "unitmail"
+    dkim_private_key_path: Optional[str] = None
+
+    @property
+    def signing_enabled(self) -> bool:
+        """Whether messages are DKIM signed."""
+        return bool(self.dkim_domain and self.dkim_private_key_path)
+
+
+class MessageRenderer:
+    """
+    Turns a stored message into the bytes sent over SMTP.
+
+    Composes the message and, when configured, prepends a DKIM signature.
+    Used directly on the event loop when no CPUExecutor is configured, and
+    inside each CPUExecutor process otherwise.
+    """
+
+    def __init__(
+        self,
+        options: Optional[RenderOptions] = None,
+        composer: Optional[EmailComposer] = None,
+    ) -> None:
+        """
+        Initialize the renderer.
+
+        Args:
+            options: Composition and signing options.
+            composer: EmailComposer to use (built from options by default).
+
+        Raises:
+            CryptoError: If the DKIM private key cannot be loaded.
+        """
+        self.options = options or RenderOptions()
+        self._composer = composer or EmailComposer(
+            default_domain=self.options.default_domain,
+            organization=self.options.organization,
+            x_mailer=self.options.x_mailer,
+        )
+
+        self._signer = None
+        if self.options.signing_enabled:
+            from gateway.crypto.dkim import DKIMSigner
+
+            self._signer = DKIMSigner(
+                domain=self.options.dkim_domain,
+                selector=self.options.dkim_selector,
+                private_key_path=self.options.dkim_private_key_path,
+            )
+
+    def render(self, message: dict) -> bytes:
+        """
+        Compose (and sign) a message.
+
+        Args:
+            message: Stored message dictionary.
+
+        Returns:
+            The message as sent over SMTP.
+
+        Raises:
+            InvalidMessageError: If the message cannot be composed.
+            CryptoError: If signing fails.
+        """
+        try:
+            model = Message.model_validate(message)
+        except ValidationError as e:
+            raise InvalidMessageError(f"Invalid message: {e}")
+
+        raw = self._composer.compose_from_message(model).encode("utf-8")
+        if self._signer is not None:
+            raw = self._signer.sign_message(raw)
+        return raw
+
+    def render_json(self, payload: bytes) -> bytes:
+        """Render a message serialized with encode_message()."""
+        return self.render(json.loads(payload))
+
+
+def encode_message(message: dict) -> bytes:
+    """Serialize a stored message for a pool process."""
+    return json.dumps(message, default=str).encode("utf-8")
+
+
+# Renderer of the current pool process, built by _init_process()
+_process_renderer: Optional[MessageRenderer] = None
+
+
+def _init_process(options: RenderOptions) -> None:
+    """Pool process initializer: build the renderer once."""
+    global _process_renderer
+    _process_renderer = MessageRenderer(options)
+
+
+def _render_in_process(payload: bytes) -> bytes:
+    """Pool task: render one encoded message."""
+    return _process_renderer.render_json(payload)
+
+
+@dataclass
+class ExecutorStats:
+    """CPUExecutor counters."""
+
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    running: int = 0
+    waiting: int = 0
+    pool_restarts: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "running": self.running,
+            "waiting": self.waiting,
+            "pool_restarts": self.pool_restarts,
+        }
+
+
+class CPUExecutor:
+    """
+    Bounded process pool for composing and signing outgoing messages.
+
+    At most ``max_pending`` tasks are handed to the pool at a time; further
+    callers wait on the event loop, so a large batch cannot queue an
+    unbounded backlog of payloads in the pool. A pool broken by a crashed
+    process is replaced on the next call.
+
+    Example:
+        executor = CPUExecutor(max_workers=4, options=RenderOptions(...))
+        raw = await executor.render(message)
+        executor.close()
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        options: Optional[RenderOptions] = None,
+        start_method: str = "spawn",
+    ) -> None:
+        """
+        Initialize the executor (processes start on first use).
+
+        Args:
+            max_workers: Pool processes (defaults to the CPU count).
+            max_pending: Tasks handed to the pool at once (defaults to
+                twice max_workers).
+            options: Composition and signing options for the pool
+                processes.
+            start_method: multiprocessing start method.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.max_workers
+        self.options = options or RenderOptions()
+        self._context = multiprocessing.get_context(start_method)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._stats = ExecutorStats()
+
+    @property
+    def stats(self) -> ExecutorStats:
+        """Current counters."""
+        return self._stats
+
+    async def render(self, message: dict) -> bytes:
+        """
+        Compose (and sign) a message in a pool process.
+
+        Args:
+            message: Stored message dictionary.
+
+        Returns:
+            The message as sent over SMTP.
+
+        Raises:
+            InvalidMessageError: If the message cannot be composed.
+            CryptoError: If signing fails.
+            BrokenProcessPool: If a pool process died during the call.
+        """
+        return await self.submit(_render_in_process, encode_message(message))
+
+    async def submit(self, fn: Callable[[bytes], bytes], payload: bytes) -> bytes:
+        """
+        Run ``fn(payload)`` in a pool process.
+
+        Args:
+            fn: Module-level function taking and returning bytes.
+            payload: Input bytes.
+
+        Returns:
+            The bytes returned by fn.
+        """
+        self._stats.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._stats.waiting -= 1
+
+        self._stats.submitted += 1
+        self._stats.running += 1
+        try:
+            pool = self._get_pool()
+            result = await asyncio.get_running_loop().run_in_executor(
+                pool, fn, payload
+            )
+        except BrokenProcessPool:
+            self._stats.failed += 1
+            self._discard_pool(pool)
+            raise
+        except BaseException:
+            self._stats.failed += 1
+            raise
+        finally:
+            self._stats.running -= 1
+            self._slots.release()
+
+        self._stats.completed += 1
+        return result
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Shut the pool down.
+
+        Args:
+            wait: Wait for running tasks to finish.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Get or start the process pool."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=self._context,
+                initializer=_init_process,
+                initargs=(self.options,),
+            )
+            logger.info("Started CPU executor with %d processes", self.max_workers)
+        return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Drop a broken pool so the next call starts a fresh one."""
+        if self._pool is pool:
+            logger.error("CPU executor process died; restarting the pool")
+            self._pool = None
+            self._stats.pool_restarts += 1
+            pool.shutdown(wait=False, cancel_futures=True)
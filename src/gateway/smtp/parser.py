@@ -6,6 +6,7 @@ extracting headers, body content, and attachments with proper
 handling of MIME multipart messages and various encodings.
 """
 
+import binascii
 import email
 import email.header
 import email.utils
@@ -15,11 +16,20 @@ import re
 from dataclasses import dataclass, field
 from datetime import datetime
 from email.message import Message
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Iterator, Optional
 from uuid import uuid4
 
+if TYPE_CHECKING:
+    from common.storage.blobs import BlobRef, BlobStore
+
 logger = logging.getLogger(__name__)
 
+# Encoded characters decoded per step when streaming an attachment
+DECODE_CHUNK_SIZE = 64 * 1024
+
+# Characters ignored in base64 content (line breaks and stray bytes)
+_NON_BASE64 = re.compile(r"[^A-Za-z0-9+/=]+")
+
 
 @dataclass
 class Attachment:
@@ -33,6 +43,9 @@ class Attachment:
     content_id: Optional[str] = None
     content_disposition: str = "attachment"
     encoding: Optional[str] = None
+    # Set when the content was written to a blob store instead of kept
+    checksum: Optional[str] = None
+    storage_path: Optional[str] = None
 
     def to_dict(self) -> dict[str, Any]:
         """Convert attachment to dictionary for database storage."""
@@ -44,7 +57,8 @@ class Attachment:
             "content_id": self.content_id,
             "content_disposition": self.content_disposition,
             "encoding": self.encoding,
-            # Note: content bytes are stored separately in object storage
+            "checksum": self.checksum,
+            "path": self.storage_path,
         }
 
 
@@ -132,14 +146,21 @@ class EmailParser:
         "auto-submitted",
     }
 
-    def __init__(self, max_attachment_size: int = 50 * 1024 * 1024) -> None:
+    def __init__(
+        self,
+        max_attachment_size: int = 50 * 1024 * 1024,
+        blob_store: Optional["BlobStore"] = None,
+    ) -> None:
         """
         Initialize the email parser.
 
         Args:
             max_attachment_size: Maximum size for individual attachments in bytes.
+            blob_store: Store that attachment content is decoded into. When
+                None the content is kept on each Attachment instead.
         """
         self.max_attachment_size = max_attachment_size
+        self.blob_store = blob_store
 
     def parse(self, raw_message: bytes | str) -> ParsedEmail:
         """
@@ -263,15 +284,14 @@ class EmailParser:
         else:
             # Single part message
             content_type = msg.get_content_type()
-            payload = self._get_payload_decoded(msg)
 
             if content_type == "text/plain":
-                parsed.body_text = payload
+                parsed.body_text = self._get_payload_decoded(msg)
             elif content_type == "text/html":
-                parsed.body_html = payload
+                parsed.body_html = self._get_payload_decoded(msg)
             else:
                 # Treat as attachment
-                attachment = self._create_attachment(msg, payload)
+                attachment = self._create_attachment(msg)
                 if attachment:
                     parsed.attachments.append(attachment)
 
@@ -293,8 +313,7 @@ class EmailParser:
             )
 
             if is_attachment:
-                payload = self._get_payload_bytes(part)
-                attachment = self._create_attachment(part, payload)
+                attachment = self._create_attachment(part)
                 if attachment:
                     parsed.attachments.append(attachment)
             elif content_type == "text/plain" and not parsed.body_text:
@@ -303,29 +322,37 @@ class EmailParser:
                 parsed.body_html = self._get_payload_decoded(part)
             elif content_disposition == "inline":
                 # Inline content that's not text - treat as inline attachment
-                payload = self._get_payload_bytes(part)
-                attachment = self._create_attachment(part, payload)
+                attachment = self._create_attachment(part)
                 if attachment:
                     attachment.content_disposition = "inline"
                     parsed.attachments.append(attachment)
 
-    def _create_attachment(
-        self, part: Message, payload: bytes | str
-    ) -> Optional[Attachment]:
-        """Create an Attachment object from a message part."""
-        if isinstance(payload, str):
-            content = payload.encode("utf-8", errors="replace")
+    def _create_attachment(self, part: Message) -> Optional[Attachment]:
+        """
+        Create an Attachment object from a message part.
+
+        With a blob store the decoded content is streamed into it and the
+        attachment records its checksum; otherwise the content is kept.
+        """
+        blob: Optional["BlobRef"] = None
+        content = b""
+        if self.blob_store is not None:
+            blob = self._write_blob(part)
+            if blob is None:
+                return None
+            size = blob.size
         else:
-            content = payload
-
-        # Check size limit
-        if len(content) > self.max_attachment_size:
-            logger.warning(
-                "Attachment exceeds size limit: %d > %d",
-                len(content),
-                self.max_attachment_size,
-            )
-            return None
+            content = self._get_payload_bytes(part)
+            size = len(content)
+
+            # Check size limit
+            if size > self.max_attachment_size:
+                logger.warning(
+                    "Attachment exceeds size limit: %d > %d",
+                    size,
+                    self.max_attachment_size,
+                )
+                return None
 
         filename = part.get_filename()
         if filename:
@@ -348,12 +375,91 @@ class EmailParser:
             filename=filename,
             content_type=content_type,
             content=content,
-            size=len(content),
+            size=size,
             content_id=content_id,
             content_disposition=part.get_content_disposition() or "attachment",
             encoding=encoding,
+            checksum=blob.checksum if blob else None,
+            storage_path=(
+                self.blob_store.relative_path(blob.checksum) if blob else None
+            ),
         )
 
+    def _write_blob(self, part: Message) -> Optional["BlobRef"]:
+        """
+        Decode a part's content into the blob store.
+
+        Returns:
+            The stored blob, or None if it exceeds the size limit.
+        """
+        writer = self.blob_store.writer()
+        try:
+            try:
+                for chunk in self._iter_payload_chunks(part):
+                    writer.write(chunk)
+                    if writer.size > self.max_attachment_size:
+                        break
+            except (binascii.Error, ValueError):
+                # Malformed encoding: fall back to the lenient decoder
+                writer.abort()
+                writer = self.blob_store.writer()
+                writer.write(self._get_payload_bytes(part))
+
+            if writer.size > self.max_attachment_size:
+                logger.warning(
+                    "Attachment exceeds size limit: > %d",
+                    self.max_attachment_size,
+                )
+                writer.abort()
+                return None
+            return writer.commit()
+        except BaseException:
+            writer.abort()
+            raise
+
+    def _iter_payload_chunks(self, part: Message) -> Iterator[bytes]:
+        """
+        Decode a part's content transfer encoding piece by piece.
+
+        base64 and quoted-printable bodies are decoded DECODE_CHUNK_SIZE
+        characters at a time, so the decoded content never has to exist
+        as a whole in memory.
+
+        Raises:
+            binascii.Error, ValueError: If the encoding is malformed.
+        """
+        encoded = part.get_payload()
+        cte = str(part.get("Content-Transfer-Encoding", "")).strip().lower()
+        if not isinstance(encoded, str) or cte not in (
+            "base64",
+            "quoted-printable",
+        ):
+            yield self._get_payload_bytes(part)
+            return
+
+        if cte == "base64":
+            carry = ""
+            for start in range(0, len(encoded), DECODE_CHUNK_SIZE):
+                data = carry + _NON_BASE64.sub(
+                    "", encoded[start : start + DECODE_CHUNK_SIZE]
+                )
+                usable = len(data) - len(data) % 4
+                carry = data[usable:]
+                if usable:
+                    yield binascii.a2b_base64(data[:usable])
+            if carry:
+                yield binascii.a2b_base64(carry + "=" * (-len(carry) % 4))
+            return
+
+        # Quoted-printable: cut at line ends so no escape is split
+        start = 0
+        while start < len(encoded):
+            end = encoded.find("\n", start + DECODE_CHUNK_SIZE) + 1
+            if end == 0:
+                end = len(encoded)
+            yield binascii.a2b_qp(encoded[start:end].encode("ascii"))
+            start = end
+
     def _get_payload_decoded(self, part: Message) -> str:
         """Get decoded text payload from message part."""
         try:
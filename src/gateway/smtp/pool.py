@@ -0,0 +1,231 @@
+"""
+SMTP connection pooling for unitMail.
+
+Outbound delivery reuses SMTP sessions that have already been through the
+TCP connect, EHLO, STARTTLS and AUTH exchange instead of paying for them
+on every message. Connections are pooled per destination (host, port and
+TLS mode), retired after a configurable number of messages, and closed
+with QUIT once they have sat idle for longer than the idle timeout.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Awaitable, Callable, Optional
+
+import aiosmtplib
+
+logger = logging.getLogger(__name__)
+
+
+class TLSMode(str, Enum):
+    """How a pooled connection is secured."""
+
+    NONE = "none"
+    OPPORTUNISTIC = "opportunistic"  # STARTTLS when the server offers it
+    STARTTLS = "starttls"  # STARTTLS required
+    IMPLICIT = "implicit"  # TLS from the first byte (port 465)
+
+
+@dataclass(frozen=True)
+class PoolKey:
+    """Destination a pooled connection is bound to."""
+
+    host: str
+    port: int
+    tls: TLSMode
+
+
+@dataclass
+class PooledConnection:
+    """An open SMTP session checked out of the pool."""
+
+    key: PoolKey
+    smtp: aiosmtplib.SMTP
+    messages_sent: int = 0
+    reused: bool = False
+    last_used: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class PoolStats:
+    """Connection pool counters."""
+
+    connections_opened: int = 0
+    connections_reused: int = 0
+    connections_closed: int = 0
+    idle: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        """Convert to dictionary."""
+        return {
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+            "connections_closed": self.connections_closed,
+            "idle": self.idle,
+        }
+
+
+class SMTPConnectionPool:
+    """
+    Pool of open SMTP connections keyed by destination.
+
+    Connections are opened by the ``connect`` callback, which returns a
+    connected (and, where needed, TLS-upgraded and authenticated)
+    aiosmtplib.SMTP. Checked-in connections are reused most recently used
+    first. The pool is bound to the event loop it is first used on; idle
+    connections from a previous loop are dropped.
+
+    Example:
+        pool = SMTPConnectionPool(open_connection)
+        conn = await pool.acquire(key)
+        try:
+            await conn.smtp.sendmail(sender, recipients, data)
+            conn.messages_sent += 1
+        except Exception:
+            await pool.discard(conn)
+            raise
+        await pool.release(conn)
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[PoolKey], Awaitable[aiosmtplib.SMTP]],
+        idle_timeout: float = 30.0,
+        max_messages_per_connection: int = 100,
+        max_idle_per_key: int = 8,
+    ) -> None:
+        """
+        Initialize the pool.
+
+        Args:
+            connect: Coroutine function opening a connection for a key.
+            idle_timeout: Seconds an unused connection is kept open.
+            max_messages_per_connection: Messages sent before a connection
+                is retired.
+            max_idle_per_key: Idle connections kept per destination.
+        """
+        self._connect = connect
+        self.idle_timeout = idle_timeout
+        self.max_messages_per_connection = max_messages_per_connection
+        self.max_idle_per_key = max_idle_per_key
+
+        self._idle: dict[PoolKey, list[PooledConnection]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reaper: Optional[asyncio.Task] = None
+        self._stats = PoolStats()
+
+    @property
+    def stats(self) -> PoolStats:
+        """Current pool counters."""
+        self._stats.idle = sum(len(conns) for conns in self._idle.values())
+        return self._stats
+
+    async def acquire(self, key: PoolKey) -> PooledConnection:
+        """
+        Check out a connection to a destination, opening one if needed.
+
+        Args:
+            key: Destination to connect to.
+
+        Returns:
+            A connection the caller owns until release() or discard().
+
+        Raises:
+            Whatever the connect callback raises.
+        """
+        self._bind_loop()
+
+        idle = self._idle.get(key)
+        now = time.monotonic()
+        while idle:
+            conn = idle.pop()
+            if conn.smtp.is_connected and now - conn.last_used < self.idle_timeout:
+                conn.reused = True
+                self._stats.connections_reused += 1
+                return conn
+            await self._close(conn)
+
+        smtp = await self._connect(key)
+        self._stats.connections_opened += 1
+        logger.debug("Opened SMTP connection to %s:%d", key.host, key.port)
+        return PooledConnection(key=key, smtp=smtp)
+
+    async def release(self, conn: PooledConnection) -> None:
+        """
+        Check a connection back in.
+
+        Connections that were dropped, reached max_messages_per_connection
+        or would exceed max_idle_per_key are closed instead.
+        """
+        idle = self._idle.setdefault(conn.key, [])
+        if (
+            not conn.smtp.is_connected
+            or conn.messages_sent >= self.max_messages_per_connection
+            or len(idle) >= self.max_idle_per_key
+        ):
+            await self._close(conn)
+            return
+
+        conn.last_used = time.monotonic()
+        idle.append(conn)
+        self._start_reaper()
+
+    async def discard(self, conn: PooledConnection) -> None:
+        """Close a connection that must not be reused."""
+        await self._close(conn)
+
+    async def close(self) -> None:
+        """Close every idle connection and stop the reaper."""
+        if self._reaper and not self._reaper.done():
+            self._reaper.cancel()
+        self._reaper = None
+
+        idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                await self._close(conn)
+
+    def _bind_loop(self) -> None:
+        """Forget connections that belong to a different event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._loop is not None:
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.smtp.close()
+                    self._stats.connections_closed += 1
+            self._idle = {}
+            self._reaper = None
+        self._loop = loop
+
+    def _start_reaper(self) -> None:
+        """Ensure the idle reaper is running."""
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.get_running_loop().create_task(self._reap())
+
+    async def _reap(self) -> None:
+        """Close idle connections as they pass the idle timeout."""
+        while any(self._idle.values()):
+            await asyncio.sleep(self.idle_timeout / 2)
+            cutoff = time.monotonic() - self.idle_timeout
+            for key, conns in list(self._idle.items()):
+                expired = [c for c in conns if c.last_used <= cutoff]
+                if not expired:
+                    continue
+                self._idle[key] = [c for c in conns if c.last_used > cutoff]
+                for conn in expired:
+                    await self._close(conn)
+
+    async def _close(self, conn: PooledConnection) -> None:
+        """QUIT a connection, falling back to dropping the transport."""
+        self._stats.connections_closed += 1
+        if not conn.smtp.is_connected:
+            return
+        try:
+            await asyncio.wait_for(conn.smtp.quit(), timeout=5)
+        except (aiosmtplib.SMTPException, OSError, asyncio.TimeoutError):
+            conn.smtp.close()
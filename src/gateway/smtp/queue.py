@@ -8,18 +8,29 @@ Uses SQLite for persistence.
 
 import asyncio
 import logging
+import os
+import socket
+import time
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from enum import Enum
 from typing import Any, Callable, Optional
+from uuid import uuid4
 
 from pydantic import BaseModel, Field
 
 from common.storage import EmailStorage, get_storage
+from common.storage.notify import QueueDoorbell
 from common.exceptions import (
     MessageQueueError,
 )
 
+from .executor import CPUExecutor, MessageRenderer, RenderOptions
+from .sender import SMTPSender, create_smtp_sender
+from .worker import THROTTLE_ERROR_TYPES, log_lost_claim
+from .worker import DeliveryResult as WorkerDeliveryResult
+
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +58,25 @@ RETRY_INTERVALS = [
 DEFAULT_MAX_RETRIES = len(RETRY_INTERVALS)
 
 
+# Idle domains are forgotten once more than this many are tracked
+MAX_TRACKED_DOMAINS = 1000
+
+# Claims made per wakeup to look past items handed back for busy domains
+MAX_RECLAIMS_PER_WAKEUP = 12
+
+
+class DomainStats(BaseModel):
+    """Scheduler statistics for one recipient domain."""
+
+    active: int = 0
+    concurrency_limit: int = 0
+    dispatched: int = 0
+    deferred: int = 0
+    throttle_events: int = 0
+    backoff_level: int = 0
+    backoff_remaining_seconds: float = 0.0
+
+
 class QueueStats(BaseModel):
     """Statistics for the email queue."""
 
@@ -63,6 +93,8 @@ class QueueStats(BaseModel):
     is_running: bool = False
     started_at: Optional[datetime] = None
     uptime_seconds: float = 0.0
+    domains: dict[str, DomainStats] = Field(default_factory=dict)
+    throttled_domains: int = 0
 
 
 class QueueEvent(BaseModel):
@@ -79,6 +111,18 @@ class QueueEvent(BaseModel):
     metadata: dict[str, Any] = Field(default_factory=dict)
 
 
+@dataclass
+class DomainLimits:
+    """Delivery limits for one recipient domain."""
+
+    # Simultaneous deliveries; None means half the workers (at least one)
+    max_concurrency: Optional[int] = None
+    # Sustained deliveries per second (0 disables rate limiting)
+    rate_per_second: float = 0.0
+    # Deliveries allowed back to back before the rate applies
+    burst: int = 5
+
+
 @dataclass
 class QueueConfig:
     """Configuration for the queue manager."""
@@ -86,7 +130,11 @@ class QueueConfig:
     # Worker configuration
     num_workers: int = 4
     batch_size: int = 10
-    poll_interval: float = 1.0  # seconds
+    # Fallback seconds between polls. New work normally wakes the loop
+    # immediately (in-process listener or doorbell), so this only bounds
+    # how late work from producers that can't signal is noticed.
+    poll_interval: float = 30.0
+    use_doorbell: bool = True
 
     # Retry configuration
     max_retries: int = DEFAULT_MAX_RETRIES
@@ -96,25 +144,336 @@ class QueueConfig:
 
     # Timeout configuration
     processing_timeout: float = 300.0  # 5 minutes
+    # How long a claimed item stays reserved for this worker; after that it
+    # is handed to another worker. Must exceed processing_timeout.
+    lease_seconds: float = 600.0
     shutdown_timeout: float = 30.0  # 30 seconds
 
     # Cleanup configuration
     completed_retention_hours: int = 24
     dead_letter_retention_days: int = 30
 
+    # Per-domain scheduling
+    domain_limits: DomainLimits = field(default_factory=DomainLimits)
+    domain_overrides: dict[str, DomainLimits] = field(default_factory=dict)
+    # A domain answering with temporary failures is paused for base
+    # seconds, doubling per consecutive failure up to max
+    domain_backoff_base: float = 30.0
+    domain_backoff_max: float = 900.0
+    # Deferral for items handed back for a busy domain whose delivery
+    # time has not been measured yet; each further turn of the domain's
+    # concurrency is due this much later again
+    domain_defer_seconds: float = 2.0
+
     # Event configuration
     emit_events: bool = True
 
 
+@dataclass
+class _DomainState:
+    """Scheduling state of one recipient domain."""
+
+    limits: DomainLimits
+    concurrency: int
+    tokens: float
+    refilled_at: float
+    ready: deque = field(default_factory=deque)
+    active: int = 0
+    backoff_level: int = 0
+    backoff_until: float = 0.0
+    avg_delivery_seconds: float = 0.0
+    # When the next item handed back for this domain should be retried
+    next_slot: float = 0.0
+    dispatched: int = 0
+    deferred: int = 0
+    throttle_events: int = 0
+
+
+class DomainScheduler:
+    """
+    Fair per-domain dispatch of claimed queue items.
+
+    Claimed items are queued by recipient domain and handed out round-robin
+    across domains, so a burst to one slow or greylisting domain cannot
+    occupy every worker. Each domain is held to a concurrency cap and an
+    optional token-bucket rate. A domain answering with temporary failures
+    is paused with exponential back-off and its concurrency halved per
+    back-off level; each successful delivery steps the level back down.
+
+    One claimed item, its next delivery, is held for a domain that is
+    merely at its cap. Anything more, and everything for a paused or
+    rate-limited domain, is handed back to the queue by the caller
+    (take_waiting()), spaced out at the rate the domain is expected to
+    take it, so a long backlog for one domain is neither kept leased nor
+    reclaimed all at once.
+    """
+
+    def __init__(
+        self,
+        config: QueueConfig,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize the scheduler.
+
+        Args:
+            config: Queue configuration with the domain limits.
+            clock: Monotonic time source.
+        """
+        self.config = config
+        self._clock = clock
+        self._domains: dict[str, _DomainState] = {}
+        # Domains with queued items, in turn order
+        self._ring: deque[str] = deque()
+        self._started: dict[str, float] = {}
+
+    @property
+    def active(self) -> int:
+        """Dispatched items not yet released."""
+        return len(self._started)
+
+    @property
+    def held(self) -> int:
+        """Claimed items waiting for their domain."""
+        return sum(len(self._domains[domain].ready) for domain in self._ring)
+
+    @staticmethod
+    def domain_of(item: dict) -> str:
+        """Lower-cased recipient domain of a queue item."""
+        recipient = item.get("recipient") or ""
+        return recipient.rsplit("@", 1)[1].lower() if "@" in recipient else ""
+
+    def add(self, item: dict) -> None:
+        """Queue a claimed item behind others for its domain."""
+        domain = self.domain_of(item)
+        state = self._state(domain)
+        if not state.ready:
+            self._ring.append(domain)
+        state.ready.append(item)
+
+    def pop_ready(self) -> Optional[dict]:
+        """
+        Take the next item whose domain may be delivered to now.
+
+        Domains take turns; a domain that is paused, at its concurrency
+        cap or out of rate tokens is skipped.
+
+        Returns:
+            The item, now counted as active for its domain, or None.
+        """
+        now = self._clock()
+        for _ in range(len(self._ring)):
+            domain = self._ring.popleft()
+            state = self._domains[domain]
+            if not self._can_dispatch(state, now):
+                self._ring.append(domain)
+                continue
+
+            item = state.ready.popleft()
+            if state.ready:
+                self._ring.append(domain)
+            state.active += 1
+            state.dispatched += 1
+            if state.limits.rate_per_second > 0:
+                state.tokens -= 1
+            self._started[item["id"]] = now
+            return item
+        return None
+
+    def take_waiting(self) -> list[tuple[dict, float]]:
+        """
+        Remove queued items that should go back to the queue.
+
+        A domain that is only at its concurrency cap keeps its next item;
+        the rest of its items, and all items of a paused or rate-limited
+        domain, are returned.
+
+        Returns:
+            (item, seconds) pairs: how long each item should wait before
+            it is claimed again.
+        """
+        now = self._clock()
+        waiting = []
+        for _ in range(len(self._ring)):
+            domain = self._ring.popleft()
+            state = self._domains[domain]
+
+            paused = max(state.backoff_until - now, 0.0)
+            rate_wait = self._token_wait(state)
+            keep = 0 if paused or rate_wait else 1
+            if len(state.ready) > keep:
+                # Space the returned items out at the domain's pace, or a
+                # turn per default deferral until that pace is known
+                measured = self._service_interval(state)
+                first = measured or self.config.domain_defer_seconds
+                interval = measured or first / self._concurrency(state)
+                due = max(now + max(paused, rate_wait, first), state.next_slot)
+                returned = [
+                    state.ready.pop() for _ in range(len(state.ready) - keep)
+                ]
+                for item in reversed(returned):
+                    waiting.append((item, due - now))
+                    due += interval
+                state.deferred += len(returned)
+                state.next_slot = due
+
+            if state.ready:
+                self._ring.append(domain)
+        return waiting
+
+    def take_all(self) -> list[dict]:
+        """Remove every queued item (used at shutdown)."""
+        items = []
+        for domain in self._ring:
+            items.extend(self._domains[domain].ready)
+            self._domains[domain].ready.clear()
+        self._ring.clear()
+        return items
+
+    def release(self, item: dict) -> None:
+        """Free the domain slot held by a dispatched item."""
+        started = self._started.pop(item["id"], None)
+        state = self._domains.get(self.domain_of(item))
+        if started is None or state is None:
+            return
+
+        state.active -= 1
+        elapsed = self._clock() - started
+        state.avg_delivery_seconds = (
+            elapsed
+            if not state.avg_delivery_seconds
+            else 0.8 * state.avg_delivery_seconds + 0.2 * elapsed
+        )
+
+    def record(self, item: dict, throttled: bool) -> None:
+        """
+        Adapt a domain's pacing to the outcome of a delivery.
+
+        Args:
+            item: The queue item that was attempted.
+            throttled: True if the domain pushed back (a temporary
+                failure), False otherwise.
+        """
+        domain = self.domain_of(item)
+        state = self._state(domain)
+        if throttled:
+            state.backoff_level += 1
+            state.throttle_events += 1
+            delay = min(
+                self.config.domain_backoff_base * 2 ** (state.backoff_level - 1),
+                self.config.domain_backoff_max,
+            )
+            state.backoff_until = self._clock() + delay
+            logger.info(
+                "Backing off domain %s for %.0fs (level %d)",
+                domain,
+                delay,
+                state.backoff_level,
+            )
+        elif state.backoff_level:
+            state.backoff_level -= 1
+
+    def stats(self) -> dict[str, DomainStats]:
+        """Per-domain statistics."""
+        now = self._clock()
+        return {
+            domain: DomainStats(
+                active=state.active,
+                concurrency_limit=self._concurrency(state),
+                dispatched=state.dispatched,
+                deferred=state.deferred,
+                throttle_events=state.throttle_events,
+                backoff_level=state.backoff_level,
+                backoff_remaining_seconds=max(state.backoff_until - now, 0.0),
+            )
+            for domain, state in self._domains.items()
+        }
+
+    def throttled_domains(self) -> int:
+        """Number of domains currently paused by back-off."""
+        now = self._clock()
+        return sum(1 for s in self._domains.values() if s.backoff_until > now)
+
+    def _state(self, domain: str) -> _DomainState:
+        """Get or create the state for a domain."""
+        state = self._domains.get(domain)
+        if state is None:
+            if len(self._domains) >= MAX_TRACKED_DOMAINS:
+                self._forget_idle()
+            limits = self.config.domain_overrides.get(
+                domain, self.config.domain_limits
+            )
+            state = _DomainState(
+                limits=limits,
+                concurrency=limits.max_concurrency
+                or max(1, self.config.num_workers // 2),
+                tokens=float(limits.burst),
+                refilled_at=self._clock(),
+            )
+            self._domains[domain] = state
+        return state
+
+    def _forget_idle(self) -> None:
+        """Drop domains with nothing active, queued or paused."""
+        now = self._clock()
+        for domain, state in list(self._domains.items()):
+            if (
+                not state.active
+                and not state.ready
+                and not state.backoff_level
+                and state.backoff_until <= now
+            ):
+                del self._domains[domain]
+
+    def _concurrency(self, state: _DomainState) -> int:
+        """Current concurrency cap, narrowed while backing off."""
+        return max(1, state.concurrency >> state.backoff_level)
+
+    def _can_dispatch(self, state: _DomainState, now: float) -> bool:
+        """Whether a domain may start another delivery now."""
+        if now < state.backoff_until or state.active >= self._concurrency(state):
+            return False
+        rate = state.limits.rate_per_second
+        if rate > 0:
+            state.tokens = min(
+                float(state.limits.burst),
+                state.tokens + (now - state.refilled_at) * rate,
+            )
+            state.refilled_at = now
+            return state.tokens >= 1
+        return True
+
+    def _service_interval(self, state: _DomainState) -> float:
+        """Measured seconds between deliveries a domain can take (0 if unknown)."""
+        interval = state.avg_delivery_seconds / self._concurrency(state)
+        rate = state.limits.rate_per_second
+        if rate > 0:
+            interval = max(interval, 1 / rate)
+        return interval
+
+    def _token_wait(self, state: _DomainState) -> float:
+        """Seconds until the rate limit allows the next delivery."""
+        rate = state.limits.rate_per_second
+        if rate <= 0 or state.tokens >= 1:
+            return 0.0
+        return (1 - state.tokens) / rate
+
+
 class QueueManager:
     """
     Manages the outbound email queue with worker pattern processing.
 
     Features:
+    - Event-driven dispatch: enqueues wake the loop in-process or via a
+      cross-process doorbell, with polling as a fallback
     - Configurable concurrency via worker pool
     - Exponential backoff retry logic
     - Dead letter queue for permanently failed messages
     - Real-time event emission for status updates
+    - Atomic batch claiming with leases, so concurrent workers never share
+      an item and items held by a crashed worker are recovered
+    - Per-domain concurrency caps, rate limits, round-robin dispatch and
+      adaptive back-off (DomainScheduler)
     - Graceful shutdown handling
     - SQLite-backed persistence
     """
@@ -136,6 +495,9 @@ class QueueManager:
         self.config = config or QueueConfig()
         self._event_handler = event_handler
         self._storage = storage or get_storage()
+        self._worker_id = (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        )
 
         # State management
         self._running = False
@@ -144,6 +506,12 @@ class QueueManager:
         self._worker_semaphore: Optional[asyncio.Semaphore] = None
         self._shutdown_event: Optional[asyncio.Event] = None
 
+        # Wakeup channels for the processing loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup_event: Optional[asyncio.Event] = None
+        self._doorbell: Optional[QueueDoorbell] = None
+        self._scheduler = DomainScheduler(self.config)
+
         # Statistics tracking
         self._stats = QueueStats()
         self._processing_times: list[float] = []
@@ -152,6 +520,16 @@ class QueueManager:
         # Worker registry from worker module (set dynamically)
         self._worker_class: Optional[type] = None
 
+        # Outbound SMTP client shared by all workers (created on demand)
+        self._sender: Optional[SMTPSender] = None
+
+        # Process pool for composing and signing (None: on the event loop)
+        self._executor: Optional[CPUExecutor] = None
+
+        # How workers compose and sign on the event loop
+        self._render_options: Optional[RenderOptions] = None
+        self._renderer: Optional[MessageRenderer] = None
+
         logger.info(
             "QueueManager initialized with %d workers, batch size %d",
             self.config.num_workers,
@@ -163,6 +541,117 @@ class QueueManager:
         """Check if the queue manager is currently running."""
         return self._running
 
+    def notify(self) -> None:
+        """
+        Wake the processing loop to look for ready work.
+
+        Safe to call from any thread; a no-op when the queue isn't running.
+        """
+        loop, event = self._loop, self._wakeup_event
+        if loop is None or event is None:
+            return
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            pass  # Loop already closed
+
+    @property
+    def sender(self) -> SMTPSender:
+        """
+        SMTPSender shared by all workers of this queue.
+
+        Created with default settings on first use unless one was set
+        with set_sender().
+        """
+        if self._sender is None:
+            self._sender = create_smtp_sender()
+        return self._sender
+
+    def set_sender(self, sender: SMTPSender) -> None:
+        """
+        Set the SMTPSender workers deliver through.
+
+        Args:
+            sender: Configured SMTPSender, e.g. from create_smtp_sender().
+        """
+        self._sender = sender
+
+    @property
+    def executor(self) -> Optional[CPUExecutor]:
+        """Process pool workers compose and sign messages in, if any."""
+        return self._executor
+
+    def set_executor(self, executor: CPUExecutor) -> None:
+        """
+        Compose and sign outgoing messages in a process pool.
+
+        The pool is shut down when the queue stops.
+
+        Args:
+            executor: CPUExecutor configured with the render options.
+        """
+        self._executor = executor
+
+    @property
+    def render_options(self) -> Optional[RenderOptions]:
+        """Options workers compose and sign with on the event loop."""
+        return self._render_options
+
+    @property
+    def renderer(self) -> MessageRenderer:
+        """
+        MessageRenderer shared by all workers composing on the event loop.
+
+        Built from the render options once, so the DKIM key is loaded
+        once rather than per queue item.
+        """
+        if self._renderer is None:
+            self._renderer = MessageRenderer(options=self._render_options)
+        return self._renderer
+
+    def set_render_options(self, options: RenderOptions) -> None:
+        """
+        Set how workers compose and DKIM sign messages on the event loop.
+
+        Applies when no CPUExecutor is set; an executor renders with the
+        options it was created with.
+
+        Args:
+            options: Composition and signing options.
+
+        Raises:
+            CryptoError: If the DKIM private key cannot be loaded.
+        """
+        self._renderer = MessageRenderer(options=options)
+        self._render_options = options
+
+    @property
+    def scheduler(self) -> DomainScheduler:
+        """Per-domain scheduler that paces dispatch."""
+        return self._scheduler
+
+    def record_delivery(self, item: dict, result: WorkerDeliveryResult) -> None:
+        """
+        Feed a delivery outcome to the domain scheduler.
+
+        Called by workers for every attempt. A retryable failure that the
+        ErrorClassifier attributes to the destination pushing back (or a
+        4xx reply) backs off the recipient's domain.
+
+        Args:
+            item: The queue item that was attempted.
+            result: The worker's delivery result.
+        """
+        throttled = (
+            not result.success
+            and result.should_retry
+            and (
+                result.error_type in THROTTLE_ERROR_TYPES
+                or (result.smtp_code is not None and 400 <= result.smtp_code < 500)
+            )
+        )
+        self._scheduler.record(item, throttled)
+
     def set_worker_class(self, worker_class: type) -> None:
         """
         Set the worker class to use for processing messages.
@@ -176,7 +665,8 @@ class QueueManager:
         """
         Start queue processing.
 
-        Initializes worker pool and begins polling for pending messages.
+        Initializes worker pool, registers wakeup channels and begins
+        dispatching pending messages.
 
         Raises:
             MessageQueueError: If the queue is already running or fails to start.
@@ -192,6 +682,9 @@ class QueueManager:
         self._started_at = datetime.now(timezone.utc)
         self._shutdown_event = asyncio.Event()
         self._worker_semaphore = asyncio.Semaphore(self.config.num_workers)
+        self._loop = asyncio.get_running_loop()
+        self._wakeup_event = asyncio.Event()
+        self._open_wakeup_channels()
 
         # Initialize stats
         self._stats = QueueStats(
@@ -217,6 +710,7 @@ class QueueManager:
             logger.exception("Queue manager encountered error: %s", e)
             raise MessageQueueError(f"Queue processing failed: {e}")
         finally:
+            self._close_wakeup_channels()
             self._running = False
 
     async def stop(self) -> None:
@@ -235,6 +729,8 @@ class QueueManager:
         # Signal shutdown
         if self._shutdown_event:
             self._shutdown_event.set()
+        if self._wakeup_event:
+            self._wakeup_event.set()
 
         # Wait for workers to complete with timeout
         if self._workers:
@@ -264,6 +760,16 @@ class QueueManager:
         self._running = False
         self._workers.clear()
 
+        # Return items still waiting for their domain
+        self._release_held()
+
+        # Close pooled SMTP connections
+        if self._sender:
+            await self._sender.close()
+
+        if self._executor:
+            self._executor.close()
+
         # Emit stop event
         await self._emit_event(
             QueueEvent(
@@ -376,6 +882,9 @@ class QueueManager:
             except Exception as e:
                 logger.warning("Failed to fetch queue counts: %s", e)
 
+            self._stats.domains = self._scheduler.stats()
+            self._stats.throttled_domains = self._scheduler.throttled_domains()
+
             return self._stats.model_copy()
 
     def retry_failed(
@@ -551,8 +1060,21 @@ class QueueManager:
             logger.error("Failed to purge old items: %s", e)
             raise MessageQueueError(f"Failed to purge old items: {e}")
 
+    def schedule_retry(self, item: dict, error: str) -> None:
+        """
+        Record a temporary delivery failure for a claimed item.
+
+        Schedules the next attempt with exponential backoff, or moves the
+        item to the dead letter queue once max_retries is reached.
+
+        Args:
+            item: The queue item as claimed.
+            error: The error message.
+        """
+        self._handle_failure(item, error)
+
     def move_to_dead_letter(
-        self, queue_item_id: str, error: str
+        self, queue_item_id: str, error: str, worker_id: Optional[str] = None
     ) -> Optional[dict]:
         """
         Move a queue item to the dead letter queue.
@@ -560,9 +1082,10 @@ class QueueManager:
         Args:
             queue_item_id: The queue item ID.
             error: The error message.
+            worker_id: Only move the item while this worker holds its claim.
 
         Returns:
-            The updated queue item or None.
+            The updated queue item, or None if it was not moved.
         """
         try:
             item = self._storage.get_queue_item(queue_item_id)
@@ -571,8 +1094,11 @@ class QueueManager:
                 return None
 
             updated_item = self._storage.move_to_dead_letter(
-                queue_item_id, f"Dead letter: {error}"
+                queue_item_id, f"Dead letter: {error}", worker_id
             )
+            if updated_item is None:
+                log_lost_claim(queue_item_id)
+                return None
 
             logger.warning(
                 "Moved queue item %s to dead letter queue: %s",
@@ -601,97 +1127,216 @@ class QueueManager:
     async def _process_loop(self) -> None:
         """Main processing loop that fetches and dispatches work to workers."""
         logger.info("Starting queue processing loop")
+        reclaims = 0
 
         while self._running and not self._shutdown_event.is_set():
             try:
-                # Fetch pending items ready for processing
+                # Clear before fetching so a wakeup that arrives while we
+                # query isn't lost
+                self._wakeup_event.clear()
+
+                # Claim items ready for processing
                 items = self._fetch_ready_items()
 
                 if items:
-                    logger.debug("Fetched %d items for processing", len(items))
+                    logger.debug("Claimed %d items for processing", len(items))
 
                     for item in items:
-                        if self._shutdown_event.is_set():
-                            break
+                        self._scheduler.add(item)
 
-                        # Create worker task with semaphore
-                        task = asyncio.create_task(
-                            self._process_item_with_semaphore(item)
-                        )
-                        self._workers.append(task)
+                if items or self._scheduler.held:
+                    # Start what the domain limits allow, hand back the rest
+                    self._dispatch()
+                    deferred = self._defer_waiting()
 
                     # Clean up completed worker tasks
                     self._workers = [w for w in self._workers if not w.done()]
 
-                # Wait before next poll (unless shutdown)
+                    # Look past the deferred items for other domains' work,
+                    # a bounded number of times per wakeup
+                    if (
+                        deferred
+                        and self._scheduler.active < self.config.num_workers
+                        and reclaims < MAX_RECLAIMS_PER_WAKEUP
+                    ):
+                        reclaims += 1
+                        await asyncio.sleep(0)
+                        continue
+
+                reclaims = 0
+
+                # Sleep until woken, a retry falls due or the fallback poll
                 try:
                     await asyncio.wait_for(
-                        self._shutdown_event.wait(),
-                        timeout=self.config.poll_interval,
+                        self._wakeup_event.wait(),
+                        timeout=self._next_poll_delay(),
                     )
                 except asyncio.TimeoutError:
-                    pass  # Normal polling cycle
+                    pass  # Fallback polling cycle
 
             except asyncio.CancelledError:
                 logger.info("Processing loop cancelled")
                 break
             except Exception as e:
                 logger.exception("Error in processing loop: %s", e)
-                await asyncio.sleep(self.config.poll_interval)
+                await asyncio.sleep(min(self.config.poll_interval, 1.0))
 
         logger.info("Queue processing loop ended")
 
-    def _fetch_ready_items(self) -> list[dict]:
+    def _next_poll_delay(self) -> float:
         """
-        Fetch items that are ready for processing.
+        Seconds to sleep when no wakeup arrives.
 
-        Returns pending items and deferred items whose retry time has passed.
+        Normally the fallback poll interval, shortened so the loop wakes
+        when the next scheduled retry falls due.
         """
+        delay = self.config.poll_interval
+
         try:
-            # Get pending items
-            pending_items = self._storage.get_pending_queue_items(
-                limit=self.config.batch_size
-            )
+            due = self._storage.get_next_queue_due_time()
+            if due:
+                seconds = (
+                    datetime.fromisoformat(due) - datetime.now(timezone.utc)
+                ).total_seconds()
+                # Already-due retries are picked up as workers free up
+                if seconds > 0:
+                    delay = min(delay, seconds)
+        except Exception as e:
+            logger.debug("Could not determine next retry time: %s", e)
+
+        return delay
 
-            # Also get retrying items whose next_attempt_at has passed
-            retrying_items = self._storage.get_queue_items_by_status(
-                "retrying", limit=self.config.batch_size
+    def _open_wakeup_channels(self) -> None:
+        """Register for in-process and cross-process enqueue notifications."""
+        self._storage.add_queue_listener(self.notify)
+
+        if not self.config.use_doorbell:
+            return
+
+        try:
+            self._doorbell = self._storage.open_queue_doorbell()
+            self._loop.add_reader(self._doorbell.fileno(), self._on_doorbell)
+            logger.info("Queue doorbell listening on %s", self._doorbell.path)
+        except (OSError, NotImplementedError) as e:
+            logger.warning(
+                "Queue doorbell unavailable, relying on %.1fs polling: %s",
+                self.config.poll_interval,
+                e,
             )
+            if self._doorbell:
+                self._doorbell.close()
+                self._doorbell = None
 
-            ready_items = list(pending_items)
+    def _close_wakeup_channels(self) -> None:
+        """Unregister notification channels opened by start()."""
+        self._storage.remove_queue_listener(self.notify)
 
-            now = datetime.now(timezone.utc).isoformat()
-            for item in retrying_items:
-                next_attempt = item.get("next_attempt_at")
-                if next_attempt and next_attempt <= now:
-                    ready_items.append(item)
+        if self._doorbell:
+            try:
+                self._loop.remove_reader(self._doorbell.fileno())
+            except Exception:
+                pass
+            self._doorbell.close()
+            self._doorbell = None
+
+        self._wakeup_event = None
+        self._loop = None
+
+    def _on_doorbell(self) -> None:
+        """Handle a doorbell ring from another process."""
+        if self._doorbell:
+            self._doorbell.drain()
+        if self._wakeup_event:
+            self._wakeup_event.set()
 
-            return ready_items[: self.config.batch_size]
+    def _fetch_ready_items(self) -> list[dict]:
+        """
+        Claim items that are ready for processing.
+
+        Claims at most one item per idle worker slot (capped at batch_size),
+        counting items the scheduler already holds as taking a slot, so
+        claimed items never sit leased while waiting for a worker. A
+        worker finishing wakes the loop to claim more.
+        """
+        capacity = min(
+            self.config.batch_size,
+            self.config.num_workers - self._scheduler.active - self._scheduler.held,
+        )
+        if capacity <= 0:
+            return []
+
+        try:
+            return self._storage.claim_queue_batch(
+                self._worker_id,
+                capacity,
+                lease_seconds=self.config.lease_seconds,
+            )
 
         except Exception as e:
-            logger.error("Failed to fetch ready items: %s", e)
+            logger.error("Failed to claim ready items: %s", e)
             return []
 
+    def _dispatch(self) -> None:
+        """Start a worker task for each item the domain scheduler releases."""
+        while (item := self._scheduler.pop_ready()) is not None:
+            task = asyncio.create_task(self._process_item_with_semaphore(item))
+            self._workers.append(task)
+
+    def _defer_waiting(self) -> int:
+        """
+        Hand claimed items the scheduler won't start soon back to the queue.
+
+        Returns:
+            Number of items handed back.
+        """
+        waiting = self._scheduler.take_waiting()
+        if waiting:
+            self._release_claims(waiting)
+            logger.debug("Deferred %d items for busy domains", len(waiting))
+        return len(waiting)
+
+    def _release_held(self) -> None:
+        """Hand every item still held by the scheduler back, due now."""
+        held = self._scheduler.take_all()
+        if held:
+            self._release_claims([(item, 0.0) for item in held])
+
+    def _release_claims(self, deferrals: list[tuple[dict, float]]) -> None:
+        """Release claimed items, each due after the given seconds."""
+        now = datetime.now(timezone.utc)
+        try:
+            self._storage.release_queue_claims(
+                self._worker_id,
+                [
+                    (item["id"], (now + timedelta(seconds=delay)).isoformat())
+                    for item, delay in deferrals
+                ],
+            )
+        except Exception as e:
+            # The leases expire and the items are claimed again
+            logger.error("Failed to hand back deferred items: %s", e)
+
     async def _process_item_with_semaphore(self, item: dict) -> None:
         """Process an item using the worker semaphore for concurrency control."""
-        async with self._worker_semaphore:
-            await self._process_item(item)
+        try:
+            async with self._worker_semaphore:
+                await self._process_item(item)
+        finally:
+            self._scheduler.release(item)
+            # A worker slot freed up; look for more backlog
+            if self._wakeup_event:
+                self._wakeup_event.set()
 
     async def _process_item(self, item: dict) -> None:
         """
         Process a single queue item.
 
-        This method handles claiming, processing, and updating the item status.
+        The item has already been claimed by _fetch_ready_items; this
+        method processes it and updates its status.
         """
         start_time = datetime.now(timezone.utc)
 
         try:
-            # Claim the item atomically
-            claimed = self._claim_item(item["id"])
-            if not claimed:
-                logger.debug("Item %s already claimed, skipping", item["id"])
-                return
-
             logger.info(
                 "Processing queue item %s (attempt %d)",
                 item["id"],
@@ -711,10 +1356,14 @@ class QueueManager:
             # Process the item using the worker class
             if self._worker_class:
                 worker = self._worker_class(self._storage, self)
-                await worker.process(item)
+                try:
+                    await worker.process(item)
+                except Exception as e:
+                    # The worker has already recorded the failure
+                    logger.warning("Worker failed item %s: %s", item["id"], e)
             else:
                 # Default behavior: mark as completed (for testing)
-                self._mark_completed(item["id"])
+                self._mark_completed(item)
 
             # Track processing time
             processing_time = (
@@ -734,47 +1383,29 @@ class QueueManager:
             logger.exception("Failed to process item %s: %s", item["id"], e)
             self._handle_failure(item, str(e))
 
-    def _claim_item(self, item_id: str) -> bool:
-        """
-        Atomically claim a queue item for processing.
-
-        Returns True if successfully claimed, False if already claimed.
-        """
-        try:
-            item = self._storage.get_queue_item(item_id)
-            if not item:
-                return False
-
-            # Check if still pending or retrying
-            if item["status"] not in ("pending", "retrying"):
-                return False
-
-            # Mark as processing
-            self._storage.mark_queue_item_processing(item_id)
-            return True
-
-        except Exception as e:
-            logger.error("Failed to claim item %s: %s", item_id, e)
-            return False
-
-    def _mark_completed(self, item_id: str) -> None:
-        """Mark a queue item as successfully completed."""
+    def _mark_completed(self, item: dict) -> None:
+        """Mark a claimed queue item as successfully completed."""
+        item_id = item["id"]
         try:
-            item = self._storage.mark_queue_item_completed(item_id)
+            item = self._storage.mark_queue_item_completed(
+                item_id, item.get("claimed_by")
+            )
+            if item is None:
+                log_lost_claim(item_id)
+                return
 
             logger.info("Successfully delivered queue item %s", item_id)
 
-            if item:
-                asyncio.create_task(
-                    self._emit_event(
-                        QueueEvent(
-                            event_type="message_sent",
-                            queue_item_id=item_id,
-                            message_id=item["message_id"],
-                            status=DeliveryStatus.SENT.value,
-                        )
+            asyncio.create_task(
+                self._emit_event(
+                    QueueEvent(
+                        event_type="message_sent",
+                        queue_item_id=item_id,
+                        message_id=item["message_id"],
+                        status=DeliveryStatus.SENT.value,
                     )
                 )
+            )
 
         except Exception as e:
             logger.error("Failed to mark item %s as completed: %s", item_id, e)
@@ -790,7 +1421,7 @@ class QueueManager:
 
         if new_attempts >= self.config.max_retries:
             # Move to dead letter queue
-            self.move_to_dead_letter(item["id"], error)
+            self.move_to_dead_letter(item["id"], error, item.get("claimed_by"))
         else:
             # Schedule retry with exponential backoff
             retry_interval = self._get_retry_interval(new_attempts)
@@ -799,7 +1430,7 @@ class QueueManager:
             )
 
             try:
-                self._storage.update_queue_item(
+                updated = self._storage.update_queue_item(
                     item["id"],
                     {
                         "status": "retrying",
@@ -808,7 +1439,11 @@ class QueueManager:
                         "next_attempt_at": next_attempt.isoformat(),
                         "error_message": error,
                     },
+                    worker_id=item.get("claimed_by"),
                 )
+                if updated is None:
+                    log_lost_claim(item["id"])
+                    return
 
                 logger.info(
                     "Scheduled retry for item %s in %d seconds (attempt %d/%d)",
@@ -9,26 +9,45 @@ validation, message parsing, and database storage via SQLite.
 import asyncio
 import logging
 import ssl
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 from aiosmtpd.controller import Controller
 from aiosmtpd.smtp import SMTP, AuthResult, Envelope, LoginPassword, Session
 
 from common.config import SMTPSettings, get_settings
 from common.storage import EmailStorage, get_storage
-from common.exceptions import (
-    InvalidMessageError,
-    SMTPConnectionError,
-)
+from common.exceptions import SMTPConnectionError
 from common.models import FolderType, MessageStatus
 
 from .parser import EmailParser, ParsedEmail
+from .spool import InboundSpool, SpoolProcessor
+
+if TYPE_CHECKING:
+    from gateway.crypto.dkim import DKIMVerifier
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class RecipientLookups:
+    """
+    Recipient users and Inbox folders looked up during one SMTP session.
+
+    Filled by RCPT and reused when the message is stored, so each
+    recipient's user and each user's Inbox is read once per session
+    rather than once per message and recipient.
+    """
+
+    # Lowercased address -> user ID (None when no user accepts it)
+    users: dict[str, Optional[str]] = field(default_factory=dict)
+    # User ID -> Inbox folder ID
+    inboxes: dict[str, Optional[str]] = field(default_factory=dict)
+
+
 class SMTPAuthenticator:
     """
     Handles SMTP authentication for the receiver.
@@ -119,7 +138,11 @@ class SMTPHandler:
     Handler for incoming SMTP messages.
 
     Processes received emails, validates senders/recipients,
-    parses message content, and stores to SQLite database.
+    parses message content, and stores to SQLite database. With a
+    DKIMVerifier, each message's DKIM signatures are checked (keys are
+    resolved asynchronously, so other sessions keep being served) and the
+    outcome is stored with the message as its Authentication-Results
+    header.
     """
 
     # Maximum message size (50 MB)
@@ -131,6 +154,8 @@ class SMTPHandler:
         parser: EmailParser,
         allowed_domains: Optional[list[str]] = None,
         require_auth_for_relay: bool = True,
+        dkim_verifier: Optional["DKIMVerifier"] = None,
+        verification_timeout: float = 10.0,
     ) -> None:
         """
         Initialize the SMTP handler.
@@ -140,11 +165,27 @@ class SMTPHandler:
             parser: Email parser instance.
             allowed_domains: List of domains to accept mail for.
             require_auth_for_relay: Require authentication for relaying.
+            dkim_verifier: Verifier for inbound DKIM signatures (None
+                skips verification).
+            verification_timeout: Seconds to wait for DKIM verification
+                before recording a temporary error.
         """
         self._storage = storage
         self._parser = parser
         self._allowed_domains = allowed_domains or []
         self._require_auth_for_relay = require_auth_for_relay
+        self._dkim_verifier = dkim_verifier
+        self.verification_timeout = verification_timeout
+        self._spool: Optional[SpoolProcessor] = None
+
+    def set_spool(self, spool: Optional[SpoolProcessor]) -> None:
+        """
+        Switch spool mode on (or off with None).
+
+        In spool mode DATA is answered as soon as the message is on disk
+        and ``spool`` parses and stores it in the background.
+        """
+        self._spool = spool
 
     async def handle_EHLO(
         self,
@@ -158,18 +199,26 @@ class SMTPHandler:
         Handle EHLO command.
 
         Advertises server capabilities including SIZE, STARTTLS, AUTH.
+        aiosmtpd passes the reply lines it built (greeting first, then
+        STARTTLS and AUTH as the session allows); the SIZE limit is
+        replaced with ours and missing extensions are added.
         """
         session.host_name = hostname
-        responses.append(f"SIZE {self.MAX_MESSAGE_SIZE}")
-        if server.tls_context:
-            responses.append("STARTTLS")
-        responses.append("AUTH LOGIN PLAIN")
-        responses.append("8BITMIME")
-        responses.append("ENHANCEDSTATUSCODES")
-        responses.append("PIPELINING")
+        greeting, *lines = responses
+        extensions = [
+            line[4:] for line in lines if not line[4:].upper().startswith("SIZE")
+        ]
+        extensions.insert(0, f"SIZE {self.MAX_MESSAGE_SIZE}")
+        for extension in ("8BITMIME", "ENHANCEDSTATUSCODES", "PIPELINING"):
+            if extension not in extensions:
+                extensions.append(extension)
 
         logger.debug("EHLO from %s at %s", hostname, session.peer)
-        return responses
+        return (
+            [greeting]
+            + [f"250-{extension}" for extension in extensions[:-1]]
+            + [f"250 {extensions[-1]}"]
+        )
 
     async def handle_HELO(
         self,
@@ -256,12 +305,7 @@ class SMTPHandler:
                     )
 
         # Check if recipient exists in our system (synchronous SQLite call)
-        recipient_user = self._storage.get_user_by_email(address)
-        if not recipient_user:
-            # For local mail client, also accept mail for the default user
-            default_user = self._storage.get_default_user()
-            if default_user:
-                recipient_user = default_user
+        recipient_user = self._find_user(address, self._lookups(session))
 
         if (
             not recipient_user
@@ -286,7 +330,9 @@ class SMTPHandler:
         """
         Handle DATA command.
 
-        Receives and processes the complete email message.
+        Receives and processes the complete email message. In spool mode
+        the message is only written to the spool before answering; it is
+        parsed and stored in the background.
         """
         try:
             # Check message size
@@ -303,9 +349,66 @@ class SMTPHandler:
                 limit = self.MAX_MESSAGE_SIZE
                 return f"552 5.3.4 Size exceeds {limit} bytes"
 
+            if self._spool is not None:
+                spool_id = await self._spool.accept(
+                    content,
+                    envelope.mail_from,
+                    list(envelope.rcpt_tos),
+                    server.hostname,
+                )
+                return f"250 2.0.0 OK: queued as {spool_id}"
+
+            return await self.deliver(
+                content,
+                envelope.mail_from,
+                envelope.rcpt_tos,
+                server.hostname,
+                lookups=self._lookups(session),
+            )
+
+        except Exception as e:
+            logger.error("Error processing message: %s", str(e))
+            return "451 4.3.0 Temporary server error"
+
+    async def deliver(
+        self,
+        content: bytes,
+        mail_from: Optional[str],
+        rcpt_tos: list[str],
+        authserv_id: str,
+        executor: Optional[Executor] = None,
+        lookups: Optional[RecipientLookups] = None,
+        received_at: Optional[str] = None,
+    ) -> str:
+        """
+        Parse, verify and store a received message.
+
+        Args:
+            content: Raw message content.
+            mail_from: Envelope sender.
+            rcpt_tos: Envelope recipients.
+            authserv_id: Name of this host for Authentication-Results.
+            executor: Run parsing and the SQLite writes in this executor
+                instead of on the event loop.
+            lookups: Recipient lookups of the SMTP session (fresh ones by
+                default).
+            received_at: When the message was accepted, as an ISO 8601
+                timestamp (now by default).
+
+        Returns:
+            The SMTP reply for the message (2xx stored, 4xx temporary
+            failure, 5xx rejected).
+        """
+        loop = asyncio.get_running_loop()
+        try:
             # Parse the email message
             try:
-                parsed = self._parser.parse(content)
+                if executor:
+                    parsed = await loop.run_in_executor(
+                        executor, self._parser.parse, content
+                    )
+                else:
+                    parsed = self._parser.parse(content)
             except ValueError as e:
                 logger.error("Failed to parse message: %s", str(e))
                 return "550 5.6.0 Message content rejected"
@@ -318,30 +421,36 @@ class SMTPHandler:
                 )
                 return f"550 5.6.0 Message rejected: {validation_errors[0]}"
 
+            # Our own result replaces any Authentication-Results received
+            if self._dkim_verifier is not None:
+                parsed.headers["authentication-results"] = (
+                    await self._authenticate(content, authserv_id)
+                )
+
             # Store message for each recipient
-            stored_count = 0
-            for recipient in envelope.rcpt_tos:
-                try:
-                    self._store_message(
-                        parsed=parsed,
-                        sender=envelope.mail_from or parsed.from_address,
-                        recipient=recipient,
-                        session=session,
-                        raw_content=content,
-                    )
-                    stored_count += 1
-                except Exception as e:
-                    logger.error(
-                        "Failed to store message for %s: %s", recipient, str(e)
-                    )
+            sender = mail_from or parsed.from_address
+            if executor:
+                stored_count = await loop.run_in_executor(
+                    executor,
+                    self._store_recipients,
+                    parsed,
+                    sender,
+                    rcpt_tos,
+                    lookups,
+                    received_at,
+                )
+            else:
+                stored_count = self._store_recipients(
+                    parsed, sender, rcpt_tos, lookups, received_at
+                )
 
             if stored_count == 0:
                 return "451 4.3.0 Temporary failure storing message"
 
             logger.info(
                 "Message received: from=%s, to=%s, subject=%s, size=%d",
-                envelope.mail_from,
-                envelope.rcpt_tos,
+                mail_from,
+                rcpt_tos,
                 parsed.subject[:50] if parsed.subject else "(no subject)",
                 len(content),
             )
@@ -352,51 +461,134 @@ class SMTPHandler:
             logger.error("Error processing message: %s", str(e))
             return "451 4.3.0 Temporary server error"
 
-    def _store_message(
+    def _store_recipients(
         self,
         parsed: ParsedEmail,
         sender: str,
-        recipient: str,
-        session: Session,
-        raw_content: bytes,
-    ) -> dict:
+        rcpt_tos: list[str],
+        lookups: Optional[RecipientLookups] = None,
+        received_at: Optional[str] = None,
+    ) -> int:
         """
-        Store a received message in the SQLite database.
+        Store a message for all of its recipients at once.
+
+        Recipients are resolved to users (several addresses may reach the
+        same user, who then gets one copy) and the message is written for
+        all of them in one transaction, sharing a single copy of its
+        content. Recipients that already have the message count as
+        stored.
 
         Args:
             parsed: Parsed email content.
             sender: Envelope sender address.
-            recipient: Recipient address.
-            session: SMTP session.
-            raw_content: Raw message content.
+            rcpt_tos: Recipient addresses.
+            lookups: Cached user and Inbox lookups.
+            received_at: When the message was accepted (now by default).
 
         Returns:
-            Created message dictionary.
-        """
-        # Look up the recipient user (for local client, use default user)
-        user = self._storage.get_user_by_email(recipient)
-        if not user:
-            user = self._storage.get_default_user()
-
-        if not user:
-            raise InvalidMessageError(f"Recipient not found: {recipient}")
-
-        # Get or create the inbox folder for the user
-        folders = self._storage.get_folders_by_user(user["id"])
-        inbox_folder = None
-        for folder in folders:
-            if folder.get("folder_type") == FolderType.INBOX.value:
-                inbox_folder = folder
-                break
-
-        # Fallback to get inbox by name
-        if not inbox_folder:
-            inbox_folder = self._storage.get_folder_by_name("Inbox")
-
-        # Prepare message data
-        message_data = {
-            "user_id": str(user["id"]),
-            "folder_id": str(inbox_folder["id"]) if inbox_folder else None,
+            Number of recipients the message is stored for.
+        """
+        if lookups is None:
+            lookups = RecipientLookups()
+
+        targets: dict[str, Optional[str]] = {}
+        resolved = 0
+        for recipient in rcpt_tos:
+            user_id = self._find_user(recipient, lookups)
+            if user_id is None:
+                logger.error("Recipient not found: %s", recipient)
+                continue
+            if user_id not in targets:
+                targets[user_id] = self._find_inbox(user_id, lookups)
+            resolved += 1
+
+        if not targets:
+            return 0
+
+        try:
+            message_ids = self._storage.create_shared_message(
+                self._message_data(parsed, sender, received_at), targets
+            )
+        except Exception as e:
+            logger.error("Failed to store message: %s", str(e))
+            return 0
+
+        logger.debug(
+            "Message stored: ids=%s, recipients=%s", message_ids, rcpt_tos
+        )
+        return resolved
+
+    async def _authenticate(self, content: bytes, authserv_id: str) -> str:
+        """
+        Verify a message's DKIM signatures.
+
+        Args:
+            content: Raw message content.
+            authserv_id: Name of this host for the header.
+
+        Returns:
+            Authentication-Results header value.
+        """
+        from gateway.crypto.dkim import DKIMResult, format_authentication_results
+
+        try:
+            results = await asyncio.wait_for(
+                self._dkim_verifier.evaluate(content),
+                self.verification_timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning("DKIM verification timed out")
+            results = [DKIMResult("temperror", "Verification timed out")]
+        except Exception as e:
+            logger.error("DKIM verification error: %s", str(e))
+            results = [DKIMResult("temperror", f"Verification error: {e}")]
+
+        return format_authentication_results(authserv_id, results)
+
+    def _lookups(self, session: Session) -> RecipientLookups:
+        """Get the recipient lookups cached on an SMTP session."""
+        lookups = getattr(session, "recipient_lookups", None)
+        if lookups is None:
+            lookups = RecipientLookups()
+            session.recipient_lookups = lookups
+        return lookups
+
+    def _find_user(
+        self, address: str, lookups: RecipientLookups
+    ) -> Optional[str]:
+        """
+        Resolve a recipient address to a user ID.
+
+        Mail for unknown addresses goes to the default user of the local
+        client.
+        """
+        key = address.lower()
+        if key not in lookups.users:
+            user = self._storage.get_user_by_email(address)
+            if not user:
+                user = self._storage.get_default_user()
+            lookups.users[key] = str(user["id"]) if user else None
+        return lookups.users[key]
+
+    def _find_inbox(
+        self, user_id: str, lookups: RecipientLookups
+    ) -> Optional[str]:
+        """Resolve a user's Inbox folder ID (None for the default Inbox)."""
+        if user_id not in lookups.inboxes:
+            inbox_id = None
+            for folder in self._storage.get_folders_by_user(user_id):
+                if folder.get("folder_type") == FolderType.INBOX.value:
+                    inbox_id = str(folder["id"])
+                    break
+            lookups.inboxes[user_id] = inbox_id
+        return lookups.inboxes[user_id]
+
+    @staticmethod
+    def _message_data(
+        parsed: ParsedEmail, sender: str, received_at: Optional[str] = None
+    ) -> dict:
+        """Build the stored message for a parsed email."""
+        return {
             "message_id": parsed.message_id,
             "from_address": sender,
             "to_addresses": parsed.to_addresses,
@@ -411,24 +603,10 @@ class SMTPHandler:
             "is_read": False,
             "is_starred": False,
             "is_encrypted": False,
-            "received_at": datetime.now(timezone.utc).isoformat(),
+            "received_at": received_at
+            or datetime.now(timezone.utc).isoformat(),
         }
 
-        # Create the message in SQLite database
-        message = self._storage.create_message(message_data)
-
-        # Update folder message count
-        if inbox_folder:
-            self._storage.increment_folder_message_count(
-                inbox_folder["id"], unread=True
-            )
-
-        logger.debug(
-            "Message stored: id=%s, recipient=%s", message["id"], recipient
-        )
-
-        return message
-
     def _validate_email_address(self, address: str) -> bool:
         """Validate email address format."""
         if not address:
@@ -466,6 +644,10 @@ class SMTPReceiver:
         allowed_domains: Optional[list[str]] = None,
         max_message_size: int = 50 * 1024 * 1024,
         storage: Optional[EmailStorage] = None,
+        dkim_verifier: Optional["DKIMVerifier"] = None,
+        spool_dir: Optional[str] = None,
+        spool_workers: int = 4,
+        blob_prune_interval: Optional[float] = 6 * 3600,
     ) -> None:
         """
         Initialize the SMTP receiver.
@@ -480,6 +662,13 @@ class SMTPReceiver:
             allowed_domains: List of domains to accept mail for.
             max_message_size: Maximum message size in bytes.
             storage: EmailStorage instance (uses default if not provided).
+            dkim_verifier: Verifier for inbound DKIM signatures (None
+                skips verification).
+            spool_dir: Spool directory; when set, messages are answered
+                once on disk and parsed and stored in the background.
+            spool_workers: Messages the spool processes concurrently.
+            blob_prune_interval: Seconds between sweeps of unreferenced
+                attachment blobs, the first at startup (None disables).
         """
         self.host = host
         self.port = port
@@ -489,12 +678,21 @@ class SMTPReceiver:
         self.require_starttls = require_starttls
         self.allowed_domains = allowed_domains or []
         self.max_message_size = max_message_size
+        self.dkim_verifier = dkim_verifier
+        self.spool_dir = spool_dir
+        self.spool_workers = spool_workers
+        self.blob_prune_interval = blob_prune_interval
 
         self._storage = storage or get_storage()
-        self._parser = EmailParser(max_attachment_size=max_message_size)
+        self._parser = EmailParser(
+            max_attachment_size=max_message_size,
+            blob_store=self._storage.blobs,
+        )
         self._controller: Optional[Controller] = None
         self._running = False
         self._tls_context: Optional[ssl.SSLContext] = None
+        self._spool: Optional[SpoolProcessor] = None
+        self._prune_task: Optional[asyncio.Task] = None
 
         # Update handler max size
         SMTPHandler.MAX_MESSAGE_SIZE = max_message_size
@@ -515,6 +713,16 @@ class SMTPReceiver:
         if settings is None:
             settings = get_settings().smtp
 
+        dkim_verifier = None
+        dns_settings = get_settings().dns
+        if dns_settings.dkim_verify:
+            from gateway.crypto.dkim import DKIMVerifier
+
+            dkim_verifier = DKIMVerifier(
+                dns_resolver=dns_settings.resolver,
+                dns_timeout=dns_settings.timeout,
+            )
+
         return cls(
             host=settings.host,
             port=settings.port,
@@ -523,6 +731,10 @@ class SMTPReceiver:
             tls_key_file=settings.tls_key_file,
             require_starttls=False,
             max_message_size=settings.max_message_size,
+            dkim_verifier=dkim_verifier,
+            spool_dir=settings.spool_dir,
+            spool_workers=settings.spool_workers,
+            blob_prune_interval=settings.blob_prune_interval,
         )
 
     def _create_tls_context(self) -> Optional[ssl.SSLContext]:
@@ -584,8 +796,17 @@ class SMTPReceiver:
                 parser=self._parser,
                 allowed_domains=self.allowed_domains,
                 require_auth_for_relay=True,
+                dkim_verifier=self.dkim_verifier,
             )
 
+            # Replay the spool before accepting new mail
+            if self.spool_dir:
+                self._spool = SpoolProcessor(
+                    InboundSpool(self.spool_dir), handler, self.spool_workers
+                )
+                handler.set_spool(self._spool)
+                await self._spool.start()
+
             authenticator = SMTPAuthenticator(self._storage)
 
             # Create the controller
@@ -600,12 +821,16 @@ class SMTPReceiver:
                 auth_require_tls=True,
                 authenticator=authenticator,
                 auth_required=False,  # Auth optional for receiving mail
+                data_size_limit=self.max_message_size,
             )
 
             # Start the server
             self._controller.start()
             self._running = True
 
+            if self.blob_prune_interval:
+                self._prune_task = asyncio.create_task(self._prune_blobs())
+
             logger.info(
                 "SMTP receiver started on %s:%d (hostname: %s, TLS: %s)",
                 self.host,
@@ -631,12 +856,35 @@ class SMTPReceiver:
                 self._controller.stop()
                 self._controller = None
 
+            if self._spool:
+                await self._spool.stop()
+                self._spool = None
+
+            if self._prune_task:
+                self._prune_task.cancel()
+                await asyncio.gather(self._prune_task, return_exceptions=True)
+                self._prune_task = None
+
             self._running = False
             logger.info("SMTP receiver stopped")
 
         except Exception as e:
             logger.error("Error stopping SMTP receiver: %s", str(e))
 
+    async def _prune_blobs(self) -> None:
+        """
+        Periodically delete attachment blobs that nothing references.
+
+        Reclaims the blobs of deleted messages and those written for
+        deliveries that were rejected or rolled back before being stored.
+        """
+        while True:
+            try:
+                await asyncio.to_thread(self._storage.prune_attachment_blobs)
+            except Exception as e:
+                logger.error("Failed to prune attachment blobs: %s", e)
+            await asyncio.sleep(self.blob_prune_interval)
+
     async def __aenter__(self) -> "SMTPReceiver":
         """Async context manager entry."""
         await self.start()
@@ -674,7 +922,15 @@ class SMTPReceiver:
             "tls_enabled": self._tls_context is not None,
             "max_message_size": self.max_message_size,
             "allowed_domains": self.allowed_domains,
+            "dkim_verification": self.dkim_verifier is not None,
         }
+        if self.dkim_verifier is not None:
+            result["dkim_key_cache"] = self.dkim_verifier.key_cache.stats.to_dict()
+        if self._spool is not None:
+            result["spool"] = self._spool.stats.to_dict()
+            # Accepted mail that was never stored needs an operator
+            if result["spool"]["quarantined"]:
+                result["status"] = "degraded"
 
         # Check database connectivity
         try:
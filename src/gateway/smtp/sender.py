@@ -20,14 +20,18 @@ import aiosmtplib
 import dns.resolver
 from dns.exception import DNSException
 
-from ...common.exceptions import (
+from common.exceptions import (
     DNSLookupError,
     MessageDeliveryError,
     SMTPAuthError,
     SMTPConnectionError,
     SMTPError,
 )
-from ...common.models import Message
+from common.models import Message
+
+from .dns_cache import DNSCache, DNSCacheStats
+from .executor import CPUExecutor
+from .pool import PoolKey, PoolStats, SMTPConnectionPool, TLSMode
 
 logger = logging.getLogger(__name__)
 
@@ -154,6 +158,10 @@ class SMTPSender:
         timeout: int = DEFAULT_TIMEOUT,
         dns_resolver: Optional[str] = None,
         verify_ssl: bool = True,
+        idle_timeout: float = 30.0,
+        max_messages_per_connection: int = 100,
+        dns_cache: Optional[DNSCache] = None,
+        executor: Optional[CPUExecutor] = None,
     ) -> None:
         """
         Initialize the SMTP sender.
@@ -167,6 +175,13 @@ class SMTPSender:
             timeout: Connection timeout in seconds.
             dns_resolver: DNS resolver address for MX lookups.
             verify_ssl: Whether to verify SSL certificates.
+            idle_timeout: Seconds a pooled connection is kept open unused.
+            max_messages_per_connection: Messages sent over one pooled
+                connection before it is replaced.
+            dns_cache: Cache for MX and address lookups (one using
+                dns_resolver is created when omitted).
+            executor: Process pool send_message() composes messages in
+                (composed on the event loop when omitted).
         """
         self.hostname = hostname
         self.relay_config = relay_config
@@ -176,13 +191,23 @@ class SMTPSender:
         self.timeout = timeout
         self.dns_resolver = dns_resolver
         self.verify_ssl = verify_ssl
+        self._executor = executor
 
-        # DNS resolver for MX lookups
-        self._resolver: Optional[dns.resolver.Resolver] = None
+        # Cached, coalesced MX and address lookups
+        self._dns_cache = dns_cache or DNSCache(
+            nameserver=dns_resolver, timeout=timeout
+        )
 
         # Delivery tracking
         self._delivery_results: dict[str, DeliveryResult] = {}
 
+        # Open sessions reused across deliveries to the same destination
+        self._pool = SMTPConnectionPool(
+            self._open_connection,
+            idle_timeout=idle_timeout,
+            max_messages_per_connection=max_messages_per_connection,
+        )
+
         logger.info(
             "SMTPSender initialized with hostname=%s, relay=%s, max_retries=%d",
             hostname,
@@ -191,24 +216,42 @@ class SMTPSender:
         )
 
     @property
-    def resolver(self) -> dns.resolver.Resolver:
-        """Get or create DNS resolver."""
-        if self._resolver is None:
-            self._resolver = dns.resolver.Resolver()
-            if self.dns_resolver:
-                self._resolver.nameservers = [self.dns_resolver]
-            self._resolver.lifetime = self.timeout
-        return self._resolver
+    def pool_stats(self) -> PoolStats:
+        """Connection pool counters."""
+        return self._pool.stats
+
+    async def close(self) -> None:
+        """
+        Close pooled connections.
+
+        The sender stays usable; new connections are opened on demand.
+        """
+        await self._pool.close()
+
+    @property
+    def dns_cache(self) -> DNSCache:
+        """Cache used for MX and address lookups."""
+        return self._dns_cache
+
+    @property
+    def dns_stats(self) -> DNSCacheStats:
+        """DNS cache counters."""
+        return self._dns_cache.stats
 
     async def get_mx_records(self, domain: str) -> list[MXRecord]:
         """
         Get MX records for a domain, sorted by priority.
 
+        Answers come from the DNS cache, which honours record TTLs and
+        caches nonexistent domains. A domain without MX records falls back
+        to its own address record (the implicit MX of RFC 5321).
+
         Args:
             domain: The domain to look up.
 
         Returns:
-            List of MXRecord objects sorted by priority.
+            List of MXRecord objects sorted by priority, empty if the
+            domain accepts no mail.
 
         Raises:
             DNSLookupError: If MX lookup fails.
@@ -216,20 +259,16 @@ class SMTPSender:
         logger.debug("Looking up MX records for domain: %s", domain)
 
         try:
-            # Run DNS query in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            answers = await loop.run_in_executor(
-                None, lambda: self.resolver.resolve(domain, "MX")
-            )
+            answers = await self._dns_cache.resolve(domain, "MX")
 
             mx_records = []
             for rdata in answers:
-                mx_records.append(
-                    MXRecord(
-                        priority=rdata.preference,
-                        host=str(rdata.exchange).rstrip("."),
+                host = str(rdata.exchange).rstrip(".")
+                # A null MX ("0 .", RFC 7505) means no mail is accepted
+                if host:
+                    mx_records.append(
+                        MXRecord(priority=rdata.preference, host=host)
                     )
-                )
 
             # Sort by priority (lower is better)
             mx_records.sort()
@@ -248,7 +287,7 @@ class SMTPSender:
                 "No MX records found for domain: %s (NXDOMAIN)", domain
             )
             raise DNSLookupError(
-                domain, "MX", {"reason": "Domain does not exist"}
+                domain, "MX", {"reason": "Domain does not exist", "nxdomain": True}
             )
 
         except dns.resolver.NoAnswer:
@@ -256,12 +295,32 @@ class SMTPSender:
             logger.info(
                 "No MX records for %s, falling back to A record", domain
             )
-            return [MXRecord(priority=0, host=domain)]
+            return await self._implicit_mx(domain)
 
         except DNSException as e:
             logger.error("DNS lookup failed for %s: %s", domain, e)
             raise DNSLookupError(domain, "MX", {"reason": str(e)})
 
+    async def _implicit_mx(self, domain: str) -> list[MXRecord]:
+        """
+        Use the domain itself as its mail server if it has an address.
+
+        Raises:
+            DNSLookupError: If the address lookup fails.
+        """
+        for rdtype in ("A", "AAAA"):
+            try:
+                await self._dns_cache.resolve(domain, rdtype)
+                return [MXRecord(priority=0, host=domain)]
+            except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+                continue
+            except DNSException as e:
+                logger.error("DNS lookup failed for %s: %s", domain, e)
+                raise DNSLookupError(domain, rdtype, {"reason": str(e)})
+
+        logger.warning("No MX or address records for domain: %s", domain)
+        return []
+
     async def verify_connection(
         self, host: str, port: int = 25, use_tls: bool = False
     ) -> tuple[bool, Optional[str]]:
@@ -281,24 +340,18 @@ class SMTPSender:
         )
 
         try:
+            # Without implicit TLS, STARTTLS is used when offered
             smtp = aiosmtplib.SMTP(
                 hostname=host,
                 port=port,
+                local_hostname=self.hostname,
                 timeout=self.timeout,
                 use_tls=use_tls,
+                start_tls=False if use_tls else None,
+                validate_certs=self.verify_ssl,
             )
 
             await smtp.connect()
-            await smtp.ehlo(self.hostname)
-
-            # Try STARTTLS if not using implicit TLS
-            if not use_tls:
-                try:
-                    await smtp.starttls()
-                    await smtp.ehlo(self.hostname)
-                except aiosmtplib.SMTPException:
-                    logger.debug("STARTTLS not supported by %s:%d", host, port)
-
             await smtp.quit()
 
             logger.info("Connection verified to %s:%d", host, port)
@@ -346,14 +399,142 @@ class SMTPSender:
         """Check if SMTP response code indicates temporary failure."""
         return smtp_code in self.TEMPORARY_FAILURE_CODES
 
+    def _refused_result(
+        self,
+        recipient: str,
+        error: aiosmtplib.SMTPResponseException,
+        host: str,
+    ) -> DeliveryResult:
+        """Build the result for a server that answered with an error reply."""
+        return DeliveryResult(
+            recipient=recipient,
+            status=(
+                DeliveryStatus.BOUNCED
+                if self._is_permanent_failure(error.code)
+                else DeliveryStatus.DEFERRED
+            ),
+            smtp_code=error.code,
+            smtp_message=error.message,
+            mx_host=host,
+        )
+
+    def _tls_context(self) -> ssl.SSLContext:
+        """Create the SSL context for TLS connections."""
+        ssl_context = ssl.create_default_context()
+        if not self.verify_ssl:
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+        return ssl_context
+
+    def _relay_key(self) -> PoolKey:
+        """Pool key for the configured relay."""
+        relay = self.relay_config
+        if relay.use_tls and relay.port == 465:
+            tls = TLSMode.IMPLICIT
+        elif relay.use_tls or relay.require_starttls:
+            tls = TLSMode.STARTTLS
+        else:
+            tls = TLSMode.NONE
+        return PoolKey(relay.host, relay.port, tls)
+
+    async def _open_connection(self, key: PoolKey) -> aiosmtplib.SMTP:
+        """
+        Open an SMTP session for the connection pool.
+
+        Connects, negotiates TLS as the key requires and, for the relay,
+        authenticates.
+
+        Raises:
+            SMTPAuthError: If relay authentication fails.
+            aiosmtplib.SMTPException: If connecting fails.
+        """
+        smtp = aiosmtplib.SMTP(
+            hostname=key.host,
+            port=key.port,
+            local_hostname=self.hostname,
+            timeout=self.timeout,
+            use_tls=key.tls == TLSMode.IMPLICIT,
+            start_tls={
+                TLSMode.NONE: False,
+                TLSMode.OPPORTUNISTIC: None,
+                TLSMode.STARTTLS: True,
+                TLSMode.IMPLICIT: False,
+            }[key.tls],
+            tls_context=None if key.tls == TLSMode.NONE else self._tls_context(),
+        )
+        await smtp.connect()
+
+        relay = self.relay_config
+        if relay and key == self._relay_key() and relay.username and relay.password:
+            try:
+                await smtp.login(relay.username, relay.password)
+            except aiosmtplib.SMTPAuthenticationError as e:
+                smtp.close()
+                logger.error("Relay authentication failed: %s", e)
+                raise SMTPAuthError(
+                    f"Authentication failed for relay {relay.host}",
+                    {"error": str(e)},
+                )
+        return smtp
+
+    async def _transact(
+        self,
+        key: PoolKey,
+        sender: str,
+        recipients: list[str],
+        message_data: str | bytes,
+    ) -> dict[str, tuple[int, str]]:
+        """
+        Run one SMTP transaction (one envelope) on a pooled connection.
+
+        A reused connection the server has since dropped is replaced
+        transparently.
+
+        Returns:
+            Refusals for recipients that were rejected while others were
+            accepted, as {recipient: (code, message)}.
+
+        Raises:
+            aiosmtplib.SMTPRecipientsRefused: If every recipient was refused.
+            aiosmtplib.SMTPResponseException: If the server rejected the
+                transaction.
+            aiosmtplib.SMTPException, OSError: If the connection failed.
+        """
+        while True:
+            conn = await self._pool.acquire(key)
+            try:
+                errors, _ = await conn.smtp.sendmail(sender, recipients, message_data)
+            except aiosmtplib.SMTPRecipientsRefused:
+                await self._pool.release(conn)
+                raise
+            except aiosmtplib.SMTPResponseException as e:
+                # 421 means the server is closing the session
+                if e.code == 421:
+                    await self._pool.discard(conn)
+                else:
+                    await self._pool.release(conn)
+                raise
+            except (aiosmtplib.SMTPServerDisconnected, ConnectionError):
+                await self._pool.discard(conn)
+                if conn.reused:
+                    continue
+                raise
+            except BaseException:
+                await self._pool.discard(conn)
+                raise
+
+            conn.messages_sent += 1
+            await self._pool.release(conn)
+            return errors
+
     async def _send_via_relay(
         self,
-        message_data: str,
+        message_data: str | bytes,
         sender: str,
         recipients: list[str],
-    ) -> DeliveryResult:
+    ) -> list[DeliveryResult]:
         """
-        Send email via configured relay server.
+        Send email via configured relay server in a single envelope.
 
         Args:
             message_data: The raw email message data.
@@ -361,7 +542,12 @@ class SMTPSender:
             recipients: List of recipient email addresses.
 
         Returns:
-            DeliveryResult for the delivery attempt.
+            One DeliveryResult per recipient.
+
+        Raises:
+            SMTPConnectionError: If the relay cannot be reached.
+            SMTPAuthError: If relay authentication fails.
+            SMTPError: For other relay protocol errors.
         """
         if not self.relay_config:
             raise SMTPError("Relay configuration not set")
@@ -370,76 +556,30 @@ class SMTPSender:
         logger.info("Sending via relay server %s:%d", relay.host, relay.port)
 
         try:
-            # Create SSL context
-            ssl_context: Optional[ssl.SSLContext] = None
-            if relay.use_tls or relay.require_starttls:
-                ssl_context = ssl.create_default_context()
-                if not self.verify_ssl:
-                    ssl_context.check_hostname = False
-                    ssl_context.verify_mode = ssl.CERT_NONE
-
-            smtp = aiosmtplib.SMTP(
-                hostname=relay.host,
-                port=relay.port,
-                timeout=self.timeout,
-                use_tls=relay.use_tls and relay.port == 465,
-                tls_context=ssl_context if relay.use_tls else None,
+            errors = await self._transact(
+                self._relay_key(), sender, recipients, message_data
             )
 
-            await smtp.connect()
-            await smtp.ehlo(self.hostname)
-
-            # STARTTLS for submission port
-            if relay.require_starttls and not relay.use_tls:
-                await smtp.starttls(tls_context=ssl_context)
-                await smtp.ehlo(self.hostname)
-
-            # Authenticate if credentials provided
-            if relay.username and relay.password:
-                try:
-                    await smtp.login(relay.username, relay.password)
-                except aiosmtplib.SMTPAuthenticationError as e:
-                    logger.error("Relay authentication failed: %s", e)
-                    raise SMTPAuthError(
-                        f"Authentication failed for relay {relay.host}",
-                        {"error": str(e)},
-                    )
-
-            # Send the message
-            response = await smtp.sendmail(sender, recipients, message_data)
-            await smtp.quit()
+        except SMTPAuthError:
+            raise
 
-            # Check response for each recipient
-            # aiosmtplib returns dict of {recipient: (code, message)} for
-            # failures
-            if response:
-                # Some recipients failed
-                failed_recipient = list(response.keys())[0]
-                code, message = response[failed_recipient]
-                return DeliveryResult(
-                    recipient=", ".join(recipients),
-                    status=(
-                        DeliveryStatus.FAILED
-                        if self._is_permanent_failure(code)
-                        else DeliveryStatus.DEFERRED
-                    ),
-                    smtp_code=code,
-                    smtp_message=message,
-                    mx_host=relay.host,
-                )
+        except aiosmtplib.SMTPRecipientsRefused as e:
+            refused = {r.recipient: r for r in e.recipients}
+            return [
+                self._refused_result(recipient, refused[recipient], relay.host)
+                for recipient in recipients
+            ]
 
-            return DeliveryResult(
-                recipient=", ".join(recipients),
-                status=DeliveryStatus.DELIVERED,
-                smtp_code=250,
-                smtp_message="Message accepted",
-                mx_host=relay.host,
+        except aiosmtplib.SMTPResponseException as e:
+            logger.warning(
+                "SMTP error from relay %s: %d %s", relay.host, e.code, e.message
             )
+            return [
+                self._refused_result(recipient, e, relay.host)
+                for recipient in recipients
+            ]
 
-        except SMTPAuthError:
-            raise
-
-        except aiosmtplib.SMTPConnectError as e:
+        except (aiosmtplib.SMTPConnectError, OSError) as e:
             logger.error("Failed to connect to relay %s: %s", relay.host, e)
             raise SMTPConnectionError(
                 f"Failed to connect to relay {relay.host}",
@@ -453,166 +593,263 @@ class SMTPSender:
                 {"error": str(e)},
             )
 
+        results = []
+        for recipient in recipients:
+            if recipient in errors:
+                code, message = errors[recipient]
+                results.append(
+                    DeliveryResult(
+                        recipient=recipient,
+                        status=(
+                            DeliveryStatus.BOUNCED
+                            if self._is_permanent_failure(code)
+                            else DeliveryStatus.DEFERRED
+                        ),
+                        smtp_code=code,
+                        smtp_message=message,
+                        mx_host=relay.host,
+                    )
+                )
+            else:
+                results.append(self._delivered_result(recipient, relay.host))
+        return results
+
     async def _send_direct(
         self,
-        message_data: str,
+        message_data: str | bytes,
         sender: str,
-        recipient: str,
-    ) -> DeliveryResult:
+        recipients: list[str],
+    ) -> list[DeliveryResult]:
         """
-        Send email directly to recipient's mail server via MX lookup.
+        Send email directly to the recipients' mail server via MX lookup.
+
+        All recipients must share a domain; they are sent as one envelope
+        with a RCPT TO per recipient. Recipients a server defers are tried
+        again on the next MX host.
 
         Args:
             message_data: The raw email message data.
             sender: The sender email address.
-            recipient: The recipient email address.
+            recipients: Recipient email addresses at a single domain.
 
         Returns:
-            DeliveryResult for the delivery attempt.
+            One DeliveryResult per recipient.
         """
-        # Extract domain from recipient
-        if "@" not in recipient:
-            return DeliveryResult(
-                recipient=recipient,
-                status=DeliveryStatus.FAILED,
-                error="Invalid recipient address: no domain",
-            )
-
-        domain = recipient.split("@")[1]
+        domain = _domain_of(recipients[0])
+        if domain is None:
+            return [
+                DeliveryResult(
+                    recipient=recipient,
+                    status=DeliveryStatus.FAILED,
+                    error="Invalid recipient address: no domain",
+                )
+                for recipient in recipients
+            ]
 
         # Get MX records
         try:
             mx_records = await self.get_mx_records(domain)
         except DNSLookupError as e:
-            return DeliveryResult(
-                recipient=recipient,
-                status=DeliveryStatus.BOUNCED,
-                error=str(e),
+            # Only a missing domain is final; timeouts and SERVFAIL recover
+            status = (
+                DeliveryStatus.BOUNCED
+                if e.details.get("nxdomain")
+                else DeliveryStatus.DEFERRED
             )
+            return [
+                DeliveryResult(recipient=recipient, status=status, error=str(e))
+                for recipient in recipients
+            ]
 
         if not mx_records:
-            return DeliveryResult(
-                recipient=recipient,
-                status=DeliveryStatus.BOUNCED,
-                error=f"No mail servers found for domain {domain}",
-            )
+            return [
+                DeliveryResult(
+                    recipient=recipient,
+                    status=DeliveryStatus.BOUNCED,
+                    error=f"No mail servers found for domain {domain}",
+                )
+                for recipient in recipients
+            ]
 
-        # Try each MX server in priority order
+        results: dict[str, DeliveryResult] = {}
+        pending = list(recipients)
         last_error: Optional[str] = None
         last_code: Optional[int] = None
 
+        # Try each MX server in priority order
         for mx in mx_records:
             logger.info(
-                "Trying MX server %s:%d for %s", mx.host, mx.port, recipient
+                "Trying MX server %s:%d for %d recipient(s) at %s",
+                mx.host,
+                mx.port,
+                len(pending),
+                domain,
             )
+            key = PoolKey(mx.host, mx.port, TLSMode.OPPORTUNISTIC)
 
             try:
-                # Create SSL context for STARTTLS
-                ssl_context = ssl.create_default_context()
-                if not self.verify_ssl:
-                    ssl_context.check_hostname = False
-                    ssl_context.verify_mode = ssl.CERT_NONE
-
-                smtp = aiosmtplib.SMTP(
-                    hostname=mx.host,
-                    port=mx.port,
-                    timeout=self.timeout,
-                )
-
-                await smtp.connect()
-                await smtp.ehlo(self.hostname)
-
-                # Try STARTTLS
-                try:
-                    await smtp.starttls(tls_context=ssl_context)
-                    await smtp.ehlo(self.hostname)
-                except aiosmtplib.SMTPException as e:
-                    logger.debug(
-                        "STARTTLS not available on %s: %s", mx.host, e
-                    )
-
-                # Send the message
-                response = await smtp.sendmail(
-                    sender, [recipient], message_data
-                )
-                await smtp.quit()
-
-                # Check for errors
-                if response and recipient in response:
-                    code, message = response[recipient]
-                    if self._is_permanent_failure(code):
-                        return DeliveryResult(
-                            recipient=recipient,
-                            status=DeliveryStatus.BOUNCED,
-                            smtp_code=code,
-                            smtp_message=message,
-                            mx_host=mx.host,
+                errors = await self._transact(key, sender, pending, message_data)
+                refusals = [
+                    (recipient, *errors[recipient])
+                    for recipient in pending
+                    if recipient in errors
+                ]
+                for recipient in pending:
+                    if recipient not in errors:
+                        results[recipient] = self._delivered_result(
+                            recipient, mx.host
                         )
-                    else:
-                        last_code = code
-                        last_error = message
-                        continue
 
-                # Success
-                return DeliveryResult(
-                    recipient=recipient,
-                    status=DeliveryStatus.DELIVERED,
-                    smtp_code=250,
-                    smtp_message="Message accepted",
-                    mx_host=mx.host,
-                )
+            except aiosmtplib.SMTPRecipientsRefused as e:
+                refusals = [(r.recipient, r.code, r.message) for r in e.recipients]
 
             except aiosmtplib.SMTPResponseException as e:
                 logger.warning(
                     "SMTP error from %s for %s: %d %s",
                     mx.host,
-                    recipient,
+                    domain,
                     e.code,
                     e.message,
                 )
-                if self._is_permanent_failure(e.code):
-                    return DeliveryResult(
-                        recipient=recipient,
-                        status=DeliveryStatus.BOUNCED,
-                        smtp_code=e.code,
-                        smtp_message=e.message,
-                        mx_host=mx.host,
-                    )
-                last_code = e.code
-                last_error = e.message
+                refusals = [(recipient, e.code, e.message) for recipient in pending]
 
             except (aiosmtplib.SMTPConnectError, socket.error, OSError) as e:
-                logger.warning(
-                    "Connection error to %s for %s: %s", mx.host, recipient, e
-                )
+                logger.warning("Connection error to %s for %s: %s", mx.host, domain, e)
                 last_error = str(e)
+                continue
 
             except Exception as e:
                 logger.error(
-                    "Unexpected error sending to %s via %s: %s",
-                    recipient,
-                    mx.host,
-                    e,
+                    "Unexpected error sending to %s via %s: %s", domain, mx.host, e
                 )
                 last_error = str(e)
+                continue
+
+            # Permanent refusals are final; deferrals move on to the next MX
+            pending = []
+            for recipient, code, message in refusals:
+                if self._is_permanent_failure(code):
+                    results[recipient] = DeliveryResult(
+                        recipient=recipient,
+                        status=DeliveryStatus.BOUNCED,
+                        smtp_code=code,
+                        smtp_message=message,
+                        mx_host=mx.host,
+                    )
+                else:
+                    pending.append(recipient)
+                    last_code = code
+                    last_error = message
+            if not pending:
+                break
+
+        # All MX servers failed for the rest - defer for retry
+        for recipient in pending:
+            results[recipient] = DeliveryResult(
+                recipient=recipient,
+                status=DeliveryStatus.DEFERRED,
+                smtp_code=last_code,
+                smtp_message=last_error,
+                error=f"All MX servers failed for {domain}",
+            )
+        return [results[recipient] for recipient in recipients]
 
-        # All MX servers failed - defer for retry
+    @staticmethod
+    def _delivered_result(recipient: str, host: str) -> DeliveryResult:
+        """Build the result for an accepted recipient."""
         return DeliveryResult(
             recipient=recipient,
-            status=DeliveryStatus.DEFERRED,
-            smtp_code=last_code,
-            smtp_message=last_error,
-            error=f"All MX servers failed for {domain}",
+            status=DeliveryStatus.DELIVERED,
+            smtp_code=250,
+            smtp_message="Message accepted",
+            mx_host=host,
         )
 
+    async def send_envelope(
+        self,
+        message_data: str | bytes,
+        sender: str,
+        recipients: list[str],
+    ) -> list[DeliveryResult]:
+        """
+        Make one delivery attempt of pre-composed message data.
+
+        Recipients are sent in one envelope through the relay when one is
+        configured, otherwise in one envelope per recipient domain to that
+        domain's MX servers, with domains delivered concurrently. Unlike
+        send_message(), this never waits and retries, so callers with
+        their own retry scheduling (the outbound queue) decide when to try
+        again.
+
+        Args:
+            message_data: The raw email message data.
+            sender: The envelope sender address.
+            recipients: Recipient email addresses.
+
+        Returns:
+            One DeliveryResult per distinct recipient, in order.
+
+        Raises:
+            SMTPConnectionError: If the relay cannot be reached.
+            SMTPAuthError: If relay authentication fails.
+            SMTPError: For other relay protocol errors.
+        """
+        recipients = _unique(recipients)
+
+        if self.relay_config:
+            results = await self._send_via_relay(message_data, sender, recipients)
+        else:
+            groups = await asyncio.gather(
+                *(
+                    self._send_direct(message_data, sender, group)
+                    for group in _group_by_domain(recipients)
+                )
+            )
+            by_recipient = {r.recipient: r for group in groups for r in group}
+            results = [by_recipient[recipient] for recipient in recipients]
+
+        for result in results:
+            result.attempts = 1
+        return results
+
+    async def send_raw(
+        self,
+        message_data: str | bytes,
+        sender: str,
+        recipient: str,
+    ) -> DeliveryResult:
+        """
+        Make one delivery attempt of pre-composed message data.
+
+        Single-recipient form of send_envelope().
+
+        Args:
+            message_data: The raw email message data.
+            sender: The envelope sender address.
+            recipient: The recipient email address.
+
+        Returns:
+            DeliveryResult for the attempt.
+
+        Raises:
+            SMTPConnectionError: If the relay cannot be reached.
+            SMTPAuthError: If relay authentication fails.
+            SMTPError: For other relay protocol errors.
+        """
+        (result,) = await self.send_envelope(message_data, sender, [recipient])
+        return result
+
     async def send_message(
         self,
         message: Message,
-        raw_data: Optional[str] = None,
+        raw_data: Optional[str | bytes] = None,
     ) -> list[DeliveryResult]:
         """
         Send an email message to all recipients.
 
+        Recipients at the same domain share one envelope; deferred
+        recipients are retried with exponential backoff.
+
         Args:
             message: The Message object to send.
             raw_data: Optional pre-composed raw message data.
@@ -634,17 +871,27 @@ class SMTPSender:
 
         # Get raw message data if not provided
         if raw_data is None:
-            # Import composer here to avoid circular imports
-            from .composer import EmailComposer
+            if self._executor is not None:
+                raw_data = await self._executor.render(
+                    message.model_dump(mode="json")
+                )
+            else:
+                # Import composer here to avoid circular imports
+                from .composer import EmailComposer
 
-            composer = EmailComposer()
-            raw_data = composer.compose_from_message(message)
+                composer = EmailComposer()
+                raw_data = composer.compose_from_message(message)
 
         # Collect all recipients
-        all_recipients = (
-            list(message.to_addresses)
-            + list(message.cc_addresses)
-            + list(message.bcc_addresses)
+        all_recipients = _unique(
+            [
+                str(r)
+                for r in (
+                    list(message.to_addresses)
+                    + list(message.cc_addresses)
+                    + list(message.bcc_addresses)
+                )
+            ]
         )
 
         if not all_recipients:
@@ -653,31 +900,31 @@ class SMTPSender:
                 reason="No recipients specified",
             )
 
-        results: list[DeliveryResult] = []
-
         # Use relay if configured, otherwise send direct
         if self.relay_config:
-            # Send all recipients through relay in one connection
-            result = await self._send_via_relay(
+            # Send all recipients through relay in one envelope
+            results = await self._send_via_relay(
                 message_data=raw_data,
                 sender=str(message.from_address),
-                recipients=[str(r) for r in all_recipients],
+                recipients=all_recipients,
             )
-            result.message_id = message.message_id
-            results.append(result)
         else:
-            # Send to each recipient directly
-            for recipient in all_recipients:
-                result = await self._send_with_retry(
-                    message_data=raw_data,
-                    sender=str(message.from_address),
-                    recipient=str(recipient),
+            # One envelope per recipient domain
+            groups = await asyncio.gather(
+                *(
+                    self._send_with_retry(
+                        message_data=raw_data,
+                        sender=str(message.from_address),
+                        recipients=group,
+                    )
+                    for group in _group_by_domain(all_recipients)
                 )
-                result.message_id = message.message_id
-                results.append(result)
+            )
+            results = [result for group in groups for result in group]
 
         # Store results for tracking
         for result in results:
+            result.message_id = message.message_id
             self._delivery_results[
                 f"{message.message_id}:{result.recipient}"
             ] = result
@@ -707,72 +954,71 @@ class SMTPSender:
 
     async def _send_with_retry(
         self,
-        message_data: str,
+        message_data: str | bytes,
         sender: str,
-        recipient: str,
-    ) -> DeliveryResult:
+        recipients: list[str],
+    ) -> list[DeliveryResult]:
         """
         Send email with retry logic and exponential backoff.
 
+        Each attempt sends the still-deferred recipients as one envelope.
+
         Args:
             message_data: The raw email message data.
             sender: The sender email address.
-            recipient: The recipient email address.
+            recipients: Recipient email addresses at a single domain.
 
         Returns:
-            DeliveryResult for the delivery attempt.
+            One DeliveryResult per recipient.
         """
+        final: dict[str, DeliveryResult] = {}
+        pending = list(recipients)
         attempt = 0
 
-        while attempt < self.max_retries:
+        while pending:
             attempt += 1
             logger.debug(
-                "Delivery attempt %d/%d for %s",
+                "Delivery attempt %d/%d for %d recipient(s)",
                 attempt,
                 self.max_retries,
-                recipient,
+                len(pending),
             )
 
-            result = await self._send_direct(
+            results = await self._send_direct(
                 message_data=message_data,
                 sender=sender,
-                recipient=recipient,
+                recipients=pending,
             )
-            result.attempts = attempt
 
-            # Success or permanent failure - don't retry
-            if result.status in (
-                DeliveryStatus.DELIVERED,
-                DeliveryStatus.BOUNCED,
-                DeliveryStatus.FAILED,
-            ):
-                return result
+            pending = []
+            for result in results:
+                result.attempts = attempt
 
-            # Temporary failure - retry with backoff
-            if result.status == DeliveryStatus.DEFERRED:
-                if attempt < self.max_retries:
-                    delay = self._calculate_retry_delay(attempt)
-                    logger.info(
-                        "Deferring delivery to %s, retry in %d seconds (attempt %d/%d)",
-                        recipient,
-                        delay,
-                        attempt,
-                        self.max_retries,
-                    )
-                    await asyncio.sleep(delay)
-                else:
+                # Success or permanent failure - don't retry
+                if result.status != DeliveryStatus.DEFERRED:
+                    final[result.recipient] = result
+                elif attempt >= self.max_retries:
                     # Max retries reached
                     result.status = DeliveryStatus.FAILED
                     result.error = f"Max retries ({self.max_retries}) exceeded"
-                    return result
+                    final[result.recipient] = result
+                else:
+                    pending.append(result.recipient)
 
-        # Should not reach here, but just in case
-        return DeliveryResult(
-            recipient=recipient,
-            status=DeliveryStatus.FAILED,
-            error="Unexpected retry loop exit",
-            attempts=attempt,
-        )
+            # Temporary failure - retry with backoff
+            if pending:
+                delay = self._calculate_retry_delay(attempt)
+                logger.info(
+                    "Deferring delivery to %d recipient(s), retry in %d seconds "
+                    "(attempt %d/%d)",
+                    len(pending),
+                    delay,
+                    attempt,
+                    self.max_retries,
+                )
+                await asyncio.sleep(delay)
+
+        return [final[recipient] for recipient in recipients]
 
     async def send_batch(
         self,
@@ -913,6 +1159,32 @@ class SMTPSender:
         return len(keys_to_remove)
 
 
+def _domain_of(address: str) -> Optional[str]:
+    """Return the lower-cased domain of an address, or None."""
+    if "@" not in address:
+        return None
+    return address.rsplit("@", 1)[1].lower() or None
+
+
+def _unique(addresses: list[str]) -> list[str]:
+    """Drop repeated addresses (case-insensitively), keeping order."""
+    seen: set[str] = set()
+    unique = []
+    for address in addresses:
+        if address.lower() not in seen:
+            seen.add(address.lower())
+            unique.append(address)
+    return unique
+
+
+def _group_by_domain(addresses: list[str]) -> list[list[str]]:
+    """Group addresses by domain, preserving first-seen order."""
+    groups: dict[Optional[str], list[str]] = {}
+    for address in addresses:
+        groups.setdefault(_domain_of(address), []).append(address)
+    return list(groups.values())
+
+
 # Factory function for creating configured sender
 def create_smtp_sender(
     hostname: str = "localhost",
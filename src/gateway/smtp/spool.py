@@ -0,0 +1,433 @@
+"""
+Inbound spool for the SMTP receiver.
+
+Parsing a MIME message and writing it to SQLite for every recipient is
+synchronous work; done inside handle_DATA it runs on the aiosmtpd event
+loop before the 250 reply, so one large message stalls every other
+session. In spool mode the receiver only writes the raw message to disk,
+fsyncs it and answers 250. A SpoolProcessor then parses and stores spooled
+messages with a pool of worker threads.
+
+The spool is a directory with three subdirectories:
+
+- ``tmp/``: messages being written (left over only by a crash before the
+  reply was sent, so they are deleted on startup)
+- ``new/``: accepted messages waiting to be stored (replayed on startup)
+- ``failed/``: messages that were rejected or kept failing to store
+
+Each spool file holds a one-line JSON envelope followed by the raw
+message. Delivery to the mailbox is at-least-once: a crash after storing a
+message but before removing its spool file stores it again on replay.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+if TYPE_CHECKING:
+    from .receiver import SMTPHandler
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SpoolEntry:
+    """A spooled message and its SMTP envelope."""
+
+    spool_id: str
+    mail_from: Optional[str]
+    rcpt_tos: list[str]
+    authserv_id: str
+    received_at: str
+    content: bytes = b""
+
+
+class InboundSpool:
+    """
+    Durable on-disk spool of accepted inbound messages.
+
+    A message is written to ``tmp/``, fsynced and renamed into ``new/``
+    (then the directory is fsynced), so a message acknowledged with 250
+    survives a crash or power loss.
+    """
+
+    def __init__(self, directory: Union[str, Path], fsync: bool = True) -> None:
+        """
+        Initialize the spool, creating its directories.
+
+        Args:
+            directory: Spool directory.
+            fsync: fsync spool files and directories before a message
+                counts as accepted (disable only for tests and benchmarks).
+        """
+        self.directory = Path(directory)
+        self.fsync = fsync
+        self._tmp = self.directory / "tmp"
+        self._new = self.directory / "new"
+        self._failed = self.directory / "failed"
+        for path in (self._tmp, self._new, self._failed):
+            path.mkdir(parents=True, exist_ok=True)
+
+    def write(
+        self,
+        content: bytes,
+        mail_from: Optional[str],
+        rcpt_tos: list[str],
+        authserv_id: str,
+    ) -> str:
+        """
+        Durably spool a message.
+
+        Args:
+            content: Raw message content.
+            mail_from: Envelope sender.
+            rcpt_tos: Envelope recipients.
+            authserv_id: Name of the receiving host.
+
+        Returns:
+            The spool ID.
+        """
+        # Time-ordered IDs make the replay order the arrival order
+        spool_id = f"{time.time_ns():020d}.{uuid.uuid4().hex[:12]}"
+        envelope = {
+            "mail_from": mail_from,
+            "rcpt_tos": rcpt_tos,
+            "authserv_id": authserv_id,
+            "received_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+        tmp_path = self._tmp / spool_id
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(envelope).encode("utf-8") + b"\n")
+            f.write(content)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self._new / spool_id)
+        if self.fsync:
+            _fsync_directory(self._new)
+        return spool_id
+
+    def read(self, spool_id: str) -> SpoolEntry:
+        """
+        Load a spooled message.
+
+        Raises:
+            FileNotFoundError: If the message is no longer spooled.
+        """
+        with open(self._new / spool_id, "rb") as f:
+            envelope = json.loads(f.readline())
+            content = f.read()
+        return SpoolEntry(
+            spool_id=spool_id,
+            mail_from=envelope["mail_from"],
+            rcpt_tos=envelope["rcpt_tos"],
+            authserv_id=envelope["authserv_id"],
+            received_at=envelope["received_at"],
+            content=content,
+        )
+
+    def pending(self) -> list[str]:
+        """IDs of spooled messages not yet stored, oldest first."""
+        return sorted(path.name for path in self._new.iterdir())
+
+    def failed(self) -> list[str]:
+        """IDs of messages moved to ``failed/``, oldest first."""
+        return sorted(path.name for path in self._failed.iterdir())
+
+    def remove(self, spool_id: str) -> None:
+        """Remove a message that has been stored."""
+        (self._new / spool_id).unlink(missing_ok=True)
+
+    def quarantine(self, spool_id: str) -> None:
+        """Move a message that cannot be stored to ``failed/``."""
+        os.replace(self._new / spool_id, self._failed / spool_id)
+
+    def recover(self) -> list[str]:
+        """
+        Clean up after a crash.
+
+        Deletes partial writes left in ``tmp/`` (never acknowledged).
+
+        Returns:
+            IDs of spooled messages to replay, oldest first.
+        """
+        for path in self._tmp.iterdir():
+            logger.warning("Removing incomplete spool file %s", path.name)
+            path.unlink(missing_ok=True)
+        return self.pending()
+
+
+def _fsync_directory(path: Path) -> None:
+    """fsync a directory so a rename into it is durable."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        # Directories cannot be opened on some platforms (Windows)
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@dataclass
+class SpoolStats:
+    """SpoolProcessor counters."""
+
+    accepted: int = 0
+    replayed: int = 0
+    stored: int = 0
+    rejected: int = 0
+    retried: int = 0
+    failed: int = 0
+    backlog: int = 0
+    # Messages in failed/, including those left by earlier runs
+    quarantined: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "accepted": self.accepted,
+            "replayed": self.replayed,
+            "stored": self.stored,
+            "rejected": self.rejected,
+            "retried": self.retried,
+            "failed": self.failed,
+            "backlog": self.backlog,
+            "quarantined": self.quarantined,
+        }
+
+
+class SpoolProcessor:
+    """
+    Background pool that parses and stores spooled messages.
+
+    ``workers`` asyncio tasks take spool IDs from a queue and run
+    SMTPHandler.deliver() with parsing and the SQLite writes in a thread
+    pool of the same size, so the event loop only does the asynchronous
+    parts (DKIM key lookups). Messages the handler rejects (5xx) are
+    quarantined; temporary failures (4xx) are retried after
+    ``retry_delay`` seconds, up to ``max_attempts`` times.
+
+    Example:
+        processor = SpoolProcessor(InboundSpool("/var/spool/unitmail"), handler)
+        handler.set_spool(processor)
+        await processor.start()
+    """
+
+    def __init__(
+        self,
+        spool: InboundSpool,
+        handler: "SMTPHandler",
+        workers: int = 4,
+        retry_delay: float = 60.0,
+        max_attempts: int = 10,
+    ) -> None:
+        """
+        Initialize the processor.
+
+        Args:
+            spool: The spool to process.
+            handler: Handler whose deliver() parses and stores messages.
+            workers: Messages processed concurrently.
+            retry_delay: Seconds before a temporary failure is retried.
+            max_attempts: Attempts before a message is quarantined.
+        """
+        self.spool = spool
+        self.workers = workers
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+        self._handler = handler
+
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks: list[asyncio.Task] = []
+        self._retries: dict[str, asyncio.TimerHandle] = {}
+        self._attempts: dict[str, int] = {}
+        self._stats = SpoolStats()
+
+    @property
+    def stats(self) -> SpoolStats:
+        """Current counters."""
+        self._stats.backlog = self._queue.qsize() + len(self._retries)
+        return self._stats
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the workers are running."""
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Replay messages left in the spool and start the workers."""
+        if self._tasks:
+            return
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="unitmail-spool"
+        )
+        loop = self._loop = asyncio.get_running_loop()
+        pending = await loop.run_in_executor(self._executor, self.spool.recover)
+        failed = await loop.run_in_executor(self._executor, self.spool.failed)
+        self._stats.quarantined = len(failed)
+        if failed:
+            logger.error(
+                "%d accepted messages could not be stored and are in %s",
+                len(failed),
+                self.spool.directory / "failed",
+            )
+        if pending:
+            logger.info("Replaying %d spooled messages", len(pending))
+        for spool_id in pending:
+            self._stats.replayed += 1
+            self._queue.put_nowait(spool_id)
+
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"unitmail-spool-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """
+        Stop the workers.
+
+        Messages not yet stored stay in the spool and are replayed by the
+        next start().
+        """
+        for handle in self._retries.values():
+            handle.cancel()
+        self._retries.clear()
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = asyncio.Queue()
+        self._loop = None
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def accept(
+        self,
+        content: bytes,
+        mail_from: Optional[str],
+        rcpt_tos: list[str],
+        authserv_id: str,
+    ) -> str:
+        """
+        Spool a message and queue it for storage.
+
+        The write and fsync run in the worker threads, so the event loop
+        keeps serving other sessions meanwhile. May be called from another
+        event loop than the processor's (aiosmtpd's Controller runs its
+        own loop in a thread).
+
+        Returns:
+            The spool ID.
+
+        Raises:
+            OSError: If the message could not be written to the spool.
+        """
+        loop = asyncio.get_running_loop()
+        spool_id = await loop.run_in_executor(
+            self._executor, self.spool.write, content, mail_from, rcpt_tos, authserv_id
+        )
+        self._stats.accepted += 1
+        if self._loop is None or self._loop is loop:
+            self._queue.put_nowait(spool_id)
+        else:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, spool_id)
+        return spool_id
+
+    async def drain(self) -> None:
+        """Wait until every queued message has been processed once."""
+        await self._queue.join()
+
+    async def _run(self) -> None:
+        """Worker: process spooled messages until cancelled."""
+        while True:
+            spool_id = await self._queue.get()
+            try:
+                await self._process(spool_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error processing spooled message %s: %s", spool_id, e)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, spool_id: str) -> None:
+        """Store one spooled message and settle its spool file."""
+        loop = asyncio.get_running_loop()
+        try:
+            entry = await loop.run_in_executor(
+                self._executor, self.spool.read, spool_id
+            )
+        except FileNotFoundError:
+            return
+
+        reply = await self._handler.deliver(
+            entry.content,
+            entry.mail_from,
+            entry.rcpt_tos,
+            entry.authserv_id,
+            executor=self._executor,
+            received_at=entry.received_at,
+        )
+
+        if reply.startswith("2"):
+            self._stats.stored += 1
+            self._attempts.pop(spool_id, None)
+            await loop.run_in_executor(self._executor, self.spool.remove, spool_id)
+            return
+
+        attempts = self._attempts.get(spool_id, 0) + 1
+        if reply.startswith("5") or attempts >= self.max_attempts:
+            # The client was already answered 250, so nobody else learns
+            # that this message was not delivered
+            logger.error(
+                "Accepted message %s from %s to %s could not be stored and "
+                "was moved to failed/: %s",
+                spool_id,
+                entry.mail_from,
+                ", ".join(entry.rcpt_tos),
+                reply,
+            )
+            if reply.startswith("5"):
+                self._stats.rejected += 1
+            else:
+                self._stats.failed += 1
+            self._stats.quarantined += 1
+            self._attempts.pop(spool_id, None)
+            await loop.run_in_executor(
+                self._executor, self.spool.quarantine, spool_id
+            )
+            return
+
+        logger.warning(
+            "Spooled message %s not stored (%s); retrying in %.0fs",
+            spool_id,
+            reply,
+            self.retry_delay,
+        )
+        self._stats.retried += 1
+        self._attempts[spool_id] = attempts
+        self._retries[spool_id] = loop.call_later(
+            self.retry_delay, self._retry, spool_id
+        )
+
+    def _retry(self, spool_id: str) -> None:
+        """Queue a message again after a temporary failure."""
+        self._retries.pop(spool_id, None)
+        self._queue.put_nowait(spool_id)
@@ -0,0 +1,363 @@
+"""
+Multi-process supervision for the outbound queue.
+
+Runs several queue worker processes against the shared SQLite queue.
+Lease-based claims (EmailStorage.claim_queue_batch) keep the processes from
+delivering the same item, so CPU-bound per-message work such as MIME
+composition, DKIM signing and PGP spreads across cores instead of
+serialising on one event loop. The supervisor restarts children that exit
+unexpectedly and merges the QueueStats each child reports.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue as queue_module
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from .queue import DomainStats, QueueManager, QueueStats
+
+logger = logging.getLogger(__name__)
+
+
+class StatsReporter:
+    """
+    Sends a child's QueueStats to its supervisor.
+
+    Handed to each child process by QueueSupervisor; picklable.
+    """
+
+    def __init__(self, channel: Any, index: int) -> None:
+        """
+        Initialize the reporter.
+
+        Args:
+            channel: multiprocessing queue shared with the supervisor.
+            index: Slot number of the child process.
+        """
+        self._channel = channel
+        self.index = index
+
+    def report(self, stats: QueueStats) -> None:
+        """Send one stats snapshot (dropped if the channel is unavailable)."""
+        try:
+            self._channel.put_nowait(
+                (self.index, os.getpid(), stats.model_dump_json())
+            )
+        except (queue_module.Full, OSError, ValueError):
+            pass
+
+    async def run(self, manager: QueueManager, interval: float = 5.0) -> None:
+        """
+        Report the manager's status every ``interval`` seconds.
+
+        Runs until cancelled.
+        """
+        while True:
+            self.report(await manager.get_status())
+            await asyncio.sleep(interval)
+
+
+@dataclass
+class _Child:
+    """A supervised worker process slot."""
+
+    index: int
+    process: Optional[multiprocessing.process.BaseProcess] = None
+    started_at: float = 0.0
+    restarts: int = 0
+    failures: int = 0
+    restart_at: Optional[float] = None
+    stats: Optional[QueueStats] = None
+    reported_at: float = 0.0
+
+
+class QueueSupervisor:
+    """
+    Runs and supervises N queue worker processes.
+
+    Each child runs ``target(index, reporter, *args)``, which is expected
+    to run a QueueManager until told to stop with SIGTERM and to report
+    its stats through ``reporter``. Children that exit while the
+    supervisor is running are restarted after a delay that doubles with
+    each consecutive quick failure.
+
+    Example:
+        supervisor = QueueSupervisor(run_child, processes=8)
+        signal.signal(signal.SIGTERM, lambda *_: supervisor.stop())
+        supervisor.run()
+    """
+
+    def __init__(
+        self,
+        target: Callable[..., Any],
+        processes: int,
+        args: tuple = (),
+        restart_delay: float = 1.0,
+        max_restart_delay: float = 60.0,
+        min_uptime: float = 10.0,
+        shutdown_timeout: float = 30.0,
+        stats_log_interval: float = 60.0,
+        start_method: str = "spawn",
+    ) -> None:
+        """
+        Initialize the supervisor.
+
+        Args:
+            target: Module-level function run in each child process.
+            processes: Number of child processes.
+            args: Extra arguments passed to target.
+            restart_delay: Delay in seconds before restarting a crashed
+                child.
+            max_restart_delay: Upper bound on the restart delay.
+            min_uptime: A child that ran at least this long before exiting
+                is restarted without delay growth.
+            shutdown_timeout: Seconds to wait for children to stop before
+                killing them.
+            stats_log_interval: Seconds between aggregated stats log
+                lines (0 disables them).
+            start_method: multiprocessing start method.
+        """
+        if processes < 1:
+            raise ValueError("processes must be at least 1")
+
+        self._target = target
+        self._args = args
+        self.processes = processes
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.min_uptime = min_uptime
+        self.shutdown_timeout = shutdown_timeout
+        self.stats_log_interval = stats_log_interval
+
+        self._context = multiprocessing.get_context(start_method)
+        self._channel = self._context.Queue()
+        self._children = [_Child(index=i) for i in range(processes)]
+        self._stopping = False
+
+    @property
+    def restarts(self) -> int:
+        """Total number of child restarts."""
+        return sum(child.restarts for child in self._children)
+
+    @property
+    def pids(self) -> list[Optional[int]]:
+        """PIDs of the current children (None for a slot awaiting restart)."""
+        return [
+            child.process.pid if child.process and child.process.is_alive() else None
+            for child in self._children
+        ]
+
+    def stats(self) -> QueueStats:
+        """Queue statistics merged across the children's latest reports."""
+        reports = sorted(
+            (child for child in self._children if child.stats is not None),
+            key=lambda child: child.reported_at,
+        )
+        return aggregate_stats([child.stats for child in reports])
+
+    def stop(self) -> None:
+        """
+        Ask run() to shut the children down and return.
+
+        Safe to call from a signal handler.
+        """
+        self._stopping = True
+
+    def run(self, tick: float = 0.5) -> int:
+        """
+        Start the children and supervise them until stop() is called.
+
+        Args:
+            tick: Seconds between supervision passes.
+
+        Returns:
+            Exit code (0 for success).
+        """
+        logger.info("Starting %d queue worker processes", self.processes)
+        for child in self._children:
+            self._spawn(child)
+
+        last_log = time.monotonic()
+        try:
+            while not self._stopping:
+                self._collect_stats(timeout=tick)
+                self._check_children()
+
+                if (
+                    self.stats_log_interval
+                    and time.monotonic() - last_log >= self.stats_log_interval
+                ):
+                    last_log = time.monotonic()
+                    self._log_stats()
+        finally:
+            self._shutdown()
+
+        return 0
+
+    def _spawn(self, child: _Child) -> None:
+        """Start (or restart) the process for a slot."""
+        reporter = StatsReporter(self._channel, child.index)
+        child.process = self._context.Process(
+            target=self._target,
+            args=(child.index, reporter, *self._args),
+            name=f"unitmail-queue-{child.index}",
+        )
+        child.process.start()
+        child.started_at = time.monotonic()
+        child.restart_at = None
+        logger.info(
+            "Queue worker process %d started (pid %d)",
+            child.index,
+            child.process.pid,
+        )
+
+    def _check_children(self) -> None:
+        """Schedule restarts for exited children and start those due."""
+        now = time.monotonic()
+        for child in self._children:
+            if child.restart_at is not None:
+                if now >= child.restart_at and not self._stopping:
+                    child.restarts += 1
+                    self._spawn(child)
+                continue
+
+            if child.process is None or child.process.is_alive():
+                continue
+
+            exitcode = child.process.exitcode
+            child.process.join()
+            uptime = now - child.started_at
+            child.failures = 0 if uptime >= self.min_uptime else child.failures + 1
+            delay = min(
+                self.restart_delay * 2 ** max(child.failures - 1, 0),
+                self.max_restart_delay,
+            )
+            child.restart_at = now + delay
+            logger.error(
+                "Queue worker process %d (pid %d) exited with code %s after "
+                "%.1fs; restarting in %.1fs",
+                child.index,
+                child.process.pid,
+                exitcode,
+                uptime,
+                delay,
+            )
+
+    def _collect_stats(self, timeout: float) -> None:
+        """Read stats reports, waiting up to ``timeout`` for the first."""
+        try:
+            message = self._channel.get(timeout=timeout)
+            while True:
+                index, pid, payload = message
+                child = self._children[index]
+                if child.process is not None and child.process.pid == pid:
+                    child.stats = QueueStats.model_validate_json(payload)
+                    child.reported_at = time.monotonic()
+                message = self._channel.get_nowait()
+        except queue_module.Empty:
+            pass
+
+    def _log_stats(self) -> None:
+        """Log a one-line summary of the aggregated stats."""
+        stats = self.stats()
+        logger.info(
+            "Queue stats: processes=%d workers=%d/%d processed=%d pending=%d "
+            "retrying=%d throttled_domains=%d restarts=%d",
+            sum(1 for pid in self.pids if pid),
+            stats.workers_active,
+            stats.workers_total,
+            stats.total_processed,
+            stats.pending,
+            stats.deferred,
+            stats.throttled_domains,
+            self.restarts,
+        )
+
+    def _shutdown(self) -> None:
+        """Stop every child: SIGTERM, then SIGKILL after the timeout."""
+        self._stopping = True
+        running = [
+            child.process
+            for child in self._children
+            if child.process is not None and child.process.is_alive()
+        ]
+        logger.info("Stopping %d queue worker processes", len(running))
+        for process in running:
+            process.terminate()
+
+        deadline = time.monotonic() + self.shutdown_timeout
+        for process in running:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.warning(
+                    "Queue worker process %d did not stop; killing it",
+                    process.pid,
+                )
+                process.kill()
+                process.join()
+
+        self._collect_stats(timeout=0)
+        self._channel.close()
+        self._channel.join_thread()
+
+
+def aggregate_stats(reports: list[QueueStats]) -> QueueStats:
+    """
+    Merge QueueStats reported by several queue processes.
+
+    Per-process counters are summed. The queue-wide counts (pending,
+    processing, ...) are read from the shared database by every process,
+    so they are taken from the last report, which should be the most
+    recent.
+
+    Args:
+        reports: Stats from each process, oldest report first.
+
+    Returns:
+        Combined QueueStats.
+    """
+    merged = QueueStats()
+    if not reports:
+        return merged
+
+    latest = reports[-1]
+    merged.pending = latest.pending
+    merged.processing = latest.processing
+    merged.completed = latest.completed
+    merged.failed = latest.failed
+    merged.deferred = latest.deferred
+    merged.dead_letter = latest.dead_letter
+
+    merged.total_processed = sum(r.total_processed for r in reports)
+    merged.workers_active = sum(r.workers_active for r in reports)
+    merged.workers_total = sum(r.workers_total for r in reports)
+    if merged.total_processed:
+        merged.avg_processing_time_ms = (
+            sum(r.avg_processing_time_ms * r.total_processed for r in reports)
+            / merged.total_processed
+        )
+    merged.is_running = any(r.is_running for r in reports)
+    started = [r.started_at for r in reports if r.started_at]
+    merged.started_at = min(started) if started else None
+    merged.uptime_seconds = max(r.uptime_seconds for r in reports)
+
+    for report in reports:
+        for domain, stats in report.domains.items():
+            total = merged.domains.setdefault(domain, DomainStats())
+            total.active += stats.active
+            total.concurrency_limit += stats.concurrency_limit
+            total.dispatched += stats.dispatched
+            total.deferred += stats.deferred
+            total.throttle_events += stats.throttle_events
+            total.backoff_level = max(total.backoff_level, stats.backoff_level)
+            total.backoff_remaining_seconds = max(
+                total.backoff_remaining_seconds, stats.backoff_remaining_seconds
+            )
+    merged.throttled_domains = sum(
+        1 for stats in merged.domains.values() if stats.backoff_remaining_seconds > 0
+    )
+    return merged
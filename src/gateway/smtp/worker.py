@@ -16,12 +16,20 @@ from typing import Any, Optional, TYPE_CHECKING
 
 from common.storage import EmailStorage
 from common.exceptions import (
+    InvalidMessageError,
     MessageDeliveryError,
+    SMTPAuthError,
     SMTPConnectionError,
     SMTPError,
     DNSLookupError,
 )
 
+from .composer import EmailComposer
+from .executor import CPUExecutor, MessageRenderer
+from .sender import DeliveryResult as SMTPDeliveryResult
+from .sender import DeliveryStatus as SMTPDeliveryStatus
+from .sender import SMTPSender
+
 if TYPE_CHECKING:
     from .queue import QueueManager
 
@@ -52,6 +60,40 @@ class ErrorType(str, Enum):
     UNKNOWN = "unknown"
 
 
+# Error types that should not be retried
+PERMANENT_ERROR_TYPES = frozenset(
+    {
+        ErrorType.PERMANENT,
+        ErrorType.INVALID_RECIPIENT,
+        ErrorType.REJECTED,
+        ErrorType.POLICY_VIOLATION,
+        ErrorType.DNS_PERMANENT,
+        ErrorType.AUTHENTICATION_FAILED,
+    }
+)
+
+# Retryable error types that mean the destination is pushing back, so the
+# queue slows down delivery to the whole domain
+THROTTLE_ERROR_TYPES = frozenset(
+    {
+        ErrorType.TEMPORARY,
+        ErrorType.RATE_LIMITED,
+        ErrorType.SERVER_BUSY,
+        ErrorType.CONNECTION_FAILED,
+        ErrorType.TIMEOUT,
+    }
+)
+
+
+def log_lost_claim(item_id: str) -> None:
+    """Log a result dropped because another worker reclaimed the item."""
+    logger.warning(
+        "Queue item %s was reclaimed after its lease expired; "
+        "discarding this attempt's result",
+        item_id,
+    )
+
+
 @dataclass
 class DeliveryResult:
     """Result of a message delivery attempt."""
@@ -74,16 +116,7 @@ class DeliveryResult:
             return True
 
         # Permanent errors should not be retried
-        permanent_errors = {
-            ErrorType.PERMANENT,
-            ErrorType.INVALID_RECIPIENT,
-            ErrorType.REJECTED,
-            ErrorType.POLICY_VIOLATION,
-            ErrorType.DNS_PERMANENT,
-            ErrorType.AUTHENTICATION_FAILED,
-        }
-
-        return self.error_type not in permanent_errors
+        return self.error_type not in PERMANENT_ERROR_TYPES
 
 
 class ErrorClassifier:
@@ -218,6 +251,9 @@ class ErrorClassifier:
         if isinstance(exc, SMTPConnectionError):
             return ErrorType.CONNECTION_FAILED
 
+        if isinstance(exc, SMTPAuthError):
+            return ErrorType.AUTHENTICATION_FAILED
+
         if isinstance(exc, DNSLookupError):
             return ErrorType.DNS_TEMPORARY
 
@@ -231,6 +267,36 @@ class ErrorClassifier:
 
         return ErrorType.UNKNOWN
 
+    @classmethod
+    def classify_delivery(cls, result: SMTPDeliveryResult) -> Optional[ErrorType]:
+        """
+        Classify the outcome of an SMTPSender delivery attempt.
+
+        The reply code and text decide the error type, but the sender's
+        verdict bounds it: a bounce is never retried and a deferral is
+        never treated as permanent.
+
+        Args:
+            result: DeliveryResult returned by SMTPSender.
+
+        Returns:
+            None if the message was delivered, otherwise the ErrorType.
+        """
+        if result.status == SMTPDeliveryStatus.DELIVERED:
+            return None
+
+        error_type = cls.classify(
+            smtp_code=result.smtp_code,
+            error_message=" ".join(
+                part for part in (result.smtp_message, result.error) if part
+            ),
+        )
+        permanent = error_type in PERMANENT_ERROR_TYPES
+
+        if result.status in (SMTPDeliveryStatus.BOUNCED, SMTPDeliveryStatus.FAILED):
+            return error_type if permanent else ErrorType.PERMANENT
+        return ErrorType.TEMPORARY if permanent else error_type
+
     @classmethod
     def classify(
         cls,
@@ -333,10 +399,8 @@ class BaseQueueWorker(ABC):
             if not message:
                 raise ValueError(f"Message not found: {item['message_id']}")
 
-            # Mark as processing
-            self._storage.mark_queue_item_processing(item["id"])
-
-            # Attempt delivery with timeout
+            # Attempt delivery with timeout; the item was already claimed
+            # (status processing) by the queue manager
             result = await asyncio.wait_for(
                 self.deliver(message, item.get("recipient", "")),
                 timeout=self._timeout,
@@ -379,10 +443,20 @@ class BaseQueueWorker(ABC):
                 "Worker completed item %s in %.2fms", item["id"], elapsed
             )
 
+    def _report(self, item: dict, result: DeliveryResult) -> None:
+        """Tell the queue's domain scheduler how the attempt went."""
+        if self._queue_manager is not None:
+            self._queue_manager.record_delivery(item, result)
+
     def _handle_success(self, item: dict, result: DeliveryResult) -> None:
         """Handle successful delivery."""
+        self._report(item, result)
         try:
-            self._storage.mark_queue_item_completed(item["id"])
+            if not self._storage.mark_queue_item_completed(
+                item["id"], item.get("claimed_by")
+            ):
+                log_lost_claim(item["id"])
+                return
             logger.info(
                 "Successfully delivered item %s to %s",
                 item["id"],
@@ -395,11 +469,17 @@ class BaseQueueWorker(ABC):
 
     def _handle_failure(self, item: dict, result: DeliveryResult) -> None:
         """Handle failed delivery."""
+        self._report(item, result)
         error_msg = result.error_message or "Unknown error"
 
         if result.should_retry:
-            # Let storage handle retry logic based on attempt count
-            self._storage.mark_queue_item_failed(item["id"], error_msg)
+            if self._queue_manager is not None:
+                # Backoff and dead-lettering follow the queue's retry policy
+                self._queue_manager.schedule_retry(item, error_msg)
+            else:
+                self._storage.mark_queue_item_failed(
+                    item["id"], error_msg, item.get("claimed_by")
+                )
             logger.warning(
                 "Delivery failed for item %s (retryable): %s",
                 item["id"],
@@ -407,10 +487,13 @@ class BaseQueueWorker(ABC):
             )
         else:
             # Permanent failure - move to dead letter
-            self._storage.move_to_dead_letter(
+            if not self._storage.move_to_dead_letter(
                 item["id"],
                 f"Permanent failure ({result.error_type}): {error_msg}",
-            )
+                item.get("claimed_by"),
+            ):
+                log_lost_claim(item["id"])
+                return
             logger.error(
                 "Permanent delivery failure for item %s: %s",
                 item["id"],
@@ -422,8 +505,12 @@ class QueueWorker(BaseQueueWorker):
     """
     Default queue worker implementation.
 
-    This worker handles email delivery using SMTP. In a full implementation,
-    this would connect to remote mail servers and perform actual delivery.
+    Composes the stored message and delivers it over SMTP through the
+    queue manager's shared SMTPSender, either directly to the recipient's
+    MX servers or via the configured relay. Composition (and DKIM signing)
+    runs in the queue manager's CPUExecutor when one is set, otherwise on
+    the event loop. Each call is a single attempt; retries are scheduled
+    by the queue.
     """
 
     def __init__(
@@ -432,6 +519,10 @@ class QueueWorker(BaseQueueWorker):
         queue_manager: "QueueManager",
         timeout: float = 300.0,
         smtp_timeout: float = 30.0,
+        sender: Optional[SMTPSender] = None,
+        composer: Optional[EmailComposer] = None,
+        executor: Optional[CPUExecutor] = None,
+        renderer: Optional[MessageRenderer] = None,
     ) -> None:
         """
         Initialize the SMTP queue worker.
@@ -440,10 +531,41 @@ class QueueWorker(BaseQueueWorker):
             storage: EmailStorage instance for database operations.
             queue_manager: Queue manager reference.
             timeout: Overall processing timeout in seconds.
-            smtp_timeout: SMTP connection timeout in seconds.
+            smtp_timeout: SMTP timeout in seconds for the SMTPSender
+                created when neither ``sender`` nor the queue manager
+                provides one.
+            sender: SMTPSender to deliver with (defaults to the queue
+                manager's shared sender).
+            composer: EmailComposer used to build the outgoing message
+                when composing on the event loop.
+            executor: CPUExecutor to compose and sign in (defaults to the
+                queue manager's, if any).
+            renderer: MessageRenderer to compose and sign with on the event
+                loop (defaults to the queue manager's shared renderer, or
+                one built around ``composer``).
         """
         super().__init__(storage, queue_manager, timeout)
         self._smtp_timeout = smtp_timeout
+        if sender is None:
+            sender = (
+                queue_manager.sender
+                if queue_manager is not None
+                else SMTPSender(timeout=int(smtp_timeout))
+            )
+        self._sender = sender
+        if executor is None and queue_manager is not None:
+            executor = queue_manager.executor
+        self._executor = executor
+        if renderer is None and composer is not None:
+            renderer = MessageRenderer(
+                options=(
+                    queue_manager.render_options
+                    if queue_manager is not None
+                    else None
+                ),
+                composer=composer,
+            )
+        self._renderer = renderer
 
     async def deliver(self, message: dict, recipient: str) -> DeliveryResult:
         """
@@ -458,78 +580,100 @@ class QueueWorker(BaseQueueWorker):
         """
         start_time = datetime.now(timezone.utc)
 
-        try:
-            # Extract domain from recipient
-            domain = recipient.split("@")[1] if "@" in recipient else None
-            if not domain:
-                return DeliveryResult(
-                    success=False,
-                    error_type=ErrorType.INVALID_RECIPIENT,
-                    error_message=f"Invalid recipient address: {recipient}",
-                )
-
-            # In a full implementation, we would:
-            # 1. Perform MX lookup for the domain
-            # 2. Connect to the mail server
-            # 3. Perform SMTP handshake
-            # 4. Send the message
-            # 5. Handle the response
-
-            # For now, we simulate successful delivery
-            # TODO: Implement actual SMTP delivery
-            await self._simulate_delivery(message, recipient, domain)
-
-            delivery_time = (
-                datetime.now(timezone.utc) - start_time
-            ).total_seconds() * 1000
+        domain = recipient.split("@")[1] if "@" in recipient else None
+        if not domain:
+            return DeliveryResult(
+                success=False,
+                error_type=ErrorType.INVALID_RECIPIENT,
+                error_message=f"Invalid recipient address: {recipient}",
+            )
 
+        # A message that can't be composed won't compose on retry either
+        try:
+            raw_data = await self._render(message)
+        except InvalidMessageError as e:
+            return DeliveryResult(
+                success=False,
+                error_type=ErrorType.PERMANENT,
+                error_message=f"Cannot compose message: {e}",
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Signing failed or a pool process died; worth another attempt
             return DeliveryResult(
-                success=True,
-                remote_host=f"mx.{domain}",
-                delivery_time_ms=delivery_time,
-                metadata={
-                    "message_id": message.get("message_id", ""),
-                    "recipient": recipient,
-                },
+                success=False,
+                error_type=ErrorType.TEMPORARY,
+                error_message=f"Cannot render message: {e}",
+                delivery_time_ms=self._elapsed_ms(start_time),
+            )
+
+        try:
+            result = await self._sender.send_raw(
+                message_data=raw_data,
+                sender=message["from_address"],
+                recipient=recipient,
             )
 
         except asyncio.CancelledError:
             raise
 
         except Exception as e:
-            delivery_time = (
-                datetime.now(timezone.utc) - start_time
-            ).total_seconds() * 1000
-            error_type = self._error_classifier.classify_exception(e)
-
             return DeliveryResult(
                 success=False,
-                error_type=error_type,
+                error_type=self._error_classifier.classify_exception(e),
                 error_message=str(e),
-                delivery_time_ms=delivery_time,
+                delivery_time_ms=self._elapsed_ms(start_time),
             )
 
-    async def _simulate_delivery(
-        self,
-        message: dict,
-        recipient: str,
-        domain: str,
-    ) -> None:
-        """
-        Simulate email delivery for testing purposes.
-
-        In production, this would be replaced with actual SMTP code.
-        """
-        # Simulate network latency
-        await asyncio.sleep(0.1)
-
-        logger.debug(
-            "Simulated delivery of message %s to %s@%s",
-            message.get("message_id", ""),
-            recipient.split("@")[0],
-            domain,
+        error_type = self._error_classifier.classify_delivery(result)
+        return DeliveryResult(
+            success=error_type is None,
+            error_type=error_type,
+            error_message=(
+                None
+                if error_type is None
+                else self._describe_failure(result)
+            ),
+            smtp_code=result.smtp_code,
+            remote_host=result.mx_host,
+            delivery_time_ms=self._elapsed_ms(start_time),
+            metadata={
+                "message_id": message.get("message_id", ""),
+                "recipient": recipient,
+                "status": result.status.value,
+            },
         )
 
+    async def _render(self, message: dict) -> bytes:
+        """Compose the message, off the event loop if possible."""
+        if self._executor is not None:
+            return await self._executor.render(message)
+        if self._renderer is None:
+            self._renderer = (
+                self._queue_manager.renderer
+                if self._queue_manager is not None
+                else MessageRenderer()
+            )
+        return self._renderer.render(message)
+
+    @staticmethod
+    def _describe_failure(result: SMTPDeliveryResult) -> str:
+        """Build an error message from a failed SMTPSender result."""
+        parts = []
+        if result.smtp_code is not None:
+            parts.append(str(result.smtp_code))
+        if result.smtp_message:
+            parts.append(result.smtp_message)
+        if result.error:
+            parts.append(f"({result.error})" if parts else result.error)
+        return " ".join(parts) or f"Delivery {result.status.value}"
+
+    @staticmethod
+    def _elapsed_ms(start_time: datetime) -> float:
+        """Milliseconds since start_time."""
+        return (datetime.now(timezone.utc) - start_time).total_seconds() * 1000
+
 
 class WorkerPool:
     """
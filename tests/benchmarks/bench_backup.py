@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Peak memory benchmark for encrypted backups.
+
+Builds mailbox databases of increasing size, then creates and restores
+an encrypted backup of each in a fresh process and reports the process's
+peak RSS. With the streaming backup format peak RSS stays flat as the
+database grows; the single-shot encryption of earlier versions is run
+for comparison and grows with it. Previewing a backup reads only its
+index block, so its time stays flat too.
+
+Run with: python tests/benchmarks/bench_backup.py [--sizes 64 256 1024]
+"""
+
+import argparse
+import json
+import os
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+PASSWORD = "benchmark password"
+
+
+def build_database(path: str, size_mb: int) -> None:
+    """A mailbox database padded with incompressible data to size_mb."""
+    from common.storage import EmailStorage
+
+    storage = EmailStorage(path)
+    storage.create_message({"subject": "Benchmark", "body_text": "Hello"})
+    storage.close()
+    EmailStorage.reset()
+
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE bench_padding (data BLOB)")
+    for _ in range(size_mb):
+        conn.execute(
+            "INSERT INTO bench_padding VALUES (randomblob(?))", (1024 * 1024,)
+        )
+    conn.commit()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(mode: str, db_path: str, backup_path: str) -> dict:
+    """Run one operation and measure it; runs in its own process."""
+    from client.services.backup_service import (
+        BackupContents,
+        BackupEncryption,
+        BackupService,
+    )
+    from common.storage import EmailStorage
+
+    contents = BackupContents(
+        configuration=False, dkim_keys=False, pgp_keys=False
+    )
+    start = time.perf_counter()
+    if mode == "backup":
+        service = BackupService(EmailStorage(db_path))
+        service.create_backup(backup_path, PASSWORD, contents)
+    elif mode == "restore":
+        service = BackupService(EmailStorage(db_path))
+        service.restore(backup_path, PASSWORD, contents=contents)
+    elif mode == "preview":
+        service = BackupService(EmailStorage(db_path))
+        service.preview_restore(backup_path, PASSWORD)
+    else:
+        # Earlier versions encrypted the whole archive in one call
+        with open(db_path, "rb") as f:
+            sealed = BackupEncryption.encrypt(f.read(), PASSWORD)
+        with open(backup_path, "wb") as f:
+            f.write(sealed)
+    return {"seconds": time.perf_counter() - start, "rss": peak_rss_mb()}
+
+
+def measure(mode: str, db_path: str, backup_path: str) -> dict:
+    """Run child() in a fresh interpreter so peak RSS is its own."""
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", mode, db_path, backup_path],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[64, 256, 1024],
+        help="Database sizes in MiB",
+    )
+    parser.add_argument(
+        "--child", nargs=3, metavar=("MODE", "DB", "BACKUP"), help="internal"
+    )
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(*args.child)))
+        return 0
+
+    print(
+        f"{'db MiB':>7}  {'backup s':>9}  {'backup RSS':>11}  "
+        f"{'restore s':>9}  {'restore RSS':>11}  {'preview ms':>10}  "
+        f"{'single-shot RSS':>15}"
+    )
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["HOME"] = tmp
+            db_path = os.path.join(tmp, "unitmail.db")
+            backup_path = os.path.join(tmp, "mail.unitmail-backup")
+            build_database(db_path, size)
+
+            backup = measure("backup", db_path, backup_path)
+            preview = measure("preview", db_path, backup_path)
+            restore = measure("restore", db_path, backup_path)
+            single = measure("single-shot", db_path, backup_path)
+
+        print(
+            f"{size:>7}  {backup['seconds']:>9.1f}  "
+            f"{backup['rss']:>9.0f}MB  {restore['seconds']:>9.1f}  "
+            f"{restore['rss']:>9.0f}MB  {preview['seconds'] * 1000:>10.0f}  "
+            f"{single['rss']:>13.0f}MB"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
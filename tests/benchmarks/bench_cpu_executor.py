@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Event-loop lag benchmark for composing and DKIM signing outgoing mail.
+
+Renders messages (MIME composition plus an RSA-2048 DKIM signature) the
+way QueueWorker does, either directly on the event loop or through a
+CPUExecutor process pool, while a ticker task measures how late the loop
+wakes it. Reports render throughput and loop lag percentiles.
+
+Run with: python tests/benchmarks/bench_cpu_executor.py [--processes 1 2]
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from gateway.crypto.dkim import DKIMSigner  # noqa: E402
+from gateway.smtp.executor import (  # noqa: E402
+    CPUExecutor,
+    MessageRenderer,
+    RenderOptions,
+)
+
+TICK = 0.005
+
+
+def make_message(i: int, attachment_size: int) -> dict:
+    """A stored outbound message with one attachment."""
+    return {
+        "user_id": "00000000-0000-0000-0000-000000000001",
+        "message_id": f"<bench-{i}@example.com>",
+        "from_address": "sender@example.com",
+        "to_addresses": [f"rcpt{i}@example.com"],
+        "subject": f"Benchmark render {i}",
+        "body_text": "Line of benchmark text.\n" * 200,
+        "body_html": "<p>Line of benchmark text.</p>\n" * 200,
+        "attachments": [
+            {
+                "filename": "report.pdf",
+                "content_type": "application/pdf",
+                "content": base64.b64encode(os.urandom(attachment_size)).decode(),
+            }
+        ],
+    }
+
+
+async def measure(render, messages: list[dict], concurrency: int):
+    """Render every message while sampling loop lag; return (s, lags)."""
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - start - TICK)
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(message: dict) -> None:
+        async with slots:
+            await render(message)
+
+    tick_task = asyncio.create_task(ticker())
+    await asyncio.sleep(TICK * 2)
+    start = time.perf_counter()
+    await asyncio.gather(*(one(m) for m in messages))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await tick_task
+    return elapsed, lags
+
+
+def report(label: str, count: int, elapsed: float, lags: list[float]) -> None:
+    """Print one result row."""
+    lags_ms = sorted(lag * 1000 for lag in lags)
+    p99 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))]
+    print(
+        f"{label:>10}  {count / elapsed:>8.0f}  "
+        f"{statistics.median(lags_ms):>8.1f}  {p99:>8.1f}  {lags_ms[-1]:>8.1f}"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--processes",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4],
+        help="Pool sizes to benchmark",
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=200,
+        help="Messages rendered per run",
+    )
+    parser.add_argument(
+        "--attachment-size",
+        type=int,
+        default=256 * 1024,
+        help="Attachment bytes per message",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        key_path = os.path.join(tmp, "dkim.private")
+        with open(key_path, "wb") as f:
+            f.write(DKIMSigner.generate_key_pair().private_key_pem)
+        options = RenderOptions(
+            dkim_domain="example.com",
+            dkim_selector="bench",
+            dkim_private_key_path=key_path,
+        )
+        messages = [
+            make_message(i, args.attachment_size) for i in range(args.count)
+        ]
+
+        print(f"cores: {os.cpu_count()}")
+        print(
+            f"{'mode':>10}  {'msg/s':>8}  {'lag p50':>8}  {'lag p99':>8}  "
+            f"{'lag max':>8}  (ms)"
+        )
+
+        renderer = MessageRenderer(options)
+
+        async def inline(message: dict) -> bytes:
+            return renderer.render(message)
+
+        elapsed, lags = asyncio.run(measure(inline, messages, 8))
+        report("loop", args.count, elapsed, lags)
+
+        for processes in args.processes:
+            executor = CPUExecutor(max_workers=processes, options=options)
+
+            async def run_pool():
+                # Start the pool processes before timing
+                await executor.render(messages[0])
+                return await measure(executor.render, messages, 8)
+
+            elapsed, lags = asyncio.run(run_pool())
+            executor.close()
+            report(f"pool x{processes}", args.count, elapsed, lags)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
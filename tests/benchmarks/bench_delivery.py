@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Outbound delivery benchmark for unitMail.
+
+Queues messages for a local aiosmtpd sink and times QueueManager draining
+them through QueueWorker and a shared SMTPSender at increasing worker
+counts. Reports end-to-end throughput in messages per second.
+
+Run with: python tests/benchmarks/bench_delivery.py [--workers 1 4 16]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from bench_storage import BODY, open_storage
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from common.storage import EmailStorage  # noqa: E402
+from gateway.smtp.queue import DomainLimits, QueueConfig, QueueManager  # noqa: E402
+from gateway.smtp.sender import RelayConfig, SMTPSender  # noqa: E402
+from gateway.smtp.worker import QueueWorker  # noqa: E402
+from tests.smtp_sink import SMTPSink  # noqa: E402
+
+
+def seed_queue(storage: EmailStorage, count: int) -> None:
+    """Queue ``count`` outbound messages, one recipient each."""
+    for i in range(count):
+        message = storage.create_message(
+            {
+                "from_address": "sender@example.com",
+                "to_addresses": [f"rcpt{i}@example.com"],
+                "subject": f"Benchmark delivery {i}",
+                "body_text": BODY,
+                "status": "queued",
+            }
+        )
+        storage.create_queue_item(message["id"], f"rcpt{i}@example.com")
+
+
+async def drain(
+    storage: EmailStorage, sink: SMTPSink, workers: int, count: int
+) -> float:
+    """Run the queue until ``count`` messages reach the sink; return seconds."""
+    # Every recipient shares one domain; let it use all the workers
+    manager = QueueManager(
+        config=QueueConfig(
+            num_workers=workers,
+            batch_size=workers,
+            emit_events=False,
+            domain_limits=DomainLimits(max_concurrency=workers),
+        ),
+        storage=storage,
+    )
+    manager.set_worker_class(QueueWorker)
+    manager.set_sender(
+        SMTPSender(
+            relay_config=RelayConfig(
+                host=sink.host,
+                port=sink.port,
+                use_tls=False,
+                require_starttls=False,
+            )
+        )
+    )
+
+    start = time.perf_counter()
+    task = asyncio.create_task(manager.start())
+    while sink.count < count:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    await manager.stop()
+    await task
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, 4, 16],
+        help="Worker counts to benchmark",
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=500,
+        help="Messages delivered per run",
+    )
+    args = parser.parse_args()
+
+    print(f"{'workers':>8}  {'messages':>9}  {'seconds':>8}  {'msg/s':>8}")
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as tmp, SMTPSink() as sink:
+            storage = open_storage(tmp)
+            seed_queue(storage, args.count)
+            elapsed = asyncio.run(drain(storage, sink, workers, args.count))
+            EmailStorage.reset()
+        print(
+            f"{workers:>8}  {args.count:>9}  {elapsed:>8.2f}  "
+            f"{args.count / elapsed:>8.0f}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
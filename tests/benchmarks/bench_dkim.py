@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+DKIM signing and verification micro-benchmark for unitMail.
+
+Signs and verifies messages of increasing size (a short text part plus a
+base64 attachment) with an RSA-2048 key, the way outgoing mail is signed
+before delivery. Reports the median time per operation and the peak
+memory allocated while signing, which shows whether the body is copied or
+decoded as a whole.
+
+Run with: python tests/benchmarks/bench_dkim.py [--sizes 10240 1048576 26214400]
+"""
+
+import argparse
+import base64
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from gateway.crypto.dkim import DKIMSigner, DKIMVerifier  # noqa: E402
+
+
+def make_message(size: int) -> bytes:
+    """A multipart message of roughly ``size`` bytes."""
+    attachment = base64.encodebytes(os.urandom(size * 3 // 4)).replace(b"\n", b"\r\n")
+    return (
+        b"From: sender@example.com\r\n"
+        b"To: rcpt@example.com\r\n"
+        b"Subject: Benchmark\r\n"
+        b"Date: Thu, 01 Jan 2026 00:00:00 +0000\r\n"
+        b"Message-ID: <bench@example.com>\r\n"
+        b"MIME-Version: 1.0\r\n"
+        b'Content-Type: multipart/mixed; boundary="b"\r\n'
+        b"\r\n"
+        b"--b\r\n"
+        b"Content-Type: text/plain; charset=utf-8\r\n"
+        b"\r\n"
+        b"See attached.  \r\n"
+        b"--b\r\n"
+        b"Content-Type: application/octet-stream\r\n"
+        b"Content-Transfer-Encoding: base64\r\n"
+        b"\r\n" + attachment + b"--b--\r\n"
+    )
+
+
+def timed(fn, repeat: int) -> float:
+    """Median seconds per call."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def peak_memory(fn) -> int:
+    """Peak bytes allocated by one call."""
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10 * 1024, 1024 * 1024, 25 * 1024 * 1024],
+        help="Message sizes in bytes",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Runs per measurement",
+    )
+    parser.add_argument(
+        "--canonicalization",
+        default="relaxed/relaxed",
+        help="DKIM canonicalization (c= tag)",
+    )
+    args = parser.parse_args()
+
+    keys = DKIMSigner.generate_key_pair()
+    signer = DKIMSigner(
+        "example.com",
+        "bench",
+        private_key=keys.private_key,
+        canonicalization=args.canonicalization,
+    )
+    verifier = DKIMVerifier()
+    verifier._fetch_public_key = lambda domain, selector: keys.public_key
+
+    print(
+        f"{'size':>10}  {'sign ms':>9}  {'MB/s':>7}  {'verify ms':>9}  "
+        f"{'sign peak MB':>12}"
+    )
+    for size in args.sizes:
+        raw = make_message(size)
+        signed = signer.sign_message(raw)
+        assert verifier.verify(signed)[0]
+
+        sign_s = timed(lambda: signer.sign(raw), args.repeat)
+        verify_s = timed(lambda: verifier.verify(signed), args.repeat)
+        peak = peak_memory(lambda: signer.sign(raw))
+        print(
+            f"{len(raw):>10}  {sign_s * 1000:>9.2f}  "
+            f"{len(raw) / sign_s / 1e6:>7.0f}  {verify_s * 1000:>9.2f}  "
+            f"{peak / 1e6:>12.1f}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Peak memory benchmark for MBOX exports.
+
+Builds mailboxes of increasing size, then exports each to MBOX in a fresh
+process and reports the export's time and the process's peak RSS.
+Messages are read and written a batch at a time, so peak RSS stays flat
+as the mailbox grows.
+
+Run with: python tests/benchmarks/bench_export.py [--sizes 10000 50000]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+BODY = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 40
+
+
+def build_database(path: str, count: int) -> None:
+    """A mailbox database holding count messages."""
+    from common.storage import EmailStorage
+
+    storage = EmailStorage(path)
+    storage.create_messages_bulk(
+        {
+            "subject": f"Message {i}",
+            "from_address": "sender@example.com",
+            "to_addresses": ["local@unitmail.local"],
+            "body_text": f"{BODY} {i}",
+            "body_html": f"<p>{BODY} {i}</p>",
+        }
+        for i in range(count)
+    )
+    storage.close()
+    EmailStorage.reset()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(db_path: str, output_path: str, compression: str) -> dict:
+    """Export the mailbox and measure it; runs in its own process."""
+    from client.services.export_service import (
+        ExportCompression,
+        ExportFormat,
+        ExportScope,
+        ExportService,
+    )
+    from common.storage import get_storage
+
+    get_storage(db_path)
+    start = time.perf_counter()
+    result = ExportService().export_messages(
+        Path(output_path),
+        ExportFormat.MBOX,
+        ExportScope.ALL_MESSAGES,
+        compression=ExportCompression(compression),
+    )
+    return {
+        "seconds": time.perf_counter() - start,
+        "rss": peak_rss_mb(),
+        "bytes": os.path.getsize(result.output_path),
+    }
+
+
+def measure(db_path: str, output_path: str, compression: str) -> dict:
+    """Run child() in a fresh interpreter so peak RSS is its own."""
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", db_path, output_path, compression],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10000, 50000],
+        help="Mailbox sizes in messages",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=["", "gz", "zst"],
+        default="",
+        help="Compress the export",
+    )
+    parser.add_argument(
+        "--child", nargs=3, metavar=("DB", "OUTPUT", "COMP"), help="internal"
+    )
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(*args.child)))
+        return 0
+
+    print(f"{'messages':>9}  {'export s':>9}  {'MiB':>7}  {'peak RSS':>9}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["HOME"] = tmp
+            db_path = os.path.join(tmp, "unitmail.db")
+            build_database(db_path, size)
+
+            export = measure(
+                db_path, os.path.join(tmp, "mail.mbox"), args.compression
+            )
+
+        print(
+            f"{size:>9}  {export['seconds']:>9.1f}  "
+            f"{export['bytes'] / 1024 / 1024:>7.0f}  {export['rss']:>7.0f}MB"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Size and time benchmark for incremental backups.
+
+Builds mailboxes of increasing size, takes a full backup of each, then
+delivers a day's worth of new mail, reads and deletes some old mail, and
+takes an incremental backup. Full backups grow with the mailbox; the
+incremental backup should follow the day's churn and stay the same size.
+
+Run with: python tests/benchmarks/bench_incremental.py [--sizes 10000 50000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from client.services.backup_service import (  # noqa: E402
+    BackupContents,
+    BackupMetadata,
+    BackupService,
+    BackupType,
+)
+from common.storage import EmailStorage  # noqa: E402
+
+PASSWORD = "benchmark password"
+BODY = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 40
+
+
+def deliver(storage: EmailStorage, count: int, label: str) -> list[str]:
+    """Store count messages and return their ids."""
+    return storage.create_messages_bulk(
+        {"subject": f"{label} {i}", "body_text": f"{BODY} {label} {i}"}
+        for i in range(count)
+    )
+
+
+def timed_backup(
+    service: BackupService,
+    path: str,
+    backup_type: BackupType,
+    since: Optional[datetime] = None,
+) -> tuple[float, int, BackupMetadata]:
+    """Create a backup; return (seconds, bytes, metadata)."""
+    contents = BackupContents(
+        configuration=False, dkim_keys=False, pgp_keys=False
+    )
+    start = time.perf_counter()
+    metadata = service.create_backup(
+        path, PASSWORD, contents, backup_type=backup_type, since=since
+    )
+    return time.perf_counter() - start, os.path.getsize(path), metadata
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10000, 50000],
+        help="Mailbox sizes in messages",
+    )
+    parser.add_argument(
+        "--churn", type=int, default=500, help="Messages delivered per day"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'messages':>9}  {'full s':>7}  {'full KiB':>9}  "
+        f"{'incr s':>7}  {'incr KiB':>9}"
+    )
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["HOME"] = tmp
+            storage = EmailStorage(os.path.join(tmp, "unitmail.db"))
+            service = BackupService(storage)
+            old = deliver(storage, size, "Old")
+            backups = os.path.join(tmp, "backups")
+
+            full = timed_backup(
+                service,
+                os.path.join(backups, "full.unitmail-backup"),
+                BackupType.FULL,
+            )
+            deliver(storage, args.churn, "New")
+            storage.mark_read_many(old[: args.churn // 5])
+            for message_id in old[-(args.churn // 10):]:
+                storage.delete_message(message_id)
+            # The whole run falls within the default overlap, which would
+            # copy the mailbox again
+            incremental = timed_backup(
+                service,
+                os.path.join(backups, "incr.unitmail-backup"),
+                BackupType.INCREMENTAL,
+                since=datetime.fromisoformat(full[2].watermark),
+            )
+
+            print(
+                f"{size:>9}  {full[0]:>7.2f}  {full[1] / 1024:>9.0f}  "
+                f"{incremental[0]:>7.2f}  {incremental[1] / 1024:>9.0f}"
+            )
+            storage.close()
+            EmailStorage.reset()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
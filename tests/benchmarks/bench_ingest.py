@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Bulk ingest benchmark for unitMail.
+
+Times EmailStorage.create_messages_bulk on a large synthetic mailbox and
+compares its throughput with one create_message() call per message.
+
+Run with: python tests/benchmarks/bench_ingest.py [--count 100000]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+from bench_storage import BODY, BODY_HTML, open_storage
+
+from common.storage import EmailStorage
+
+
+def synthetic_messages(count: int) -> Iterator[dict]:
+    """Yield ``count`` synthetic Inbox messages, newest first."""
+    base = datetime.now(timezone.utc)
+    for i in range(count):
+        yield {
+            "from_address": f"sender{i % 500}@example.com",
+            "to_addresses": ["me@example.com"],
+            "subject": f"Ingested message {i}",
+            "body_text": BODY,
+            "body_html": BODY_HTML,
+            "headers": {"From": f"Sender {i % 500} <sender{i % 500}@example.com>"},
+            "is_read": i % 3 == 0,
+            "received_at": (base - timedelta(seconds=i)).isoformat(),
+            "attachments": (
+                [{"filename": f"file{i}.pdf", "size": 1024}] if i % 10 == 0 else []
+            ),
+        }
+
+
+def print_progress(total: int):
+    """Return a progress callback that redraws a status line on stderr."""
+    start = time.perf_counter()
+
+    def report(done: int) -> None:
+        rate = done / max(time.perf_counter() - start, 1e-9)
+        sys.stderr.write(
+            f"\r  ingested {done:>{len(str(total))}}/{total} "
+            f"({done * 100 // total:3d}%)  {rate:,.0f} msg/s"
+        )
+        if done == total:
+            sys.stderr.write("\n")
+        sys.stderr.flush()
+
+    return report
+
+
+def bench_bulk(count: int, chunk_size: int) -> float:
+    """Return messages/second for create_messages_bulk."""
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = open_storage(tmp)
+        start = time.perf_counter()
+        ids = storage.create_messages_bulk(
+            synthetic_messages(count),
+            chunk_size=chunk_size,
+            progress_callback=print_progress(count),
+        )
+        elapsed = time.perf_counter() - start
+
+        assert len(ids) == count
+        assert storage.recount_folders() == 0, "folder counters drifted"
+        EmailStorage.reset()
+    return count / elapsed
+
+
+def bench_single(count: int) -> float:
+    """Return messages/second for one create_message() call per message."""
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = open_storage(tmp)
+        start = time.perf_counter()
+        for message in synthetic_messages(count):
+            storage.create_message(message)
+        elapsed = time.perf_counter() - start
+        EmailStorage.reset()
+    return count / elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=100_000,
+        help="Messages ingested by the bulk benchmark",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="Rows per executemany chunk",
+    )
+    parser.add_argument(
+        "--single-count",
+        type=int,
+        default=5_000,
+        help="Messages ingested one at a time for comparison",
+    )
+    args = parser.parse_args()
+
+    print(f"create_messages_bulk: {args.count} messages")
+    bulk_rate = bench_bulk(args.count, args.chunk_size)
+    print(f"create_message loop:  {args.single_count} messages")
+    single_rate = bench_single(args.single_count)
+
+    print(
+        f"\n{'method':>22}  {'msg/s':>10}  {'100k ETA s':>10}\n"
+        f"{'create_messages_bulk':>22}  {bulk_rate:>10,.0f}  "
+        f"{100_000 / bulk_rate:>10.1f}\n"
+        f"{'create_message':>22}  {single_rate:>10,.0f}  "
+        f"{100_000 / single_rate:>10.1f}\n"
+        f"speedup: {bulk_rate / single_rate:.1f}x"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Multi-process outbound delivery benchmark for unitMail.
+
+Queues messages for a local aiosmtpd sink and times QueueSupervisor
+draining them with increasing numbers of worker processes, each running
+a QueueManager with QueueWorker and its own SMTPSender. Reports
+end-to-end throughput in messages per second. Scaling is bounded by the
+cores available (and by the sink, which runs in this process).
+
+Run with: python tests/benchmarks/bench_processes.py [--processes 1 2 4 8]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from bench_delivery import seed_queue
+from bench_storage import open_storage
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from common.storage import EmailStorage  # noqa: E402
+from gateway.smtp.queue import DomainLimits, QueueConfig, QueueManager  # noqa: E402
+from gateway.smtp.sender import RelayConfig, SMTPSender  # noqa: E402
+from gateway.smtp.supervisor import QueueSupervisor, StatsReporter  # noqa: E402
+from gateway.smtp.worker import QueueWorker  # noqa: E402
+from tests.smtp_sink import SMTPSink  # noqa: E402
+
+
+def run_child(
+    index: int,
+    reporter: StatsReporter,
+    db_path: str,
+    host: str,
+    port: int,
+    workers: int,
+) -> None:
+    """Worker process: deliver from the shared queue to the sink."""
+    import signal
+
+    async def run() -> None:
+        manager = QueueManager(
+            config=QueueConfig(
+                num_workers=workers,
+                batch_size=workers,
+                emit_events=False,
+                domain_limits=DomainLimits(max_concurrency=workers),
+            ),
+            storage=EmailStorage(db_path),
+        )
+        manager.set_worker_class(QueueWorker)
+        manager.set_sender(
+            SMTPSender(
+                relay_config=RelayConfig(
+                    host=host, port=port, use_tls=False, require_starttls=False
+                )
+            )
+        )
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(
+            signal.SIGTERM, lambda: asyncio.ensure_future(manager.stop())
+        )
+        await manager.start()
+
+    asyncio.run(run())
+
+
+def drain(db_path: str, sink: SMTPSink, processes: int, workers: int, count: int):
+    """Run the supervisor until ``count`` messages reach the sink."""
+    supervisor = QueueSupervisor(
+        run_child,
+        processes=processes,
+        args=(db_path, sink.host, sink.port, workers),
+        stats_log_interval=0,
+    )
+    thread = threading.Thread(target=supervisor.run, kwargs={"tick": 0.05})
+
+    start = time.perf_counter()
+    thread.start()
+    try:
+        while sink.count < count:
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+    finally:
+        supervisor.stop()
+        thread.join()
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--processes",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8],
+        help="Process counts to benchmark",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Concurrent deliveries per process",
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=2000,
+        help="Messages delivered per run",
+    )
+    args = parser.parse_args()
+
+    print(f"cores: {os.cpu_count()}")
+    print(f"{'processes':>9}  {'messages':>9}  {'seconds':>8}  {'msg/s':>8}")
+    for processes in args.processes:
+        with tempfile.TemporaryDirectory() as tmp, SMTPSink() as sink:
+            storage = open_storage(tmp)
+            seed_queue(storage, args.count)
+            db_path = os.path.join(tmp, "bench.db")
+            EmailStorage.reset()
+            # Process start-up is included; it is amortised over the run
+            elapsed = drain(db_path, sink, processes, args.workers, args.count)
+        print(
+            f"{processes:>9}  {args.count:>9}  {elapsed:>8.2f}  "
+            f"{args.count / elapsed:>8.0f}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
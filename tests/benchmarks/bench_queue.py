@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Queue dispatch benchmark for unitMail.
+
+Seeds a queue with a backlog of retries deferred into the future and times
+claiming freshly enqueued work. Claim latency should stay flat however
+large the deferred backlog grows. The single OR-predicate scan used before
+the readiness indexes is timed alongside for comparison.
+
+Run with: python tests/benchmarks/bench_queue.py [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from bench_storage import open_storage
+
+from common.storage import EmailStorage
+
+# Claim predicate before schema v6, kept as a baseline
+LEGACY_READY_SQL = """
+SELECT id FROM queue
+WHERE status = 'pending'
+OR (status = 'retrying' AND next_attempt_at <= ?)
+OR (status = 'processing' AND lease_expires_at <= ?)
+ORDER BY priority DESC, created_at ASC
+LIMIT ?
+"""
+
+
+def seed_deferred(storage: EmailStorage, message_id: str, count: int) -> None:
+    """Insert ``count`` retrying items due an hour from now with raw SQL."""
+    now = datetime.now(timezone.utc)
+    due = (now + timedelta(hours=1)).isoformat()
+
+    rows = [
+        (
+            str(uuid4()),
+            message_id,
+            f"deferred{i}@example.com",
+            i % 3,
+            due,
+            now.isoformat(),
+            now.isoformat(),
+        )
+        for i in range(count)
+    ]
+    with storage._db.transaction() as conn:
+        conn.executemany(
+            """
+            INSERT INTO queue (
+                id, message_id, recipient, status, priority, attempts,
+                next_attempt_at, created_at, updated_at
+            ) VALUES (?, ?, ?, 'retrying', ?, 1, ?, ?, ?)
+            """,
+            rows,
+        )
+    storage._db.execute("ANALYZE")
+
+
+def bench_claim(
+    storage: EmailStorage, message_id: str, iterations: int, batch: int
+) -> float:
+    """Return the median claim_queue_batch latency in ms for fresh work."""
+    samples = []
+    for _ in range(iterations):
+        storage.create_queue_item(message_id, "fresh@example.com")
+        start = time.perf_counter()
+        claimed = storage.claim_queue_batch("bench", batch)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert len(claimed) == 1
+    return statistics.median(samples)
+
+
+def bench_legacy_scan(storage: EmailStorage, iterations: int, batch: int) -> float:
+    """Return the median latency in ms of the pre-v6 readiness scan."""
+    now = datetime.now(timezone.utc).isoformat()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        storage._db.fetchall(LEGACY_READY_SQL, (now, now, batch))
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000],
+        help="Deferred backlog sizes to benchmark",
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=200,
+        help="Claims timed per backlog size",
+    )
+    parser.add_argument(
+        "--batch",
+        type=int,
+        default=10,
+        help="Items requested per claim",
+    )
+    args = parser.parse_args()
+
+    print(f"{'deferred':>10}  {'claim ms':>10}  {'legacy scan ms':>15}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = open_storage(tmp)
+            message_id = storage.create_message({"subject": "outbound"})["id"]
+            seed_deferred(storage, message_id, size)
+            claim_ms = bench_claim(storage, message_id, args.iterations, args.batch)
+            legacy_ms = bench_legacy_scan(storage, args.iterations, args.batch)
+            EmailStorage.reset()
+        print(f"{size:>10}  {claim_ms:>10.3f}  {legacy_ms:>15.3f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
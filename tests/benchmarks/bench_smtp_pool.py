@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+SMTP connection pooling benchmark for unitMail.
+
+Delivers batches of messages to a local aiosmtpd sink standing in for a
+recipient MX. Each batch is one message to ``--recipients`` addresses at a
+single domain. The old per-recipient path (one connection and envelope per
+recipient) is compared with pooled connections plus one envelope per
+domain. Reports handshakes (EHLO sessions) and wall time per batch.
+
+Run with: python tests/benchmarks/bench_smtp_pool.py [--recipients 1 10 40]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from gateway.smtp.sender import MXRecord, SMTPSender  # noqa: E402
+from tests.smtp_sink import SMTPSink  # noqa: E402
+
+RAW = (
+    "From: sender@example.com\r\n"
+    "Subject: Benchmark\r\n"
+    "\r\n" + "Lorem ipsum dolor sit amet, consectetur adipiscing elit.\r\n" * 50
+)
+
+
+class SinkSender(SMTPSender):
+    """Sender whose MX lookups all resolve to the sink."""
+
+    def __init__(self, port: int, **kwargs) -> None:
+        super().__init__(timeout=10, **kwargs)
+        self.sink_port = port
+
+    async def get_mx_records(self, domain: str) -> list[MXRecord]:
+        return [MXRecord(priority=0, host="127.0.0.1", port=self.sink_port)]
+
+
+async def per_recipient(sender: SMTPSender, recipients: list[str]) -> None:
+    """Send one envelope per recipient, as before pooling."""
+    for recipient in recipients:
+        await sender.send_raw(RAW, "sender@example.com", recipient)
+
+
+async def grouped(sender: SMTPSender, recipients: list[str]) -> None:
+    """Send all recipients in per-domain envelopes."""
+    await sender.send_envelope(RAW, "sender@example.com", recipients)
+
+
+async def run(mode, pooled: bool, recipients: int, batches: int) -> tuple:
+    """Return (handshakes per batch, ms per batch) for one mode."""
+    with SMTPSink() as sink:
+        # A connection retired after one message reproduces connect-per-send
+        sender = SinkSender(
+            sink.port, max_messages_per_connection=100 if pooled else 1
+        )
+        addresses = [f"rcpt{i}@example.com" for i in range(recipients)]
+
+        start = time.perf_counter()
+        for _ in range(batches):
+            await mode(sender, addresses)
+        elapsed = time.perf_counter() - start
+        await sender.close()
+        handshakes = sink.connections
+
+    return handshakes / batches, elapsed * 1000 / batches
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--recipients",
+        type=int,
+        nargs="+",
+        default=[1, 10, 40],
+        help="Recipients per batch",
+    )
+    parser.add_argument(
+        "--batches",
+        type=int,
+        default=20,
+        help="Batches delivered per run",
+    )
+    args = parser.parse_args()
+
+    modes = [
+        ("per-recipient", per_recipient, False),
+        ("pooled+grouped", grouped, True),
+    ]
+
+    print(
+        f"{'recipients':>10}  {'mode':>15}  {'handshakes/batch':>17}  "
+        f"{'ms/batch':>9}"
+    )
+    for recipients in args.recipients:
+        for name, mode, pooled in modes:
+            handshakes, ms = asyncio.run(
+                run(mode, pooled, recipients, args.batches)
+            )
+            print(
+                f"{recipients:>10}  {name:>15}  {handshakes:>17.2f}  {ms:>9.2f}"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
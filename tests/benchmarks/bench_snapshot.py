@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Write latency benchmark for hot database snapshots.
+
+A writer thread stores a message every few milliseconds, the way the SMTP
+receiver does, while the database is snapshotted with the online backup
+API (EmailStorage.snapshot) and, for comparison, with VACUUM INTO. Reports
+snapshot time and the writer's commit latency percentiles with and
+without a snapshot running.
+
+Run with: python tests/benchmarks/bench_snapshot.py [--size 256]
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from common.storage import EmailStorage  # noqa: E402
+
+INTERVAL = 0.005
+
+
+def build_database(storage: EmailStorage, size_mb: int) -> None:
+    """Pad the mailbox with incompressible data to size_mb."""
+    storage._db.execute("CREATE TABLE bench_padding (data BLOB)")
+    for _ in range(size_mb):
+        storage._db.execute(
+            "INSERT INTO bench_padding VALUES (randomblob(?))", (1024 * 1024,)
+        )
+    storage._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def run_with_writer(storage: EmailStorage, work) -> tuple[float, list[float]]:
+    """Run work() while a thread stores messages; return (s, latencies)."""
+    latencies: list[float] = []
+    done = threading.Event()
+
+    def writer() -> None:
+        i = 0
+        while not done.is_set():
+            start = time.perf_counter()
+            storage.create_message(
+                {"subject": f"Incoming {i}", "body_text": "Hello " * 200}
+            )
+            latencies.append(time.perf_counter() - start)
+            i += 1
+            time.sleep(INTERVAL)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    time.sleep(0.2)
+    start = time.perf_counter()
+    work()
+    elapsed = time.perf_counter() - start
+    time.sleep(0.05)
+    done.set()
+    thread.join()
+    return elapsed, latencies
+
+
+def report(label: str, elapsed: float, latencies: list[float]) -> None:
+    """Print one result row."""
+    ms = sorted(latency * 1000 for latency in latencies)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    print(
+        f"{label:>12}  {elapsed:>8.2f}  {len(ms):>7}  "
+        f"{statistics.median(ms):>8.2f}  {p99:>8.2f}  {ms[-1]:>8.2f}"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--size", type=int, default=256, help="Database size in MiB"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["HOME"] = tmp
+        storage = EmailStorage(os.path.join(tmp, "unitmail.db"))
+        build_database(storage, args.size)
+        target = os.path.join(tmp, "snapshot.db")
+
+        def vacuum_into() -> None:
+            if os.path.exists(target):
+                os.unlink(target)
+            conn = sqlite3.connect(storage._db.db_path)
+            conn.execute("VACUUM INTO ?", (target,))
+            conn.close()
+
+        print(f"database: {args.size} MiB")
+        print(
+            f"{'snapshot':>12}  {'seconds':>8}  {'writes':>7}  "
+            f"{'p50 ms':>8}  {'p99 ms':>8}  {'max ms':>8}"
+        )
+        report("none", *run_with_writer(storage, lambda: time.sleep(2)))
+        report(
+            "backup API",
+            *run_with_writer(storage, lambda: storage.snapshot(target)),
+        )
+        report("VACUUM INTO", *run_with_writer(storage, vacuum_into))
+        EmailStorage.reset()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
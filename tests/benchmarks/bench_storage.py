@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Storage micro-benchmarks for unitMail.
+
+Seeds throwaway SQLite mailboxes of increasing size and times the
+operations that should stay flat as the mailbox grows.
+
+Run with: python tests/benchmarks/bench_storage.py [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from common.storage import EmailStorage  # noqa: E402
+
+
+# Representative message payload: ~3 KB text, ~6 KB HTML, ~1 KB headers
+BODY = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 50
+BODY_HTML = f"<html><body><p>{BODY}</p><p>{BODY}</p></body></html>"
+HEADERS = json.dumps(
+    {
+        "From": "Bench Sender <sender@example.com>",
+        "To": "Me <me@example.com>",
+        "Received": "from mx.example.com by mail.local; " * 20,
+    }
+)
+
+
+def open_storage(directory: str) -> EmailStorage:
+    """Open a fresh EmailStorage in the given directory."""
+    os.environ["HOME"] = directory
+    EmailStorage.reset()
+    return EmailStorage(os.path.join(directory, "bench.db"))
+
+
+def seed_messages(storage: EmailStorage, count: int) -> None:
+    """Insert ``count`` synthetic messages into the Inbox with raw SQL."""
+    inbox = storage.get_folder_by_name("Inbox")
+    user_id = storage._default_user_id
+    base = datetime.now(timezone.utc)
+
+    rows = []
+    for i in range(count):
+        msg_id = str(uuid4())
+        rows.append(
+            (
+                msg_id,
+                user_id,
+                inbox["id"],
+                f"<{msg_id}@bench.local>",
+                f"sender{i % 500}@example.com",
+                '["me@example.com"]',
+                f"Benchmark message {i}",
+                BODY,
+                BODY_HTML,
+                HEADERS,
+                BODY[:200],
+                i % 3 == 0,
+                (base - timedelta(seconds=i)).isoformat(),
+            )
+        )
+
+    with storage._db.transaction() as conn:
+        conn.executemany(
+            """
+            INSERT INTO messages (
+                id, user_id, folder_id, message_id, from_address,
+                to_addresses, subject, body_text, body_html, headers,
+                preview, is_read, received_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+
+
+def bench_mark_as_read(storage: EmailStorage, iterations: int) -> float:
+    """Return the median mark_as_read/mark_as_unread latency in ms."""
+    row = storage._db.fetchone("SELECT id FROM messages LIMIT 1")
+    message_id = row["id"]
+
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        if i % 2:
+            storage.mark_as_unread(message_id)
+        else:
+            storage.mark_as_read(message_id)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def bench_folder_listing(
+    storage: EmailStorage, page_size: int
+) -> tuple[float, float, float, float]:
+    """
+    Compare full-message and summary listing of the Inbox.
+
+    Time and peak allocation are measured in separate passes so that
+    tracemalloc overhead doesn't skew the timings.
+
+    Returns:
+        (full_ms, full_peak_kb, summary_ms, summary_peak_kb)
+    """
+    results = []
+    for fetch in (
+        lambda: storage.get_messages_by_folder("Inbox", limit=page_size),
+        lambda: storage.get_message_summaries(
+            folder_name="Inbox", limit=page_size
+        ),
+    ):
+        start = time.perf_counter()
+        rows = fetch()
+        elapsed = (time.perf_counter() - start) * 1000
+        del rows
+
+        tracemalloc.start()
+        rows = fetch()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del rows
+
+        results.extend([elapsed, peak / 1024])
+    return tuple(results)
+
+
+def bench_deep_page(storage: EmailStorage, page_size: int = 50) -> tuple:
+    """
+    Time fetching the last page of the Inbox by OFFSET and by cursor.
+
+    Returns:
+        (offset_ms, cursor_ms)
+    """
+    total = storage.count_messages()
+    offset = max(0, total - page_size)
+
+    previous = storage.get_message_summaries(
+        folder_name="Inbox", limit=page_size, offset=offset - page_size
+    )
+    cursor = storage.get_next_cursor(previous, page_size)
+
+    timings = []
+    for kwargs in ({"offset": offset}, {"cursor": cursor}):
+        start = time.perf_counter()
+        storage.get_message_summaries(
+            folder_name="Inbox", limit=page_size, **kwargs
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return tuple(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000],
+        help="Mailbox sizes to benchmark",
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=200,
+        help="Operations timed per mailbox size",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=50_000,
+        help="Rows fetched by the listing benchmark",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'messages':>10}  {'mark_as_read ms':>16}  "
+        f"{'list full ms':>13}  {'full KB':>10}  "
+        f"{'list summary ms':>16}  {'summary KB':>10}  "
+        f"{'last page offset ms':>20}  {'last page cursor ms':>20}"
+    )
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = open_storage(tmp)
+            seed_messages(storage, size)
+            latency = bench_mark_as_read(storage, args.iterations)
+            full_ms, full_kb, summary_ms, summary_kb = bench_folder_listing(
+                storage, args.page_size
+            )
+            offset_ms, cursor_ms = bench_deep_page(storage)
+            EmailStorage.reset()
+        print(
+            f"{size:>10}  {latency:>16.3f}  "
+            f"{full_ms:>13.1f}  {full_kb:>10.0f}  "
+            f"{summary_ms:>16.1f}  {summary_kb:>10.0f}  "
+            f"{offset_ms:>20.2f}  {cursor_ms:>20.2f}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+Local SMTP sink for delivery tests and benchmarks.
+
+Runs an aiosmtpd server on a loopback port in a background thread. It
+records every accepted message and can refuse chosen recipients with a
+fixed reply, so delivery code can be exercised end to end without
+touching the network.
+"""
+
+import socket
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from aiosmtpd.controller import Controller
+
+
+@dataclass
+class SinkMessage:
+    """A message accepted by the sink."""
+
+    mail_from: str
+    rcpt_tos: list[str]
+    data: bytes
+    peer: tuple = field(default=())
+
+
+class _SinkHandler:
+    """aiosmtpd handler that records messages and applies refusals."""
+
+    def __init__(self, sink: "SMTPSink") -> None:
+        self._sink = sink
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        # aiosmtpd leaves recording the greeting to the hook
+        session.host_name = hostname
+        self._sink._connected(session)
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        reply = self._sink.refusals.get(address.lower())
+        if reply:
+            return reply
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self._sink._record(
+            SinkMessage(
+                mail_from=envelope.mail_from,
+                rcpt_tos=list(envelope.rcpt_tos),
+                data=envelope.content,
+                peer=session.peer,
+            )
+        )
+        return "250 Message accepted for delivery"
+
+
+class SMTPSink:
+    """
+    Loopback SMTP server that swallows mail.
+
+    Example:
+        with SMTPSink() as sink:
+            ...deliver to ("127.0.0.1", sink.port)...
+            assert sink.count == 1
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: Optional[int] = None) -> None:
+        """
+        Create the sink (not yet listening).
+
+        Args:
+            host: Address to listen on.
+            port: Port to listen on (a free port when omitted).
+        """
+        self.host = host
+        self.port = port or _free_port(host)
+        self.messages: list[SinkMessage] = []
+        # address -> full SMTP reply, e.g. "550 5.1.1 No such user"
+        self.refusals: dict[str, str] = {}
+        self._connections = 0
+        self._lock = threading.Lock()
+        self._delivered = threading.Condition(self._lock)
+        self._controller = Controller(
+            _SinkHandler(self), hostname=host, port=self.port
+        )
+
+    @property
+    def count(self) -> int:
+        """Number of messages accepted so far."""
+        with self._lock:
+            return len(self.messages)
+
+    @property
+    def connections(self) -> int:
+        """Number of SMTP sessions that completed an EHLO handshake."""
+        with self._lock:
+            return self._connections
+
+    def refuse(self, address: str, reply: str = "550 5.1.1 No such user") -> None:
+        """
+        Refuse a recipient at RCPT TO.
+
+        Args:
+            address: Recipient address to refuse.
+            reply: SMTP reply line to answer with.
+        """
+        self.refusals[address.lower()] = reply
+
+    def wait_for(self, count: int, timeout: float = 5.0) -> bool:
+        """
+        Block until at least ``count`` messages were accepted.
+
+        Returns:
+            True if the count was reached before the timeout.
+        """
+        with self._delivered:
+            return self._delivered.wait_for(
+                lambda: len(self.messages) >= count, timeout
+            )
+
+    def start(self) -> "SMTPSink":
+        """Start listening."""
+        self._controller.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop listening."""
+        self._controller.stop()
+
+    def _connected(self, session) -> None:
+        # EHLO is repeated after STARTTLS; count each session once
+        if getattr(session, "sink_counted", False):
+            return
+        session.sink_counted = True
+        with self._lock:
+            self._connections += 1
+
+    def _record(self, message: SinkMessage) -> None:
+        with self._delivered:
+            self.messages.append(message)
+            self._delivered.notify_all()
+
+    def __enter__(self) -> "SMTPSink":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def _free_port(host: str) -> int:
+    """Return a currently unused TCP port on host."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
@@ -0,0 +1,83 @@
+"""
+Pytest fixtures for unitMail unit tests.
+"""
+
+import asyncio
+
+import dns.rdata
+import dns.resolver
+import pytest
+
+from common.storage import EmailStorage
+from common.storage import storage as storage_module
+from tests.smtp_sink import SMTPSink
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    """Provide a fresh EmailStorage backed by a temporary database."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    EmailStorage.reset()
+    monkeypatch.setattr(storage_module, "_storage_instance", None)
+
+    instance = EmailStorage(str(tmp_path / "unitmail.db"))
+    yield instance
+
+    EmailStorage.reset()
+
+
+@pytest.fixture
+def smtp_sink():
+    """Provide a running loopback SMTP sink."""
+    with SMTPSink() as sink:
+        yield sink
+
+
+class Clock:
+    """Settable time source for code that takes a clock callable."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Provide a Clock starting at 1000.0."""
+    return Clock()
+
+
+class _Answer:
+    def __init__(self, rdtype, values, ttl):
+        self.rrset = type("RRset", (), {"ttl": ttl})()
+        self._rdata = [dns.rdata.from_text("IN", rdtype, v) for v in values]
+
+    def __iter__(self):
+        return iter(self._rdata)
+
+
+class StubResolver:
+    """Answers from a fixed zone and counts queries."""
+
+    def __init__(self, zone, delay=0.0):
+        # (name, rdtype) -> (values, ttl) or an exception to raise
+        self.zone = zone
+        self.delay = delay
+        self.queries = []
+
+    async def resolve(self, name, rdtype):
+        self.queries.append((name, rdtype))
+        await asyncio.sleep(self.delay)
+        record = self.zone.get((name, rdtype), dns.resolver.NXDOMAIN())
+        if isinstance(record, Exception):
+            raise record
+        values, ttl = record
+        return _Answer(rdtype, values, ttl)
+
+
+@pytest.fixture
+def stub_resolver():
+    """Provide a factory of StubResolvers: stub_resolver(zone, delay=0.0)."""
+    return StubResolver
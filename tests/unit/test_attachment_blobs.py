@@ -0,0 +1,287 @@
+"""
+Tests for the content-addressed attachment blob store.
+"""
+
+import asyncio
+import hashlib
+import os
+import socket
+import time
+from email.message import EmailMessage
+from types import SimpleNamespace
+
+import pytest
+
+from common.storage import BlobStore
+from gateway.smtp.parser import DECODE_CHUNK_SIZE, EmailParser
+from gateway.smtp.receiver import SMTPHandler, SMTPReceiver
+
+PDF = os.urandom(3 * DECODE_CHUNK_SIZE + 123)
+
+
+def _raw_message(message_id, attachments):
+    message = EmailMessage()
+    message["From"] = "alice@example.com"
+    message["To"] = "local@unitmail.local"
+    message["Subject"] = "With attachments"
+    message["Message-ID"] = message_id
+    message.set_content("See attached.")
+    for filename, maintype, subtype, content, cte in attachments:
+        message.add_attachment(
+            content,
+            maintype=maintype,
+            subtype=subtype,
+            filename=filename,
+            cte=cte,
+        )
+    return message.as_bytes()
+
+
+def _blob_files(store):
+    return sorted(p.name for p in store.root.glob("??/??/*"))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(tmp_path / "blobs", fsync=False)
+
+
+def test_parser_streams_parts_into_store(store):
+    text = ("café = " * 20000).encode("utf-8")
+    raw = _raw_message(
+        "<blobs-1@example.com>",
+        [
+            ("report.pdf", "application", "pdf", PDF, "base64"),
+            ("notes.txt", "application", "octet-stream", text,
+             "quoted-printable"),
+        ],
+    )
+
+    parsed = EmailParser(blob_store=store).parse(raw)
+
+    report, notes = parsed.attachments
+    assert report.checksum == hashlib.sha256(PDF).hexdigest()
+    assert notes.checksum == hashlib.sha256(text).hexdigest()
+    assert (report.size, report.content) == (len(PDF), b"")
+    assert store.read(report.checksum) == PDF
+    assert report.storage_path == store.relative_path(report.checksum)
+    assert (store.root / report.storage_path).is_file()
+    assert _blob_files(store) == sorted([report.checksum, notes.checksum])
+
+
+def test_without_store_content_is_kept():
+    raw = _raw_message(
+        "<blobs-2@example.com>",
+        [("report.pdf", "application", "pdf", PDF, "base64")],
+    )
+
+    (attachment,) = EmailParser().parse(raw).attachments
+
+    assert attachment.content == PDF
+    assert attachment.checksum is None
+
+
+def test_oversized_attachment_dropped(store):
+    raw = _raw_message(
+        "<blobs-3@example.com>",
+        [("report.pdf", "application", "pdf", PDF, "base64")],
+    )
+
+    parsed = EmailParser(max_attachment_size=1000, blob_store=store).parse(raw)
+
+    assert parsed.attachments == []
+    assert _blob_files(store) == []
+    assert list((store.root / "tmp").iterdir()) == []
+
+
+def test_mapped_reads(store):
+    ref = store.put(PDF)
+
+    with store.open(ref.checksum) as view:
+        assert view.readonly
+        assert view[:64] == PDF[:64]
+    assert b"".join(
+        bytes(chunk) for chunk in store.iter_chunks(ref.checksum, 4096)
+    ) == PDF
+    empty = store.put(b"")
+    with store.open(empty.checksum) as view:
+        assert len(view) == 0
+
+
+async def test_receiver_stores_attachments_once(storage):
+    handler = SMTPHandler(storage, EmailParser(blob_store=storage.blobs))
+    attachment = [("report.pdf", "application", "pdf", PDF, "base64")]
+
+    for n in (1, 2):
+        reply = await handler.deliver(
+            _raw_message(f"<blobs-{n}@example.com>", attachment),
+            "alice@example.com",
+            ["local@unitmail.local"],
+            "mx.test",
+        )
+        assert reply.startswith("250 ")
+
+    checksum = hashlib.sha256(PDF).hexdigest()
+    assert _blob_files(storage.blobs) == [checksum]
+    for message in storage.get_messages():
+        (stored,) = message["attachments"]
+        assert stored["checksum"] == checksum
+        assert stored["path"] == str(storage.blobs.path(checksum))
+        assert storage.get_attachment(message["id"], stored["id"]) == stored
+
+
+def test_prune_keeps_referenced_blobs(storage):
+    kept = storage.blobs.put(b"kept")
+    orphan = storage.blobs.put(b"orphan")
+    storage.create_message(
+        {
+            "subject": "kept",
+            "attachments": [
+                {
+                    "filename": "kept.txt",
+                    "checksum": kept.checksum,
+                    "path": storage.blobs.relative_path(kept.checksum),
+                }
+            ],
+        }
+    )
+
+    assert storage.prune_attachment_blobs() == 0
+    assert storage.prune_attachment_blobs(grace=0) == 1
+    assert storage.blobs.exists(kept.checksum)
+    assert not storage.blobs.exists(orphan.checksum)
+
+
+def _attached(storage, *blobs):
+    return storage.create_message(
+        {
+            "subject": "attached",
+            "attachments": [
+                {
+                    "filename": f"{blob.checksum[:8]}.txt",
+                    "checksum": blob.checksum,
+                    "path": storage.blobs.relative_path(blob.checksum),
+                }
+                for blob in blobs
+            ],
+        }
+    )
+
+
+def _backdate(store, *blobs, seconds=7200):
+    then = time.time() - seconds
+    for blob in blobs:
+        os.utime(store.path(blob.checksum), (then, then))
+
+
+def test_deleted_message_blobs_are_pruned_after_grace(storage):
+    shared = storage.blobs.put(b"shared")
+    own = storage.blobs.put(b"own")
+    # Written by a delivery that failed before its message was stored
+    orphan = storage.blobs.put(b"orphan")
+    first = _attached(storage, shared, own)
+    second = _attached(storage, shared)
+    _backdate(storage.blobs, shared, own, orphan)
+
+    # Deleting leaves the blobs to the prune
+    assert storage.delete_message(first["id"])
+    assert storage.blobs.exists(own.checksum)
+    assert storage.prune_attachment_blobs() == 2
+    assert storage.blobs.exists(shared.checksum)
+    assert not storage.blobs.exists(own.checksum)
+    assert not storage.blobs.exists(orphan.checksum)
+
+    storage.move_to_trash(second["id"])
+    assert storage.empty_trash() == 1
+    assert storage.prune_attachment_blobs() == 1
+    assert _blob_files(storage.blobs) == []
+
+
+def test_prune_keeps_blob_reused_by_pending_delivery(storage):
+    reused = storage.blobs.put(b"reused")
+    message = _attached(storage, reused)
+    _backdate(storage.blobs, reused)
+
+    # A new delivery commits the same content before its row is stored
+    storage.blobs.put(b"reused")
+    assert storage.delete_message(message["id"])
+
+    assert storage.prune_attachment_blobs() == 0
+    assert storage.blobs.exists(reused.checksum)
+
+
+async def test_receiver_prunes_blobs_on_startup(storage):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    # Left by a delivery that was rejected after its attachment was written
+    orphan = storage.blobs.put(b"orphan")
+    _backdate(storage.blobs, orphan)
+
+    receiver = SMTPReceiver(
+        host="127.0.0.1", port=port, hostname="mx.test", storage=storage
+    )
+    async with receiver:
+        for _ in range(500):
+            if not storage.blobs.exists(orphan.checksum):
+                break
+            await asyncio.sleep(0.01)
+        assert not receiver._prune_task.done()
+
+    assert not storage.blobs.exists(orphan.checksum)
+    assert receiver._prune_task is None
+
+
+@pytest.mark.parametrize(
+    ("content_type", "is_inline", "disposition"),
+    [
+        ("image/png", True, "inline"),
+        ("text/plain; charset=utf-8", True, "inline"),
+        ("text/html", True, "attachment"),
+        ("image/svg+xml", True, "attachment"),
+        ("image/png", False, "attachment"),
+    ],
+)
+def test_download_only_inlines_safe_types(
+    storage, monkeypatch, content_type, is_inline, disposition
+):
+    # The API package needs the gateway server's dependencies
+    pytest.importorskip("flask_socketio")
+    from flask import Flask
+
+    from gateway.api import auth
+    from gateway.api.routes import messages as routes
+
+    blob = storage.blobs.put(b"<svg onload='alert(1)'/>")
+    message = storage.create_message(
+        {
+            "subject": "attached",
+            "attachments": [
+                {
+                    "filename": "file",
+                    "content_type": content_type,
+                    "is_inline": is_inline,
+                    "checksum": blob.checksum,
+                    "path": storage.blobs.relative_path(blob.checksum),
+                }
+            ],
+        }
+    )
+    jwt = SimpleNamespace(
+        get_token_from_request=lambda: "token",
+        verify_token=lambda token, expected_type: {"sub": message["user_id"]},
+    )
+    monkeypatch.setattr(auth, "get_jwt_manager", lambda: jwt)
+    monkeypatch.setattr(routes, "get_storage", lambda: storage)
+    app = Flask(__name__)
+    app.register_blueprint(routes.create_messages_blueprint())
+
+    (attachment,) = message["attachments"]
+    response = app.test_client().get(
+        f"/messages/{message['id']}/attachments/{attachment['id']}"
+    )
+
+    assert response.status_code == 200
+    assert response.headers["Content-Disposition"].startswith(disposition)
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+    response.close()
@@ -0,0 +1,62 @@
+"""
+Tests for batched attachment loading on list-returning storage methods.
+"""
+
+
+def _create_with_attachments(storage, count):
+    return storage.create_message(
+        {
+            "from_address": "a@example.com",
+            "subject": f"{count} attachments",
+            "thread_id": "thread-1",
+            "attachments": [
+                {"filename": f"file{i}.txt", "content_type": "text/plain"}
+                for i in range(count)
+            ],
+        }
+    )
+
+
+def test_list_methods_attach_in_bulk(storage):
+    two = _create_with_attachments(storage, 2)
+    none = _create_with_attachments(storage, 0)
+
+    messages = {m["id"]: m for m in storage.get_messages_by_folder("Inbox")}
+
+    assert [a["filename"] for a in messages[two["id"]]["attachments"]] == [
+        "file0.txt",
+        "file1.txt",
+    ]
+    assert messages[none["id"]]["attachments"] == []
+    assert messages[two["id"]] == storage.get_message(two["id"])
+
+
+def test_single_query_for_attachments(storage):
+    for _ in range(5):
+        _create_with_attachments(storage, 1)
+
+    statements = []
+    storage._db.connection.set_trace_callback(statements.append)
+    try:
+        messages = storage.get_thread_messages("thread-1")
+    finally:
+        storage._db.connection.set_trace_callback(None)
+
+    assert len(messages) == 5
+    assert all(len(m["attachments"]) == 1 for m in messages)
+    assert sum("FROM attachments" in sql for sql in statements) == 1
+
+
+def test_opt_out_skips_attachment_rows(storage):
+    _create_with_attachments(storage, 3)
+
+    statements = []
+    storage._db.connection.set_trace_callback(statements.append)
+    try:
+        messages = storage.get_all_messages(include_attachments=False)
+    finally:
+        storage._db.connection.set_trace_callback(None)
+
+    assert messages[0]["has_attachments"] is True
+    assert messages[0]["attachments"] == []
+    assert not any("FROM attachments" in sql for sql in statements)
@@ -0,0 +1,76 @@
+"""
+Tests for set-based batch message operations.
+"""
+
+import pytest
+
+
+def _create(storage, count):
+    return storage.create_messages_bulk(
+        {"subject": f"message {i}"} for i in range(count)
+    )
+
+
+def _counts(storage, name):
+    folder = storage.get_folder_by_name(name)
+    return folder["message_count"], folder["unread_count"]
+
+
+def test_mark_read_many(storage):
+    ids = _create(storage, 5)
+
+    assert storage.mark_read_many(ids[:3]) == 3
+    # Already-read messages are not rewritten
+    assert storage.mark_read_many(ids) == 2
+    assert _counts(storage, "Inbox") == (5, 0)
+
+    assert storage.mark_read_many(ids[:2], is_read=False) == 2
+    assert _counts(storage, "Inbox") == (5, 2)
+    assert not storage.get_message(ids[0])["is_read"]
+
+
+def test_set_flag_many(storage):
+    ids = _create(storage, 3)
+
+    assert storage.set_flag_many(ids, "is_starred", True) == 3
+    assert storage.set_flag_many(ids[:1], "is_important", True) == 1
+    assert storage.get_starred_count() == 3
+    assert storage.get_message(ids[0])["is_important"]
+
+    with pytest.raises(ValueError):
+        storage.set_flag_many(ids, "deleted_at", True)
+
+
+def test_move_many(storage):
+    ids = _create(storage, 4)
+    archive = storage.get_folder_by_name("Archive")
+
+    assert storage.move_many(ids[:3], archive["id"]) == 3
+    assert _counts(storage, "Inbox") == (1, 1)
+    assert _counts(storage, "Archive") == (3, 3)
+
+
+def test_trash_many_preserves_original_folder(storage):
+    ids = _create(storage, 3)
+    inbox = storage.get_folder_by_name("Inbox")
+
+    assert storage.trash_many(ids[:2]) == 2
+    assert storage.trash_many(ids[:2]) == 0
+    assert _counts(storage, "Trash") == (2, 2)
+
+    trashed = storage.get_message(ids[0])
+    assert trashed["original_folder_id"] == inbox["id"]
+    assert trashed["deleted_at"]
+
+    restored = storage.restore_from_trash(ids[0])
+    assert restored["folder_id"] == inbox["id"]
+
+
+def test_batch_spans_chunks_and_filters_owner(storage):
+    ids = _create(storage, storage._MAX_SQL_PARAMS + 50)
+
+    assert storage.mark_read_many(ids, user_id="someone-else") == 0
+    assert storage.mark_read_many(
+        ids + ["missing"], user_id=storage._default_user_id
+    ) == len(ids)
+    assert storage.get_unread_count() == 0
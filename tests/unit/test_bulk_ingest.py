@@ -0,0 +1,103 @@
+"""
+Tests for EmailStorage.create_messages_bulk.
+"""
+
+import sqlite3
+
+import pytest
+
+
+def _messages(count, **extra):
+    return (
+        {
+            "from_address": f"sender{i}@example.com",
+            "subject": f"Bulk message {i}",
+            "body_text": f"body number {i}",
+            **extra,
+        }
+        for i in range(count)
+    )
+
+
+def _triggers(storage):
+    rows = storage._db.fetchall(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+    )
+    return {row["name"] for row in rows}
+
+
+def test_bulk_insert_returns_ids_in_order(storage):
+    ids = storage.create_messages_bulk(_messages(25), chunk_size=10)
+
+    assert len(ids) == 25
+    assert storage.get_message(ids[7])["subject"] == "Bulk message 7"
+
+
+def test_bulk_insert_counts_and_search(storage):
+    triggers = _triggers(storage)
+    trash = storage.get_folder_by_name("Trash")
+
+    storage.create_messages_bulk(_messages(12), chunk_size=5)
+    storage.create_messages_bulk(
+        _messages(3, folder_id=trash["id"], is_read=True)
+    )
+
+    assert storage.get_folder_by_name("Inbox")["message_count"] == 12
+    assert storage.get_folder_by_name("Inbox")["unread_count"] == 12
+    assert storage.get_folder_by_name("Trash")["message_count"] == 3
+    assert storage.get_folder_by_name("Trash")["unread_count"] == 0
+    assert storage.recount_folders() == 0
+
+    assert len(storage.search_messages("number", limit=100)) == 15
+    assert _triggers(storage) == triggers
+
+    # Per-row maintenance still works after the batch
+    storage.create_message({"subject": "after", "body_text": "number"})
+    assert storage.get_folder_by_name("Inbox")["message_count"] == 13
+    assert len(storage.search_messages("after")) == 1
+
+
+def test_bulk_insert_attachments(storage):
+    ids = storage.create_messages_bulk(
+        [
+            {
+                "subject": "with files",
+                "attachments": [{"filename": "a.txt"}, {"filename": "b.txt"}],
+            }
+        ]
+    )
+
+    message = storage.get_message(ids[0])
+    assert message["has_attachments"]
+    assert [a["filename"] for a in message["attachments"]] == [
+        "a.txt",
+        "b.txt",
+    ]
+
+
+def test_bulk_insert_progress_callback(storage):
+    progress = []
+
+    storage.create_messages_bulk(
+        _messages(7), chunk_size=3, progress_callback=progress.append
+    )
+
+    assert progress == [3, 6, 7]
+
+
+def test_bulk_insert_is_atomic(storage):
+    triggers = _triggers(storage)
+    batch = list(_messages(5))
+    batch[3]["message_id"] = batch[1]["message_id"] = "<dup@example.com>"
+
+    with pytest.raises(sqlite3.IntegrityError):
+        storage.create_messages_bulk(batch, chunk_size=2)
+
+    assert storage.get_message_count() == 0
+    assert storage.get_folder_by_name("Inbox")["message_count"] == 0
+    assert _triggers(storage) == triggers
+
+
+def test_bulk_insert_rejects_bad_chunk_size(storage):
+    with pytest.raises(ValueError):
+        storage.create_messages_bulk(_messages(1), chunk_size=0)
@@ -0,0 +1,180 @@
+"""
+Tests for composing and signing outgoing mail in a process pool.
+"""
+
+import asyncio
+import os
+import time
+from email import message_from_bytes
+
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+
+from common.exceptions import InvalidMessageError
+from gateway.crypto.dkim import DKIMSigner, DKIMVerifier
+from gateway.smtp.executor import CPUExecutor, MessageRenderer, RenderOptions
+from gateway.smtp.queue import QueueManager
+from gateway.smtp.sender import RelayConfig, SMTPSender
+from gateway.smtp.worker import ErrorType, QueueWorker
+
+MESSAGE = {
+    "user_id": "00000000-0000-0000-0000-000000000001",
+    "message_id": "<report-1@example.com>",
+    "from_address": "alice@example.com",
+    "to_addresses": ["bob@example.com"],
+    "subject": "Quarterly report",
+    "body_text": "Numbers attached.",
+}
+
+
+def _leaf_payloads(message):
+    return [
+        part.get_payload(decode=True)
+        for part in message.walk()
+        if not part.is_multipart()
+    ]
+
+
+def _slow_echo(payload):
+    time.sleep(0.1)
+    return payload
+
+
+def _crash(payload):
+    os._exit(1)
+
+
+@pytest.fixture
+def executor():
+    executor = CPUExecutor(max_workers=1, max_pending=2)
+    yield executor
+    executor.close()
+
+
+async def test_renders_in_pool_like_on_the_loop(executor):
+    pooled = message_from_bytes(await executor.render(MESSAGE))
+    inline = message_from_bytes(MessageRenderer().render(MESSAGE))
+
+    for header in ("From", "To", "Subject", "Message-ID"):
+        assert pooled[header] == inline[header]
+    assert _leaf_payloads(pooled) == _leaf_payloads(inline) != []
+    assert executor.stats.completed == 1
+
+
+async def test_dkim_signature_made_in_pool_verifies(tmp_path):
+    keys = DKIMSigner.generate_key_pair()
+    key_path = tmp_path / "dkim.private"
+    key_path.write_bytes(keys.private_key_pem)
+    executor = CPUExecutor(
+        max_workers=1,
+        options=RenderOptions(
+            dkim_domain="example.com",
+            dkim_selector="mail",
+            dkim_private_key_path=str(key_path),
+        ),
+    )
+    try:
+        signed = await executor.render(MESSAGE)
+    finally:
+        executor.close()
+
+    assert signed.startswith(b"DKIM-Signature: ")
+    verifier = DKIMVerifier()
+    verifier._fetch_public_key = lambda domain, selector: keys.public_key
+    assert verifier.verify(signed)[0]
+
+
+async def test_queue_worker_signs_without_executor(
+    storage, smtp_sink, tmp_path, monkeypatch
+):
+    keys = DKIMSigner.generate_key_pair()
+    key_path = tmp_path / "dkim.private"
+    key_path.write_bytes(keys.private_key_pem)
+    loads = []
+
+    class CountingSigner(DKIMSigner):
+        def __init__(self, *args, **kwargs):
+            loads.append(kwargs["private_key_path"])
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr("gateway.crypto.dkim.DKIMSigner", CountingSigner)
+    manager = QueueManager(storage=storage)
+    manager.set_render_options(
+        RenderOptions(
+            dkim_domain="example.com",
+            dkim_selector="mail",
+            dkim_private_key_path=str(key_path),
+        )
+    )
+    manager.set_sender(
+        SMTPSender(
+            relay_config=RelayConfig(
+                host="127.0.0.1",
+                port=smtp_sink.port,
+                use_tls=False,
+                require_starttls=False,
+            ),
+            timeout=5,
+        )
+    )
+
+    try:
+        # A worker per queue item, as the queue manager creates them
+        results = [
+            await QueueWorker(storage, manager).deliver(MESSAGE, "bob@example.com")
+            for _ in range(2)
+        ]
+    finally:
+        await manager.sender.close()
+
+    assert all(result.success for result in results), results
+    assert [sent.data[:16] for sent in smtp_sink.messages] == [
+        b"DKIM-Signature: "
+    ] * 2
+    # The key is loaded once, not per queue item
+    assert loads == [str(key_path)]
+
+
+async def test_invalid_message_error_crosses_processes(executor):
+    with pytest.raises(InvalidMessageError):
+        await executor.render({**MESSAGE, "from_address": "not an address"})
+    assert executor.stats.failed == 1
+
+
+async def test_pending_tasks_are_bounded(executor):
+    async def watch():
+        peak = 0
+        while executor.stats.completed < 6:
+            peak = max(peak, executor.stats.running)
+            await asyncio.sleep(0.01)
+        return peak
+
+    watcher = asyncio.create_task(watch())
+    results = await asyncio.gather(
+        *(executor.submit(_slow_echo, bytes([i])) for i in range(6))
+    )
+
+    assert results == [bytes([i]) for i in range(6)]
+    assert await watcher == 2
+
+
+async def test_crashed_pool_is_replaced(executor):
+    with pytest.raises(BrokenProcessPool):
+        await executor.submit(_crash, b"")
+
+    assert await executor.submit(_slow_echo, b"ok") == b"ok"
+    assert executor.stats.pool_restarts == 1
+
+
+async def test_queue_worker_renders_with_manager_executor(storage, executor):
+    manager = QueueManager(storage=storage)
+    manager.set_executor(executor)
+    worker = QueueWorker(storage, manager)
+
+    result = await worker.deliver(
+        {**MESSAGE, "to_addresses": ["nobody"]}, "bob@example.com"
+    )
+
+    assert result.error_type == ErrorType.PERMANENT
+    assert "Cannot compose message" in result.error_message
+    assert executor.stats.failed == 1
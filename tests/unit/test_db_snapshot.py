@@ -0,0 +1,98 @@
+"""
+Tests for hot database snapshots with the SQLite online backup API.
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+
+def _count(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _fill(storage, count):
+    storage.create_messages_bulk(
+        [
+            {"subject": f"Message {i}", "body_text": "x" * 2000}
+            for i in range(count)
+        ]
+    )
+
+
+def test_snapshot_includes_wal_frames(storage, tmp_path):
+    _fill(storage, 50)
+    wal = tmp_path / "unitmail.db-wal"
+    assert wal.exists() and wal.stat().st_size > 0
+
+    target = tmp_path / "copy.db"
+    storage.snapshot(str(target))
+
+    assert _count(target) == 50
+
+
+def test_writers_proceed_during_snapshot(storage, tmp_path):
+    _fill(storage, 300)
+    writer = sqlite3.connect(tmp_path / "unitmail.db", timeout=0.5)
+    steps = []
+
+    def write_between_steps(copied, total):
+        steps.append((copied, total))
+        # Another connection commits while the snapshot is open: it
+        # must neither wait on the snapshot nor make it start over
+        writer.execute(
+            "UPDATE messages SET subject = 'changed' WHERE rowid = ?",
+            (len(steps),),
+        )
+        writer.commit()
+
+    target = tmp_path / "copy.db"
+    storage._db.snapshot(str(target), pages=16, progress=write_between_steps)
+    writer.close()
+
+    total = steps[-1][1]
+    assert len(steps) == -(-total // 16)
+    assert [copied for copied, _ in steps] == sorted(
+        copied for copied, _ in steps
+    )
+    copy = sqlite3.connect(target)
+    assert copy.execute(
+        "SELECT COUNT(*) FROM messages WHERE subject = 'changed'"
+    ).fetchone()[0] == 0
+    assert copy.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    copy.close()
+    assert storage.search_messages("changed")
+
+
+def test_snapshot_runs_beside_other_threads(storage, tmp_path):
+    _fill(storage, 20)
+    errors = []
+
+    def deliver():
+        try:
+            storage.create_message({"subject": "Arrived", "body_text": "hi"})
+        except Exception as e:
+            errors.append(e)
+
+    def deliver_between_steps(copied, total):
+        thread = threading.Thread(target=deliver)
+        thread.start()
+        thread.join(timeout=5)
+
+    storage._db.snapshot(
+        str(tmp_path / "copy.db"), pages=4, progress=deliver_between_steps
+    )
+
+    assert errors == []
+    assert _count(tmp_path / "copy.db") == 20
+
+
+def test_snapshot_refused_in_transaction(storage, tmp_path):
+    with storage._db.transaction():
+        with pytest.raises(RuntimeError):
+            storage.snapshot(str(tmp_path / "copy.db"))
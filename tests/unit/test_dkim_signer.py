@@ -0,0 +1,156 @@
+"""
+Tests for byte-level DKIM signing and verification.
+"""
+
+import base64
+import hashlib
+
+import pytest
+
+from gateway.crypto.dkim import (
+    BodyHasher,
+    DKIMSigner,
+    DKIMVerifier,
+    HeaderIndex,
+    canonicalize_header,
+    split_message,
+)
+
+# RFC 6376 section 3.4.5
+RFC_HEADERS = b"A: X\r\nB : Y\t\r\n\tZ  \r\n"
+RFC_BODY = b" C \r\nD \t E\r\n\r\n\r\n"
+
+
+def _b64sha256(data):
+    return base64.b64encode(hashlib.sha256(data).digest()).decode("ascii")
+
+
+def _body_hash(body, method, chunk_size=None):
+    hasher = BodyHasher("rsa-sha256", method)
+    chunk_size = chunk_size or len(body) or 1
+    for start in range(0, len(body), chunk_size):
+        hasher.update(body[start : start + chunk_size])
+    return hasher.finalize()
+
+
+@pytest.fixture(scope="module")
+def keys():
+    return DKIMSigner.generate_key_pair()
+
+
+def _signer(keys, canonicalization="relaxed/relaxed"):
+    return DKIMSigner(
+        "example.com",
+        "mail",
+        private_key=keys.private_key,
+        canonicalization=canonicalization,
+    )
+
+
+def _verifier(keys):
+    verifier = DKIMVerifier()
+    verifier._fetch_public_key = lambda domain, selector: keys.public_key
+    return verifier
+
+
+def test_rfc_canonicalization_example():
+    headers = HeaderIndex(RFC_HEADERS).headers
+    relaxed = [canonicalize_header(n, v, "relaxed") for n, v in headers]
+    simple = [canonicalize_header(n, v, "simple") for n, v in headers]
+
+    assert relaxed == [b"a:X", b"b:Y Z"]
+    assert b"\r\n".join(simple) + b"\r\n" == RFC_HEADERS
+    assert _body_hash(RFC_BODY, "relaxed") == _b64sha256(b" C\r\nD E\r\n")
+    assert _body_hash(RFC_BODY, "simple") == _b64sha256(b" C \r\nD \t E\r\n")
+
+
+def test_empty_body_hashes():
+    assert _body_hash(b"", "simple") == _b64sha256(b"\r\n")
+    assert _body_hash(b"\r\n\r\n", "simple") == _b64sha256(b"\r\n")
+    assert _body_hash(b"", "relaxed") == _b64sha256(b"")
+    assert _body_hash(b" \r\n\t\r\n", "relaxed") == _b64sha256(b"")
+
+
+@pytest.mark.parametrize("method", ["simple", "relaxed"])
+def test_chunked_hash_matches_whole_body(method):
+    body = (
+        b"line one  \r\n\r\n\tindented\ttext \r\n"
+        b"bare lf line\n\n\n8-bit \xe9\xff\r\n\r\n"
+        b"after blanks\r\n \r\n\r\n"
+    ) * 20
+    whole = _body_hash(body, method)
+
+    for chunk_size in (1, 2, 3, 7, 64, 1000):
+        assert _body_hash(body, method, chunk_size) == whole
+
+
+def test_split_message_takes_first_empty_line():
+    raw = b"From: a@example.com\nSubject: x\n\nbody\r\n\r\nmore\r\n"
+    header_block, offset = split_message(raw)
+
+    assert header_block == b"From: a@example.com\nSubject: x"
+    assert raw[offset:] == b"body\r\n\r\nmore\r\n"
+    assert split_message(b"From: a@example.com") == (b"From: a@example.com", 19)
+
+
+def test_repeated_headers_are_signed_bottom_up():
+    index = HeaderIndex(
+        b"From: a@example.com\r\nTo: first@example.com\r\n"
+        b"Received: x\r\nto: second@example.com\r\n"
+    )
+
+    assert "TO" in index and "cc" not in index
+    assert index.first("to") == (b"To", b" first@example.com")
+    assert index.select(["to", "from", "to", "to"]) == [
+        (b"to", b" second@example.com"),
+        (b"From", b" a@example.com"),
+        (b"To", b" first@example.com"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "canonicalization",
+    ["relaxed/relaxed", "simple/simple", "relaxed/simple", "simple/relaxed"],
+)
+def test_8bit_message_signs_byte_exact(keys, canonicalization):
+    raw = (
+        b"From: a@example.com\r\nTo: b@example.com\r\n"
+        b"Subject: Caf\xc3\xa9\r\nContent-Transfer-Encoding: 8bit\r\n\r\n"
+        b"Latin-1 \xe9 and invalid UTF-8 \xff\xfe\r\n"
+    )
+    signed = _signer(keys, canonicalization).sign_message(raw)
+
+    assert signed.endswith(raw)
+    assert _verifier(keys).verify(signed)[0]
+    tampered = signed.replace(b"\xff\xfe", b"\xfe\xff")
+    assert _verifier(keys).verify(tampered) == (False, "Body hash mismatch")
+
+
+def test_signature_covers_every_listed_instance(keys):
+    raw = (
+        b"From: a@example.com\r\nTo: one@example.com\r\n"
+        b"To: two@example.com\r\nSubject: x\r\n\r\nbody\r\n"
+    )
+    signed = _signer(keys).sign_message(raw, ["from", "to", "to", "subject"])
+
+    assert _verifier(keys).verify(signed)[0]
+    tampered = signed.replace(b"one@", b"uno@")
+    assert _verifier(keys).verify(tampered) == (
+        False,
+        "Signature verification failed",
+    )
+
+
+def test_sign_stream_matches_sign(keys):
+    signer = _signer(keys)
+    raw = b"From: a@example.com\r\nSubject: big\r\n\r\n" + b"x" * 100_000
+    header_block, offset = split_message(raw)
+    chunks = (raw[i : i + 4096] for i in range(offset, len(raw), 4096))
+
+    streamed = signer.sign_stream(header_block, chunks)
+
+    assert "bh=" in streamed
+    assert streamed.split("bh=")[1].split(";")[0] == (
+        signer.sign(raw).split("bh=")[1].split(";")[0]
+    )
+    assert _verifier(keys).verify(streamed.encode() + b"\r\n" + raw)[0]
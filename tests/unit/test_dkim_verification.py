@@ -0,0 +1,220 @@
+"""
+Tests for the DKIM key cache and inbound DKIM verification.
+"""
+
+import asyncio
+import base64
+from types import SimpleNamespace
+
+import dns.exception
+import pytest
+from aiosmtpd.smtp import Envelope
+from cryptography.hazmat.primitives import serialization
+
+from common.exceptions import DNSLookupError, SignatureError
+from gateway.crypto.dkim import (
+    DKIMKeyCache,
+    DKIMSigner,
+    DKIMVerifier,
+    format_authentication_results,
+)
+from gateway.smtp.parser import EmailParser
+from gateway.smtp.receiver import SMTPHandler
+
+MESSAGE = (
+    b"From: alice@example.com\r\nTo: local@unitmail.local\r\n"
+    b"Subject: Signed\r\nMessage-ID: <signed-1@example.com>\r\n\r\n"
+    b"Hello from a signed message.\r\n"
+)
+
+
+def _txt(public_key):
+    der = public_key.public_bytes(
+        serialization.Encoding.DER,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    record = f"v=DKIM1; k=rsa; p={base64.b64encode(der).decode()}"
+    # TXT strings are limited to 255 bytes; long records are split
+    return " ".join(f'"{record[i : i + 200]}"' for i in range(0, len(record), 200))
+
+
+@pytest.fixture(scope="module")
+def keys():
+    return DKIMSigner.generate_key_pair()
+
+
+@pytest.fixture
+def resolver(keys, stub_resolver):
+    return stub_resolver(
+        {
+            ("mail._domainkey.example.com", "TXT"): ([_txt(keys.public_key)], 300),
+            ("old._domainkey.example.com", "TXT"): (['"v=DKIM1; k=rsa; p="'], 300),
+            ("flaky._domainkey.example.com", "TXT"): dns.exception.Timeout(),
+        }
+    )
+
+
+def _signed(keys, selector="mail", message=MESSAGE):
+    signer = DKIMSigner("example.com", selector, private_key=keys.private_key)
+    return signer.sign_message(message)
+
+
+async def test_keys_cached_until_ttl_expires(resolver, clock, keys):
+    cache = DKIMKeyCache(resolver=resolver, clock=clock)
+
+    key = await cache.get("example.com", "mail")
+    assert key.public_numbers() == keys.public_key.public_numbers()
+    assert await cache.get("EXAMPLE.com.", "MAIL") is key
+    assert len(resolver.queries) == 1
+
+    clock.now += 301
+    await cache.get("example.com", "mail")
+    assert len(resolver.queries) == 2
+    assert cache.stats.hits == 1 and cache.stats.misses == 2
+
+
+async def test_concurrent_lookups_share_one_query(keys, stub_resolver):
+    resolver = stub_resolver(
+        {("mail._domainkey.example.com", "TXT"): ([_txt(keys.public_key)], 300)},
+        delay=0.05,
+    )
+    cache = DKIMKeyCache(resolver=resolver)
+
+    found = await asyncio.gather(
+        *(cache.get("example.com", "mail") for _ in range(5))
+    )
+
+    assert len({id(key) for key in found}) == 1
+    assert resolver.queries == [("mail._domainkey.example.com", "TXT")]
+    assert cache.stats.coalesced == 4
+
+
+async def test_missing_and_revoked_keys_cached(resolver, clock):
+    cache = DKIMKeyCache(resolver=resolver, negative_ttl=60, clock=clock)
+
+    for _ in range(2):
+        with pytest.raises(SignatureError, match="No DKIM key record"):
+            await cache.get("example.com", "gone")
+        with pytest.raises(SignatureError, match="revoked"):
+            await cache.get("example.com", "old")
+    assert len(resolver.queries) == 2
+    assert (cache.stats.negative_hits, cache.stats.hits) == (1, 1)
+
+    # Missing records are kept for the negative TTL, revoked keys for
+    # their record's TTL
+    clock.now += 61
+    with pytest.raises(SignatureError):
+        await cache.get("example.com", "gone")
+    with pytest.raises(SignatureError):
+        await cache.get("example.com", "old")
+    assert len(resolver.queries) == 3
+
+
+async def test_transient_failures_not_cached(resolver):
+    cache = DKIMKeyCache(resolver=resolver)
+
+    for _ in range(2):
+        with pytest.raises(DNSLookupError):
+            await cache.get("example.com", "flaky")
+    assert len(resolver.queries) == 2
+
+
+async def test_least_recently_used_key_evicted(resolver):
+    cache = DKIMKeyCache(resolver=resolver, max_entries=1)
+
+    await cache.get("example.com", "mail")
+    with pytest.raises(SignatureError):
+        await cache.get("example.com", "old")
+    await cache.get("example.com", "mail")
+
+    assert len(resolver.queries) == 3
+    assert cache.stats.evictions == 2
+
+
+async def test_evaluate_reports_each_outcome(resolver, keys):
+    verifier = DKIMVerifier(key_cache=DKIMKeyCache(resolver=resolver))
+
+    [passed] = await verifier.evaluate(_signed(keys))
+    assert passed.passed and passed.domain == "example.com"
+
+    tampered = _signed(keys).replace(b"Hello", b"Jello")
+    [failed] = await verifier.evaluate(tampered)
+    assert (failed.result, failed.reason) == ("fail", "Body hash mismatch")
+
+    [revoked] = await verifier.evaluate(_signed(keys, selector="old"))
+    assert revoked.result == "permerror"
+    [flaky] = await verifier.evaluate(_signed(keys, selector="flaky"))
+    assert flaky.result == "temperror"
+    [unsigned] = await verifier.evaluate(MESSAGE)
+    assert unsigned.result == "none"
+
+
+async def test_evaluate_checks_every_signature(resolver, keys):
+    verifier = DKIMVerifier(key_cache=DKIMKeyCache(resolver=resolver))
+    twice = _signed(keys, selector="old", message=_signed(keys))
+
+    results = await verifier.evaluate(twice)
+
+    assert [r.selector for r in results] == ["old", "mail"]
+    assert [r.result for r in results] == ["permerror", "pass"]
+    header = format_authentication_results("mx.test", results)
+    assert header.startswith("mx.test; dkim=permerror reason=")
+    assert "; dkim=pass header.d=example.com header.s=mail header.b=" in header
+
+
+async def test_bad_numeric_tag_fails_only_its_signature(resolver, keys):
+    verifier = DKIMVerifier(key_cache=DKIMKeyCache(resolver=resolver))
+    bogus = (
+        b"DKIM-Signature: v=1; a=rsa-sha256; d=example.com; s=mail; "
+        b"x=tomorrow; h=from; bh=AAAA; b=AAAA\r\n"
+    )
+
+    results = await verifier.evaluate(bogus + _signed(keys))
+
+    assert [r.result for r in results] == ["permerror", "pass"]
+    assert "Invalid x= value" in results[0].reason
+    with pytest.raises(SignatureError, match="Invalid l= value"):
+        DKIMVerifier.parse_signature(
+            "v=1; d=example.com; s=mail; l=-1; h=from; bh=AAAA; b=AAAA"
+        )
+
+
+async def _receive(storage, verifier, content, **options):
+    handler = SMTPHandler(storage, EmailParser(), dkim_verifier=verifier, **options)
+    envelope = Envelope()
+    envelope.mail_from = "alice@example.com"
+    envelope.rcpt_tos = ["local@unitmail.local"]
+    envelope.content = content
+    reply = await handler.handle_DATA(
+        SimpleNamespace(hostname="mx.test"), SimpleNamespace(), envelope
+    )
+    assert reply.startswith("250 ")
+    [message] = storage.get_messages(limit=10)
+    return storage.get_message(message["id"])["headers"]
+
+
+async def test_handler_stores_authentication_results(storage, resolver, keys):
+    verifier = DKIMVerifier(key_cache=DKIMKeyCache(resolver=resolver))
+    forged = b"Authentication-Results: mx.test; dkim=pass\r\n" + MESSAGE
+
+    headers = await _receive(
+        storage, verifier, _signed(keys, message=forged).decode()
+    )
+
+    assert headers["authentication-results"].startswith(
+        "mx.test; dkim=pass header.d=example.com header.s=mail"
+    )
+
+
+async def test_handler_records_verification_timeout(storage, keys, stub_resolver):
+    verifier = DKIMVerifier(
+        key_cache=DKIMKeyCache(resolver=stub_resolver({}, delay=5))
+    )
+
+    headers = await _receive(
+        storage, verifier, _signed(keys), verification_timeout=0.05
+    )
+
+    assert headers["authentication-results"] == (
+        'mx.test; dkim=temperror reason="Verification timed out"'
+    )
@@ -0,0 +1,118 @@
+"""
+Tests for the outbound DNS cache and its use by SMTPSender.
+"""
+
+import asyncio
+
+import dns.exception
+import dns.resolver
+import pytest
+
+from common.exceptions import DNSLookupError
+from gateway.smtp.dns_cache import DNSCache
+from gateway.smtp.sender import SMTPSender
+
+
+ZONE = {
+    ("example.com", "MX"): (["20 mx2.example.com.", "10 mx1.example.com."], 300),
+    ("bare.example", "MX"): dns.resolver.NoAnswer(),
+    ("bare.example", "A"): (["192.0.2.1"], 60),
+    ("flaky.example", "MX"): dns.exception.Timeout(),
+}
+
+
+@pytest.fixture
+def resolver(stub_resolver):
+    return stub_resolver(ZONE)
+
+
+async def test_answers_cached_until_ttl_expires(resolver, clock):
+    cache = DNSCache(resolver=resolver, clock=clock)
+
+    first = await cache.resolve("example.com", "MX")
+    again = await cache.resolve("EXAMPLE.com.", "MX")
+    assert [str(r) for r in again] == [str(r) for r in first]
+    assert len(resolver.queries) == 1
+
+    clock.now += 301
+    await cache.resolve("example.com", "MX")
+    assert len(resolver.queries) == 2
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 2
+
+
+async def test_nxdomain_cached_negatively(resolver, clock):
+    cache = DNSCache(resolver=resolver, negative_ttl=60, clock=clock)
+
+    for _ in range(3):
+        with pytest.raises(dns.resolver.NXDOMAIN):
+            await cache.resolve("typo.example", "MX")
+    assert len(resolver.queries) == 1
+    assert cache.stats.negative_hits == 2
+
+    clock.now += 61
+    with pytest.raises(dns.resolver.NXDOMAIN):
+        await cache.resolve("typo.example", "MX")
+    assert len(resolver.queries) == 2
+
+
+async def test_transient_failures_not_cached(resolver, clock):
+    cache = DNSCache(resolver=resolver, clock=clock)
+
+    for _ in range(2):
+        with pytest.raises(dns.exception.Timeout):
+            await cache.resolve("flaky.example", "MX")
+    assert len(resolver.queries) == 2
+
+
+async def test_concurrent_lookups_share_one_query(clock, stub_resolver):
+    resolver = stub_resolver(ZONE, delay=0.05)
+    cache = DNSCache(resolver=resolver, clock=clock)
+
+    results = await asyncio.gather(
+        *(cache.resolve("example.com", "MX") for _ in range(20))
+    )
+
+    assert len(resolver.queries) == 1
+    assert all(len(r) == 2 for r in results)
+    assert cache.stats.coalesced == 19
+
+
+async def test_least_recently_used_evicted(resolver, clock):
+    cache = DNSCache(resolver=resolver, max_entries=1, clock=clock)
+
+    await cache.resolve("example.com", "MX")
+    await cache.resolve("bare.example", "A")
+    await cache.resolve("example.com", "MX")
+
+    assert len(resolver.queries) == 3
+    assert cache.stats.evictions == 2
+
+
+async def test_sender_mx_lookups_use_cache(resolver, clock):
+    sender = SMTPSender(dns_cache=DNSCache(resolver=resolver, clock=clock))
+
+    for _ in range(5):
+        records = await sender.get_mx_records("example.com")
+
+    assert [(r.priority, r.host) for r in records] == [
+        (10, "mx1.example.com"),
+        (20, "mx2.example.com"),
+    ]
+    assert resolver.queries == [("example.com", "MX")]
+    assert sender.dns_stats.hits == 4
+
+
+async def test_sender_implicit_mx_and_failures(resolver, clock):
+    sender = SMTPSender(dns_cache=DNSCache(resolver=resolver, clock=clock))
+
+    records = await sender.get_mx_records("bare.example")
+    assert [(r.priority, r.host) for r in records] == [(0, "bare.example")]
+
+    with pytest.raises(DNSLookupError) as missing:
+        await sender.get_mx_records("typo.example")
+    assert missing.value.details["nxdomain"] is True
+
+    with pytest.raises(DNSLookupError) as flaky:
+        await sender.get_mx_records("flaky.example")
+    assert "nxdomain" not in flaky.value.details
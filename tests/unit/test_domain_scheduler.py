@@ -0,0 +1,228 @@
+"""
+Tests for per-domain scheduling of outbound queue dispatch.
+"""
+
+import asyncio
+import time
+
+from gateway.smtp.queue import (
+    DomainLimits,
+    DomainScheduler,
+    QueueConfig,
+    QueueManager,
+)
+from gateway.smtp.worker import BaseQueueWorker, DeliveryResult, ErrorType
+
+
+def _items(domain, count, start=0):
+    return [
+        {"id": f"{domain}-{i}", "recipient": f"user{i}@{domain}"}
+        for i in range(start, start + count)
+    ]
+
+
+def _drain(scheduler):
+    popped = []
+    while (item := scheduler.pop_ready()) is not None:
+        popped.append(item)
+    return popped
+
+
+def test_round_robin_across_domains(clock):
+    scheduler = DomainScheduler(
+        QueueConfig(domain_limits=DomainLimits(max_concurrency=10)), clock
+    )
+    items = _items("big.test", 4) + _items("a.test", 1) + _items("b.test", 1)
+    for item in items:
+        scheduler.add(item)
+
+    order = [scheduler.domain_of(item) for item in _drain(scheduler)]
+
+    assert order[:3] == ["big.test", "a.test", "b.test"]
+    assert order[3:] == ["big.test"] * 3
+
+
+def test_concurrency_cap_and_release(clock):
+    scheduler = DomainScheduler(
+        QueueConfig(domain_limits=DomainLimits(max_concurrency=2)), clock
+    )
+    for item in _items("slow.test", 5):
+        scheduler.add(item)
+
+    first = _drain(scheduler)
+    assert len(first) == 2
+
+    # The next item stays queued; the rest wait an unmeasured domain's
+    # default, a turn of the domain's concurrency apart
+    assert scheduler.take_waiting() == [
+        (_items("slow.test", 1, start=3)[0], 2.0),
+        (_items("slow.test", 1, start=4)[0], 3.0),
+    ]
+    assert scheduler.held == 1
+
+    clock.now += 10
+    scheduler.release(first[0])
+    assert len(_drain(scheduler)) == 1
+    for item in _items("slow.test", 3, start=5):
+        scheduler.add(item)
+    # Returned items are spaced by the measured delivery time per slot
+    assert [delay for _, delay in scheduler.take_waiting()] == [5.0, 10.0]
+
+
+def test_default_cap_is_half_the_workers(clock):
+    scheduler = DomainScheduler(QueueConfig(num_workers=8), clock)
+    for item in _items("one.test", 8):
+        scheduler.add(item)
+
+    assert len(_drain(scheduler)) == 4
+    assert scheduler.stats()["one.test"].concurrency_limit == 4
+
+
+def test_rate_limit(clock):
+    config = QueueConfig(
+        domain_overrides={
+            "paced.test": DomainLimits(
+                max_concurrency=10, rate_per_second=2.0, burst=2
+            )
+        }
+    )
+    scheduler = DomainScheduler(config, clock)
+    for item in _items("paced.test", 5):
+        scheduler.add(item)
+
+    assert len(_drain(scheduler)) == 2
+    clock.now += 0.5
+    assert len(_drain(scheduler)) == 1
+    # Out of tokens: everything goes back, paced at the rate
+    assert [round(d, 2) for _, d in scheduler.take_waiting()] == [0.5, 1.0]
+
+
+def test_temporary_failures_back_off_domain(clock):
+    config = QueueConfig(
+        domain_limits=DomainLimits(max_concurrency=4),
+        domain_backoff_base=30,
+        domain_backoff_max=100,
+    )
+    scheduler = DomainScheduler(config, clock)
+    (item,) = _items("grey.test", 1)
+
+    scheduler.record(item, throttled=True)
+    scheduler.record(item, throttled=True)
+    stats = scheduler.stats()["grey.test"]
+    assert stats.backoff_remaining_seconds == 60
+    assert stats.concurrency_limit == 1
+    assert scheduler.throttled_domains() == 1
+
+    for other in _items("grey.test", 2, start=1) + _items("ok.test", 1):
+        scheduler.add(other)
+    assert [scheduler.domain_of(i) for i in _drain(scheduler)] == ["ok.test"]
+    assert [d for _, d in scheduler.take_waiting()] == [60, 62]
+
+    scheduler.record(item, throttled=True)
+    assert scheduler.stats()["grey.test"].backoff_remaining_seconds == 100
+
+    clock.now += 100
+    scheduler.record(item, throttled=False)
+    assert scheduler.stats()["grey.test"].backoff_level == 2
+    assert scheduler.throttled_domains() == 0
+
+
+def test_release_queue_claims_keeps_attempts(storage):
+    message_id = storage.create_message({"subject": "outbound"})["id"]
+    item = storage.create_queue_item(message_id, "to@example.com")
+    storage.claim_queue_batch("me", 1)
+
+    assert storage.release_queue_claims("other", [(item["id"], "2099-01-01")]) == 0
+    assert storage.release_queue_claims("me", [(item["id"], "2099-01-01")]) == 1
+
+    released = storage.get_queue_item(item["id"])
+    assert released["status"] == "retrying"
+    assert released["attempts"] == 0
+    assert released["next_attempt_at"] == "2099-01-01"
+    assert storage.claim_queue_batch("me", 1) == []
+
+
+class _FakeWorker(BaseQueueWorker):
+    """Delivers instantly, except slowly to slow.test and 451 from grey.test."""
+
+    async def deliver(self, message, recipient):
+        if recipient.endswith("@slow.test"):
+            await asyncio.sleep(0.5)
+        if recipient.endswith("@grey.test"):
+            return DeliveryResult(
+                success=False,
+                error_type=ErrorType.TEMPORARY,
+                error_message="451 Greylisted",
+                smtp_code=451,
+            )
+        return DeliveryResult(success=True)
+
+
+async def test_slow_domain_does_not_stall_others(storage):
+    message_id = storage.create_message({"subject": "outbound"})["id"]
+    slow = [
+        storage.create_queue_item(message_id, f"u{i}@slow.test") for i in range(20)
+    ]
+    fast = storage.create_queue_item(message_id, "u@fast.test")
+    grey = storage.create_queue_item(message_id, "u@grey.test")
+
+    manager = QueueManager(
+        config=QueueConfig(num_workers=4, emit_events=False), storage=storage
+    )
+    manager.set_worker_class(_FakeWorker)
+    task = asyncio.create_task(manager.start())
+    try:
+        deadline = time.monotonic() + 2
+        while (
+            storage.get_queue_item(fast["id"])["status"] != "completed"
+            or storage.get_queue_item(grey["id"])["status"] != "retrying"
+        ):
+            assert time.monotonic() < deadline, "fast.test or grey.test starved"
+            await asyncio.sleep(0.01)
+
+        status = await manager.get_status()
+        assert status.domains["slow.test"].active == 2
+        assert status.domains["slow.test"].deferred > 0
+        assert status.domains["grey.test"].throttle_events == 1
+        assert status.throttled_domains == 1
+        assert storage.get_queue_item(slow[-1]["id"])["attempts"] == 0
+    finally:
+        await manager.stop()
+        await asyncio.wait_for(task, timeout=5)
+
+
+async def test_single_domain_backlog_does_not_stall_loop(storage, monkeypatch):
+    message_id = storage.create_message({"subject": "outbound"})["id"]
+    for i in range(10_000):
+        storage.create_queue_item(message_id, f"u{i}@slow.test")
+
+    claims = []
+    claim = storage.claim_queue_batch
+
+    def counting_claim(*args, **kwargs):
+        items = claim(*args, **kwargs)
+        claims.append(len(items))
+        return items
+
+    monkeypatch.setattr(storage, "claim_queue_batch", counting_claim)
+
+    manager = QueueManager(
+        config=QueueConfig(num_workers=4, emit_events=False), storage=storage
+    )
+    manager.set_worker_class(_FakeWorker)
+    task = asyncio.create_task(manager.start())
+    try:
+        lag = 0.0
+        deadline = time.monotonic() + 1.2
+        while time.monotonic() < deadline:
+            before = time.monotonic()
+            await asyncio.sleep(0.01)
+            lag = max(lag, time.monotonic() - before - 0.01)
+
+        assert lag < 0.1
+        # A few wakeups' worth of claims, not a pass over the whole backlog
+        assert len(claims) < 200
+        assert storage.count_queue_items("retrying") < 500
+    finally:
+        await manager.stop()
+        await asyncio.wait_for(task, timeout=5)
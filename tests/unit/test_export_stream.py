@@ -0,0 +1,167 @@
+"""
+Tests for streaming message exports.
+"""
+
+import email
+import gzip
+import mailbox
+
+import pytest
+
+# client.services pulls in the GTK settings service
+pytest.importorskip("gi")
+
+from client.services import export_service  # noqa: E402
+from client.services.export_service import (  # noqa: E402
+    ExportCompression,
+    ExportFormat,
+    ExportScope,
+    ExportService,
+)
+
+PDF = b"%PDF-1.4 report\n" * 64
+
+
+@pytest.fixture
+def service(storage, monkeypatch):
+    monkeypatch.setattr(export_service, "get_storage", lambda: storage)
+    return ExportService()
+
+
+def test_mbox_export_is_uncapped_and_reports_per_batch(
+    storage, service, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(export_service, "EXPORT_BATCH_SIZE", 7)
+    storage.create_messages_bulk(
+        {"subject": f"Message {i}", "body_text": "x"} for i in range(30)
+    )
+    progress = []
+    service.set_progress_callback(progress.append)
+
+    result = service.export_messages(
+        tmp_path / "all.mbox", ExportFormat.MBOX, ExportScope.ALL_MESSAGES
+    )
+
+    assert result.success, result.error_message
+    assert result.messages_exported == 30
+    assert len(mailbox.mbox(str(result.output_path))) == 30
+    assert [p.items_processed for p in progress] == [7, 14, 21, 28, 30]
+    assert progress[-1].percent_complete == 100
+
+
+def test_mbox_export_rebuilds_mime(storage, service, tmp_path):
+    blob = storage.blobs.put(PDF)
+    storage.create_message(
+        {
+            "subject": "Quarterly report",
+            "from_address": "alice@example.com",
+            "to_addresses": ["bob@example.com"],
+            "body_text": "Hi Bob,\nFrom the top:\n>From the archive\n",
+            "body_html": "<p>Hi Bob</p>",
+            "attachments": [
+                {
+                    "filename": "report.pdf",
+                    "content_type": "application/pdf",
+                    "checksum": blob.checksum,
+                    "path": storage.blobs.relative_path(blob.checksum),
+                }
+            ],
+        }
+    )
+
+    result = service.export_messages(
+        tmp_path / "all.mbox",
+        ExportFormat.MBOX,
+        ExportScope.ALL_MESSAGES,
+        compression=ExportCompression.GZIP,
+    )
+
+    assert result.output_path.name == "all.mbox.gz"
+    with gzip.open(result.output_path, "rb") as f:
+        data = f.read()
+    # mboxrd adds one ">" to every quoted or unquoted "From " line
+    assert b"\n>From the top:" in data
+    assert b"\n>>From the archive" in data
+    assert data.count(b"\nFrom ") == 0 and data.startswith(b"From ")
+
+    path = tmp_path / "all.mbox"
+    path.write_bytes(data)
+    (message,) = mailbox.mbox(str(path))
+    types = [part.get_content_type() for part in message.walk()]
+    assert "text/html" in types
+    (attachment,) = [p for p in message.walk() if p.get_filename()]
+    assert attachment.get_filename() == "report.pdf"
+    assert attachment.get_payload(decode=True) == PDF
+
+
+def test_eml_export_writes_one_file_per_message(storage, service, tmp_path):
+    storage.create_messages_bulk(
+        {"subject": f"Message {i}", "body_text": "x"} for i in range(3)
+    )
+
+    result = service.export_messages(
+        tmp_path / "mail.eml", ExportFormat.EML, ExportScope.ALL_MESSAGES
+    )
+
+    assert result.messages_exported == 3
+    assert len(list(result.output_path.glob("*.eml"))) == 3
+
+    compressed = service.export_messages(
+        tmp_path / "mail.eml",
+        ExportFormat.EML,
+        ExportScope.ALL_MESSAGES,
+        compression=ExportCompression.GZIP,
+    )
+    assert not compressed.success
+
+
+@pytest.mark.parametrize("format", [ExportFormat.MBOX, ExportFormat.EML])
+def test_folded_headers_are_unfolded(storage, service, tmp_path, format):
+    # The receiver stores folded headers with their line breaks
+    storage.create_message(
+        {
+            "subject": "Quarterly numbers, please review\r\n before Friday",
+            "from_address": "Alice Example\r\n <alice@example.com>",
+            "body_text": "x",
+        }
+    )
+
+    result = service.export_messages(
+        tmp_path / "mail.eml", format, ExportScope.ALL_MESSAGES
+    )
+
+    assert result.success, result.error_message
+    assert result.messages_exported == 1
+    if format == ExportFormat.MBOX:
+        (message,) = mailbox.mbox(str(result.output_path))
+    else:
+        (path,) = result.output_path.glob("*.eml")
+        message = email.message_from_bytes(path.read_bytes())
+    assert (
+        message["Subject"] == "Quarterly numbers, please review before Friday"
+    )
+    assert message["From"] == "Alice Example <alice@example.com>"
+
+
+def test_message_that_cannot_be_rebuilt_is_skipped(
+    storage, service, tmp_path, monkeypatch
+):
+    storage.create_messages_bulk(
+        {"subject": f"Message {i}", "body_text": "x"} for i in range(3)
+    )
+    build = service._build_email
+
+    def fail_one(msg, include_attachments=True):
+        if msg["subject"] == "Message 1":
+            raise ValueError("bad header")
+        return build(msg, include_attachments)
+
+    monkeypatch.setattr(service, "_build_email", fail_one)
+
+    result = service.export_messages(
+        tmp_path / "all.mbox", ExportFormat.MBOX, ExportScope.ALL_MESSAGES
+    )
+
+    assert result.success and result.messages_exported == 2
+    subjects = {m["Subject"] for m in mailbox.mbox(str(result.output_path))}
+    assert subjects == {"Message 0", "Message 2"}
@@ -0,0 +1,56 @@
+"""
+Tests for incrementally maintained folder counters.
+"""
+
+
+def _counts(storage, name):
+    folder = storage.get_folder_by_name(name)
+    return folder["message_count"], folder["unread_count"]
+
+
+def test_create_message_updates_counts(storage):
+    storage.create_message({"from_address": "a@example.com"})
+    storage.create_message({"from_address": "b@example.com", "is_read": True})
+
+    assert _counts(storage, "Inbox") == (2, 1)
+
+
+def test_mark_read_and_unread(storage):
+    msg = storage.create_message({"from_address": "a@example.com"})
+
+    storage.mark_as_read(msg["id"])
+    assert _counts(storage, "Inbox") == (1, 0)
+
+    storage.mark_as_unread(msg["id"])
+    assert _counts(storage, "Inbox") == (1, 1)
+
+
+def test_move_and_delete(storage):
+    msg = storage.create_message({"from_address": "a@example.com"})
+
+    storage.move_to_trash(msg["id"])
+    assert _counts(storage, "Inbox") == (0, 0)
+    assert _counts(storage, "Trash") == (1, 1)
+
+    assert storage.empty_trash() == 1
+    assert _counts(storage, "Trash") == (0, 0)
+
+
+def test_flag_update_leaves_counts_untouched(storage):
+    msg = storage.create_message({"from_address": "a@example.com"})
+
+    storage.toggle_starred(msg["id"])
+    assert _counts(storage, "Inbox") == (1, 1)
+
+
+def test_recount_folders_repairs_drift(storage):
+    storage.create_message({"from_address": "a@example.com"})
+    inbox = storage.get_folder_by_name("Inbox")
+    storage._db.execute(
+        "UPDATE folders SET message_count = 42, unread_count = 7 WHERE id = ?",
+        (inbox["id"],),
+    )
+
+    assert storage.recount_folders() == 1
+    assert _counts(storage, "Inbox") == (1, 1)
+    assert storage.recount_folders() == 0
@@ -0,0 +1,183 @@
+"""
+Tests for the inbound spool and spool-mode SMTP receiving.
+"""
+
+import asyncio
+import socket
+from types import SimpleNamespace
+
+import aiosmtplib
+import pytest
+from aiosmtpd.smtp import Envelope
+
+from gateway.smtp.parser import EmailParser
+from gateway.smtp.receiver import SMTPHandler, SMTPReceiver
+from gateway.smtp.spool import InboundSpool, SpoolProcessor
+
+MESSAGE = (
+    b"From: alice@example.com\r\nTo: local@unitmail.local\r\n"
+    b"Subject: Spooled\r\nMessage-ID: <spooled-1@example.com>\r\n\r\n"
+    b"Stored in the background.\r\n"
+)
+
+
+def _envelope(content=MESSAGE):
+    envelope = Envelope()
+    envelope.mail_from = "alice@example.com"
+    envelope.rcpt_tos = ["local@unitmail.local"]
+    envelope.content = content
+    return envelope
+
+
+def _subjects(storage):
+    return [m["subject"] for m in storage.get_messages(limit=100)]
+
+
+@pytest.fixture
+def handler(storage):
+    return SMTPHandler(storage, EmailParser())
+
+
+@pytest.fixture
+async def processor(tmp_path, handler):
+    processor = SpoolProcessor(
+        InboundSpool(tmp_path / "spool"), handler, workers=2, retry_delay=0
+    )
+    handler.set_spool(processor)
+    await processor.start()
+    yield processor
+    await processor.stop()
+
+
+def test_spool_roundtrip(tmp_path):
+    spool = InboundSpool(tmp_path)
+    first = spool.write(b"one", "a@example.com", ["b@example.com"], "mx.test")
+    second = spool.write(MESSAGE, None, ["c@example.com"], "mx.test")
+
+    assert spool.pending() == [first, second]
+    entry = spool.read(second)
+    assert (entry.content, entry.mail_from, entry.rcpt_tos) == (
+        MESSAGE,
+        None,
+        ["c@example.com"],
+    )
+
+    spool.remove(first)
+    spool.quarantine(second)
+    assert spool.pending() == []
+    assert (tmp_path / "failed" / second).exists()
+
+
+async def test_data_answered_before_storing(storage, handler, processor):
+    reply = await handler.handle_DATA(
+        SimpleNamespace(hostname="mx.test"), SimpleNamespace(), _envelope()
+    )
+
+    spool_id = reply.rsplit(" ", 1)[1]
+    assert reply.startswith("250 2.0.0 OK: queued as ")
+    assert processor.spool.pending() == [spool_id]
+    assert _subjects(storage) == []
+
+    await processor.drain()
+    assert _subjects(storage) == ["Spooled"]
+    assert processor.spool.pending() == []
+    assert processor.stats.stored == 1
+
+
+async def test_unprocessed_messages_replayed_on_start(tmp_path, storage, handler):
+    spool = InboundSpool(tmp_path / "spool")
+    for i in range(3):
+        spool.write(
+            MESSAGE.replace(b"Spooled", f"Crashed {i}".encode()).replace(
+                b"spooled-1", f"crashed-{i}".encode()
+            ),
+            "alice@example.com",
+            ["local@unitmail.local"],
+            "mx.test",
+        )
+    (tmp_path / "spool" / "tmp" / "partial").write_bytes(b"{")
+    accepted = {spool.read(spool_id).received_at for spool_id in spool.pending()}
+
+    processor = SpoolProcessor(InboundSpool(tmp_path / "spool"), handler)
+    await processor.start()
+    try:
+        await processor.drain()
+    finally:
+        await processor.stop()
+
+    assert sorted(_subjects(storage)) == ["Crashed 0", "Crashed 1", "Crashed 2"]
+    # Stored with the time they were accepted, not the time of the replay
+    assert {m["received_at"] for m in storage.get_messages(limit=10)} == accepted
+    assert processor.stats.replayed == 3
+    assert spool.pending() == []
+    assert not (tmp_path / "spool" / "tmp" / "partial").exists()
+
+
+async def test_rejected_message_quarantined(storage, handler, processor):
+    await handler.handle_DATA(
+        SimpleNamespace(hostname="mx.test"),
+        SimpleNamespace(),
+        _envelope(b"Subject: no sender\r\n\r\nbody\r\n"),
+    )
+    await processor.drain()
+
+    assert _subjects(storage) == []
+    assert processor.stats.rejected == 1
+    assert processor.stats.quarantined == 1
+    assert len(processor.spool.failed()) == 1
+
+    # Still reported after a restart
+    await processor.stop()
+    await processor.start()
+    assert processor.stats.to_dict()["quarantined"] == 1
+
+
+async def test_storage_failure_retried(storage, handler, processor, monkeypatch):
+    store = storage.create_shared_message
+    failures = [RuntimeError("database is locked")]
+
+    def flaky_store(*args):
+        if failures:
+            raise failures.pop()
+        return store(*args)
+
+    monkeypatch.setattr(storage, "create_shared_message", flaky_store)
+    await handler.handle_DATA(
+        SimpleNamespace(hostname="mx.test"), SimpleNamespace(), _envelope()
+    )
+
+    while processor.stats.stored == 0:
+        await asyncio.sleep(0.01)
+    assert processor.stats.retried == 1
+    assert _subjects(storage) == ["Spooled"]
+
+
+async def test_receiver_spool_mode_end_to_end(tmp_path, storage):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    receiver = SMTPReceiver(
+        host="127.0.0.1",
+        port=port,
+        hostname="mx.test",
+        storage=storage,
+        spool_dir=str(tmp_path / "spool"),
+        spool_workers=1,
+    )
+    async with receiver:
+        await aiosmtplib.send(
+            MESSAGE,
+            sender="alice@example.com",
+            recipients=["local@unitmail.local"],
+            hostname="127.0.0.1",
+            port=port,
+        )
+        for _ in range(500):
+            if _subjects(storage):
+                break
+            await asyncio.sleep(0.01)
+        health = await receiver.health_check()
+
+    assert _subjects(storage) == ["Spooled"]
+    assert health["spool"]["stored"] == 1
@@ -0,0 +1,102 @@
+"""
+Tests for change sets, the database side of incremental backups.
+"""
+
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+def _rewind(storage, base):
+    """Put the database back to the state saved in base."""
+    db_path = storage._db.db_path
+    storage.close()
+    os.replace(base, db_path)
+    for suffix in ("-wal", "-shm"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+
+
+def _state(storage):
+    messages = sorted(
+        (m["id"], m["subject"], m["is_read"], m["folder_id"])
+        for m in storage.get_all_messages()
+    )
+    contacts = sorted(c["email"] for c in storage.get_contacts())
+    folders = sorted(
+        (f["name"], f["message_count"], f["unread_count"])
+        for f in storage.get_folders()
+    )
+    return messages, contacts, folders
+
+
+def _base(storage, tmp_path):
+    """Snapshot the mailbox and return (snapshot path, since)."""
+    base = tmp_path / "base.db"
+    storage.snapshot(str(base))
+    return base, datetime.now(timezone.utc).isoformat()
+
+
+def test_change_set_holds_only_changed_rows(storage, tmp_path):
+    storage.create_messages_bulk(
+        [{"subject": f"Old {i}", "body_text": "x"} for i in range(50)]
+    )
+    old = storage.get_all_messages()[0]
+    _, since = _base(storage, tmp_path)
+
+    storage.create_message({"subject": "New", "body_text": "y"})
+    storage.mark_as_read(old["id"])
+    storage.create_contact({"email": "friend@example.com"})
+
+    changes = storage.export_changes(str(tmp_path / "changes.db"), since)
+
+    assert changes.counts["messages"] == 2
+    assert changes.counts["contacts"] == 1
+    assert changes.counts["deleted_rows"] == 0
+    assert changes.watermark > since
+
+
+def test_replay_rebuilds_the_mailbox(storage, tmp_path):
+    ids = storage.create_messages_bulk(
+        [{"subject": f"Old {i}", "body_text": "x"} for i in range(5)]
+    )
+    gone = storage.create_contact({"email": "gone@example.com"})
+    base, since = _base(storage, tmp_path)
+
+    storage.create_message({"subject": "Quarterly invoice", "body_text": "z"})
+    storage.mark_as_read(ids[0])
+    storage.move_to_trash(ids[1])
+    storage.delete_message(ids[2])
+    storage.delete_contact(gone["id"])
+    storage.create_folder("Receipts")
+    expected = _state(storage)
+
+    changes_path = str(tmp_path / "changes.db")
+    storage.export_changes(changes_path, since)
+    _rewind(storage, base)
+    assert _state(storage) != expected
+
+    applied = storage.apply_changes(changes_path)
+
+    assert applied["deleted"] == 2
+    assert _state(storage) == expected
+    assert storage.get_message(ids[2]) is None
+    # Full-text search follows the applied rows
+    assert [m["subject"] for m in storage.search_messages("invoice")] == [
+        "Quarterly invoice"
+    ]
+
+
+def test_overlapping_change_sets_apply_twice(storage, tmp_path):
+    message = storage.create_message({"subject": "Hello", "body_text": "x"})
+    since = datetime.now(timezone.utc).isoformat()
+    storage.update_message(message["id"], {"subject": "Hello again"})
+    storage.create_message({"subject": "Second", "body_text": "y"})
+    expected = _state(storage)
+
+    changes_path = str(tmp_path / "changes.db")
+    storage.export_changes(changes_path, since)
+    storage.apply_changes(changes_path)
+    storage.apply_changes(changes_path)
+
+    assert _state(storage) == expected
+    assert len(storage.search_messages("again")) == 1
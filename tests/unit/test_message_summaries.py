@@ -0,0 +1,77 @@
+"""
+Tests for the lightweight message summary projection.
+"""
+
+from common.storage import MessageSummary
+
+
+def test_summary_fields(storage):
+    storage.create_message(
+        {
+            "from_address": "alice@example.com",
+            "to_addresses": ["me@example.com"],
+            "subject": "Quarterly report",
+            "body_text": "Hello,\n\n  the numbers   are in.\n",
+            "headers": {"From": "Alice <alice@example.com>"},
+            "attachments": [{"filename": "q3.pdf"}, {"filename": "q3.xlsx"}],
+        }
+    )
+
+    (summary,) = storage.get_message_summaries(folder_name="Inbox")
+
+    assert isinstance(summary, MessageSummary)
+    assert summary.subject == "Quarterly report"
+    assert summary.preview == "Hello, the numbers are in."
+    assert summary.from_header == "Alice <alice@example.com>"
+    assert summary.to_addresses == ["me@example.com"]
+    assert summary.has_attachments is True
+    assert summary.attachment_count == 2
+    assert summary.is_read is False
+
+
+def test_preview_is_truncated_and_refreshed(storage):
+    msg = storage.create_message(
+        {"from_address": "a@example.com", "body_text": "x" * 1000}
+    )
+    assert len(storage.get_message(msg["id"])["preview"]) == 200
+
+    storage.update_message(msg["id"], {"body_text": "short body"})
+    (summary,) = storage.get_message_summaries()
+    assert summary.preview == "short body"
+
+
+def test_summaries_filter_and_order(storage):
+    storage.create_message(
+        {"from_address": "a@example.com", "received_at": "2026-01-01T00:00:00"}
+    )
+    newer = storage.create_message(
+        {
+            "from_address": "b@example.com",
+            "received_at": "2026-01-02T00:00:00",
+            "is_read": True,
+        }
+    )
+
+    summaries = storage.get_message_summaries()
+    assert [s.from_address for s in summaries] == [
+        "b@example.com",
+        "a@example.com",
+    ]
+    assert [s.id for s in storage.get_message_summaries(is_read=True)] == [
+        newer["id"]
+    ]
+    assert storage.get_message_summaries(folder_name="Sent") == []
+
+
+def test_search_message_summaries(storage):
+    storage.create_message(
+        {"from_address": "a@example.com", "subject": "Invoice for March"}
+    )
+    storage.create_message(
+        {"from_address": "b@example.com", "subject": "Lunch plans"}
+    )
+
+    results = storage.search_message_summaries("invoice")
+
+    assert [s.subject for s in results] == ["Invoice for March"]
+    assert results[0].rank is not None
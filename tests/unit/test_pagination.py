@@ -0,0 +1,102 @@
+"""
+Tests for keyset (cursor) pagination of message listings.
+"""
+
+import pytest
+
+
+def _seed(storage, count):
+    # Pairs of messages share a timestamp to exercise the rowid tiebreaker
+    for i in range(count):
+        storage.create_message(
+            {
+                "from_address": f"sender{i}@example.com",
+                "received_at": f"2026-01-01T00:00:{59 - i // 2:02d}",
+            }
+        )
+
+
+def _walk(storage, fetch, limit):
+    seen = []
+    cursor = None
+    while True:
+        page = fetch(limit=limit, cursor=cursor)
+        seen.extend(m["id"] if isinstance(m, dict) else m.id for m in page)
+        cursor = storage.get_next_cursor(page, limit)
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize("limit", [1, 3, 4, 50])
+def test_cursor_walk_matches_offset_order(storage, limit):
+    _seed(storage, 9)
+    expected = [m["id"] for m in storage.get_all_messages(limit=100)]
+
+    assert _walk(storage, storage.get_all_messages, limit) == expected
+    assert (
+        _walk(
+            storage,
+            lambda **kw: storage.get_message_summaries(folder_name="Inbox", **kw),
+            limit,
+        )
+        == expected
+    )
+
+
+def test_cursor_ignores_offset(storage):
+    _seed(storage, 4)
+    first = storage.get_messages(limit=2)
+    cursor = storage.get_next_cursor(first, 2)
+
+    second = storage.get_messages(limit=2, offset=100, cursor=cursor)
+
+    assert [m["id"] for m in second] == [
+        m["id"] for m in storage.get_messages(limit=2, offset=2)
+    ]
+
+
+def test_last_page_has_no_cursor(storage):
+    _seed(storage, 3)
+    assert storage.get_next_cursor(storage.get_messages(limit=5), 5) is None
+    assert storage.get_next_cursor([], 5) is None
+
+
+def test_invalid_cursor_rejected(storage):
+    with pytest.raises(ValueError):
+        storage.get_messages(cursor="not-a-cursor")
+
+
+def test_iter_messages_walks_every_batch(storage):
+    _seed(storage, 9)
+
+    seen = [m["id"] for m in storage.iter_messages(batch_size=4)]
+
+    assert seen == [m["id"] for m in storage.get_messages(limit=50)]
+
+
+def test_iter_messages_survives_deleting_last_of_batch(storage):
+    _seed(storage, 9)
+    expected = [m["id"] for m in storage.get_messages(limit=50)]
+
+    seen = []
+    for message in storage.iter_messages(batch_size=4):
+        seen.append(message["id"])
+        if len(seen) % 4 == 0:
+            # The export has this message in hand; the next batch is not
+            # fetched yet
+            assert storage.delete_message(message["id"])
+
+    assert seen == expected
+
+
+def test_cursor_survives_deleting_last_of_page(storage):
+    _seed(storage, 6)
+    expected = [m.id for m in storage.get_message_summaries(limit=50)]
+    first = storage.get_message_summaries(limit=3)
+    storage.delete_message(first[-1].id)
+
+    second = storage.get_message_summaries(
+        limit=3, cursor=storage.get_next_cursor(first, 3)
+    )
+
+    assert [m.id for m in second] == expected[3:]
@@ -0,0 +1,156 @@
+"""
+Tests for atomic queue batch claiming.
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+from gateway.smtp.queue import QueueConfig, QueueManager
+
+
+def _enqueue(storage, count, **kwargs):
+    message_id = storage.create_message({"subject": "outbound"})["id"]
+    return [
+        storage.create_queue_item(message_id, f"to{i}@example.com", **kwargs)
+        for i in range(count)
+    ]
+
+
+def _iso(seconds):
+    return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).isoformat()
+
+
+def test_claim_flips_to_processing_with_lease(storage):
+    low = _enqueue(storage, 2)
+    high = _enqueue(storage, 1, priority=5)
+
+    claimed = storage.claim_queue_batch("worker-a", 2, lease_seconds=60)
+
+    assert [item["id"] for item in claimed] == [high[0]["id"], low[0]["id"]]
+    for item in claimed:
+        assert item["status"] == "processing"
+        assert item["claimed_by"] == "worker-a"
+        assert item["lease_expires_at"] > _iso(30)
+
+    rest = storage.claim_queue_batch("worker-b", 10)
+    assert [item["id"] for item in rest] == [low[1]["id"]]
+    assert storage.claim_queue_batch("worker-b", 10) == []
+
+
+def test_claim_only_due_retries(storage):
+    due, later = _enqueue(storage, 2)
+    storage.update_queue_item(
+        due["id"], {"status": "retrying", "next_attempt_at": _iso(-1)}
+    )
+    storage.update_queue_item(
+        later["id"], {"status": "retrying", "next_attempt_at": _iso(3600)}
+    )
+
+    claimed = storage.claim_queue_batch("worker-a", 10)
+
+    assert [item["id"] for item in claimed] == [due["id"]]
+    assert storage.get_next_queue_due_time() <= claimed[0]["lease_expires_at"]
+
+
+def test_expired_lease_is_reclaimed(storage):
+    (item,) = _enqueue(storage, 1)
+    storage.claim_queue_batch("crashed", 1, lease_seconds=-1)
+
+    reclaimed = storage.claim_queue_batch("worker-b", 1, lease_seconds=60)
+
+    assert [i["id"] for i in reclaimed] == [item["id"]]
+    assert reclaimed[0]["claimed_by"] == "worker-b"
+    assert storage.claim_queue_batch("worker-c", 1) == []
+
+
+def test_concurrent_claims_never_overlap(storage):
+    items = _enqueue(storage, 200)
+    claims: dict[str, list[str]] = {}
+
+    def worker(name):
+        ids = claims.setdefault(name, [])
+        while batch := storage.claim_queue_batch(name, 7):
+            ids.extend(item["id"] for item in batch)
+
+    threads = [
+        threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    claimed = [item_id for ids in claims.values() for item_id in ids]
+    assert sorted(claimed) == sorted(item["id"] for item in items)
+
+
+def test_deferred_backlog_does_not_starve_due_retries(storage):
+    deferred = _enqueue(storage, 20, priority=9)
+    for item in deferred:
+        storage.update_queue_item(
+            item["id"], {"status": "retrying", "next_attempt_at": _iso(3600)}
+        )
+    (due,) = _enqueue(storage, 1)
+    storage.update_queue_item(
+        due["id"], {"status": "retrying", "next_attempt_at": _iso(-1)}
+    )
+
+    claimed = storage.claim_queue_batch("worker-a", 5)
+
+    assert [item["id"] for item in claimed] == [due["id"]]
+
+
+def test_claim_orders_by_priority_then_due_time(storage):
+    pending, late, early, urgent = _enqueue(storage, 4)
+    storage.update_queue_item(
+        late["id"], {"status": "retrying", "next_attempt_at": _iso(-10)}
+    )
+    storage.update_queue_item(
+        early["id"], {"status": "retrying", "next_attempt_at": _iso(-600)}
+    )
+    storage.update_queue_item(
+        urgent["id"],
+        {"status": "retrying", "next_attempt_at": _iso(-1), "priority": 5},
+    )
+
+    claimed = storage.claim_queue_batch("worker-a", 10)
+
+    assert [item["id"] for item in claimed] == [
+        urgent["id"],
+        early["id"],
+        late["id"],
+        pending["id"],
+    ]
+
+
+def test_expired_claim_cannot_overwrite_new_owner(storage):
+    (item,) = _enqueue(storage, 1)
+    (stale,) = storage.claim_queue_batch("slow", 1, lease_seconds=-1)
+    storage.claim_queue_batch("worker-b", 1, lease_seconds=60)
+
+    assert storage.mark_queue_item_completed(item["id"], "slow") is None
+    assert storage.move_to_dead_letter(item["id"], "late 550", "slow") is None
+    assert storage.mark_queue_item_failed(item["id"], "late 451", "slow") is None
+    assert (
+        storage.update_queue_item(item["id"], {"status": "retrying"}, "slow")
+        is None
+    )
+    assert storage.get_queue_item(item["id"])["status"] == "processing"
+
+    done = storage.mark_queue_item_completed(item["id"], "worker-b")
+    assert done["status"] == "completed"
+
+
+async def test_queue_manager_drops_stale_results(storage):
+    (item,) = _enqueue(storage, 1)
+    (stale,) = storage.claim_queue_batch("slow", 1, lease_seconds=-1)
+    storage.claim_queue_batch("worker-b", 1, lease_seconds=60)
+    manager = QueueManager(config=QueueConfig(emit_events=False), storage=storage)
+
+    manager.schedule_retry(stale, "451 too late")
+    manager.schedule_retry({**stale, "attempts": 99}, "451 too late")
+    manager._mark_completed(stale)
+
+    current = storage.get_queue_item(item["id"])
+    assert (current["status"], current["claimed_by"]) == ("processing", "worker-b")
+    assert current["attempts"] == 0
@@ -0,0 +1,158 @@
+"""
+Tests for SMTP delivery of queued messages through QueueWorker.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from gateway.smtp.queue import QueueConfig, QueueManager
+from gateway.smtp.sender import DeliveryResult, DeliveryStatus, RelayConfig, SMTPSender
+from gateway.smtp.worker import ErrorClassifier, ErrorType, QueueWorker
+
+
+def _relay_sender(port):
+    return SMTPSender(
+        relay_config=RelayConfig(
+            host="127.0.0.1", port=port, use_tls=False, require_starttls=False
+        ),
+        timeout=5,
+    )
+
+
+@pytest.fixture
+def outbound(storage):
+    return storage.create_message(
+        {
+            "from_address": "alice@example.com",
+            "to_addresses": ["bob@example.com", "carol@example.org"],
+            "subject": "Quarterly report",
+            "body_text": "Numbers attached.",
+            "status": "queued",
+        }
+    )
+
+
+@pytest.fixture
+async def run_queue(storage):
+    managers = []
+
+    async def start(sender):
+        manager = QueueManager(
+            config=QueueConfig(emit_events=False, retry_intervals=[3600]),
+            storage=storage,
+        )
+        manager.set_worker_class(QueueWorker)
+        manager.set_sender(sender)
+        managers.append((manager, asyncio.create_task(manager.start())))
+        await asyncio.sleep(0.05)
+        return manager
+
+    yield start
+
+    for manager, task in managers:
+        await manager.stop()
+        await asyncio.wait_for(task, timeout=5)
+
+
+async def _wait_for_status(storage, item_id, statuses, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        item = storage.get_queue_item(item_id)
+        if item["status"] in statuses:
+            return item
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"queue item stuck in {item['status']}")
+
+
+async def test_queue_delivers_through_sender(storage, smtp_sink, outbound, run_queue):
+    await run_queue(_relay_sender(smtp_sink.port))
+    items = [
+        storage.create_queue_item(outbound["id"], recipient)
+        for recipient in outbound["to_addresses"]
+    ]
+
+    for item in items:
+        await _wait_for_status(storage, item["id"], {"completed"})
+
+    assert sorted(m.rcpt_tos[0] for m in smtp_sink.messages) == [
+        "bob@example.com",
+        "carol@example.org",
+    ]
+    for message in smtp_sink.messages:
+        assert message.mail_from == "alice@example.com"
+        assert b"Subject: Quarterly report" in message.data
+        assert outbound["message_id"].encode() in message.data
+
+
+async def test_refused_recipient_is_dead_lettered(
+    storage, smtp_sink, outbound, run_queue
+):
+    smtp_sink.refuse("bob@example.com", "550 5.1.1 No such user")
+    await run_queue(_relay_sender(smtp_sink.port))
+
+    item = storage.create_queue_item(outbound["id"], "bob@example.com")
+    item = await _wait_for_status(storage, item["id"], {"dead_letter"})
+
+    assert "550" in item["error_message"]
+    assert smtp_sink.count == 0
+
+
+async def test_temporary_refusal_schedules_retry(
+    storage, smtp_sink, outbound, run_queue
+):
+    smtp_sink.refuse("bob@example.com", "451 4.7.1 Greylisted, try again later")
+    await run_queue(_relay_sender(smtp_sink.port))
+
+    item = storage.create_queue_item(outbound["id"], "bob@example.com")
+    item = await _wait_for_status(storage, item["id"], {"retrying"})
+
+    assert item["attempts"] == 1
+    assert item["next_attempt_at"] > item["updated_at"]
+    assert "451" in item["error_message"]
+
+
+async def test_unreachable_relay_is_retried(storage, outbound, run_queue):
+    from tests.smtp_sink import _free_port
+
+    await run_queue(_relay_sender(_free_port("127.0.0.1")))
+
+    item = storage.create_queue_item(outbound["id"], "bob@example.com")
+    await _wait_for_status(storage, item["id"], {"retrying"})
+
+
+async def test_uncomposable_message_is_dead_lettered(
+    storage, smtp_sink, run_queue
+):
+    message = storage.create_message(
+        {"from_address": "alice@example.com", "subject": "No body"}
+    )
+    await run_queue(_relay_sender(smtp_sink.port))
+
+    item = storage.create_queue_item(message["id"], "bob@example.com")
+    item = await _wait_for_status(storage, item["id"], {"dead_letter"})
+
+    assert "Cannot compose message" in item["error_message"]
+
+
+@pytest.mark.parametrize(
+    ("status", "code", "text", "expected"),
+    [
+        (DeliveryStatus.DELIVERED, 250, "OK", None),
+        (DeliveryStatus.BOUNCED, 550, "No such user", ErrorType.INVALID_RECIPIENT),
+        (DeliveryStatus.BOUNCED, None, "DNS lookup failed", ErrorType.PERMANENT),
+        (DeliveryStatus.DEFERRED, 421, "Too busy", ErrorType.SERVER_BUSY),
+        (DeliveryStatus.DEFERRED, None, "Connection refused", ErrorType.TEMPORARY),
+        (DeliveryStatus.DEFERRED, None, "blocked by policy", ErrorType.TEMPORARY),
+    ],
+)
+def test_classify_delivery(status, code, text, expected):
+    result = DeliveryResult(
+        recipient="bob@example.com",
+        status=status,
+        smtp_code=code,
+        smtp_message=text,
+    )
+
+    assert ErrorClassifier.classify_delivery(result) == expected
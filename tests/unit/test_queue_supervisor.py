@@ -0,0 +1,134 @@
+"""
+Tests for multi-process queue supervision.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from common.storage import EmailStorage
+from gateway.smtp.queue import DomainStats, QueueConfig, QueueManager, QueueStats
+from gateway.smtp.supervisor import QueueSupervisor, aggregate_stats
+
+
+def _crash_once_child(index, reporter, marker_dir):
+    """Exit with an error the first time a slot starts, then idle."""
+    marker = os.path.join(marker_dir, f"started-{index}")
+    first_start = not os.path.exists(marker)
+    with open(marker, "a") as f:
+        f.write(f"{os.getpid()}\n")
+    if first_start:
+        os._exit(3)
+
+    reporter.report(QueueStats(total_processed=index + 1, workers_total=2))
+    time.sleep(60)
+
+
+def _drain_child(index, reporter, db_path):
+    """Run a QueueManager with the default (mark completed) processing."""
+
+    async def run():
+        manager = QueueManager(
+            config=QueueConfig(
+                emit_events=False, use_doorbell=False, poll_interval=0.5
+            ),
+            storage=EmailStorage(db_path),
+        )
+        reporter_task = asyncio.create_task(reporter.run(manager, 0.05))
+        try:
+            await manager.start()
+        finally:
+            reporter_task.cancel()
+
+    asyncio.run(run())
+
+
+def _run_until(supervisor, condition, timeout=20.0):
+    thread = threading.Thread(target=supervisor.run, kwargs={"tick": 0.05})
+    thread.start()
+    try:
+        deadline = time.monotonic() + timeout
+        while not condition():
+            assert time.monotonic() < deadline, "condition never met"
+            time.sleep(0.05)
+    finally:
+        supervisor.stop()
+        thread.join(timeout=15)
+    assert not thread.is_alive()
+
+
+def test_aggregate_stats_merges_processes():
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    older = QueueStats(
+        pending=9,
+        total_processed=10,
+        avg_processing_time_ms=10.0,
+        workers_total=4,
+        started_at=started,
+        domains={"a.test": DomainStats(active=1, dispatched=5, throttle_events=1)},
+    )
+    newer = QueueStats(
+        pending=7,
+        total_processed=30,
+        avg_processing_time_ms=30.0,
+        workers_total=4,
+        domains={
+            "a.test": DomainStats(
+                active=2, dispatched=7, backoff_remaining_seconds=12.0
+            ),
+            "b.test": DomainStats(dispatched=1),
+        },
+    )
+
+    merged = aggregate_stats([older, newer])
+
+    assert merged.pending == 7
+    assert merged.total_processed == 40
+    assert merged.avg_processing_time_ms == 25.0
+    assert merged.workers_total == 8
+    assert merged.started_at == started
+    assert merged.domains["a.test"].active == 3
+    assert merged.domains["a.test"].dispatched == 12
+    assert merged.domains["a.test"].throttle_events == 1
+    assert merged.throttled_domains == 1
+    assert aggregate_stats([]) == QueueStats()
+
+
+def test_crashed_children_are_restarted(tmp_path):
+    supervisor = QueueSupervisor(
+        _crash_once_child,
+        processes=2,
+        args=(str(tmp_path),),
+        restart_delay=0.05,
+        shutdown_timeout=5,
+    )
+
+    _run_until(supervisor, lambda: supervisor.stats().workers_total == 4)
+
+    assert supervisor.restarts == 2
+    assert supervisor.stats().total_processed == 3
+    for index in range(2):
+        pids = (tmp_path / f"started-{index}").read_text().split()
+        assert len(pids) == 2 and pids[0] != pids[1]
+
+
+def test_processes_share_the_queue(storage, tmp_path):
+    message_id = storage.create_message({"subject": "outbound"})["id"]
+    items = [
+        storage.create_queue_item(message_id, f"to{i}@example.com")
+        for i in range(60)
+    ]
+    supervisor = QueueSupervisor(
+        _drain_child,
+        processes=2,
+        args=(str(tmp_path / "unitmail.db"),),
+        shutdown_timeout=5,
+    )
+
+    _run_until(
+        supervisor, lambda: supervisor.stats().total_processed == len(items)
+    )
+
+    assert storage.count_queue_items("completed") == len(items)
@@ -0,0 +1,164 @@
+"""
+Tests for event-driven queue dispatch and doorbells.
+"""
+
+import asyncio
+import importlib
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from common.storage.notify import (
+    DOORBELLS_SUPPORTED,
+    QueueDoorbell,
+    doorbell_directory,
+    ring_doorbells,
+)
+from gateway.smtp.queue import QueueConfig, QueueManager
+
+
+@pytest.fixture
+def message_id(storage):
+    return storage.create_message({"subject": "outbound"})["id"]
+
+
+@pytest.fixture
+async def manager(storage):
+    manager = QueueManager(
+        config=QueueConfig(poll_interval=30.0, emit_events=False),
+        storage=storage,
+    )
+    task = asyncio.create_task(manager.start())
+    await asyncio.sleep(0.05)
+    yield manager
+    await manager.stop()
+    await asyncio.wait_for(task, timeout=5)
+
+
+async def _wait_for_status(storage, item_id, status, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if storage.get_queue_item(item_id)["status"] == status:
+            return time.monotonic()
+        await asyncio.sleep(0.005)
+    raise AssertionError(f"queue item never reached {status}")
+
+
+async def test_enqueue_wakes_idle_loop(storage, manager, message_id):
+    start = time.monotonic()
+    item = storage.create_queue_item(message_id, "to@example.com")
+
+    done = await _wait_for_status(storage, item["id"], "completed")
+    assert done - start < 1.0
+
+
+async def test_enqueue_from_another_thread(storage, manager, message_id):
+    items = []
+    thread = threading.Thread(
+        target=lambda: items.append(
+            storage.create_queue_item(message_id, "to@example.com")
+        )
+    )
+    thread.start()
+    thread.join()
+
+    await _wait_for_status(storage, items[0]["id"], "completed")
+
+
+async def test_scheduled_retry_wakes_loop(storage, manager, message_id):
+    item = storage.create_queue_item(message_id, "to@example.com")
+    await _wait_for_status(storage, item["id"], "completed")
+
+    due = datetime.now(timezone.utc) + timedelta(seconds=0.3)
+    storage.update_queue_item(
+        item["id"],
+        {"status": "retrying", "next_attempt_at": due.isoformat()},
+    )
+
+    await _wait_for_status(storage, item["id"], "completed", timeout=2.0)
+
+
+def test_only_claimable_updates_notify(storage, message_id):
+    rings = []
+    storage.add_queue_listener(lambda: rings.append(1))
+    done, dead, retried = (
+        storage.create_queue_item(message_id, f"to{i}@example.com")
+        for i in range(3)
+    )
+    assert len(rings) == 3
+    storage.claim_queue_batch("me", 3)
+
+    storage.mark_queue_item_completed(done["id"], "me")
+    storage.move_to_dead_letter(dead["id"], "550 No such user", "me")
+    storage.update_queue_item(dead["id"], {"status": "failed"})
+    assert len(rings) == 3
+
+    due = datetime.now(timezone.utc).isoformat()
+    storage.update_queue_item(
+        retried["id"],
+        {"status": "retrying", "next_attempt_at": due},
+        worker_id="me",
+    )
+    assert len(rings) == 4
+
+
+@pytest.mark.skipif(not DOORBELLS_SUPPORTED, reason="needs AF_UNIX")
+def test_doorbell_ring_and_cleanup(tmp_path):
+    db_path = str(tmp_path / "queue.db")
+    doorbell = QueueDoorbell(db_path)
+
+    assert ring_doorbells(db_path) == 1
+    assert ring_doorbells(db_path) == 1
+    assert doorbell.drain() == 2
+    assert doorbell.drain() == 0
+
+    # A socket file left behind by a dead listener is removed on ring
+    stale = doorbell_directory(db_path) / "stale.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as dead:
+        dead.bind(str(stale))
+
+    assert ring_doorbells(db_path) == 1
+    assert not stale.exists()
+    doorbell.drain()
+
+    doorbell.close()
+    assert ring_doorbells(db_path) == 0
+
+
+def test_ring_without_listeners(tmp_path):
+    assert ring_doorbells(str(tmp_path / "missing.db")) == 0
+
+
+def test_long_paths_use_temp_directory(tmp_path):
+    db_path = str(tmp_path / ("x" * 120) / "unitmail.db")
+
+    assert len(str(doorbell_directory(db_path))) < 100
+
+
+async def test_sigterm_stops_idle_worker_promptly(storage, monkeypatch):
+    monkeypatch.syspath_prepend(str(Path(__file__).parents[2] / "scripts"))
+    queue_worker = importlib.import_module("queue_worker")
+    monkeypatch.setattr(queue_worker, "_shutdown_requested", False)
+    run = asyncio.create_task(
+        queue_worker.run_queue_worker(
+            num_workers=1,
+            batch_size=1,
+            poll_interval=30.0,
+            emit_events=False,
+            max_retries=None,
+            shutdown_timeout=None,
+            logger=logging.getLogger("test"),
+        )
+    )
+    await asyncio.sleep(0.2)
+
+    os.kill(os.getpid(), signal.SIGTERM)
+
+    assert await asyncio.wait_for(run, timeout=2) == 0
@@ -0,0 +1,196 @@
+"""
+Tests for storing a message once for all of its local recipients.
+"""
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+from aiosmtpd.smtp import Envelope
+
+from common.storage import EmailStorage
+from common.storage.connection import get_db
+from common.storage.migrations import get_schema_version, run_migrations
+from common.storage.schema import SCHEMA_VERSION
+from gateway.smtp.parser import EmailParser
+from gateway.smtp.receiver import SMTPHandler
+
+MESSAGE = {
+    "message_id": "<shared-1@example.com>",
+    "from_address": "alice@example.com",
+    "to_addresses": ["team@example.com"],
+    "subject": "Team update",
+    "body_text": "Quarterly numbers inside.",
+    "body_html": "<p>Quarterly numbers inside.</p>",
+    "headers": {"From": "Alice <alice@example.com>"},
+    "attachments": [{"filename": "numbers.csv", "content_type": "text/csv"}],
+}
+
+RAW = (
+    b"From: alice@example.com\r\nTo: team@example.com\r\n"
+    b"Subject: Team update\r\nMessage-ID: <shared-2@example.com>\r\n\r\n"
+    b"Quarterly numbers inside.\r\n"
+)
+
+
+def _add_user(storage, email):
+    user_id = str(uuid4())
+    storage._db.execute(
+        "INSERT INTO users (id, email) VALUES (?, ?)", (user_id, email)
+    )
+    return user_id
+
+
+def _content_count(storage):
+    return storage._db.fetchone("SELECT COUNT(*) FROM message_contents")[0]
+
+
+def test_content_stored_once_for_all_users(storage):
+    bob = _add_user(storage, "bob@example.com")
+    me = storage.get_default_user()["id"]
+
+    ids = storage.create_shared_message(MESSAGE, {me: None, bob: None})
+
+    assert len(ids) == 2
+    assert _content_count(storage) == 1
+    for message_id in ids:
+        message = storage.get_message(message_id)
+        assert message["body_text"] == MESSAGE["body_text"]
+        assert message["body_html"] == MESSAGE["body_html"]
+        assert message["headers"] == MESSAGE["headers"]
+        assert [a["filename"] for a in message["attachments"]] == [
+            "numbers.csv"
+        ]
+    assert {m["user_id"] for m in storage.get_messages()} == {me, bob}
+    assert len(storage.search_messages("quarterly")) == 2
+    assert storage.get_message_summaries()[0].from_header == (
+        "Alice <alice@example.com>"
+    )
+    assert storage.get_folder_by_name("Inbox")["message_count"] == 2
+
+
+def test_storing_again_is_a_no_op(storage):
+    me = storage.get_default_user()["id"]
+    storage.create_shared_message(MESSAGE, {me: None})
+
+    retry = {**MESSAGE, "headers": {**MESSAGE["headers"], "X-Retry": "1"}}
+    assert storage.create_shared_message(retry, {me: None}) == []
+    assert storage.get_message_count() == 1
+    assert _content_count(storage) == 1
+
+
+def test_editing_a_copy_detaches_it(storage):
+    bob = _add_user(storage, "bob@example.com")
+    me = storage.get_default_user()["id"]
+    mine, bobs = storage.create_shared_message(MESSAGE, {me: None, bob: None})
+
+    storage.update_message(mine, {"body_text": "My own notes."})
+
+    edited = storage.get_message(mine)
+    assert edited["body_html"] == MESSAGE["body_html"]
+    assert edited["headers"] == MESSAGE["headers"]
+    assert storage.get_message(bobs)["body_text"] == MESSAGE["body_text"]
+    assert [m["id"] for m in storage.search_messages("notes")] == [mine]
+    assert [m["id"] for m in storage.search_messages("quarterly")] == [bobs]
+
+
+def test_content_removed_with_last_copy(storage):
+    bob = _add_user(storage, "bob@example.com")
+    me = storage.get_default_user()["id"]
+    mine, bobs = storage.create_shared_message(MESSAGE, {me: None, bob: None})
+
+    storage.delete_message(mine)
+    assert _content_count(storage) == 1
+    storage.delete_message(bobs)
+
+    assert _content_count(storage) == 0
+    assert storage.search_messages("quarterly") == []
+    storage._db.execute(
+        "INSERT INTO messages_fts(messages_fts) VALUES ('integrity-check')"
+    )
+
+
+async def test_receiver_fans_out_with_session_lookups(storage, monkeypatch):
+    bob = _add_user(storage, "bob@example.com")
+    handler = SMTPHandler(storage, EmailParser())
+    lookups = []
+    find_user = storage.get_user_by_email
+
+    def counting_lookup(email):
+        lookups.append(email)
+        return find_user(email)
+
+    monkeypatch.setattr(storage, "get_user_by_email", counting_lookup)
+    server = SimpleNamespace(hostname="mx.test")
+    session = SimpleNamespace(auth_data=None)
+    rcpt_tos = ["bob@example.com", "me@unitmail.local", "alias@unitmail.local"]
+
+    for content in (RAW, RAW.replace(b"shared-2", b"shared-3")):
+        envelope = Envelope()
+        await handler.handle_MAIL(
+            server, session, envelope, "alice@example.com", []
+        )
+        for address in rcpt_tos:
+            await handler.handle_RCPT(server, session, envelope, address, [])
+        envelope.content = content
+        reply = await handler.handle_DATA(server, session, envelope)
+        assert reply.startswith("250 ")
+
+    # Each address looked up once per session, not per message
+    assert sorted(lookups) == sorted(rcpt_tos)
+    # Both local aliases reach the default user, who gets one copy
+    messages = storage.get_messages()
+    assert len(messages) == 4
+    assert sum(m["user_id"] == bob for m in messages) == 2
+    assert _content_count(storage) == 2
+
+
+def test_v6_database_upgraded(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    db_path = str(tmp_path / "v6.db")
+    EmailStorage.reset()
+    db = get_db(db_path)
+    run_migrations(target_version=6)
+    db.execute("INSERT INTO users (id, email) VALUES ('u1', 'me@example.com')")
+    db.execute(
+        "INSERT INTO folders (id, user_id, name) VALUES ('f1', 'u1', 'Inbox')"
+    )
+    db.execute(
+        """
+        INSERT INTO messages (
+            id, user_id, folder_id, message_id, from_address, to_addresses,
+            subject, body_text, has_attachments
+        ) VALUES ('m1', 'u1', 'f1', '<old@example.com>', 'a@example.com',
+                  '[]', 'Old mail', 'legacy pineapple', 1)
+        """
+    )
+    db.execute(
+        """
+        INSERT INTO attachments (id, message_id, filename, content_type)
+        VALUES ('a1', 'm1', 'old.txt', 'text/plain')
+        """
+    )
+    rowid = db.fetchone("SELECT rowid FROM messages WHERE id = 'm1'")[0]
+    EmailStorage.reset()
+
+    try:
+        storage = EmailStorage(db_path)
+
+        assert get_schema_version() == SCHEMA_VERSION
+        message = storage.get_message("m1")
+        assert message["body_text"] == "legacy pineapple"
+        assert [a["filename"] for a in message["attachments"]] == ["old.txt"]
+        assert [m["id"] for m in storage.search_messages("pineapple")] == ["m1"]
+        assert storage._db.fetchone(
+            "SELECT rowid FROM messages WHERE id = 'm1'"
+        )[0] == rowid
+        assert storage.get_folder_by_id("f1")["message_count"] == 1
+
+        # The Message-ID is now unique per user, not globally
+        other = _add_user(storage, "other@example.com")
+        assert storage.create_shared_message(
+            {"message_id": "<old@example.com>", "subject": "Old mail"},
+            {"u1": "f1", other: None},
+        ) != []
+        assert storage.get_message_count() == 2
+    finally:
+        EmailStorage.reset()
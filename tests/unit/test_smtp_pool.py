@@ -0,0 +1,119 @@
+"""
+Tests for SMTP connection pooling and per-domain recipient batching.
+"""
+
+import asyncio
+
+from gateway.smtp.sender import DeliveryStatus, MXRecord, RelayConfig, SMTPSender
+
+RAW = "From: a@example.com\r\nSubject: Hello\r\n\r\nHi.\r\n"
+
+
+class _SinkMXSender(SMTPSender):
+    """Sender whose MX lookups all resolve to the local sink."""
+
+    def __init__(self, port, **kwargs):
+        super().__init__(timeout=5, **kwargs)
+        self.sink_port = port
+        self.lookups = []
+
+    async def get_mx_records(self, domain):
+        self.lookups.append(domain)
+        return [MXRecord(priority=0, host="127.0.0.1", port=self.sink_port)]
+
+
+async def test_same_domain_recipients_share_one_envelope(smtp_sink):
+    sender = _SinkMXSender(smtp_sink.port)
+    recipients = [f"user{i}@example.com" for i in range(40)]
+
+    results = await sender.send_envelope(RAW, "a@example.com", recipients)
+    await sender.close()
+
+    assert [r.recipient for r in results] == recipients
+    assert all(r.status == DeliveryStatus.DELIVERED for r in results)
+    assert smtp_sink.count == 1
+    assert smtp_sink.messages[0].rcpt_tos == recipients
+    assert smtp_sink.connections == 1
+    assert sender.lookups == ["example.com"]
+
+
+async def test_domains_are_enveloped_separately(smtp_sink):
+    sender = _SinkMXSender(smtp_sink.port)
+    recipients = ["a@one.test", "b@two.test", "c@one.test", "A@one.test"]
+
+    results = await sender.send_envelope(RAW, "a@example.com", recipients)
+    await sender.close()
+
+    assert [r.recipient for r in results] == recipients[:3]
+    envelopes = sorted(m.rcpt_tos for m in smtp_sink.messages)
+    assert envelopes == [["a@one.test", "c@one.test"], ["b@two.test"]]
+
+
+async def test_connection_reused_across_messages(smtp_sink):
+    sender = _SinkMXSender(smtp_sink.port)
+
+    for i in range(5):
+        result = await sender.send_raw(RAW, "a@example.com", f"to{i}@example.com")
+        assert result.status == DeliveryStatus.DELIVERED
+
+    assert smtp_sink.count == 5
+    assert smtp_sink.connections == 1
+    assert sender.pool_stats.connections_reused == 4
+
+    await sender.close()
+    assert sender.pool_stats.idle == 0
+
+
+async def test_connection_retired_after_max_messages(smtp_sink):
+    sender = _SinkMXSender(smtp_sink.port, max_messages_per_connection=2)
+
+    for i in range(5):
+        await sender.send_raw(RAW, "a@example.com", f"to{i}@example.com")
+    await sender.close()
+
+    assert smtp_sink.count == 5
+    assert smtp_sink.connections == 3
+
+
+async def test_idle_connection_closed_after_timeout(smtp_sink):
+    sender = _SinkMXSender(smtp_sink.port, idle_timeout=0.1)
+
+    await sender.send_raw(RAW, "a@example.com", "to@example.com")
+    assert sender.pool_stats.idle == 1
+
+    await asyncio.sleep(0.3)
+    assert sender.pool_stats.idle == 0
+    assert sender.pool_stats.connections_closed == 1
+
+    await sender.send_raw(RAW, "a@example.com", "to@example.com")
+    await sender.close()
+    assert smtp_sink.connections == 2
+
+
+async def test_refused_recipients_reported_individually(smtp_sink):
+    smtp_sink.refuse("gone@example.com")
+    smtp_sink.refuse("busy@example.com", "451 4.3.0 Try again later")
+    sender = SMTPSender(
+        relay_config=RelayConfig(
+            host="127.0.0.1",
+            port=smtp_sink.port,
+            use_tls=False,
+            require_starttls=False,
+        ),
+        timeout=5,
+    )
+
+    results = await sender.send_envelope(
+        RAW,
+        "a@example.com",
+        ["ok@example.com", "gone@example.com", "busy@example.com"],
+    )
+    await sender.close()
+
+    assert [r.status for r in results] == [
+        DeliveryStatus.DELIVERED,
+        DeliveryStatus.BOUNCED,
+        DeliveryStatus.DEFERRED,
+    ]
+    assert results[1].smtp_code == 550
+    assert smtp_sink.messages[0].rcpt_tos == ["ok@example.com"]